@@ -0,0 +1,250 @@
+"""Admission control and load shedding for the work routes, as ASGI middleware.
+
+Every work route has its own bounded concurrency limit and wait queue, and
+all of them share one pool sized for the LLM deployment. A request first
+takes a slot of its route, then one of the shared pool; when none is free it
+waits in the queue, ordered by priority class:
+
+- ``interactive`` (the mapper routes by default),
+- ``batch`` (callers opt in with ``X-Request-Priority: batch``),
+- ``evaluation`` (``/evaluator``).
+
+A request may lower its class with the header but never raise it above its
+route's default. When a queue is full, an arriving request evicts the
+lowest-priority waiter if it outranks it; otherwise it is shed. Shed
+requests, and requests that wait longer than the queue timeout, get an
+immediate 503 with ``Retry-After``.
+
+Limits are per worker process. The queue depth gauges
+(``mapper_admission_queue_depth``) are the autoscaling signal.
+"""
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+import json
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from mapper_api.application.services.metrics import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_QUEUE_WAIT,
+    ADMISSION_REJECTED,
+)
+
+PRIORITIES: Tuple[str, ...] = ("interactive", "batch", "evaluation")
+PRIORITY_HEADER = b"x-request-priority"
+SHARED_POOL = "shared"
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, limiter: Optional["PriorityLimiter"] = None) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.limiter = limiter
+
+
+@dataclass(eq=False)
+class _Waiter:
+    rank: int
+    seq: int
+    future: "asyncio.Future[None]"
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.rank, self.seq) < (other.rank, other.seq)
+
+
+class PriorityLimiter:
+    """
+    At most ``limit`` holders; up to ``max_queue`` waiters served by priority
+    rank (lower first), then arrival. Event-loop only, not thread-safe.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int) -> None:
+        if limit < 1 or max_queue < 0:
+            raise ValueError("limit must be >= 1 and max_queue >= 0")
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _depth_changed(self, rank: int, delta: int) -> None:
+        ADMISSION_QUEUE_DEPTH.labels(self.name, PRIORITIES[rank]).inc(delta)
+
+    async def acquire(self, rank: int, timeout_s: float) -> None:
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            ADMISSION_IN_FLIGHT.labels(self.name).inc()
+            return
+        if len(self._waiters) >= self.max_queue:
+            lowest = max(self._waiters) if self._waiters else None
+            if lowest is None or lowest.rank <= rank:
+                raise AdmissionRejected("queue_full")
+            # Make room by shedding the lowest-priority, latest waiter
+            self._waiters.remove(lowest)
+            heapq.heapify(self._waiters)
+            self._depth_changed(lowest.rank, -1)
+            lowest.future.set_exception(AdmissionRejected("evicted"))
+        waiter = _Waiter(rank, next(self._seq), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiters, waiter)
+        self._depth_changed(rank, 1)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout_s)
+        except asyncio.TimeoutError:
+            if waiter.future.done() and waiter.future.exception() is None:
+                return  # granted just as the wait timed out
+            self._abandon(waiter)
+            raise AdmissionRejected("queue_timeout")
+        except asyncio.CancelledError:
+            if waiter.future.done() and waiter.future.exception() is None:
+                self.release()
+            else:
+                self._abandon(waiter)
+            raise
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+            heapq.heapify(self._waiters)
+            self._depth_changed(waiter.rank, -1)
+        if not waiter.future.done():
+            waiter.future.cancel()
+
+    def release(self) -> None:
+        # Hand the slot straight to the next waiter, so arrivals cannot overtake the queue
+        while self._waiters:
+            waiter = heapq.heappop(self._waiters)
+            self._depth_changed(waiter.rank, -1)
+            if not waiter.future.done():
+                waiter.future.set_result(None)
+                return
+        self.in_flight -= 1
+        ADMISSION_IN_FLIGHT.labels(self.name).dec()
+
+    def stats(self) -> Dict[str, Any]:
+        by_priority = {name: 0 for name in PRIORITIES}
+        for waiter in self._waiters:
+            by_priority[PRIORITIES[waiter.rank]] += 1
+        return {"limit": self.limit, "maxQueue": self.max_queue, "inFlight": self.in_flight, "queued": by_priority}
+
+
+def default_priority(route: str) -> str:
+    return "evaluation" if route.endswith("/evaluator") else "interactive"
+
+
+class AdmissionController:
+    """The per-route limiters and the shared pool of one worker."""
+
+    def __init__(
+        self,
+        *,
+        route_limits: Dict[str, Tuple[int, int]],
+        shared_limit: int,
+        shared_queue: int,
+        queue_timeout_s: float = 10.0,
+        retry_after_s: float = 1.0,
+    ) -> None:
+        """``route_limits`` maps a work route suffix to (concurrency, queue size)."""
+        self.routes = tuple(route_limits)
+        self.limiters = {route: PriorityLimiter(route, *limits) for route, limits in route_limits.items()}
+        self.shared = PriorityLimiter(SHARED_POOL, shared_limit, shared_queue)
+        self.queue_timeout_s = queue_timeout_s
+        self.retry_after_s = retry_after_s
+
+    def route(self, path: str) -> Optional[str]:
+        for route in self.routes:
+            if path.endswith(route):
+                return route
+        return None
+
+    @staticmethod
+    def rank(route: str, requested: Optional[str]) -> int:
+        floor = PRIORITIES.index(default_priority(route))
+        requested = (requested or "").strip().lower()
+        return max(PRIORITIES.index(requested), floor) if requested in PRIORITIES else floor
+
+    async def admit(self, route: str, rank: int) -> List[PriorityLimiter]:
+        """Take a slot of the route, then of the shared pool; the caller releases them."""
+        deadline = time.perf_counter() + self.queue_timeout_s
+        acquired: List[PriorityLimiter] = []
+        try:
+            for limiter in (self.limiters[route], self.shared):
+                try:
+                    await limiter.acquire(rank, max(deadline - time.perf_counter(), 0.0))
+                except AdmissionRejected as e:
+                    ADMISSION_REJECTED.labels(route, PRIORITIES[rank], e.reason).inc()
+                    raise AdmissionRejected(e.reason, limiter) from None
+                acquired.append(limiter)
+        except BaseException:
+            self.release(acquired)
+            raise
+        ADMISSION_QUEUE_WAIT.labels(route, PRIORITIES[rank]).observe(
+            self.queue_timeout_s - (deadline - time.perf_counter())
+        )
+        return acquired
+
+    @staticmethod
+    def release(acquired: List[PriorityLimiter]) -> None:
+        for limiter in reversed(acquired):
+            limiter.release()
+
+    def retry_after(self, limiter: Optional[PriorityLimiter]) -> int:
+        # Longer back-off the deeper the backlog, in whole seconds as the header requires
+        backlog = limiter.queued / limiter.limit if limiter is not None else 0.0
+        return max(1, math.ceil(self.retry_after_s * (1 + backlog)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "routes": {route: limiter.stats() for route, limiter in self.limiters.items()},
+            SHARED_POOL: self.shared.stats(),
+        }
+
+
+class AdmissionControlMiddleware:
+    def __init__(self, app: Any, *, controller: AdmissionController) -> None:
+        self.app = app
+        self.controller = controller
+
+    async def _reject(self, scope: Dict[str, Any], send: Any, retry_after: int) -> None:
+        trace_id = dict(scope.get("headers", [])).get(b"x-trace-id")
+        body = json.dumps({
+            "error": "Server overloaded, retry later",
+            "traceId": trace_id.decode("latin-1") if trace_id else None,
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        route = self.controller.route(scope.get("path", "")) if scope["type"] == "http" else None
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        requested = dict(scope.get("headers", [])).get(PRIORITY_HEADER)
+        rank = self.controller.rank(route, requested.decode("latin-1") if requested else None)
+        try:
+            acquired = await self.controller.admit(route, rank)
+        except AdmissionRejected as e:
+            await self._reject(scope, send, self.controller.retry_after(e.limiter))
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(acquired)
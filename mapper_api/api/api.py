@@ -1,14 +1,20 @@
 """FastAPI app wiring routers and exception handlers."""
 from __future__ import annotations
+import asyncio
+from contextlib import ExitStack, asynccontextmanager
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from mapper_api.api.routers.taxonomy_mapper import router as taxonomy_router
 from mapper_api.api.routers.fivews_mapper import router as fivews_router
 from mapper_api.api.routers.evaluator import router as evaluator_router
 from mapper_api.api.routers.health import router as health_router
+from mapper_api.api.routers.metrics import router as metrics_router
+from mapper_api.api.routers.admin import router as admin_router
 from mapper_api.api.errors import (
     control_validation_exception_handler,
     definitions_unavailable_exception_handler, 
+    deadline_exceeded_exception_handler,
+    llm_capacity_exception_handler,
     llm_processing_exception_handler,
     domain_exception_handler,
     unhandled_exception_handler
@@ -17,9 +23,75 @@ from mapper_api.domain.errors import (
     MapperDomainError,
     ControlValidationError,
     DefinitionsUnavailableError,
+    DeadlineExceededError,
+    LLMCapacityError,
     LLMProcessingError
 )
 from mapper_api.config.settings import Settings
+from mapper_api.application.services.llm_usage import LLMPricing, set_llm_pricing
+from mapper_api.api.dependencies import (
+    get_settings, shutdown_worker_pools, start_definitions_refresher, stop_definitions_refresher,
+)
+from mapper_api.api.warmup import run_warmup, mark_ready_without_warmup, retry_warmup
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    debug = ExitStack()
+    if settings.LOOP_DEBUG:
+        from mapper_api.api.loop_monitor import detect_blocking_calls, log_blocking_calls
+
+        loop = asyncio.get_running_loop()
+        loop.set_debug(True)
+        loop.slow_callback_duration = settings.LOOP_STALL_THRESHOLD_MS / 1000
+        debug.enter_context(detect_blocking_calls(log_blocking_calls()))
+    loop_monitor = None
+    if settings.LOOP_MONITOR_ENABLED:
+        from mapper_api.api.loop_monitor import LoopLagMonitor
+
+        loop_monitor = app.state.loop_monitor = LoopLagMonitor(
+            interval_s=settings.LOOP_MONITOR_INTERVAL_S,
+            stall_threshold_s=settings.LOOP_STALL_THRESHOLD_MS / 1000,
+        )
+        await loop_monitor.start()
+    # Azure clients and definitions are built here, not at import time; the
+    # blocking work runs off the event loop before the first request is accepted
+    warmup_retry = None
+    if settings.WARMUP_ENABLED:
+        report = await asyncio.to_thread(run_warmup, app)
+        if not report.ready:
+            # Keep serving /health (503) and retry the failed steps until storage and definitions recover
+            warmup_retry = asyncio.create_task(
+                retry_warmup(app, max_backoff_s=settings.WARMUP_RETRY_MAX_BACKOFF_S), name="warmup-retry"
+            )
+    else:
+        await asyncio.to_thread(start_definitions_refresher)
+        mark_ready_without_warmup()
+    metrics_store = getattr(app.state, "metrics_store", None)
+    if metrics_store is not None:
+        metrics_store.start()
+    yield
+    if warmup_retry is not None:
+        warmup_retry.cancel()
+    stop_definitions_refresher()
+    shutdown_worker_pools()
+    if metrics_store is not None:
+        await asyncio.to_thread(metrics_store.close)
+    tracer_provider = getattr(app.state, "tracer_provider", None)
+    if tracer_provider is not None:
+        await asyncio.to_thread(tracer_provider.shutdown)
+    capture_writer = getattr(app.state, "capture_writer", None)
+    if capture_writer is not None:
+        await asyncio.to_thread(capture_writer.close)
+    # Stop token refresh and release pooled Azure connections on shutdown
+    from mapper_api.infrastructure.azure.credentials import close_shared_credential
+    from mapper_api.infrastructure.azure.http_transport import close_shared_transport
+    close_shared_credential()
+    await close_shared_transport()
+    if loop_monitor is not None:
+        await loop_monitor.stop()
+    debug.close()
 
 
 def create_app() -> FastAPI:
@@ -28,7 +100,8 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title="Mapper API",
         version=settings.API_VERSION,
-        root_path="/mapper-api"
+        root_path="/mapper-api",
+        lifespan=lifespan
     )
     
     # Include routers with version prefix
@@ -36,16 +109,93 @@ def create_app() -> FastAPI:
     app.include_router(fivews_router, prefix=f"/{settings.API_VERSION}")
     app.include_router(evaluator_router, prefix=f"/{settings.API_VERSION}")
     app.include_router(health_router, prefix=f"/{settings.API_VERSION}")
+    app.include_router(admin_router, prefix=f"/{settings.API_VERSION}")
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics_router)
 
     # Exception handlers
     app.add_exception_handler(ControlValidationError, control_validation_exception_handler)
     app.add_exception_handler(DefinitionsUnavailableError, definitions_unavailable_exception_handler)
+    app.add_exception_handler(DeadlineExceededError, deadline_exceeded_exception_handler)
+    app.add_exception_handler(LLMCapacityError, llm_capacity_exception_handler)
     app.add_exception_handler(LLMProcessingError, llm_processing_exception_handler)
     app.add_exception_handler(MapperDomainError, domain_exception_handler)
     app.add_exception_handler(RequestValidationError, control_validation_exception_handler)
     
     # Catch-all handler
     app.add_exception_handler(Exception, unhandled_exception_handler)
+
+    if settings.ADMISSION_ENABLED:
+        from mapper_api.api.admission import AdmissionControlMiddleware, AdmissionController
+
+        mapper_limits = (settings.ADMISSION_MAPPER_CONCURRENCY, settings.ADMISSION_MAPPER_QUEUE)
+        app.state.admission = AdmissionController(
+            route_limits={
+                "/taxonomy_mapper": mapper_limits,
+                "/taxonomy_mapper/stream": mapper_limits,
+                "/5ws_mapper": mapper_limits,
+                "/evaluator": (settings.ADMISSION_EVALUATOR_CONCURRENCY, settings.ADMISSION_EVALUATOR_QUEUE),
+            },
+            shared_limit=settings.ADMISSION_SHARED_CONCURRENCY,
+            shared_queue=settings.ADMISSION_SHARED_QUEUE,
+            queue_timeout_s=settings.ADMISSION_QUEUE_TIMEOUT_S,
+            retry_after_s=settings.ADMISSION_RETRY_AFTER_S,
+        )
+        app.add_middleware(AdmissionControlMiddleware, controller=app.state.admission)
+    if settings.DEADLINE_ENABLED:
+        from mapper_api.api.deadline import DeadlineMiddleware
+
+        # Outside admission control: the queue wait counts against the deadline, and leaving clients free their slot
+        app.add_middleware(DeadlineMiddleware, route_timeouts={
+            "/taxonomy_mapper": settings.DEADLINE_MAPPER_S,
+            "/taxonomy_mapper/stream": settings.DEADLINE_MAPPER_S,
+            "/5ws_mapper": settings.DEADLINE_MAPPER_S,
+            "/evaluator": settings.DEADLINE_EVALUATOR_S,
+        })
+    if settings.CAPTURE_ENABLED:
+        from mapper_api.api.capture import TrafficCaptureMiddleware
+        from mapper_api.infrastructure.local.capture_log import CaptureLogWriter
+
+        app.state.capture_writer = CaptureLogWriter(
+            settings.CAPTURE_DIR,
+            max_file_bytes=int(settings.CAPTURE_MAX_FILE_MB * 1024 * 1024),
+            max_files=settings.CAPTURE_MAX_FILES,
+        )
+        app.add_middleware(
+            TrafficCaptureMiddleware,
+            writer=app.state.capture_writer,
+            sample_rate=settings.CAPTURE_SAMPLE_RATE,
+            include_text=settings.CAPTURE_INCLUDE_TEXT,
+        )
+    if settings.METRICS_ENABLED:
+        from mapper_api.api.metrics import RequestMetricsMiddleware
+
+        if settings.METRICS_MULTIPROC_DIR:
+            from mapper_api.application.services.metrics import REGISTRY
+            from mapper_api.infrastructure.local.metrics_store import MetricsSnapshotStore
+
+            app.state.metrics_store = MetricsSnapshotStore(
+                settings.METRICS_MULTIPROC_DIR, REGISTRY, interval_s=settings.METRICS_FLUSH_INTERVAL_S
+            )
+        app.add_middleware(RequestMetricsMiddleware)
+    set_llm_pricing(LLMPricing(
+        prompt=settings.LLM_PRICE_PROMPT_PER_1M,
+        completion=settings.LLM_PRICE_COMPLETION_PER_1M,
+        cached=settings.LLM_PRICE_CACHED_PER_1M,
+    ))
+    if settings.USAGE_ACCOUNTING_ENABLED:
+        from mapper_api.api.usage import LLMUsageMiddleware
+
+        app.add_middleware(LLMUsageMiddleware)
+    if settings.STAGE_TIMING_ENABLED:
+        from mapper_api.api.server_timing import ServerTimingMiddleware
+
+        app.add_middleware(ServerTimingMiddleware, header=settings.SERVER_TIMING_HEADER)
+    if settings.TRACING_ENABLED:
+        from mapper_api.api.tracing import TracingMiddleware, configure_tracing
+
+        app.state.tracer_provider = configure_tracing(settings)
+        app.add_middleware(TracingMiddleware)
     return app
 
 
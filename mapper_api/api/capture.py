@@ -0,0 +1,117 @@
+"""Opt-in, sampled capture of mapper traffic for incident reproduction and replay.
+
+A pure ASGI middleware (streaming responses pass through untouched). Only
+sampled POSTs to the capture routes are buffered; everything else costs one
+random draw. Records go to a CaptureLogWriter queue and are written off the
+request path.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import random
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from mapper_api.application.services.llm_usage import track_llm_usage
+from mapper_api.infrastructure.local.capture_log import CaptureLogWriter
+
+CAPTURE_ROUTES: Tuple[str, ...] = ("/taxonomy_mapper", "/taxonomy_mapper/stream", "/5ws_mapper", "/evaluator")
+
+
+def text_sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TrafficCaptureMiddleware:
+    """
+    Write sampled requests (timestamp, route, recordId, control text or its
+    hash, status, response time, LLM usage) to a rotating gzip NDJSON log.
+
+    With ``include_text=False`` the control description is replaced by its
+    SHA-256; the replayer can restore it from a corpus holding the same text.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        *,
+        writer: CaptureLogWriter,
+        sample_rate: float = 0.01,
+        include_text: bool = False,
+        routes: Tuple[str, ...] = CAPTURE_ROUTES,
+    ) -> None:
+        self.app = app
+        self.writer = writer
+        self.sample_rate = sample_rate
+        self.include_text = include_text
+        self.routes = routes
+        self._pid = os.getpid()
+
+    def _route(self, scope: Dict[str, Any]) -> Optional[str]:
+        path = scope.get("path", "")
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        return path if path.endswith(self.routes) else None
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope.get("method") != "POST" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+        route = self._route(scope)
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.time()
+        started = time.perf_counter()
+        body = bytearray()
+        status: Dict[str, int] = {}
+
+        async def capturing_receive() -> Dict[str, Any]:
+            message = await receive()
+            if message["type"] == "http.request":
+                body.extend(message.get("body", b""))
+            return message
+
+        async def capturing_send(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        with track_llm_usage() as usage:
+            try:
+                await self.app(scope, capturing_receive, capturing_send)
+            finally:
+                duration_ms = (time.perf_counter() - started) * 1000
+                self.writer.submit(self._record(
+                    route, bytes(body), started_at, duration_ms, status.get("code", 500), usage.to_dict()
+                ))
+
+    def _record(self, route: str, body: bytes, started_at: float, duration_ms: float, status: int,
+                usage: Dict[str, int]) -> Dict[str, Any]:
+        record: Dict[str, Any] = {
+            "ts": round(started_at, 6),
+            "route": route,
+            "status": status,
+            "durationMs": round(duration_ms, 2),
+            "llm": usage,
+            "pid": self._pid,
+        }
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            record["bodyError"] = "invalid JSON"
+            return record
+        if not isinstance(payload, dict):
+            return record
+        record["recordId"] = (payload.get("header") or {}).get("recordId")
+        data = payload.get("data") or {}
+        control = data.get("controlDescription") if isinstance(data, dict) else None
+        if isinstance(control, str):
+            record["controlSha256"] = text_sha256(control)
+            if not self.include_text:
+                payload = {**payload, "data": {k: v for k, v in data.items() if k != "controlDescription"}}
+        record["body"] = payload
+        return record
@@ -0,0 +1,152 @@
+"""Request deadlines and cancellation on client disconnect, as ASGI middleware.
+
+Each work route runs under a ``Deadline`` (see
+``application.services.deadline``): the route's default, or less when the
+caller sends ``X-Request-Timeout`` in seconds (a caller cannot extend it).
+
+The middleware reads the request body itself, then listens for
+``http.disconnect``. When the client goes away before the response is
+complete, the deadline is cancelled, so the LLM client running in a worker
+thread starts no further attempt or retry and streams stop, and the request
+task is cancelled. Work still queued for a worker thread never runs; a call
+already running cannot be interrupted, so the request keeps its admission
+slot until that call returns (``WorkerPool.run``), bounded by the
+per-attempt timeout, and is counted in ``mapper_worker_pool_orphaned``.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from mapper_api.application.services.deadline import Deadline, deadline_scope
+from mapper_api.application.services.metrics import HTTP_REQUESTS_CANCELLED
+
+TIMEOUT_HEADER = b"x-request-timeout"
+
+
+def requested_timeout(scope: Dict[str, Any]) -> Optional[float]:
+    raw = dict(scope.get("headers", [])).get(TIMEOUT_HEADER)
+    try:
+        timeout_s = float(raw) if raw else None
+    except ValueError:
+        return None
+    return timeout_s if timeout_s is not None and timeout_s > 0 else None
+
+
+class _DisconnectWatcher:
+    """
+    Reads the (small, JSON) request body up front, then owns the server's
+    ``receive``: a task waits for the disconnect, and the app's ``receive``
+    replays the body, then waits for that task.
+    """
+
+    def __init__(self, receive: Any, deadline: Deadline, cancel_app: Any) -> None:
+        self._receive = receive
+        self._deadline = deadline
+        self._cancel_app = cancel_app
+        self._body: Optional[bytes] = None
+        self._task: Optional[asyncio.Task] = None
+        self._disconnected = asyncio.Event()
+        self.response_complete = False
+        self.client_gone = False
+
+    async def start(self) -> bool:
+        """Read the body and start watching; False if the client left while sending it."""
+        chunks = []
+        while True:
+            message = await self._receive()
+            if message["type"] == "http.disconnect":
+                self._on_disconnect()
+                return False
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        self._body = b"".join(chunks)
+        self._task = asyncio.create_task(self._watch(), name="disconnect-watcher")
+        return True
+
+    async def receive(self) -> Dict[str, Any]:
+        if self._body is not None:
+            body, self._body = self._body, None
+            return {"type": "http.request", "body": body, "more_body": False}
+        await self._disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def _watch(self) -> None:
+        while True:
+            message = await self._receive()
+            if message["type"] == "http.disconnect":
+                self._disconnected.set()
+                if not self.response_complete:
+                    self._on_disconnect()
+                return
+
+    def _on_disconnect(self) -> None:
+        self.client_gone = True
+        self._deadline.cancel("client disconnected")
+        self._cancel_app()
+
+    def close(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+
+class DeadlineMiddleware:
+    def __init__(self, app: Any, *, route_timeouts: Dict[str, float], logger: Optional[logging.Logger] = None) -> None:
+        """``route_timeouts`` maps a work route suffix to its default deadline in seconds."""
+        self.app = app
+        self.route_timeouts = route_timeouts
+        self._logger = logger or logging.getLogger("mapper.deadline")
+
+    def route(self, path: str) -> Optional[str]:
+        for route in self.route_timeouts:
+            if path.endswith(route):
+                return route
+        return None
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        route = self.route(scope.get("path", "")) if scope["type"] == "http" else None
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        timeout_s = self.route_timeouts[route]
+        requested = requested_timeout(scope)
+        if requested is not None:
+            timeout_s = min(timeout_s, requested)
+
+        with deadline_scope(timeout_s) as deadline:
+            app_task: Optional[asyncio.Task] = None
+
+            def cancel_app() -> None:
+                if app_task is not None:
+                    app_task.cancel()
+
+            watcher = _DisconnectWatcher(receive, deadline, cancel_app)
+
+            async def watched_send(message: Dict[str, Any]) -> None:
+                if message["type"] == "http.response.body" and not message.get("more_body", False):
+                    watcher.response_complete = True
+                await send(message)
+
+            try:
+                if await watcher.start():
+                    app_task = asyncio.create_task(self.app(scope, watcher.receive, watched_send))
+                    await app_task
+                else:
+                    HTTP_REQUESTS_CANCELLED.labels(route).inc()
+            except asyncio.CancelledError:
+                if app_task is None or not app_task.done():
+                    # This task was cancelled (server shutdown): take the request down with it
+                    if app_task is not None:
+                        app_task.cancel()
+                    raise
+                if not watcher.client_gone:
+                    raise
+                HTTP_REQUESTS_CANCELLED.labels(route).inc()
+                self._logger.info(
+                    "http.request.cancelled",
+                    extra={"route": route, "reason": deadline.cancel_reason, "timeoutS": timeout_s},
+                )
+            finally:
+                watcher.close()
@@ -0,0 +1,249 @@
+"""Process-wide shared dependencies: LLM client, blob store, definitions snapshot and its refresher.
+
+Azure SDK adapters (openai, azure-identity, azure-storage-blob, tenacity) are
+imported inside the factories, so importing the app stays cheap and does no
+network I/O; everything is built on first use or in the app lifespan.
+"""
+from __future__ import annotations
+from functools import lru_cache
+from typing import Dict, Optional, TYPE_CHECKING
+
+from mapper_api.config.settings import Settings
+from mapper_api.application.ports.blob_store import AsyncBlobStore, BlobStore
+from mapper_api.application.ports.rate_limit_store import RateLimitStore
+from mapper_api.domain.repositories.definitions import DefinitionsSnapshot
+from mapper_api.application.services.compiled_definitions import CompiledDefinitions, DefinitionsHolder
+from mapper_api.application.services.adaptive_concurrency import AdaptiveConcurrencyLimiter
+from mapper_api.application.services.rate_limiter import LLMRateLimiter
+from mapper_api.application.services.worker_pools import WorkerPool
+
+if TYPE_CHECKING:
+    from mapper_api.infrastructure.azure.blob_definitions_repo import BlobDefinitionsRepository
+    from mapper_api.infrastructure.azure.definitions_refresher import DefinitionsRefresher
+    from mapper_api.infrastructure.azure.openai_client import AzureOpenAILLMClient
+    from mapper_api.infrastructure.local.blob_store import TransferProfile
+
+_refresher: Optional[DefinitionsRefresher] = None
+_worker_pools: Dict[str, WorkerPool] = {}
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    return Settings()
+
+
+@lru_cache(maxsize=None)
+def get_llm_client() -> AzureOpenAILLMClient:
+    from mapper_api.infrastructure.azure.http_transport import get_shared_transport
+    from mapper_api.infrastructure.azure.openai_client import AzureOpenAILLMClient, llm_outcome
+
+    settings = get_settings()
+    limiter = None
+    if settings.LLM_ADAPTIVE_CONCURRENCY:
+        # One limiter per worker: the mapper routes and /evaluator share it
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=settings.LLM_CONCURRENCY_INITIAL,
+            min_limit=settings.LLM_CONCURRENCY_MIN,
+            max_limit=settings.LLM_CONCURRENCY_MAX,
+            backoff_ratio=settings.LLM_CONCURRENCY_BACKOFF,
+            latency_tolerance=settings.LLM_LATENCY_TOLERANCE,
+            wait_timeout_s=settings.LLM_CONCURRENCY_WAIT_S,
+            classify=llm_outcome,
+        )
+    return AzureOpenAILLMClient(
+        endpoint=settings.AZURE_OPENAI_ENDPOINT,
+        api_key=settings.AZURE_OPENAI_API_KEY,
+        api_version=settings.AZURE_OPENAI_API_VERSION,
+        http_client=get_shared_transport(settings).sync_client,
+        concurrency_limiter=limiter,
+        rate_limiter=_llm_rate_limiter(settings),
+    )
+
+
+def _llm_rate_limiter(settings: Settings) -> Optional[LLMRateLimiter]:
+    if settings.LLM_RATE_LIMIT_RPM <= 0 and settings.LLM_RATE_LIMIT_TPM <= 0:
+        return None
+    store: RateLimitStore
+    if settings.LLM_RATE_LIMIT_BACKEND == 'redis':
+        from mapper_api.infrastructure.local.redis_rate_limit_store import RedisRateLimitStore
+
+        store = RedisRateLimitStore.from_url(settings.LLM_RATE_LIMIT_REDIS_URL)
+    else:
+        from mapper_api.infrastructure.local.rate_limit_store import FileRateLimitStore
+
+        store = FileRateLimitStore(settings.LLM_RATE_LIMIT_STATE_PATH or None)
+    return LLMRateLimiter(
+        store,
+        requests_per_minute=settings.LLM_RATE_LIMIT_RPM,
+        tokens_per_minute=settings.LLM_RATE_LIMIT_TPM,
+        burst_s=settings.LLM_RATE_LIMIT_BURST_S,
+        max_wait_s=settings.LLM_RATE_LIMIT_MAX_WAIT_S,
+    )
+
+
+@lru_cache(maxsize=None)
+def _local_blob_store() -> BlobStore:
+    # One underlying local/in-memory store shared by the sync and async views,
+    # so results written by /evaluator are visible to every reader in the process
+    from mapper_api.infrastructure.local.blob_store import DATA_DIR, InMemoryBlobStore, LocalFileBlobStore
+
+    settings = get_settings()
+    seed_dir = settings.STORAGE_SEED_DIR or DATA_DIR
+    if settings.STORAGE_BACKEND == 'memory':
+        return InMemoryBlobStore.from_directory(seed_dir)
+    return LocalFileBlobStore(settings.STORAGE_LOCAL_ROOT, seed_dir=seed_dir)
+
+
+def _transfer_profile() -> TransferProfile:
+    from mapper_api.infrastructure.local.blob_store import TransferProfile
+
+    settings = get_settings()
+    return TransferProfile(
+        latency_ms=settings.STORAGE_LATENCY_MS,
+        throughput_mb_s=settings.STORAGE_THROUGHPUT_MB_S,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_blob_store() -> BlobStore:
+    """Process-wide sync blob store for the configured ``STORAGE_BACKEND``."""
+    from mapper_api.infrastructure.local.blob_store import SimulatedLatencyBlobStore
+
+    from mapper_api.infrastructure.local.metered_blob_store import MeteredBlobStore
+
+    settings = get_settings()
+    if settings.STORAGE_BACKEND == 'azure':
+        from mapper_api.infrastructure.azure.blob_store import AzureBlobStore
+        from mapper_api.infrastructure.azure.credentials import get_shared_credential
+        from mapper_api.infrastructure.azure.http_transport import get_shared_transport
+
+        store: BlobStore = AzureBlobStore.connect(
+            account_name=settings.STORAGE_ACCOUNT_NAME,
+            container_name=settings.STORAGE_CONTAINER_NAME,
+            credential=get_shared_credential(settings),
+            transport=get_shared_transport(settings).blob_transport(),
+            max_concurrency=settings.BLOB_MAX_CONCURRENCY,
+        )
+    else:
+        profile = _transfer_profile()
+        store = _local_blob_store()
+        if profile.enabled:
+            store = SimulatedLatencyBlobStore(store, profile)
+    return MeteredBlobStore(store, backend=settings.STORAGE_BACKEND)
+
+
+def get_async_blob_store() -> AsyncBlobStore:
+    """
+    Async blob store for one unit of work; the caller closes it.
+
+    Azure gets a fresh ``azure.storage.blob.aio`` client bound to the running
+    loop; local backends get an async view of the shared process-wide store.
+    """
+    from mapper_api.infrastructure.local.metered_blob_store import AsyncMeteredBlobStore
+
+    settings = get_settings()
+    if settings.STORAGE_BACKEND == 'azure':
+        from mapper_api.infrastructure.azure.aio.blob_store import AsyncAzureBlobStore
+        from mapper_api.infrastructure.azure.credentials import AsyncTokenCredentialAdapter, get_shared_credential
+        from mapper_api.infrastructure.azure.http_transport import get_shared_transport
+
+        store: AsyncBlobStore = AsyncAzureBlobStore.connect(
+            account_name=settings.STORAGE_ACCOUNT_NAME,
+            container_name=settings.STORAGE_CONTAINER_NAME,
+            credential=AsyncTokenCredentialAdapter(get_shared_credential(settings)),
+            transport=get_shared_transport(settings).async_blob_transport(),
+            max_concurrency=settings.BLOB_MAX_CONCURRENCY,
+        )
+    else:
+        from mapper_api.infrastructure.local.blob_store import AsyncBlobStoreAdapter
+
+        store = AsyncBlobStoreAdapter(_local_blob_store(), _transfer_profile())
+    return AsyncMeteredBlobStore(store, backend=settings.STORAGE_BACKEND)
+
+
+@lru_cache(maxsize=None)
+def get_definitions_repo() -> BlobDefinitionsRepository:
+    from mapper_api.infrastructure.azure.blob_definitions_repo import BlobDefinitionsRepository
+    from mapper_api.infrastructure.local.definitions_snapshot_file import DefinitionsSnapshotFile
+
+    settings = get_settings()
+    return BlobDefinitionsRepository(
+        store=get_blob_store(),
+        snapshot_file=(
+            DefinitionsSnapshotFile(settings.DEFINITIONS_SNAPSHOT_PATH)
+            if settings.DEFINITIONS_SNAPSHOT_PATH else None
+        ),
+    )
+
+
+def _compile(snapshot: DefinitionsSnapshot) -> CompiledDefinitions:
+    return CompiledDefinitions.compile(
+        snapshot,
+        llm=get_llm_client(),
+        deployment_name=get_settings().AZURE_OPENAI_DEPLOYMENT,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_definitions_holder() -> DefinitionsHolder:
+    """
+    Holder of the compiled definitions every mapper and evaluator request reads from.
+
+    Empty until ``start_definitions_refresher`` loads them (warm-up, or its
+    retries): requests meanwhile get a fast 503, never blob I/O of their own.
+    """
+    return DefinitionsHolder()
+
+
+def start_definitions_refresher() -> None:
+    """Load the definitions into the holder, then start ETag polling (no-op when the interval is 0)."""
+    from mapper_api.infrastructure.azure.definitions_refresher import DefinitionsRefresher
+
+    global _refresher
+    if _refresher is not None:
+        return
+    # Raises while neither blob storage nor a local snapshot is available (warm-up retries it)
+    repo = get_definitions_repo()
+    holder = get_definitions_holder()
+    if repo.snapshot is not None:
+        holder.swap(_compile(repo.snapshot))
+    _refresher = DefinitionsRefresher(
+        source=repo,
+        on_snapshot=lambda snapshot: holder.swap(_compile(snapshot)),
+        interval_s=get_settings().DEFINITIONS_REFRESH_INTERVAL_S,
+    )
+    # A worker that started from the local snapshot revalidates against blob right away
+    _refresher.start(poll_immediately=repo.loaded_from_local_snapshot)
+
+
+def stop_definitions_refresher() -> None:
+    global _refresher
+    if _refresher is not None:
+        _refresher.stop()
+        _refresher = None
+
+
+def get_mapper_pool() -> WorkerPool:
+    """Threads for the mapper routes' blocking controller calls."""
+    settings = get_settings()
+    workers = settings.MAPPER_WORKERS or max(settings.ADMISSION_SHARED_CONCURRENCY, settings.LLM_CONCURRENCY_MAX)
+    return _worker_pool("mapper", workers)
+
+
+def get_evaluation_pool() -> WorkerPool:
+    """Threads for whole evaluation runs, which hold one for minutes (kept off the mapper pool)."""
+    settings = get_settings()
+    return _worker_pool("evaluation", settings.EVALUATION_WORKERS or settings.ADMISSION_EVALUATOR_CONCURRENCY)
+
+
+def _worker_pool(name: str, workers: int) -> WorkerPool:
+    pool = _worker_pools.get(name)
+    if pool is None:
+        pool = _worker_pools.setdefault(name, WorkerPool(name, max(workers, 1)))
+    return pool
+
+
+def shutdown_worker_pools() -> None:
+    while _worker_pools:
+        _, pool = _worker_pools.popitem()
+        pool.shutdown()
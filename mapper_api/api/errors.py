@@ -5,7 +5,9 @@ from fastapi.responses import JSONResponse
 from mapper_api.domain.errors import (
     MapperDomainError, 
     ControlValidationError, 
+    DeadlineExceededError,
     DefinitionsUnavailableError,
+    LLMCapacityError,
     LLMProcessingError
 )
 
@@ -28,6 +30,18 @@ async def llm_processing_exception_handler(request: Request, exc: LLMProcessingE
     return JSONResponse(status_code=502, content={"error": str(exc), "traceId": record_id})
 
 
+async def llm_capacity_exception_handler(request: Request, exc: LLMCapacityError):
+    """Handle a saturated LLM deployment with 503 status and a retry hint."""
+    record_id = request.headers.get('x-trace-id')
+    return JSONResponse(status_code=503, content={"error": str(exc), "traceId": record_id}, headers={"Retry-After": "1"})
+
+
+async def deadline_exceeded_exception_handler(request: Request, exc: DeadlineExceededError):
+    """Handle a request that ran out of time with 504 status (gateway timeout)."""
+    record_id = request.headers.get('x-trace-id')
+    return JSONResponse(status_code=504, content={"error": str(exc), "traceId": record_id})
+
+
 async def domain_exception_handler(request: Request, exc: MapperDomainError):
     """Handle general domain errors with 400 status."""
     record_id = request.headers.get('x-trace-id')
@@ -0,0 +1,224 @@
+"""Event-loop lag monitoring and blocking-call detection.
+
+``LoopLagMonitor`` runs a periodic tick on the event loop and observes how
+late each tick is scheduled in ``mapper_event_loop_lag_seconds``. A watchdog
+thread notices a tick that is overdue by more than the stall threshold
+*while the loop is still stuck*, so it can log the loop thread's stack and
+the task that is running: the code that blocks, not whatever runs after it.
+
+``detect_blocking_calls`` flags synchronous calls that block the calling
+thread (``time.sleep``, blocking socket connect/send/recv) when made from a
+thread running an event loop; ``forbid_blocking_calls`` turns those into a
+test failure. With ``LOOP_DEBUG`` the app logs them and runs the loop in
+asyncio debug mode (slow callbacks logged by the ``asyncio`` logger).
+"""
+from __future__ import annotations
+import asyncio
+import collections
+import logging
+import socket
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from mapper_api.application.services.metrics import EVENT_LOOP_LAG, EVENT_LOOP_STALLS
+
+
+@dataclass(frozen=True)
+class LoopStall:
+    overdue_ms: float
+    task: Optional[str]
+    stack: List[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"overdueMs": round(self.overdue_ms, 1), "task": self.task, "stack": self.stack}
+
+
+def _task_name(task: Optional[asyncio.Task]) -> Optional[str]:
+    if task is None:
+        return None
+    coro = task.get_coro()
+    return f"{task.get_name()} ({getattr(coro, '__qualname__', type(coro).__name__)})"
+
+
+class LoopLagMonitor:
+    """Samples the scheduling delay of the running loop; logs the stack of stalls."""
+
+    def __init__(self, *, interval_s: float = 0.1, stall_threshold_s: float = 0.1, max_stalls: int = 50,
+                 logger: Optional[logging.Logger] = None) -> None:
+        self.interval_s = interval_s
+        self.stall_threshold_s = stall_threshold_s
+        self.stalls: Deque[LoopStall] = collections.deque(maxlen=max_stalls)
+        self.stall_count = 0
+        self._logger = logger or logging.getLogger("mapper.loop")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._due: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._stop.clear()
+        self._task = self._loop.create_task(self._tick(), name="loop-lag-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+
+    async def _tick(self) -> None:
+        while True:
+            self._due = time.perf_counter() + self.interval_s
+            await asyncio.sleep(self.interval_s)
+            EVENT_LOOP_LAG.observe(max(time.perf_counter() - self._due, 0.0))
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stop.wait(min(self.interval_s, self.stall_threshold_s) / 2):
+            due = self._due
+            if due is None or due == reported:
+                continue
+            overdue = time.perf_counter() - due
+            if overdue > self.stall_threshold_s:
+                reported = due
+                self._report(overdue)
+
+    def _report(self, overdue_s: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread)
+        stack = traceback.format_stack(frame) if frame is not None else []
+        stall = LoopStall(
+            overdue_ms=overdue_s * 1000,
+            task=_task_name(asyncio.current_task(self._loop)),
+            stack=[line.rstrip() for line in stack],
+        )
+        self.stalls.append(stall)
+        self.stall_count += 1
+        EVENT_LOOP_STALLS.inc()
+        self._logger.warning(
+            "event_loop.stall",
+            extra={"stallMs": round(stall.overdue_ms, 1), "task": stall.task, "stack": "\n".join(stall.stack)},
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "intervalS": self.interval_s,
+            "stallThresholdMs": self.stall_threshold_s * 1000,
+            "stalls": self.stall_count,
+            "recent": [stall.to_dict() for stall in self.stalls],
+        }
+
+
+# (owner, attribute) of calls that block the calling thread
+_SOCKET_CALLS = ("connect", "accept", "recv", "recv_into", "recvfrom", "send", "sendall", "sendto")
+_BLOCKING_CALLS: List[Tuple[Any, str]] = [(time, "sleep"), *((socket.socket, name) for name in _SOCKET_CALLS)]
+
+_detectors: List[Callable[[str, List[str]], None]] = []
+_originals: Dict[Tuple[int, str], Tuple[Any, bool]] = {}
+_patch_lock = threading.Lock()
+_reporting = threading.local()
+
+
+class BlockingCallError(RuntimeError):
+    """Blocking calls were made from a thread running an event loop."""
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _flag(name: str) -> None:
+    if getattr(_reporting, "active", False):
+        return
+    _reporting.active = True
+    try:
+        stack = [line.rstrip() for line in traceback.format_stack()[:-2]]
+        for detector in list(_detectors):
+            detector(name, stack)
+    finally:
+        _reporting.active = False
+
+
+def _guarded(owner: Any, attribute: str, original: Any) -> Any:
+    name = f"{getattr(owner, '__name__', owner)}.{attribute}"
+    if owner is socket.socket:
+        def guarded_method(self: socket.socket, *args: Any, **kwargs: Any) -> Any:
+            # asyncio's own sockets are non-blocking
+            if self.gettimeout() != 0.0 and _on_event_loop():
+                _flag(name)
+            return original(self, *args, **kwargs)
+        return guarded_method
+
+    def guarded(*args: Any, **kwargs: Any) -> Any:
+        if _on_event_loop():
+            _flag(name)
+        return original(*args, **kwargs)
+    return guarded
+
+
+@contextmanager
+def detect_blocking_calls(on_blocking: Callable[[str, List[str]], None]) -> Iterator[None]:
+    """
+    Call ``on_blocking(call name, stack)`` for every blocking call made from
+    an event loop thread while the block runs (process-wide; nests).
+    """
+    with _patch_lock:
+        if not _detectors:
+            for owner, attribute in _BLOCKING_CALLS:
+                original = getattr(owner, attribute)
+                # socket.socket inherits most methods from _socket.socket: restore by deleting the override
+                _originals[(id(owner), attribute)] = (original, attribute in vars(owner))
+                setattr(owner, attribute, _guarded(owner, attribute, original))
+        _detectors.append(on_blocking)
+    try:
+        yield
+    finally:
+        with _patch_lock:
+            _detectors.remove(on_blocking)
+            if not _detectors:
+                for owner, attribute in _BLOCKING_CALLS:
+                    original, owned = _originals.pop((id(owner), attribute))
+                    if owned:
+                        setattr(owner, attribute, original)
+                    else:
+                        delattr(owner, attribute)
+
+
+@contextmanager
+def forbid_blocking_calls() -> Iterator[List[Tuple[str, List[str]]]]:
+    """Debug mode for tests: raise BlockingCallError at exit if the loop made blocking calls."""
+    calls: List[Tuple[str, List[str]]] = []
+    with detect_blocking_calls(lambda name, stack: calls.append((name, stack))):
+        yield calls
+    if calls:
+        name, stack = calls[0]
+        raise BlockingCallError(
+            f"{len(calls)} blocking call(s) on the event loop, first {name} at:\n" + "\n".join(stack[-8:])
+        )
+
+
+def log_blocking_calls(logger: Optional[logging.Logger] = None) -> Callable[[str, List[str]], None]:
+    """``on_blocking`` callback logging each call with its stack (``LOOP_DEBUG``)."""
+    logger = logger or logging.getLogger("mapper.loop")
+
+    def on_blocking(name: str, stack: List[str]) -> None:
+        logger.warning("event_loop.blocking_call", extra={"call": name, "stack": "\n".join(stack)})
+    return on_blocking
@@ -0,0 +1,50 @@
+"""HTTP request metrics (latency per route and status, in-flight requests) as ASGI middleware.
+
+In-flight requests are counted before routing has happened, so they are
+labelled by path for the work routes and grouped as ``other`` for the rest
+(keeps label cardinality bounded whatever paths clients send).
+"""
+from __future__ import annotations
+import time
+from typing import Any, Dict, Tuple
+
+from mapper_api.api.server_timing import route_template
+from mapper_api.application.services.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT
+
+WORK_ROUTES: Tuple[str, ...] = ("/taxonomy_mapper", "/taxonomy_mapper/stream", "/5ws_mapper", "/evaluator")
+OTHER_ROUTE = "other"
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app: Any, *, routes: Tuple[str, ...] = WORK_ROUTES) -> None:
+        self.app = app
+        self.routes = routes
+
+    def _in_flight_route(self, scope: Dict[str, Any]) -> str:
+        path, root_path = scope.get("path", ""), scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        return path if path.endswith(self.routes) else OTHER_ROUTE
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def metered_send(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(self._in_flight_route(scope))
+        start = time.perf_counter()
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, metered_send)
+        finally:
+            in_flight.dec()
+            HTTP_REQUEST_DURATION.labels(route_template(scope), scope.get("method", ""), status["code"]).observe(
+                time.perf_counter() - start
+            )
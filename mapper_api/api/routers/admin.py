@@ -0,0 +1,83 @@
+"""Admin HTTP router: on-demand profiling of the worker serving the request.
+
+Every endpoint needs the ``X-Admin-Token`` header to match ``ADMIN_TOKEN``;
+with no token configured the endpoints answer 404. Profiles are time-boxed
+(``PROFILE_MAX_DURATION_S``) and run off the event loop, so the worker keeps
+serving, and is profiled, while they run.
+"""
+from __future__ import annotations
+import asyncio
+import hmac
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from mapper_api.api.dependencies import get_settings
+from mapper_api.config.settings import Settings
+from mapper_api.infrastructure.local.profiler import ProfilerBusyError, allocation_diff, sample_stacks
+
+router = APIRouter()
+
+
+def require_admin(
+    x_admin_token: Optional[str] = Header(None),
+    settings: Settings = Depends(get_settings),
+) -> Settings:
+    """Reject requests without the admin token; hide the endpoints when none is configured."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), settings.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    return settings
+
+
+def _check_duration(duration_s: float, settings: Settings) -> None:
+    if duration_s > settings.PROFILE_MAX_DURATION_S:
+        raise HTTPException(
+            status_code=422, detail=f"duration_s may not exceed {settings.PROFILE_MAX_DURATION_S:g}"
+        )
+
+
+@router.get('/admin/profile/stacks', response_class=PlainTextResponse, include_in_schema=False)
+async def profile_stacks(
+    duration_s: float = Query(10.0, gt=0),
+    mode: str = Query("wall", pattern="^(wall|cpu)$"),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+    settings: Settings = Depends(require_admin),
+) -> PlainTextResponse:
+    """
+    Sampled stacks of every thread in collapsed format (feed to flamegraph.pl
+    or speedscope): ``wall`` weights are samples, ``cpu`` weights are CPU microseconds.
+    """
+    _check_duration(duration_s, settings)
+    try:
+        profile = await asyncio.to_thread(sample_stacks, duration_s, mode=mode, interval_s=interval_ms / 1000)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return PlainTextResponse(
+        profile.to_collapsed(),
+        headers={
+            "Content-Disposition": f'attachment; filename="profile-{mode}.collapsed"',
+            "X-Profile-Samples": str(profile.samples),
+            "X-Profile-Duration-S": f"{profile.duration_s:.3f}",
+        },
+    )
+
+
+@router.get('/admin/profile/memory', include_in_schema=False)
+async def profile_memory(
+    duration_s: float = Query(10.0, gt=0),
+    top: int = Query(50, ge=1, le=500),
+    frames: int = Query(1, ge=1, le=50),
+    settings: Settings = Depends(require_admin),
+) -> JSONResponse:
+    """Allocation sites whose live memory grew the most during the window (tracemalloc snapshot diff)."""
+    _check_duration(duration_s, settings)
+    try:
+        diff: Dict[str, Any] = await asyncio.to_thread(allocation_diff, duration_s, top=top, frames=frames)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return JSONResponse(diff)
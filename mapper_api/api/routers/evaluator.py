@@ -4,13 +4,9 @@ from fastapi import APIRouter
 
 from mapper_api.application.dto.http_evaluation import EvaluationHttpRequest
 from mapper_api.application.dto.http_evaluation import EvaluationResponse
-from mapper_api.config.settings import Settings
-from mapper_api.infrastructure.azure.blob_definitions_repo import BlobDefinitionsRepository
-from mapper_api.infrastructure.azure.blob_ground_truth_repo import BlobGroundTruthRepository
-from mapper_api.infrastructure.azure.blob_evaluation_results_writer import BlobEvaluationResultsWriter
-from mapper_api.infrastructure.azure.openai_client import AzureOpenAILLMClient
-from mapper_api.application.use_cases.map_control_to_themes import ClassifyControlToThemes
-from mapper_api.application.use_cases.map_control_to_5ws import ClassifyControlTo5Ws
+from mapper_api.api.dependencies import (
+    get_async_blob_store, get_definitions_holder, get_evaluation_pool, get_llm_client, get_settings,
+)
 from mapper_api.application.use_cases.evaluate_mapper import EvaluateMapper
 from mapper_api.domain.services.evaluation_service import EvaluationService
 from mapper_api.interface.controllers.evaluation_controller import EvaluationController
@@ -18,74 +14,49 @@ from mapper_api.interface.controllers.evaluation_controller import EvaluationCon
 router = APIRouter()
 
 
-def get_evaluation_controller() -> EvaluationController:
+async def get_evaluation_controller() -> EvaluationController:
     """
     Factory to create evaluation controller with dependencies.
     Following EcomApp's pattern of in-place dependency assembly.
+    Azure adapters are imported here so importing the app stays SDK-free;
+    the async blob adapters fetch both ground truth files concurrently from
+    whichever storage backend is configured (Azure, local files or memory).
     """
-    # Load settings
-    settings = Settings()
-    
+    from mapper_api.infrastructure.azure.aio.blob_ground_truth_repo import AsyncBlobGroundTruthRepository
+    from mapper_api.infrastructure.azure.aio.blob_evaluation_results_writer import AsyncBlobEvaluationResultsWriter
+
     # Create infrastructure adapters
-    definitions_repo = BlobDefinitionsRepository(
-        account_name=settings.STORAGE_ACCOUNT_NAME,
-        container_name=settings.STORAGE_CONTAINER_NAME,
-        tenant_id=settings.AZURE_TENANT_ID,
-        client_id=settings.AZURE_CLIENT_ID,
-        client_secret=settings.AZURE_CLIENT_SECRET,
-    )
-    
-    ground_truth_repo = BlobGroundTruthRepository(
-        account_name=settings.STORAGE_ACCOUNT_NAME,
-        container_name=settings.STORAGE_CONTAINER_NAME,
-        tenant_id=settings.AZURE_TENANT_ID,
-        client_id=settings.AZURE_CLIENT_ID,
-        client_secret=settings.AZURE_CLIENT_SECRET,
-    )
+    ground_truth_repo = await AsyncBlobGroundTruthRepository.create(store=get_async_blob_store())
+    # Ground truth is held in memory from here on; release the client
+    await ground_truth_repo.close()
     
-    results_writer = BlobEvaluationResultsWriter(
-        account_name=settings.STORAGE_ACCOUNT_NAME,
-        container_name=settings.STORAGE_CONTAINER_NAME,
-        tenant_id=settings.AZURE_TENANT_ID,
-        client_id=settings.AZURE_CLIENT_ID,
-        client_secret=settings.AZURE_CLIENT_SECRET,
-    )
+    results_writer = AsyncBlobEvaluationResultsWriter(store=get_async_blob_store())
     
-    llm_client = AzureOpenAILLMClient(
-        endpoint=settings.AZURE_OPENAI_ENDPOINT,
-        api_key=settings.AZURE_OPENAI_API_KEY,
-        api_version=settings.AZURE_OPENAI_API_VERSION,
-    )
+    llm_client = get_llm_client()
     
     # Create domain service
     evaluation_service = EvaluationService()
     
-    # Create existing use cases for making predictions
-    taxonomy_classifier = ClassifyControlToThemes.from_defs(
-        repo=definitions_repo,
-        llm=llm_client,
-        deployment_name=settings.AZURE_OPENAI_DEPLOYMENT
-    )
-    
-    fivews_classifier = ClassifyControlTo5Ws.from_defs(
-        repo=definitions_repo,
-        llm=llm_client,
-        deployment_name=settings.AZURE_OPENAI_DEPLOYMENT
-    )
+    # Existing use cases for making predictions, pinned to one definitions
+    # version for the whole evaluation run (no re-download per request)
+    definitions = get_definitions_holder().current()
     
     # Create evaluation use case with dependencies
     evaluate_use_case = EvaluateMapper(
         ground_truth_repo=ground_truth_repo,
         evaluation_service=evaluation_service,
-        taxonomy_classifier=taxonomy_classifier,
-        fivews_classifier=fivews_classifier,
+        taxonomy_classifier=definitions.taxonomy_classifier,
+        fivews_classifier=definitions.fivews_classifier,
         llm_client=llm_client
     )
     
     # Create and return controller
     return EvaluationController(
         evaluate_use_case=evaluate_use_case,
-        results_writer=results_writer
+        results_writer=results_writer,
+        definitions_version=definitions.version,
+        default_token_budget=get_settings().EVALUATION_TOKEN_BUDGET or None,
+        worker_pool=get_evaluation_pool()
     )
 
 
@@ -97,5 +68,6 @@ async def evaluator(req: EvaluationHttpRequest) -> EvaluationResponse:
     Dependencies are created right here where they're used, making the flow
     transparent and easy to follow. This follows EcomApp's pattern.
     """
-    controller = get_evaluation_controller()
-    return controller.handle_evaluation(req)
+    controller = await get_evaluation_controller()
+    async with controller.results_writer:
+        return await controller.handle_evaluation_async(req)
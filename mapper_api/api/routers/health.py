@@ -1,11 +1,13 @@
 """Health check endpoints for Azure service connectivity."""
 from __future__ import annotations
-from fastapi import APIRouter
+import asyncio
+from typing import Dict, Any, Optional
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
 from mapper_api.config.settings import Settings
-from mapper_api.infrastructure.azure.blob_definitions_repo import BlobDefinitionsRepository
-from mapper_api.infrastructure.azure.openai_client import AzureOpenAILLMClient
+from mapper_api.api.warmup import get_warmup_report
 
 router = APIRouter()
 
@@ -20,16 +22,128 @@ class HealthStatus(BaseModel):
 
 @router.get('/health', response_model=HealthStatus)
 async def health_check():
-    """Basic health check endpoint."""
+    """Basic health check endpoint; 503 until the startup warm-up has succeeded."""
+    report = get_warmup_report()
+    if report is None or not report.ready:
+        failed = [] if report is None else [s.name for s in report.steps if s.required and not s.ok]
+        detail = f"api: warming up - failed: {', '.join(failed)}" if failed else "api: warming up"
+        return JSONResponse(
+            status_code=503,
+            content=HealthStatus(status="starting", services=detail).model_dump(),
+        )
     return HealthStatus(
         status="healthy",
         services="api: running"
     )
 
 
+@router.get('/health/warmup')
+async def warmup_report() -> JSONResponse:
+    """Per-step timings of the startup warm-up."""
+    report = get_warmup_report()
+    if report is None:
+        return JSONResponse(status_code=503, content={"ready": False, "steps": []})
+    return JSONResponse(status_code=200 if report.ready else 503, content=report.to_dict())
+
+
+@router.get('/health/transport')
+async def transport_health_check() -> Dict[str, Any]:
+    """Connection pool utilization of the shared Azure HTTP transport."""
+    from mapper_api.infrastructure.azure.http_transport import peek_shared_transport
+
+    transport = peek_shared_transport()
+    if transport is None:
+        return {"status": "not_initialized"}
+    return {"status": "ok", **transport.pool_stats()}
+
+
+@router.get('/health/credentials')
+async def credentials_health_check() -> Dict[str, Any]:
+    """AAD token acquisition latency and cache counters of the shared credential."""
+    from mapper_api.infrastructure.azure.credentials import peek_shared_credential
+
+    credential = peek_shared_credential()
+    if credential is None:
+        return {"status": "not_initialized"}
+    return {"status": "ok", **credential.stats()}
+
+
+@router.get('/health/capture')
+async def capture_health_check(request: Request) -> Dict[str, Any]:
+    """Records written/dropped by the traffic capture writer."""
+    writer = getattr(request.app.state, "capture_writer", None)
+    if writer is None:
+        return {"status": "disabled"}
+    return {"status": "ok", **writer.stats()}
+
+
+@router.get('/health/timing')
+async def timing_health_check() -> Dict[str, Any]:
+    """Per-route, per-stage latency histograms of the requests served by this worker."""
+    from mapper_api.application.services.stage_timing import STAGE_HISTOGRAMS
+
+    return {"status": "ok", "routes": STAGE_HISTOGRAMS.snapshot()}
+
+
+@router.get('/health/usage')
+async def usage_health_check() -> Dict[str, Any]:
+    """LLM calls, tokens and estimated cost of this worker in rolling windows, per route, use case and schema."""
+    from mapper_api.application.services.llm_usage import USAGE_WINDOWS
+
+    return {"status": "ok", "windows": USAGE_WINDOWS.snapshot()}
+
+
+@router.get('/health/traces')
+async def traces_health_check(request: Request, trace_id: Optional[str] = None) -> Dict[str, Any]:
+    """Spans kept by the in-memory trace exporter, optionally for one trace id."""
+    provider = getattr(request.app.state, "tracer_provider", None)
+    if provider is None:
+        return {"status": "disabled"}
+    exporter = getattr(provider, "exporter", None)
+    if not hasattr(exporter, "spans"):
+        stats = exporter.stats() if hasattr(exporter, "stats") else {}
+        return {"status": "ok", "exporter": type(exporter).__name__ if exporter else "sdk", **stats}
+    return {"status": "ok", "exported": provider.exported, "spans": exporter.spans(trace_id)}
+
+
+@router.get('/health/loop')
+async def loop_health_check(request: Request) -> Dict[str, Any]:
+    """Event loop stalls of this worker, with the stack of the code that blocked the loop."""
+    monitor = getattr(request.app.state, "loop_monitor", None)
+    if monitor is None:
+        return {"status": "disabled"}
+    return {"status": "ok", **monitor.stats()}
+
+
+@router.get('/health/admission')
+async def admission_health_check(request: Request) -> Dict[str, Any]:
+    """In-flight requests and queue depth per priority of each admission limiter of this worker."""
+    admission = getattr(request.app.state, "admission", None)
+    if admission is None:
+        return {"status": "disabled"}
+    return {"status": "ok", **admission.stats()}
+
+
+@router.get('/health/workers')
+async def workers_health_check() -> Dict[str, Any]:
+    """Busy and queued calls of the worker pools running mapper calls and evaluation runs."""
+    from mapper_api.api.dependencies import get_evaluation_pool, get_mapper_pool
+
+    return {"status": "ok", "pools": {pool.name: pool.stats() for pool in (get_mapper_pool(), get_evaluation_pool())}}
+
+
 @router.get('/health/azure', response_model=HealthStatus)
 async def azure_health_check():
-    """Comprehensive Azure services health check."""
+    """Comprehensive Azure services health check (blocking SDK calls, run in a worker thread)."""
+    return await asyncio.to_thread(_azure_health)
+
+
+def _azure_health() -> HealthStatus:
+    from mapper_api.api.dependencies import get_blob_store
+    from mapper_api.infrastructure.azure.blob_definitions_repo import BlobDefinitionsRepository
+    from mapper_api.infrastructure.azure.openai_client import AzureOpenAILLMClient
+    from mapper_api.infrastructure.azure.http_transport import get_shared_transport
+
     services_status = []
     overall_status = "healthy"
     
@@ -42,18 +156,12 @@ async def azure_health_check():
         
     # Test Blob Storage
     try:
-        repo = BlobDefinitionsRepository(
-            account_name=settings.STORAGE_ACCOUNT_NAME,
-            container_name=settings.STORAGE_CONTAINER_NAME,
-            tenant_id=settings.AZURE_TENANT_ID,
-            client_id=settings.AZURE_CLIENT_ID,
-            client_secret=settings.AZURE_CLIENT_SECRET,
-        )
+        repo = BlobDefinitionsRepository(store=get_blob_store())
         
         risk_themes = repo.get_risk_themes()
         fivews = repo.get_fivews_rows()
         
-        services_status.append(f"blob_storage: ok - Connected - {len(risk_themes)} themes, {len(fivews)} 5Ws definitions loaded")
+        services_status.append(f"blob_storage: ok - Connected ({settings.STORAGE_BACKEND}) - {len(risk_themes)} themes, {len(fivews)} 5Ws definitions loaded")
     except Exception as e:
         services_status.append(f"blob_storage: error - Connection failed: {type(e).__name__}: {str(e)}")
         overall_status = "unhealthy"
@@ -64,6 +172,7 @@ async def azure_health_check():
             endpoint=settings.AZURE_OPENAI_ENDPOINT,
             api_key=settings.AZURE_OPENAI_API_KEY,
             api_version=settings.AZURE_OPENAI_API_VERSION,
+            http_client=get_shared_transport(settings).sync_client,
         )
         
         # Minimal connectivity test
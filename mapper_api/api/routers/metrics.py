@@ -0,0 +1,24 @@
+"""HTTP router for GET /metrics (Prometheus text exposition format)."""
+from __future__ import annotations
+import asyncio
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from mapper_api.application.services.metrics import REGISTRY, render
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get('/metrics', response_class=PlainTextResponse, include_in_schema=False)
+async def metrics(request: Request) -> PlainTextResponse:
+    """
+    Request, LLM, blob and evaluation metrics.
+
+    With ``METRICS_MULTIPROC_DIR`` set, the values of every uvicorn worker are
+    merged, whichever worker serves the scrape.
+    """
+    store = getattr(request.app.state, "metrics_store", None)
+    snapshot = await asyncio.to_thread(store.collect) if store is not None else REGISTRY.snapshot()
+    return PlainTextResponse(render(snapshot), media_type=CONTENT_TYPE)
@@ -1,60 +1,64 @@
 """HTTP router for POST /taxonomy_mapper."""
 from __future__ import annotations
-from fastapi import APIRouter
+from functools import lru_cache
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
 from mapper_api.application.dto.http_common import CommonRequest
 from mapper_api.application.dto.http_common import TaxonomyResponse
-from mapper_api.config.settings import Settings
-from mapper_api.infrastructure.azure.blob_definitions_repo import BlobDefinitionsRepository
-from mapper_api.infrastructure.azure.openai_client import AzureOpenAILLMClient
-from mapper_api.application.use_cases.map_control_to_themes import ClassifyControlToThemes
+from mapper_api.api.dependencies import get_definitions_holder, get_mapper_pool
 from mapper_api.interface.controllers.taxonomy_controller import TaxonomyController
+from mapper_api.api.sse import sse_stream
 
 router = APIRouter()
 
 
+@lru_cache(maxsize=None)
 def get_taxonomy_controller() -> TaxonomyController:
     """
     Factory to create taxonomy controller with dependencies.
-    Following EcomApp's pattern of in-place dependency assembly.
-    """
-    # Load settings
-    settings = Settings()
-    
-    # Create infrastructure adapters
-    definitions_repo = BlobDefinitionsRepository(
-        account_name=settings.STORAGE_ACCOUNT_NAME,
-        container_name=settings.STORAGE_CONTAINER_NAME,
-        tenant_id=settings.AZURE_TENANT_ID,
-        client_id=settings.AZURE_CLIENT_ID,
-        client_secret=settings.AZURE_CLIENT_SECRET,
-    )
-    
-    llm_client = AzureOpenAILLMClient(
-        endpoint=settings.AZURE_OPENAI_ENDPOINT,
-        api_key=settings.AZURE_OPENAI_API_KEY,
-        api_version=settings.AZURE_OPENAI_API_VERSION,
-    )
-    
-    # Create use case with dependencies
-    classify_use_case = ClassifyControlToThemes.from_defs(
-        repo=definitions_repo,
-        llm=llm_client,
-        deployment_name=settings.AZURE_OPENAI_DEPLOYMENT
-    )
     
-    # Create and return controller
+    The controller reads the use case from the shared definitions holder on
+    every request, so hot-reloaded definitions are picked up without a redeploy.
+    Built on first use (or in the app lifespan), never at import time.
+    """
     return TaxonomyController(
-        classify_use_case=classify_use_case
+        definitions=get_definitions_holder()
     )
 
-controller = get_taxonomy_controller()
 
 @router.post('/taxonomy_mapper', response_model=TaxonomyResponse)
-async def taxonomy_mapper(req: CommonRequest) -> TaxonomyResponse:
+async def taxonomy_mapper(
+    req: CommonRequest,
+    controller: TaxonomyController = Depends(get_taxonomy_controller),
+) -> TaxonomyResponse:
     """
     Map control description to taxonomy themes using in-place dependency assembly.
     
     Dependencies are created right here where they're used, making the flow
     transparent and easy to follow. This follows EcomApp's pattern.
     """
-    return controller.handle_taxonomy_mapping(req)
+    # The controller makes blocking LLM calls: run it on the mapper pool (context vars follow)
+    return await get_mapper_pool().run(controller.handle_taxonomy_mapping, req)
+
+
+@router.post('/taxonomy_mapper/stream')
+async def taxonomy_mapper_stream(
+    req: CommonRequest,
+    request: Request,
+    controller: TaxonomyController = Depends(get_taxonomy_controller),
+) -> StreamingResponse:
+    """
+    Stream taxonomy mapping as Server-Sent Events.
+    
+    Emits a "theme" event as soon as each taxonomy item is complete in the model
+    output, then a "result" event with the same body as /taxonomy_mapper.
+    """
+    # Validation (language detection included) runs before the first event, and every
+    # event waits on a blocking LLM chunk read: both run on the mapper pool, off the loop
+    pool = get_mapper_pool()
+    events = await pool.run(controller.stream_taxonomy_mapping, req)
+    return StreamingResponse(
+        pool.iterate(sse_stream(events, request.headers.get('x-trace-id'))),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,100 @@
+"""Per-request stage breakdown as a ``Server-Timing`` header, a log line and histograms.
+
+A pure ASGI middleware opens a ``track_stages()`` context around each HTTP
+request; the stages timed by controllers and use cases (validate, prompt,
+schema, llm, parse, scoring, ...) are reported when the response starts.
+Two entries are added by the middleware itself:
+
+- ``serialize``: from the end of the last stage to the response start, i.e.
+  FastAPI's response model validation and JSON encoding;
+- ``total``: from the request arriving to the response start.
+
+Streaming responses start before the model has answered, so their header
+only carries the stages done by then; the log line and histograms are
+written when the stream ends and hold every stage.
+"""
+from __future__ import annotations
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from mapper_api.application.services.stage_timing import STAGE_HISTOGRAMS, StageHistograms, track_stages
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """Path template of the matched route (bounded cardinality for metrics and histograms)."""
+    template = getattr(scope.get("route"), "path_format", None)
+    if not isinstance(template, str):
+        return UNMATCHED_ROUTE
+    if "{" in template:
+        return template
+    # Parameterless routes: the concrete path also carries the router prefix
+    path, root_path = scope.get("path", ""), scope.get("root_path", "")
+    return path[len(root_path):] if root_path and path.startswith(root_path) else path
+
+
+class ServerTimingMiddleware:
+    def __init__(
+        self,
+        app: Any,
+        *,
+        header: bool = True,
+        histograms: StageHistograms = STAGE_HISTOGRAMS,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.app = app
+        self.header = header
+        self.histograms = histograms
+        self._logger = logger or logging.getLogger("mapper.timing")
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state: Dict[str, Any] = {"status": 500, "extra": {}}
+
+        with track_stages() as timings:
+            async def timing_send(message: Dict[str, Any]) -> None:
+                if message["type"] == "http.response.start":
+                    now = time.perf_counter()
+                    extra = state["extra"]
+                    if timings.last_end is not None:
+                        extra["serialize"] = round((now - timings.last_end) * 1000, 3)
+                    extra["total"] = round((now - timings.started) * 1000, 3)
+                    state["status"] = message["status"]
+                    if self.header:
+                        headers: List[Tuple[bytes, bytes]] = list(message.get("headers", []))
+                        headers.append((b"server-timing", timings.server_timing(extra).encode("latin-1")))
+                        message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, timing_send)
+            finally:
+                self._report(scope, state, timings.snapshot(), (time.perf_counter() - timings.started) * 1000)
+
+    def _report(self, scope: Dict[str, Any], state: Dict[str, Any], stages: Dict[str, float],
+                duration_ms: float) -> None:
+        if not stages:
+            return  # health checks and other untimed routes
+        route = route_template(scope)
+        observed = {**stages, **state["extra"], "total": round(duration_ms, 3)}
+        self.histograms.observe(route, observed)
+        try:
+            headers = dict(scope.get("headers") or [])
+            trace_id = headers.get(b"x-trace-id")
+            self._logger.info(
+                "http.request.timing",
+                extra={
+                    "traceId": trace_id.decode("latin-1") if trace_id else None,
+                    "route": route,
+                    "status": state["status"],
+                    "durationMs": round(duration_ms, 3),
+                    "stages": observed,
+                },
+            )
+        except Exception:
+            pass
@@ -0,0 +1,33 @@
+"""Server-Sent Events framing for streaming endpoints."""
+from __future__ import annotations
+import json
+from typing import Any, Iterator, Optional, Tuple
+
+from mapper_api.domain.errors import DeadlineExceededError, LLMCapacityError, MapperDomainError
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one SSE message with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def sse_stream(events: Iterator[Tuple[str, Any]], trace_id: Optional[str]) -> Iterator[str]:
+    """
+    Frame (event, payload) pairs as SSE messages.
+
+    Once streaming has started the status code is already sent, so failures are
+    reported in-band with the same body as the JSON handlers: an ``overloaded``
+    event for what the JSON route answers with 503 and Retry-After (retry
+    later), a ``timeout`` event for a 504, and an ``error`` event otherwise.
+    """
+    try:
+        for event, payload in events:
+            yield format_sse(event, payload)
+    except LLMCapacityError as e:
+        yield format_sse("overloaded", {"error": str(e), "traceId": trace_id, "retryAfterS": 1})
+    except DeadlineExceededError as e:
+        yield format_sse("timeout", {"error": str(e), "traceId": trace_id})
+    except MapperDomainError as e:
+        yield format_sse("error", {"error": str(e), "traceId": trace_id})
+    except Exception:
+        yield format_sse("error", {"error": "Internal Server Error", "traceId": trace_id})
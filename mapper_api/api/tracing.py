@@ -0,0 +1,137 @@
+"""OpenTelemetry setup and the HTTP server span, as a pure ASGI middleware.
+
+``configure_tracing`` picks the provider from settings:
+
+- ``memory`` / ``file``: the self-contained ``LocalTracerProvider`` (no
+  OpenTelemetry SDK needed; spans at ``/health/traces`` or in rotating gzip
+  NDJSON under ``TRACING_FILE_DIR``);
+- ``console`` / ``otlp``: the OpenTelemetry SDK with a batch span processor
+  (``pip install opentelemetry-sdk opentelemetry-exporter-otlp``).
+
+Sampling is parent-based on a ratio of root traces, so an incoming
+``traceparent`` decides for the whole request and unsampled requests carry
+non-recording spans only.
+"""
+from __future__ import annotations
+from typing import Any, Dict
+
+from mapper_api.api.server_timing import route_template
+from mapper_api.application.services import tracing
+from mapper_api.config.settings import Settings
+
+EXPORTERS = ("memory", "file", "console", "otlp")
+
+
+def _resource(settings: Settings) -> Dict[str, str]:
+    return {"service.name": settings.TRACING_SERVICE_NAME, "service.version": settings.API_VERSION}
+
+
+def _sdk_provider(settings: Settings) -> Any:
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    except ImportError as e:
+        raise RuntimeError(
+            f"TRACING_EXPORTER={settings.TRACING_EXPORTER} requires the opentelemetry-sdk package"
+        ) from e
+    if settings.TRACING_EXPORTER == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError as e:
+            raise RuntimeError("TRACING_EXPORTER=otlp requires the opentelemetry-exporter-otlp package") from e
+        exporter = OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT or None)
+    else:
+        exporter = ConsoleSpanExporter()
+    provider = TracerProvider(
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+        resource=Resource.create(_resource(settings)),
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    return provider
+
+
+def configure_tracing(settings: Settings) -> Any:
+    """Build the tracer provider chosen by settings and install it for ``tracing.span()``."""
+    if settings.TRACING_EXPORTER not in EXPORTERS:
+        raise ValueError(f"TRACING_EXPORTER must be one of {', '.join(EXPORTERS)}")
+    if not tracing.tracing_available():
+        raise RuntimeError("TRACING_ENABLED requires the opentelemetry-api package")
+    if settings.TRACING_EXPORTER in ("console", "otlp"):
+        provider = _sdk_provider(settings)
+    else:
+        from mapper_api.infrastructure.local.tracing import (
+            FileSpanExporter,
+            InMemorySpanExporter,
+            LocalTracerProvider,
+        )
+
+        if settings.TRACING_EXPORTER == "file":
+            exporter: Any = FileSpanExporter(
+                settings.TRACING_FILE_DIR,
+                max_file_bytes=int(settings.TRACING_MAX_FILE_MB * 1024 * 1024),
+                max_files=settings.TRACING_MAX_FILES,
+            )
+        else:
+            exporter = InMemorySpanExporter(settings.TRACING_MEMORY_MAX_SPANS)
+        provider = LocalTracerProvider(
+            exporter, sample_ratio=settings.TRACING_SAMPLE_RATIO, resource=_resource(settings)
+        )
+    tracing.set_tracer_provider(provider)
+    return provider
+
+
+class TracingMiddleware:
+    """
+    Run each HTTP request in a server span continuing the caller's W3C
+    ``traceparent``; sampled responses carry a ``traceresponse`` header.
+    """
+
+    def __init__(self, app: Any) -> None:
+        from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+
+        self.app = app
+        self._propagator = TraceContextTextMapPropagator()
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        method = scope.get("method", "")
+        state: Dict[str, Any] = {"status": 500}
+        with tracing.span(
+            method,
+            kind="server",
+            context=self._propagator.extract(headers),
+            http__request__method=method,
+            url__path=scope.get("path", ""),
+            mapper__trace_id=headers.get("x-trace-id"),
+        ) as server_span:
+            recording = server_span.is_recording()
+            span_context = server_span.get_span_context() if recording else None
+
+            async def traced_send(message: Dict[str, Any]) -> None:
+                if message["type"] == "http.response.start":
+                    state["status"] = message["status"]
+                    if recording:
+                        message.setdefault("headers", [])
+                        message["headers"] = list(message["headers"]) + [(
+                            b"traceresponse",
+                            f"00-{span_context.trace_id:032x}-{span_context.span_id:016x}-01".encode(),
+                        )]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, traced_send)
+            finally:
+                if recording:
+                    route = route_template(scope)
+                    server_span.update_name(f"{method} {route}")
+                    server_span.set_attributes({"http.route": route, "http.response.status_code": state["status"]})
+                    if state["status"] >= 500:
+                        from opentelemetry.trace import StatusCode
+
+                        server_span.set_status(StatusCode.ERROR)
@@ -0,0 +1,57 @@
+"""Per-request LLM usage accounting as ASGI middleware.
+
+Every LLM call made while serving a request is attributed to the request's
+route (the work routes by path, ``other`` for the rest, as for in-flight
+metrics) and totalled; requests that called the model log one
+``http.request.llm_usage`` line with their tokens and estimated cost.
+Streaming responses are accounted when the stream ends.
+"""
+from __future__ import annotations
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from mapper_api.api.metrics import OTHER_ROUTE, WORK_ROUTES
+from mapper_api.application.services.llm_usage import attribute_llm_usage, track_llm_usage
+
+
+class LLMUsageMiddleware:
+    def __init__(self, app: Any, *, routes: Tuple[str, ...] = WORK_ROUTES,
+                 logger: Optional[logging.Logger] = None) -> None:
+        self.app = app
+        self.routes = routes
+        self._logger = logger or logging.getLogger("mapper.usage")
+
+    def _route(self, scope: Dict[str, Any]) -> str:
+        path, root_path = scope.get("path", ""), scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        return path if path.endswith(self.routes) else OTHER_ROUTE
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = self._route(scope)
+        status = {"code": 500}
+
+        async def accounting_send(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        with attribute_llm_usage(route=route), track_llm_usage() as usage:
+            try:
+                await self.app(scope, receive, accounting_send)
+            finally:
+                if usage.calls:
+                    trace_id = dict(scope.get("headers", [])).get(b"x-trace-id")
+                    self._logger.info(
+                        "http.request.llm_usage",
+                        extra={
+                            "traceId": trace_id.decode("latin-1") if trace_id else None,
+                            "route": route,
+                            "status": status["code"],
+                            **usage.to_dict(),
+                        },
+                    )
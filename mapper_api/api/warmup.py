@@ -0,0 +1,196 @@
+"""Readiness warm-up: prime every expensive first-request path before taking traffic."""
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI
+
+from mapper_api.application.dto.http_common import CommonRequest, CommonHeader, CommonData
+from mapper_api.application.dto.http_common import TaxonomyResponse, FiveWResponse
+from mapper_api.application.dto.http_evaluation import EvaluationHttpRequest, EvaluationResponse
+from mapper_api.domain.entities.control import Control
+from mapper_api.infrastructure.local.llm_client import StaticLLMClient
+from mapper_api.interface.controllers.taxonomy_controller import TaxonomyController
+from mapper_api.interface.controllers.fivews_controller import FiveWsController
+from mapper_api.api.dependencies import (
+    get_definitions_holder,
+    get_definitions_repo,
+    get_llm_client,
+    get_settings,
+    start_definitions_refresher,
+)
+
+_WARMUP_CONTROL = (
+    "All privileged user access to production databases must be reviewed quarterly by the "
+    "system owner to ensure access remains appropriate."
+)
+
+_report: Optional["WarmupReport"] = None
+
+
+@dataclass(frozen=True)
+class WarmupStep:
+    name: str
+    duration_ms: float
+    ok: bool
+    required: bool
+    error: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class WarmupReport:
+    """
+    Per-step timings of one warm-up run.
+
+    The service is ready when every required step succeeded; optional steps
+    (network pre-connects) only warm caches and are reported but not gating.
+    """
+    steps: Tuple[WarmupStep, ...]
+    total_ms: float
+
+    @property
+    def ready(self) -> bool:
+        return all(step.ok for step in self.steps if step.required)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "totalMs": round(self.total_ms, 1),
+            "steps": [
+                {
+                    "name": step.name,
+                    "durationMs": round(step.duration_ms, 1),
+                    "ok": step.ok,
+                    "required": step.required,
+                    **({"error": step.error} if step.error else {}),
+                }
+                for step in self.steps
+            ],
+        }
+
+
+def _warm_request_schemas(app: FastAPI) -> None:
+    for model in (CommonRequest, TaxonomyResponse, FiveWResponse, EvaluationHttpRequest, EvaluationResponse):
+        model.model_json_schema()
+    app.openapi()
+
+
+def _dry_run_taxonomy() -> None:
+    # Same compiled prompt and Literal model as live traffic, with a static LLM
+    compiled = get_definitions_holder().current()
+    controller = TaxonomyController(
+        classify_use_case=replace(compiled.taxonomy_classifier, llm=StaticLLMClient())
+    )
+    controller.handle_taxonomy_mapping(_warmup_request())
+
+
+def _dry_run_fivews() -> None:
+    compiled = get_definitions_holder().current()
+    controller = FiveWsController(
+        classify_use_case=replace(compiled.fivews_classifier, llm=StaticLLMClient())
+    )
+    controller.handle_fivews_mapping(_warmup_request())
+
+
+def _warmup_request() -> CommonRequest:
+    return CommonRequest(
+        header=CommonHeader(recordId="warmup"),
+        data=CommonData(controlDescription=_WARMUP_CONTROL),
+    )
+
+
+def _acquire_storage_token() -> None:
+    from mapper_api.infrastructure.azure.credentials import STORAGE_SCOPE, get_shared_credential
+
+    settings = get_settings()
+    if settings.STORAGE_BACKEND != 'azure':
+        return  # local/in-memory storage needs no AAD token
+    get_shared_credential(settings).get_token(STORAGE_SCOPE)
+
+
+def _plan(app: FastAPI) -> List[Tuple[str, bool, Callable[[], Any]]]:
+    return [
+        # First so its round trip to AAD is timed on its own, not inside "definitions"
+        ("aad_token", False, _acquire_storage_token),
+        # Loads (or restores) definitions, compiles the Literal model and starts polling
+        ("definitions", True, start_definitions_refresher),
+        ("language_detection", True, lambda: Control(text=_WARMUP_CONTROL).ensure_is_english()),
+        ("request_schemas", True, lambda: _warm_request_schemas(app)),
+        ("taxonomy_dry_run", True, _dry_run_taxonomy),
+        ("fivews_dry_run", True, _dry_run_fivews),
+        ("blob_storage_connection", False, lambda: get_definitions_repo().warm_up()),
+        ("azure_openai_connection", False, lambda: get_llm_client().warm_up()),
+    ]
+
+
+def _run_step(name: str, required: bool, fn: Callable[[], Any]) -> WarmupStep:
+    step_start = time.perf_counter()
+    error = None
+    try:
+        fn()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return WarmupStep(
+        name=name,
+        duration_ms=(time.perf_counter() - step_start) * 1000,
+        ok=error is None,
+        required=required,
+        error=error,
+    )
+
+
+def run_warmup(app: FastAPI) -> WarmupReport:
+    """Run all warm-up steps in order and publish the report for /health."""
+    global _report
+    started = time.perf_counter()
+    steps = [_run_step(name, required, fn) for name, required, fn in _plan(app)]
+    report = WarmupReport(steps=tuple(steps), total_ms=(time.perf_counter() - started) * 1000)
+    _report = report
+    logging.getLogger("mapper.warmup").info("app.warmup", extra=report.to_dict())
+    return report
+
+
+def retry_failed_steps(app: FastAPI) -> WarmupReport:
+    """Re-run the failed required steps in plan order and publish the updated report."""
+    global _report
+    report = _report if _report is not None else run_warmup(app)
+    failed = {step.name for step in report.steps if step.required and not step.ok}
+    started = time.perf_counter()
+    retried = {name: _run_step(name, required, fn) for name, required, fn in _plan(app) if name in failed}
+    report = WarmupReport(
+        steps=tuple(retried.get(step.name, step) for step in report.steps),
+        total_ms=report.total_ms + (time.perf_counter() - started) * 1000,
+    )
+    _report = report
+    logging.getLogger("mapper.warmup").info("app.warmup.retry", extra=report.to_dict())
+    return report
+
+
+async def retry_warmup(app: FastAPI, *, initial_backoff_s: float = 1.0, max_backoff_s: float = 60.0) -> None:
+    """
+    Retry failed required steps with exponential backoff until the app is ready.
+
+    A worker that started while blob storage was unreachable (and had no
+    local snapshot) becomes ready on its own once storage recovers, instead
+    of answering 503 on /health for the life of the process.
+    """
+    backoff_s = initial_backoff_s
+    while _report is not None and not _report.ready:
+        await asyncio.sleep(backoff_s)
+        await asyncio.to_thread(retry_failed_steps, app)
+        backoff_s = min(backoff_s * 2, max_backoff_s)
+
+
+def mark_ready_without_warmup() -> WarmupReport:
+    """Publish an empty (ready) report when warm-up is disabled."""
+    global _report
+    _report = WarmupReport(steps=(), total_ms=0.0)
+    return _report
+
+
+def get_warmup_report() -> Optional[WarmupReport]:
+    """Last warm-up report, or None while the app is still starting."""
+    return _report
@@ -12,3 +12,6 @@ class EvaluationRequest(BaseModel):
     record_id: str = Field(..., description="Record ID for evaluation")
     metric_types: List[MetricType] = Field(..., description="List of metrics to evaluate")
     n_records: Optional[int] = Field(None, description="Number of records to test for latency metrics")
+    concurrency: Optional[int] = Field(None, description="Records mapped concurrently for throughput metrics")
+    concurrency_levels: Optional[List[int]] = Field(None, description="Calls in flight for each pass of the latency metrics")
+    token_budget: Optional[int] = Field(None, description="LLM tokens the run may spend before it is stopped")
@@ -1,6 +1,6 @@
 """Common HTTP DTOs for requests and responses."""
 from __future__ import annotations
-from typing import Literal, Annotated, List
+from typing import Literal, Annotated, List, Optional
 from pydantic import BaseModel, Field
 from pydantic import ConfigDict
 
@@ -28,6 +28,7 @@ class CommonRequest(BaseModel):
 
 class ResponseHeader(BaseModel):
     recordId: str
+    definitionsVersion: Optional[str] = None
 
 
 class TaxonomyItem(BaseModel):
@@ -1,6 +1,6 @@
 """HTTP DTOs for evaluation requests and responses."""
 from __future__ import annotations
-from typing import Union, List, Optional
+from typing import Any, Dict, Union, List, Optional
 from pydantic import BaseModel, Field, field_validator
 from mapper_api.application.dto.http_common import CommonHeader, ResponseHeader
 
@@ -12,7 +12,10 @@ from mapper_api.application.dto.http_common import CommonHeader, ResponseHeader
 class EvaluationRequestData(BaseModel):
     """Data payload for evaluation request."""
     metricType: Union[str, List[str]] = Field(..., description="Metric type(s) to evaluate. Can be a single string, list of strings, or 'all' for all metrics")
-    nRecords: int = Field(None, description="Number of records to test for latency metrics (optional)")
+    nRecords: int = Field(None, description="Number of records to test for latency, throughput, token and cost metrics (optional)")
+    concurrency: Optional[int] = Field(None, ge=1, le=64, description="Records mapped concurrently for throughput metrics (optional)")
+    concurrencyLevels: Optional[List[int]] = Field(None, min_length=1, max_length=8, description="Concurrency levels swept by the latency metrics, e.g. [1, 4, 16] (optional, default [1])")
+    maxTokens: Optional[int] = Field(None, ge=1, description="LLM token budget for the run; remaining metrics fail once it is spent (optional)")
     
     @field_validator('metricType')
     @classmethod
@@ -25,6 +28,13 @@ class EvaluationRequestData(BaseModel):
             return v
         else:
             raise ValueError("metricType must be a string or list of strings")
+    
+    @field_validator('concurrencyLevels')
+    @classmethod
+    def validate_concurrency_levels(cls, v):
+        if v is not None and any(level < 1 or level > 64 for level in v):
+            raise ValueError("concurrencyLevels must be between 1 and 64")
+        return v
 
 
 class EvaluationHttpRequest(BaseModel):
@@ -40,10 +50,11 @@ class EvaluationHttpRequest(BaseModel):
 class MetricResult(BaseModel):
     """Result for a single metric evaluation."""
     metric_type: str = Field(..., description="Type of metric evaluated")
-    file_path: str = Field(..., description="Path to the metric result file in blob storage")
+    file_path: str = Field(..., description="Path to the metric summary JSON in blob storage; its records_path points to the gzip NDJSON individual results")
     total_records: int = Field(..., description="Total number of records evaluated")
     status: str = Field(..., description="Status: 'success' or 'error'")
     error_message: Optional[str] = Field(None, description="Error message if status is 'error'")
+    llm_usage: Optional[Dict[str, Any]] = Field(None, description="LLM calls, tokens and estimated cost (USD) of this metric")
 
 
 class EvaluationResponse(BaseModel):
@@ -52,3 +63,4 @@ class EvaluationResponse(BaseModel):
     results: List[MetricResult] = Field(..., description="Results for each evaluated metric")
     directory_path: str = Field(..., description="Directory path containing all result files")
     message: str = Field(..., description="Overall success or error message")
+    llm_usage: Optional[Dict[str, Any]] = Field(None, description="LLM calls, tokens and estimated cost (USD) of the whole run")
@@ -0,0 +1,48 @@
+"""Port/Protocol for the blob storage behind definitions, ground truth and evaluation results."""
+from __future__ import annotations
+from typing import AsyncIterable, Iterable, List, Optional, Protocol, Tuple, Union
+
+BlobData = Union[bytes, Iterable[bytes]]
+
+
+class BlobNotFoundError(LookupError):
+    """Raised by a BlobStore when the named blob does not exist."""
+
+
+class BlobStore(Protocol):
+    def download(self, name: str, *, etag: Optional[str] = None) -> Optional[Tuple[bytes, str]]:
+        """
+        Return (content, etag). With ``etag``, return None when the blob is unchanged.
+
+        Raises BlobNotFoundError when the blob does not exist.
+        """
+        ...
+
+    def upload(self, name: str, data: BlobData, *, content_type: str) -> None:
+        """Create or overwrite a blob; ``data`` may be an iterable of chunks (streamed)."""
+        ...
+
+    def list_names(self, prefix: str) -> List[str]:
+        """Names of all blobs starting with ``prefix``."""
+        ...
+
+    def ping(self) -> None:
+        """Cheap round trip that opens connections and fetches credentials."""
+        ...
+
+
+class AsyncBlobStore(Protocol):
+    async def download(self, name: str, *, etag: Optional[str] = None) -> Optional[Tuple[bytes, str]]:
+        ...
+
+    async def upload(self, name: str, data: Union[BlobData, AsyncIterable[bytes]], *, content_type: str) -> None:
+        ...
+
+    async def list_names(self, prefix: str) -> List[str]:
+        ...
+
+    async def ping(self) -> None:
+        ...
+
+    async def close(self) -> None:
+        ...
@@ -1,6 +1,6 @@
 """Port/Protocol for LLM client capable of json_schema_chat."""
 from __future__ import annotations
-from typing import Protocol, Mapping, Any, Optional
+from typing import Protocol, Mapping, Any, Optional, Iterator
 
 
 class LLMClient(Protocol):
@@ -18,3 +18,20 @@ class LLMClient(Protocol):
     ) -> str:
         """Return raw JSON string validated by the model against provided JSON Schema."""
         ...
+
+
+class StreamingLLMClient(LLMClient, Protocol):
+    def json_schema_chat_stream(
+        self,
+        *,
+        system: str,
+        user: str,
+        schema_name: str,
+        schema: Mapping[str, Any],
+        max_tokens: int,
+        temperature: float = 0.1,
+        context: Optional[dict] = None,
+        deployment: Optional[str] = None,
+    ) -> Iterator[str]:
+        """Yield content deltas of the JSON answer as the model generates them."""
+        ...
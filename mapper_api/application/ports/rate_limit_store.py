@@ -0,0 +1,20 @@
+"""Port/Protocol for the token-bucket state shared by all workers of the service."""
+from __future__ import annotations
+from typing import NamedTuple, Protocol, Sequence, Tuple
+
+
+class BucketLimit(NamedTuple):
+    capacity: float
+    rate_per_s: float
+
+
+class RateLimitStore(Protocol):
+    def take(self, key: str, costs: Sequence[float], limits: Sequence[BucketLimit],
+             max_wait_s: float) -> Tuple[bool, float]:
+        """
+        Atomically refill the buckets of ``key`` and reserve ``costs`` from them
+        (one cost per limit). Returns (granted, wait in seconds until the
+        reservation is covered). Buckets may go into debt; a reservation that
+        would wait longer than ``max_wait_s`` is not taken.
+        """
+        ...
@@ -0,0 +1,170 @@
+"""Adaptive limit on concurrent LLM calls (AIMD steered by latency and 429s).
+
+One ``AdaptiveConcurrencyLimiter`` sits in the LLM client, so the mapper
+routes and evaluation runs draw from the same limit. Each attempt holds a
+slot for the length of the HTTP call; callers over the limit wait for one.
+
+After every attempt the limit moves:
+
+- throttled (a 429, also one the SDK retried internally and reported with
+  ``note_throttled()``) or timed out: multiplied by ``backoff_ratio``;
+- succeeded but the smoothed latency is above ``latency_tolerance`` times the
+  baseline (the slow-moving typical latency): cut in proportion to the
+  inflation, never by more than a 429 would;
+- succeeded at flat latency while the limit was at least half used: one more
+  slot per ``limit`` successes (additive increase).
+
+A burst of failures cuts the limit once: only attempts that started after
+the last cut can cut it again. ``mapper_llm_concurrency_limit`` exports the
+current limit.
+"""
+from __future__ import annotations
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from mapper_api.application.services.deadline import current_deadline
+from mapper_api.application.services.metrics import (
+    LLM_CONCURRENCY_LIMIT,
+    LLM_CONCURRENCY_WAIT,
+    LLM_IN_FLIGHT,
+)
+from mapper_api.application.services.stage_timing import record_stage
+from mapper_api.domain.errors import LLMCapacityError
+
+THROTTLED_OUTCOMES = ("rate_limited", "timeout")
+
+
+class _Slot:
+    __slots__ = ("throttled",)
+
+    def __init__(self) -> None:
+        self.throttled = False
+
+
+_current_slot: ContextVar[Optional[_Slot]] = ContextVar("llm_concurrency_slot", default=None)
+
+
+def note_throttled() -> None:
+    """Mark the attempt running in this context as throttled (called on every HTTP 429)."""
+    slot = _current_slot.get()
+    if slot is not None:
+        slot.throttled = True
+
+
+class AdaptiveConcurrencyLimiter:
+    def __init__(
+        self,
+        *,
+        initial_limit: int = 16,
+        min_limit: int = 2,
+        max_limit: int = 64,
+        backoff_ratio: float = 0.7,
+        latency_tolerance: float = 2.0,
+        smoothing: float = 0.2,
+        baseline_smoothing: float = 0.01,
+        wait_timeout_s: float = 60.0,
+        classify: Callable[[Optional[BaseException]], str] = lambda error: "ok" if error is None else "error",
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        if not 0 < backoff_ratio < 1 or latency_tolerance <= 1:
+            raise ValueError("backoff_ratio must be in (0, 1) and latency_tolerance above 1")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.baseline_smoothing = baseline_smoothing
+        self.wait_timeout_s = wait_timeout_s
+        self._classify = classify
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._limit = float(initial_limit)
+        self.in_flight = 0
+        self._latency: Optional[float] = None
+        self._baseline: Optional[float] = None
+        self._last_cut = float("-inf")
+        LLM_CONCURRENCY_LIMIT.set(self.limit)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold one slot for the block; its outcome (exception or not) and duration adjust the limit."""
+        deadline = current_deadline()
+        timeout_s = self.wait_timeout_s if deadline is None else min(self.wait_timeout_s, deadline.remaining())
+        wait_start = time.perf_counter()
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.in_flight < self.limit, timeout=timeout_s):
+                if deadline is not None:
+                    deadline.check()
+                raise LLMCapacityError(
+                    f"No LLM capacity within {self.wait_timeout_s:g}s (limit {self.limit}, all in use)"
+                )
+            self.in_flight += 1
+            utilization = self.in_flight / self.limit
+        waited_s = time.perf_counter() - wait_start
+        LLM_CONCURRENCY_WAIT.observe(waited_s)
+        LLM_IN_FLIGHT.inc()
+        if waited_s > 0.001:
+            record_stage("llm.queue", waited_s * 1000)
+
+        slot = _Slot()
+        token = _current_slot.set(slot)
+        start = self._clock()
+        error: Optional[BaseException] = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            try:
+                _current_slot.reset(token)
+            except ValueError:
+                pass  # a streaming generator resumed in another context
+            LLM_IN_FLIGHT.dec()
+            outcome = "rate_limited" if slot.throttled else self._classify(error)
+            self._on_sample(start, self._clock() - start, outcome, utilization)
+
+    def _on_sample(self, start: float, latency_s: float, outcome: str, utilization: float) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            if outcome in THROTTLED_OUTCOMES:
+                self._cut(start, self.backoff_ratio)
+            elif outcome == "ok":
+                self._latency = latency_s if self._latency is None else (
+                    self._latency + self.smoothing * (latency_s - self._latency)
+                )
+                self._baseline = latency_s if self._baseline is None else min(
+                    self._baseline + self.baseline_smoothing * (latency_s - self._baseline), self._latency
+                )
+                threshold = self._baseline * self.latency_tolerance
+                if self._latency > threshold:
+                    self._cut(start, max(self.backoff_ratio, threshold / self._latency))
+                elif utilization >= 0.5:
+                    self._limit = min(self._limit + 1 / self._limit, float(self.max_limit))
+            LLM_CONCURRENCY_LIMIT.set(self.limit)
+            self._cond.notify_all()
+
+    def _cut(self, start: float, ratio: float) -> None:
+        # One cut per congestion episode: attempts already in flight at the last cut don't count
+        if start < self._last_cut:
+            return
+        self._limit = max(self._limit * ratio, float(self.min_limit))
+        self._last_cut = self._clock()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "inFlight": self.in_flight,
+                "latencyMs": round(self._latency * 1000, 1) if self._latency is not None else None,
+                "baselineMs": round(self._baseline * 1000, 1) if self._baseline is not None else None,
+            }
@@ -0,0 +1,66 @@
+"""Compiled, atomically swappable definitions for the mapper use cases."""
+from __future__ import annotations
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from mapper_api.domain.repositories.definitions import DefinitionsSnapshot
+from mapper_api.domain.errors import DefinitionsUnavailableError
+from mapper_api.application.ports.llm import LLMClient
+from mapper_api.application.use_cases.map_control_to_themes import ClassifyControlToThemes
+from mapper_api.application.use_cases.map_control_to_5ws import ClassifyControlTo5Ws
+
+
+@dataclass(frozen=True)
+class CompiledDefinitions:
+    """
+    Use cases built against one immutable DefinitionsSnapshot.
+
+    Building this compiles the taxonomy prompt and the dynamic Literal schema,
+    so it is done off the request path and then published as a whole.
+    """
+    version: str
+    taxonomy_classifier: ClassifyControlToThemes
+    fivews_classifier: ClassifyControlTo5Ws
+
+    @classmethod
+    def compile(cls, snapshot: DefinitionsSnapshot, llm: LLMClient, deployment_name: str) -> "CompiledDefinitions":
+        taxonomy_classifier = ClassifyControlToThemes.from_defs(
+            repo=snapshot, llm=llm, deployment_name=deployment_name
+        )
+        # Generate the strict schema now rather than on the first request
+        taxonomy_classifier.TaxonomyOut.model_json_schema()
+        return cls(
+            version=snapshot.version,
+            taxonomy_classifier=taxonomy_classifier,
+            fivews_classifier=ClassifyControlTo5Ws.from_defs(
+                repo=snapshot, llm=llm, deployment_name=deployment_name
+            ),
+        )
+
+
+class DefinitionsHolder:
+    """
+    Holds the current CompiledDefinitions.
+
+    Readers call current() once per request and keep that object, so a swap
+    never changes definitions underneath a request that is already running.
+    """
+
+    def __init__(self, compiled: Optional[CompiledDefinitions] = None) -> None:
+        self._current = compiled
+        self._lock = threading.Lock()
+
+    def current(self) -> CompiledDefinitions:
+        compiled = self._current
+        if compiled is None:
+            raise DefinitionsUnavailableError("definitions not loaded")
+        return compiled
+
+    def swap(self, compiled: CompiledDefinitions) -> bool:
+        """Publish new compiled definitions; returns False if the version is unchanged."""
+        with self._lock:
+            if self._current is not None and self._current.version == compiled.version:
+                return False
+            self._current = compiled
+            return True
@@ -0,0 +1,77 @@
+"""Request deadlines: from the HTTP edge, through controllers and use cases, to every LLM attempt.
+
+The API opens ``deadline_scope(timeout_s)`` around a request (the caller's
+``X-Request-Timeout`` or the route's default). The ``Deadline`` lives in a
+context variable, so worker threads started with a copied context
+(``asyncio.to_thread``, the evaluation pool) see the same object without it
+being passed through every signature.
+
+The LLM client bounds each attempt by ``remaining()``, does not start a
+retry that cannot finish in time, and stops with ``DeadlineExceededError``
+once the deadline has passed or was cancelled (the client disconnected).
+"""
+from __future__ import annotations
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+from mapper_api.domain.errors import DeadlineExceededError
+
+
+class Deadline:
+    def __init__(self, timeout_s: float, *, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self.timeout_s = timeout_s
+        self.expires_at = clock() + timeout_s
+        self._cancelled = threading.Event()
+        self.cancel_reason: Optional[str] = None
+
+    def remaining(self) -> float:
+        return max(self.expires_at - self._clock(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self._clock() >= self.expires_at
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self, reason: str) -> None:
+        """End the deadline now (thread-safe); work checking it stops at its next check."""
+        if not self._cancelled.is_set():
+            self.cancel_reason = reason
+            self._cancelled.set()
+
+    def check(self) -> float:
+        """Seconds left; raises DeadlineExceededError once cancelled or expired."""
+        if self.cancelled:
+            raise DeadlineExceededError(f"Request cancelled: {self.cancel_reason}")
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceededError(f"Request deadline of {self.timeout_s:g}s exceeded")
+        return remaining
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(timeout_s: float) -> Iterator[Deadline]:
+    """Run the block under a deadline ``timeout_s`` from now; an earlier enclosing deadline wins."""
+    outer = _current.get()
+    deadline = Deadline(timeout_s)
+    if outer is not None and outer.expires_at <= deadline.expires_at:
+        yield outer
+        return
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
@@ -0,0 +1,70 @@
+"""Incremental parser that yields array items from a streamed strict-JSON object."""
+from __future__ import annotations
+import json
+from typing import Any, Dict, List, Optional
+
+
+class JsonArrayItemParser:
+    """
+    Extract complete objects from ``{"<array_key>": [{...}, {...}]}`` as text arrives.
+
+    The model output is strict JSON, so a small character scanner that tracks
+    string/escape state and nesting depth is enough to know when an item's
+    closing brace has been seen. Each completed item is decoded once.
+    """
+
+    def __init__(self, array_key: str) -> None:
+        self._array_key = array_key
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start: Optional[int] = None
+        self._last_key: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._item_start: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        """Full text received so far."""
+        return self._text
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk and return items completed by it, in order."""
+        if not chunk:
+            return []
+        self._text += chunk
+        text = self._text
+        completed: List[Dict[str, Any]] = []
+
+        while self._pos < len(text):
+            ch = text[self._pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._string_start is not None:
+                        self._last_key = json.loads(text[self._string_start:self._pos + 1])
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif ch in "{[":
+                self._depth += 1
+                if ch == "[" and self._depth == 2 and self._last_key == self._array_key:
+                    self._array_depth = self._depth
+                elif ch == "{" and self._array_depth is not None and self._depth == self._array_depth + 1:
+                    self._item_start = self._pos
+            elif ch in "}]":
+                if ch == "}" and self._item_start is not None and self._depth == self._array_depth + 1:
+                    completed.append(json.loads(text[self._item_start:self._pos + 1]))
+                    self._item_start = None
+                if ch == "]" and self._depth == self._array_depth:
+                    self._array_depth = None
+                self._depth -= 1
+            self._pos += 1
+
+        return completed
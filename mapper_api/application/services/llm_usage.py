@@ -0,0 +1,288 @@
+"""LLM token usage and estimated cost: per call, per unit of work and in rolling windows.
+
+A caller opens ``track_llm_usage()`` around a unit of work (an HTTP request,
+an evaluation run, one metric of it); LLM adapters call ``record_llm_usage``
+after every completion, and the totals land in every tracker active in that
+context, so nested trackers (run and metric) all see the call. Worker threads
+started with a copied context (``asyncio.to_thread``, Starlette's threadpool)
+report into the same trackers.
+
+Each call is also attributed to the route and metric set with
+``attribute_llm_usage()`` plus the use case and record id the caller passes
+in the LLM ``context``, and added to ``USAGE_WINDOWS`` (per-minute / 5-minute
+/ hourly totals, to spot prompt growth and cost per endpoint early).
+
+A tracker can carry a token budget; ``check_llm_budget()`` raises
+``TokenBudgetExceededError`` once any active budget is spent.
+"""
+from __future__ import annotations
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from mapper_api.domain.errors import TokenBudgetExceededError
+
+
+@dataclass(frozen=True)
+class LLMPricing:
+    """USD per million tokens; cached prompt tokens are billed at ``cached`` instead of ``prompt``."""
+    prompt: float = 2.50
+    completion: float = 10.00
+    cached: float = 1.25
+
+    def cost(self, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+        uncached = max(prompt_tokens - cached_tokens, 0)
+        return (uncached * self.prompt + cached_tokens * self.cached + completion_tokens * self.completion) / 1e6
+
+
+@dataclass
+class LLMUsage:
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    cost_usd: float = 0.0
+    budget_tokens: Optional[int] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def budget_exceeded(self) -> bool:
+        return self.budget_tokens is not None and self.total_tokens >= self.budget_tokens
+
+    def add(self, *, prompt_tokens: int = 0, completion_tokens: int = 0, cached_tokens: int = 0,
+            cost_usd: float = 0.0) -> None:
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.cached_tokens += cached_tokens
+            self.cost_usd += cost_usd
+
+    def to_dict(self) -> Dict[str, Any]:
+        usage: Dict[str, Any] = {
+            "calls": self.calls,
+            "promptTokens": self.prompt_tokens,
+            "completionTokens": self.completion_tokens,
+            "cachedTokens": self.cached_tokens,
+            "totalTokens": self.total_tokens,
+            "costUsd": round(self.cost_usd, 6),
+        }
+        if self.budget_tokens is not None:
+            usage["budgetTokens"] = self.budget_tokens
+        return usage
+
+
+def total_usage(usages: Iterable[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Sum of ``LLMUsage.to_dict()`` documents (e.g. the metrics of one evaluation run)."""
+    total = LLMUsage()
+    for usage in usages:
+        total.calls += usage.get("calls", 0)
+        total.prompt_tokens += usage.get("promptTokens", 0)
+        total.completion_tokens += usage.get("completionTokens", 0)
+        total.cached_tokens += usage.get("cachedTokens", 0)
+        total.cost_usd += usage.get("costUsd", 0.0)
+    return total.to_dict()
+
+
+@dataclass(frozen=True)
+class UsageEvent:
+    """One completion's usage and where it was spent."""
+    timestamp: float
+    deployment: str
+    schema_name: str
+    route: str
+    use_case: str
+    record_id: Optional[str]
+    metric_type: Optional[str]
+    prompt_tokens: int
+    completion_tokens: int
+    cached_tokens: int
+    cost_usd: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "deployment": self.deployment,
+            "schemaName": self.schema_name,
+            "route": self.route,
+            "useCase": self.use_case,
+            "recordId": self.record_id,
+            "metricType": self.metric_type,
+            "promptTokens": self.prompt_tokens,
+            "completionTokens": self.completion_tokens,
+            "cachedTokens": self.cached_tokens,
+            "costUsd": round(self.cost_usd, 6),
+        }
+
+
+_WindowKey = Tuple[str, str, str, str]  # route, use case, schema name, deployment
+
+
+class UsageWindows:
+    """
+    Rolling usage totals per (route, use case, schema name, deployment).
+
+    Calls are added to fixed time slots; a window sums the slots it covers,
+    so its edge is accurate to one slot. Slots older than the longest window
+    are dropped as new ones open.
+    """
+
+    def __init__(self, windows_s: Sequence[int] = (60, 300, 3600), slot_s: int = 10) -> None:
+        self.windows_s = tuple(windows_s)
+        self.slot_s = slot_s
+        self._horizon = max(self.windows_s) // slot_s + 1
+        self._lock = threading.Lock()
+        # slot index -> key -> [calls, prompt, completion, cached, cost]
+        self._slots: Dict[int, Dict[_WindowKey, List[float]]] = {}
+
+    def add(self, event: UsageEvent) -> None:
+        slot = int(event.timestamp // self.slot_s)
+        key = (event.route, event.use_case, event.schema_name, event.deployment)
+        with self._lock:
+            keys = self._slots.get(slot)
+            if keys is None:
+                for old in [s for s in self._slots if s <= slot - self._horizon]:
+                    del self._slots[old]
+                keys = self._slots[slot] = {}
+            totals = keys.get(key)
+            if totals is None:
+                totals = keys[key] = [0, 0, 0, 0, 0.0]
+            totals[0] += 1
+            totals[1] += event.prompt_tokens
+            totals[2] += event.completion_tokens
+            totals[3] += event.cached_tokens
+            totals[4] += event.cost_usd
+
+    def reset(self) -> None:
+        with self._lock:
+            self._slots.clear()
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Per window (``"60s"``, ...): one row per key with totals and mean prompt tokens per call."""
+        current = int((time.time() if now is None else now) // self.slot_s)
+        with self._lock:
+            slots = {s: {k: list(v) for k, v in keys.items()} for s, keys in self._slots.items()}
+        out: Dict[str, List[Dict[str, Any]]] = {}
+        for window in self.windows_s:
+            first = current - window // self.slot_s + 1
+            sums: Dict[_WindowKey, List[float]] = {}
+            for slot, keys in slots.items():
+                if first <= slot <= current:
+                    for key, totals in keys.items():
+                        row = sums.setdefault(key, [0, 0, 0, 0, 0.0])
+                        for i, value in enumerate(totals):
+                            row[i] += value
+            out[f"{window}s"] = [
+                {
+                    "route": route,
+                    "useCase": use_case,
+                    "schemaName": schema_name,
+                    "deployment": deployment,
+                    "calls": calls,
+                    "promptTokens": prompt,
+                    "completionTokens": completion,
+                    "cachedTokens": cached,
+                    "costUsd": round(cost, 6),
+                    "promptTokensPerCall": round(prompt / calls, 1),
+                }
+                for (route, use_case, schema_name, deployment), (calls, prompt, completion, cached, cost)
+                in sorted(sums.items())
+            ]
+        return out
+
+
+USAGE_WINDOWS = UsageWindows()
+
+_pricing = LLMPricing()
+_current: ContextVar[Tuple[LLMUsage, ...]] = ContextVar("llm_usage", default=())
+_attribution: ContextVar[Dict[str, str]] = ContextVar("llm_usage_attribution", default={})
+
+
+def set_llm_pricing(pricing: LLMPricing) -> None:
+    global _pricing
+    _pricing = pricing
+
+
+def get_llm_pricing() -> LLMPricing:
+    return _pricing
+
+
+@contextmanager
+def track_llm_usage(*, budget_tokens: Optional[int] = None) -> Iterator[LLMUsage]:
+    """Collect usage of every LLM call made in this context until the block exits."""
+    usage = LLMUsage(budget_tokens=budget_tokens)
+    token = _current.set(_current.get() + (usage,))
+    try:
+        yield usage
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def attribute_llm_usage(**labels: Optional[str]) -> Iterator[None]:
+    """Attribute LLM calls made in this block (``route=``, ``metric_type=``, ``use_case=``)."""
+    token = _attribution.set({**_attribution.get(), **{k: v for k, v in labels.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _attribution.reset(token)
+
+
+def check_llm_budget() -> None:
+    """Raise TokenBudgetExceededError if any active tracker has spent its token budget."""
+    for usage in _current.get():
+        if usage.budget_exceeded:
+            raise TokenBudgetExceededError(
+                f"LLM token budget exceeded: {usage.total_tokens} of {usage.budget_tokens} tokens used"
+            )
+
+
+def record_llm_usage(
+    usage: Any,
+    *,
+    deployment: str = "",
+    schema_name: str = "",
+    context: Optional[Mapping[str, Any]] = None,
+) -> Optional[UsageEvent]:
+    """
+    Account an OpenAI-style ``usage`` object (or None) to the active trackers
+    and the rolling windows; returns the attributed event.
+
+    ``context`` is the LLM call's context: ``trace_id`` (the record id) and
+    ``use_case`` attribute the call.
+    """
+    if usage is None:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    cached_tokens = (getattr(details, "cached_tokens", 0) or 0) if details is not None else 0
+    cost_usd = _pricing.cost(prompt_tokens, completion_tokens, cached_tokens)
+
+    for tracker in _current.get():
+        tracker.add(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                    cached_tokens=cached_tokens, cost_usd=cost_usd)
+
+    labels = _attribution.get()
+    context = context or {}
+    event = UsageEvent(
+        timestamp=time.time(),
+        deployment=deployment,
+        schema_name=schema_name,
+        route=labels.get("route", ""),
+        use_case=context.get("use_case") or labels.get("use_case", ""),
+        record_id=context.get("trace_id"),
+        metric_type=labels.get("metric_type"),
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        cached_tokens=cached_tokens,
+        cost_usd=cost_usd,
+    )
+    USAGE_WINDOWS.add(event)
+    return event
@@ -0,0 +1,413 @@
+"""In-process metric registry rendered in the Prometheus text exposition format.
+
+Counters, gauges and histograms with labels. Each labelled series is a child
+object with its own lock, created once and cached by label values. An update
+takes only that child's lock, so concurrent requests contend only when they
+hit the very same series, and there is no registry-wide lock on the hot path.
+
+A registry ``snapshot()`` is plain JSON. With several uvicorn workers each
+process writes its snapshot to a shared directory, and ``render`` merges
+snapshots: counters and histograms are summed across every worker that ever
+wrote, and gauges only across live workers. See
+``infrastructure/local/metrics_store.py``.
+
+The service's own instruments are defined at the bottom of this module.
+"""
+from __future__ import annotations
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Seconds; the last bucket (+Inf) is implicit
+DEFAULT_BUCKETS_S: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+Snapshot = Dict[str, Dict[str, Any]]
+
+
+class _CounterChild:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("counters can only increase")
+        with self._lock:
+            self.value += amount
+
+    def _state(self) -> float:
+        return self.value
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self.value = value
+
+    @contextmanager
+    def track_inprogress(self) -> Iterator[None]:
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+
+class _HistogramChild:
+    __slots__ = ("_lock", "_bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self._lock = threading.Lock()
+        self._bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def _state(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"counts": list(self.counts), "sum": self.sum}
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def labels(self, *values: Any) -> Any:
+        """The series for these label values (positional, in ``labelnames`` order)."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def clear(self) -> None:
+        with self._lock:
+            self._children.clear()
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": [[list(key), child._state()] for key, child in list(self._children.items())],
+        }
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    """Summed across live workers when several processes report."""
+    type = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS_S,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return {**super()._snapshot(), "buckets": list(self.buckets)}
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"metric {metric.name} already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS_S) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def reset(self) -> None:
+        """Drop every series (tests)."""
+        for metric in list(self._metrics.values()):
+            metric.clear()
+
+    def snapshot(self) -> Snapshot:
+        return {name: metric._snapshot() for name, metric in sorted(self._metrics.items())}
+
+
+def merge_snapshots(live: Iterable[Snapshot], finished: Iterable[Snapshot] = ()) -> Snapshot:
+    """
+    Combine per-worker snapshots into one.
+
+    Counters and histograms add up over ``live`` and ``finished`` workers
+    (what a worker counted stays counted after it exits); gauges only over
+    ``live`` ones.
+    """
+    merged: Snapshot = {}
+    sources = [(snapshot, True) for snapshot in live] + [(snapshot, False) for snapshot in finished]
+    for snapshot, alive in sources:
+        for name, metric in snapshot.items():
+            if metric["type"] == "gauge" and not alive:
+                continue
+            target = merged.setdefault(name, {**metric, "samples": {}})
+            samples = target["samples"]
+            for labels, state in metric["samples"]:
+                key = tuple(labels)
+                if metric["type"] == "histogram":
+                    current = samples.get(key)
+                    if current is None:
+                        samples[key] = {"counts": list(state["counts"]), "sum": state["sum"]}
+                    else:
+                        current["counts"] = [a + b for a, b in zip(current["counts"], state["counts"])]
+                        current["sum"] += state["sum"]
+                else:
+                    samples[key] = samples.get(key, 0.0) + state
+    for metric in merged.values():
+        metric["samples"] = [[list(key), state] for key, state in metric["samples"].items()]
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render(snapshot: Snapshot) -> str:
+    """Prometheus text format (version 0.0.4) for a registry or merged snapshot."""
+    lines: List[str] = []
+    for name, metric in sorted(snapshot.items()):
+        if not metric["samples"]:
+            continue
+        lines.append(f"# HELP {name} {_escape(metric['help'])}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        names = metric["labelnames"]
+        for values, state in sorted(metric["samples"], key=lambda sample: sample[0]):
+            if metric["type"] == "histogram":
+                cumulative = 0
+                for bound, count in zip([*metric["buckets"], math.inf], state["counts"]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(names, values, ('le', _number(bound)))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(names, values)} {_number(state['sum'])}")
+                lines.append(f"{name}_count{_labels(names, values)} {cumulative}")
+            else:
+                lines.append(f"{name}{_labels(names, values)} {_number(state)}")
+    return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# HTTP
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "mapper_http_request_duration_seconds", "HTTP request latency.", ("route", "method", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "mapper_http_requests_in_flight", "HTTP requests being served.", ("route",),
+)
+HTTP_REQUESTS_CANCELLED = REGISTRY.counter(
+    "mapper_http_requests_cancelled_total", "Requests whose work was cancelled because the client disconnected.",
+    ("route",),
+)
+
+# Admission control (per route limiter and the shared pool; depth is the autoscaling signal)
+ADMISSION_QUEUE_DEPTH = REGISTRY.gauge(
+    "mapper_admission_queue_depth", "Requests waiting for admission.", ("limiter", "priority"),
+)
+ADMISSION_IN_FLIGHT = REGISTRY.gauge(
+    "mapper_admission_in_flight", "Requests holding an admission slot.", ("limiter",),
+)
+ADMISSION_QUEUE_WAIT = REGISTRY.histogram(
+    "mapper_admission_queue_wait_seconds", "Time admitted requests waited in the queue.", ("route", "priority"),
+)
+ADMISSION_REJECTED = REGISTRY.counter(
+    "mapper_admission_rejected_total", "Requests shed with 503 (queue_full, queue_timeout, evicted).",
+    ("route", "priority", "reason"),
+)
+
+# Worker pools running blocking request work (mapper calls, evaluation runs)
+WORKER_POOL_SIZE = REGISTRY.gauge(
+    "mapper_worker_pool_size", "Threads in the worker pool.", ("pool",),
+)
+WORKER_POOL_BUSY = REGISTRY.gauge(
+    "mapper_worker_pool_busy", "Worker pool threads running a call.", ("pool",),
+)
+WORKER_POOL_QUEUED = REGISTRY.gauge(
+    "mapper_worker_pool_queued", "Calls waiting for a worker pool thread.", ("pool",),
+)
+WORKER_POOL_ORPHANED = REGISTRY.gauge(
+    "mapper_worker_pool_orphaned", "Running calls whose request was cancelled, awaited before its slot is freed.",
+    ("pool",),
+)
+
+# Event loop (scheduling delay of a periodic tick; stalls are ticks overdue past the threshold)
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "mapper_event_loop_lag_seconds", "Event loop scheduling delay.",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+EVENT_LOOP_STALLS = REGISTRY.counter(
+    "mapper_event_loop_stalls_total", "Event loop stalls longer than the threshold.",
+)
+
+# LLM calls (one observation per attempt)
+LLM_REQUEST_DURATION = REGISTRY.histogram(
+    "mapper_llm_request_duration_seconds", "LLM chat completion latency per attempt.",
+    ("deployment", "schema_name", "outcome"),
+)
+LLM_TOKENS = REGISTRY.counter(
+    "mapper_llm_tokens_total", "LLM tokens by kind (prompt, completion, cached).",
+    ("deployment", "schema_name", "kind"),
+)
+LLM_COST = REGISTRY.counter(
+    "mapper_llm_cost_usd_total", "Estimated LLM cost in USD by route, use case and schema.",
+    ("route", "use_case", "schema_name"),
+)
+LLM_RETRIES = REGISTRY.counter(
+    "mapper_llm_retries_total", "LLM calls retried by the client.", ("deployment", "schema_name"),
+)
+LLM_TIMEOUTS = REGISTRY.counter(
+    "mapper_llm_timeouts_total", "LLM attempts that timed out.", ("deployment", "schema_name"),
+)
+LLM_CONCURRENCY_LIMIT = REGISTRY.gauge(
+    "mapper_llm_concurrency_limit", "Current adaptive limit on concurrent LLM calls.",
+)
+LLM_IN_FLIGHT = REGISTRY.gauge(
+    "mapper_llm_in_flight", "LLM calls holding a concurrency slot.",
+)
+LLM_CONCURRENCY_WAIT = REGISTRY.histogram(
+    "mapper_llm_concurrency_wait_seconds", "Time LLM calls waited for a concurrency slot.",
+)
+LLM_QUOTA_WAIT = REGISTRY.histogram(
+    "mapper_llm_quota_wait_seconds", "Time LLM calls waited for the shared RPM/TPM rate limit.", ("deployment",),
+)
+LLM_QUOTA_REJECTED = REGISTRY.counter(
+    "mapper_llm_quota_rejected_total", "LLM calls refused because the shared rate limit wait was too long.",
+    ("deployment",),
+)
+LLM_DEADLINE_EXCEEDED = REGISTRY.counter(
+    "mapper_llm_deadline_exceeded_total",
+    "LLM attempts or retries not made because the request deadline passed or the request was cancelled.",
+    ("deployment", "reason"),
+)
+LLM_RATE_LIMITED = REGISTRY.counter(
+    "mapper_llm_rate_limited_total", "HTTP 429 responses from the LLM endpoint, SDK retries included.",
+    ("deployment",),
+)
+
+# Blob storage
+BLOB_OPERATION_DURATION = REGISTRY.histogram(
+    "mapper_blob_operation_duration_seconds", "Blob store operation latency.",
+    ("backend", "operation", "outcome"),
+)
+
+# Evaluation progress
+EVALUATIONS_IN_PROGRESS = REGISTRY.gauge(
+    "mapper_evaluations_in_progress", "Evaluation requests being run.",
+)
+EVALUATION_RECORDS_PENDING = REGISTRY.gauge(
+    "mapper_evaluation_records_pending", "Ground truth records left in running metric evaluations.",
+    ("metric_type",),
+)
+EVALUATION_RECORDS = REGISTRY.counter(
+    "mapper_evaluation_records_total", "Ground truth records evaluated.", ("metric_type",),
+)
+EVALUATION_METRICS = REGISTRY.counter(
+    "mapper_evaluation_metrics_total", "Metric evaluations finished.", ("metric_type", "status"),
+)
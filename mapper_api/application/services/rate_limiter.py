@@ -0,0 +1,110 @@
+"""Cross-worker rate limit of LLM calls against the deployment's RPM and TPM quotas.
+
+Azure OpenAI enforces requests-per-minute and tokens-per-minute per
+deployment, across every client. Each worker enforcing its own share
+overshoots as soon as there are several, so the token buckets live in a
+``RateLimitStore`` shared by all of them (a locked file on one host, Redis
+across hosts).
+
+Every attempt reserves one request and its estimated tokens before it is
+sent, as Azure counts them: prompt characters / 4 plus ``max_tokens``,
+whatever the completion actually uses. Buckets hold ``burst_s`` seconds of
+quota and refill continuously. A reservation the buckets cannot cover yet
+waits for it; one that would wait longer than ``max_wait_s`` fails with
+LLMCapacityError instead.
+"""
+from __future__ import annotations
+import math
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from mapper_api.application.ports.rate_limit_store import BucketLimit, RateLimitStore
+from mapper_api.application.services.deadline import current_deadline
+from mapper_api.application.services.metrics import LLM_QUOTA_REJECTED, LLM_QUOTA_WAIT
+from mapper_api.application.services.stage_timing import record_stage
+from mapper_api.domain.errors import DeadlineExceededError, LLMCapacityError
+
+
+def estimate_tokens(*texts: str, max_tokens: int = 0) -> int:
+    """Tokens Azure charges against TPM up front: ~4 characters per prompt token plus ``max_tokens``."""
+    return math.ceil(sum(len(text) for text in texts) / 4) + max_tokens
+
+
+def take_from_buckets(
+    levels: Optional[Sequence[float]],
+    updated_at: float,
+    now: float,
+    costs: Sequence[float],
+    limits: Sequence[BucketLimit],
+    max_wait_s: float,
+) -> Tuple[bool, float, List[float]]:
+    """
+    Token-bucket arithmetic for stores: refill ``levels`` (full when None)
+    from ``updated_at`` to ``now`` and reserve ``costs``. Returns (granted,
+    wait seconds, new levels); the levels are only debited when granted.
+    """
+    elapsed = max(now - updated_at, 0.0)
+    refilled = [
+        limit.capacity if levels is None or i >= len(levels)
+        else min(limit.capacity, levels[i] + elapsed * limit.rate_per_s)
+        for i, limit in enumerate(limits)
+    ]
+    wait_s = max(
+        (max(cost - level, 0.0) / limit.rate_per_s for cost, level, limit in zip(costs, refilled, limits)),
+        default=0.0,
+    )
+    if wait_s > max_wait_s:
+        return False, wait_s, refilled
+    return True, wait_s, [level - cost for level, cost in zip(refilled, costs)]
+
+
+class LLMRateLimiter:
+    def __init__(
+        self,
+        store: RateLimitStore,
+        *,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        burst_s: float = 10.0,
+        max_wait_s: float = 30.0,
+        key_prefix: str = "mapper:llm-quota",
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """A per-minute quota of 0 leaves that dimension unlimited."""
+        self._store = store
+        self._limits: List[Tuple[int, BucketLimit]] = [
+            (index, BucketLimit(capacity=max(per_minute * burst_s / 60, 1.0), rate_per_s=per_minute / 60))
+            for index, per_minute in enumerate((requests_per_minute, tokens_per_minute))
+            if per_minute > 0
+        ]
+        self.max_wait_s = max_wait_s
+        self._key_prefix = key_prefix
+        self._sleep = sleep
+
+    def acquire(self, deployment: str, tokens: int) -> float:
+        """Reserve one request and ``tokens``, sleeping until covered; returns the seconds waited."""
+        if not self._limits:
+            return 0.0
+        costs = [(1.0, float(tokens))[index] for index, _ in self._limits]
+        # A single call larger than the burst can still pass once the bucket is full
+        costs = [min(cost, limit.capacity) for cost, (_, limit) in zip(costs, self._limits)]
+        # Never wait for quota past the request deadline
+        deadline = current_deadline()
+        max_wait_s = self.max_wait_s if deadline is None else min(self.max_wait_s, deadline.check())
+        granted, wait_s = self._store.take(
+            f"{self._key_prefix}:{deployment}", costs, [limit for _, limit in self._limits], max_wait_s
+        )
+        if not granted:
+            LLM_QUOTA_REJECTED.labels(deployment).inc()
+            if max_wait_s < self.max_wait_s:
+                raise DeadlineExceededError(
+                    f"LLM quota of deployment '{deployment}' frees up in {wait_s:.1f}s, after the request deadline"
+                )
+            raise LLMCapacityError(
+                f"LLM quota of deployment '{deployment}' exhausted: {wait_s:.1f}s wait exceeds {self.max_wait_s:g}s"
+            )
+        LLM_QUOTA_WAIT.labels(deployment).observe(wait_s)
+        if wait_s > 0:
+            record_stage("llm.rate_limit", wait_s * 1000)
+            self._sleep(wait_s)
+        return wait_s
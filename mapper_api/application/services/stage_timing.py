@@ -0,0 +1,147 @@
+"""Lightweight per-request stage timers, collected through a context variable.
+
+Use cases and controllers wrap their steps in ``stage("llm")`` and so on. The
+time lands in whichever ``StageTimings`` is active in that context (opened per
+request by the HTTP layer), and is a no-op otherwise. Repeated stages (several
+LLM calls in one evaluation) accumulate. Worker threads started with a copied
+context report into the same timings.
+
+``STAGE_HISTOGRAMS`` aggregates finished requests per (route, stage) in
+fixed millisecond buckets, so percentiles stay cheap to keep for the life of
+the process.
+"""
+from __future__ import annotations
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+@dataclass
+class StageTimings:
+    durations_ms: Dict[str, float] = field(default_factory=dict)
+    counts: Dict[str, int] = field(default_factory=dict)
+    started: float = field(default_factory=time.perf_counter)
+    last_end: Optional[float] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, name: str, elapsed_ms: float, end: Optional[float] = None) -> None:
+        with self._lock:
+            self.durations_ms[name] = self.durations_ms.get(name, 0.0) + elapsed_ms
+            self.counts[name] = self.counts.get(name, 0) + 1
+            end = time.perf_counter() if end is None else end
+            if self.last_end is None or end > self.last_end:
+                self.last_end = end
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {name: round(ms, 3) for name, ms in self.durations_ms.items()}
+
+    def server_timing(self, extra: Optional[Dict[str, float]] = None) -> str:
+        """``Server-Timing`` header value (``name;dur=ms`` entries, in stage order)."""
+        entries = {**self.snapshot(), **(extra or {})}
+        return ", ".join(f"{name};dur={ms:.1f}" for name, ms in entries.items())
+
+
+_current: ContextVar[Optional[StageTimings]] = ContextVar("stage_timings", default=None)
+
+
+@contextmanager
+def track_stages() -> Iterator[StageTimings]:
+    """Collect every stage timed in this context until the block exits."""
+    timings = StageTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block as ``name`` (also when it raises)."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        timings.add(name, (end - start) * 1000, end)
+
+
+def record_stage(name: str, elapsed_ms: float) -> None:
+    """Add time measured elsewhere (e.g. a retry's planned backoff) to stage ``name``."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, elapsed_ms)
+
+
+# Upper bounds in milliseconds; the last bucket is unbounded
+DEFAULT_BUCKETS_MS: Tuple[float, ...] = (
+    0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000,
+)
+
+
+class StageHistograms:
+    """Fixed-bucket latency histograms keyed by (route, stage)."""
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS) -> None:
+        self.buckets_ms = tuple(buckets_ms)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str], List[Any]] = {}
+
+    def observe(self, route: str, stages: Dict[str, float]) -> None:
+        with self._lock:
+            for name, ms in stages.items():
+                series = self._series.get((route, name))
+                if series is None:
+                    # [bucket counts, count, sum]
+                    series = self._series[(route, name)] = [[0] * (len(self.buckets_ms) + 1), 0, 0.0]
+                series[0][bisect.bisect_left(self.buckets_ms, ms)] += 1
+                series[1] += 1
+                series[2] += ms
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def _percentile(self, counts: List[int], total: int, p: float) -> float:
+        # Linear interpolation inside the bucket holding the rank
+        rank = p / 100 * total
+        seen = 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= rank:
+                lower = self.buckets_ms[i - 1] if i > 0 else 0.0
+                upper = self.buckets_ms[i] if i < len(self.buckets_ms) else self.buckets_ms[-1]
+                return round(lower + (upper - lower) * (rank - seen) / n, 3)
+            seen += n
+        return self.buckets_ms[-1]
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Per route and stage: count, mean, p50/p95/p99 and cumulative bucket counts."""
+        with self._lock:
+            series = {key: (list(s[0]), s[1], s[2]) for key, s in self._series.items()}
+        out: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (route, name), (counts, total, total_ms) in sorted(series.items()):
+            cumulative, buckets = 0, {}
+            for bound, n in zip([*map(str, self.buckets_ms), "+Inf"], counts):
+                cumulative += n
+                buckets[bound] = cumulative
+            out.setdefault(route, {})[name] = {
+                "count": total,
+                "meanMs": round(total_ms / total, 3),
+                "p50Ms": self._percentile(counts, total, 50),
+                "p95Ms": self._percentile(counts, total, 95),
+                "p99Ms": self._percentile(counts, total, 99),
+                "buckets": buckets,
+            }
+        return out
+
+
+STAGE_HISTOGRAMS = StageHistograms()
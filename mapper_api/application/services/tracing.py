@@ -0,0 +1,160 @@
+"""OpenTelemetry spans for controllers, use cases, the LLM client and blob stores.
+
+Instrumentation is written against ``opentelemetry-api`` only and is
+optional: without the package every ``span()`` is a shared no-op, and with
+the package but no configured provider the API's own non-recording spans
+are used. The provider (sampling, exporter) is chosen at startup by
+``mapper_api.api.tracing.configure_tracing``.
+
+Attributes that are expensive to compute should be guarded with
+``span.is_recording()``: unsampled requests get non-recording spans.
+"""
+from __future__ import annotations
+import functools
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # tracing is an optional dependency
+    otel_trace = None  # type: ignore[assignment]
+
+TRACER_NAME = "mapper_api"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_provider: Any = None
+
+
+class _NoopSpan:
+    def is_recording(self) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Any) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: Any = None, timestamp: Optional[int] = None) -> None:
+        pass
+
+    def update_name(self, name: str) -> None:
+        pass
+
+    def end(self, end_time: Optional[int] = None) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def tracing_available() -> bool:
+    return otel_trace is not None
+
+
+def set_tracer_provider(provider: Any) -> None:
+    """Provider used by ``span()`` (None reverts to the OpenTelemetry global one)."""
+    global _provider
+    _provider = provider
+
+
+def get_tracer() -> Any:
+    if otel_trace is None:
+        return None
+    if _provider is not None:
+        return _provider.get_tracer(TRACER_NAME)
+    return otel_trace.get_tracer(TRACER_NAME)
+
+
+def _attributes(attributes: Any) -> dict:
+    # ``mapper__record_id`` -> ``mapper.record_id``; OpenTelemetry rejects None values
+    return {key.replace("__", "."): value for key, value in attributes.items() if value is not None}
+
+
+def _kind(kind: str) -> Any:
+    return getattr(otel_trace.SpanKind, kind.upper())
+
+
+@contextmanager
+def span(name: str, *, kind: str = "internal", context: Any = None, **attributes: Any) -> Iterator[Any]:
+    """
+    Run the block in a child span of the current one.
+
+    Keyword arguments become attributes, with ``__`` standing for ``.``
+    (``mapper__record_id`` -> ``mapper.record_id``); None values are dropped.
+    ``kind`` is a SpanKind name (internal, server, client). Exceptions are
+    recorded on the span and re-raised.
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        yield _NOOP_SPAN
+        return
+    with tracer.start_as_current_span(
+        name, context=context, kind=_kind(kind), attributes=_attributes(attributes),
+    ) as current:
+        yield current
+
+
+def start_span(name: str, *, kind: str = "internal", **attributes: Any) -> Any:
+    """
+    A child span of the current one that is not made current; the caller ends it.
+
+    For generators, whose body may resume in another context than the one
+    that started them.
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        return _NOOP_SPAN
+    return tracer.start_span(name, kind=_kind(kind), attributes=_attributes(attributes))
+
+
+@contextmanager
+def activate(span: Any) -> Iterator[Any]:
+    """Make a span from ``start_span`` current for the block, without ending it."""
+    if otel_trace is None or span is _NOOP_SPAN:
+        yield span
+        return
+    with otel_trace.use_span(span, end_on_exit=False):
+        yield span
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator running each call of the function in a span called ``name``."""
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+def current_span() -> Any:
+    if otel_trace is None:
+        return _NOOP_SPAN
+    return otel_trace.get_current_span()
+
+
+def set_span_attributes(**attributes: Any) -> None:
+    """Set attributes on the current span (same naming as ``span()``)."""
+    current = current_span()
+    if current.is_recording():
+        current.set_attributes(_attributes(attributes))
+
+
+def mark_error(span: Any, error: BaseException, *, status: bool = True) -> None:
+    """Record ``error`` on a span that is ended by hand (``start_span``); ``status`` marks it failed."""
+    if not span.is_recording():
+        return
+    span.record_exception(error)
+    if status:
+        span.set_status(otel_trace.StatusCode.ERROR, type(error).__name__)
+
+
+def current_trace_id() -> Optional[str]:
+    """Hex trace id of the current span, if it has a valid context."""
+    if otel_trace is None:
+        return None
+    context = otel_trace.get_current_span().get_span_context()
+    return format(context.trace_id, "032x") if context.is_valid else None
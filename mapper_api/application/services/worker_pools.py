@@ -0,0 +1,116 @@
+"""Dedicated thread pools for blocking request work (mapper calls, evaluation runs).
+
+The loop's default executor (``asyncio.to_thread``) is ``min(32, cpu + 4)``
+threads shared with profiling, health checks, credential refresh and blob
+I/O, so it would cap mapper concurrency below the admission and LLM limits
+and queue the excess where nothing can see it. A ``WorkerPool`` is sized
+from settings, runs each call in a copy of the caller's context (like
+``asyncio.to_thread``) and reports busy and queued calls per pool.
+Streaming responses step their blocking generator with ``iterate``, so
+each chunk read runs on the pool too, not on Starlette's threadpool.
+
+A thread cannot be interrupted, so a caller cancelled (client disconnect)
+while its call runs waits for the call to return before it unwinds. The
+request keeps its admission slot meanwhile, and admission never accepts
+new work on top of threads still running for requests that are gone; the
+cancelled deadline makes the call stop at its next check.
+"""
+from __future__ import annotations
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, TypeVar
+
+from mapper_api.application.services.metrics import (
+    WORKER_POOL_BUSY,
+    WORKER_POOL_ORPHANED,
+    WORKER_POOL_QUEUED,
+    WORKER_POOL_SIZE,
+)
+
+T = TypeVar("T")
+
+
+class WorkerPool:
+    def __init__(self, name: str, max_workers: int) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-worker")
+        self._lock = threading.Lock()
+        self.busy = 0
+        self.queued = 0
+        self.orphaned = 0
+        self._busy_gauge = WORKER_POOL_BUSY.labels(name)
+        self._queued_gauge = WORKER_POOL_QUEUED.labels(name)
+        self._orphaned_gauge = WORKER_POOL_ORPHANED.labels(name)
+        WORKER_POOL_SIZE.labels(name).set(max_workers)
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run ``func(*args)`` on the pool in a copy of the current context.
+
+        Cancelled before the call starts, it never runs; cancelled while it
+        runs, this waits for it to return, then raises ``CancelledError``.
+        """
+        future = self._submit(func, *args)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if future.cancel():
+                self._moved(queued=-1)
+            else:
+                self._moved(orphaned=1)
+                try:
+                    await asyncio.wait({asyncio.wrap_future(future)})
+                finally:
+                    self._moved(orphaned=-1)
+            raise
+
+    async def iterate(self, iterator: Iterator[T]) -> AsyncIterator[T]:
+        """
+        Async iteration over a blocking iterator, each ``next`` run on the pool.
+
+        On exit (exhausted, failed or cancelled) a generator is closed on the
+        pool without waiting: its cleanup may block, and a cancelled consumer
+        cannot await it.
+        """
+        done = object()
+        try:
+            while (item := await self.run(next, iterator, done)) is not done:
+                yield item  # type: ignore[misc]
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                self._submit(close)
+
+    def _submit(self, func: Callable[..., T], *args: Any) -> "Future[T]":
+        context = contextvars.copy_context()
+        self._moved(queued=1)
+        return self._executor.submit(functools.partial(self._call, context, func, *args))
+
+    def _call(self, context: contextvars.Context, func: Callable[..., T], *args: Any) -> T:
+        self._moved(queued=-1, busy=1)
+        try:
+            return context.run(func, *args)
+        finally:
+            self._moved(busy=-1)
+
+    def _moved(self, *, queued: int = 0, busy: int = 0, orphaned: int = 0) -> None:
+        with self._lock:
+            self.queued += queued
+            self.busy += busy
+            self.orphaned += orphaned
+            self._queued_gauge.set(self.queued)
+            self._busy_gauge.set(self.busy)
+            self._orphaned_gauge.set(self.orphaned)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"maxWorkers": self.max_workers, "busy": self.busy, "queued": self.queued,
+                    "orphaned": self.orphaned}
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,18 +1,68 @@
 """Use case: evaluate mapper predictions against ground truth."""
 from __future__ import annotations
+import threading
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence
 
 from mapper_api.domain.value_objects.evaluation_result import EvaluationResult
 from mapper_api.domain.repositories.ground_truth import GroundTruthRepository
 from mapper_api.domain.services.evaluation_service import EvaluationService
-from mapper_api.domain.value_objects.metric import MetricType
-from mapper_api.domain.errors import DefinitionsUnavailableError
+from mapper_api.domain.value_objects.metric import IndividualTokenUsage, MetricType
+from mapper_api.domain.errors import DeadlineExceededError, DefinitionsUnavailableError, TokenBudgetExceededError
 from mapper_api.application.dto.domain_evaluation import EvaluationRequest
 from mapper_api.application.dto.domain_mapping import TaxonomyMappingRequest, FiveWsMappingRequest
 from mapper_api.application.use_cases.map_control_to_themes import ClassifyControlToThemes
 from mapper_api.application.use_cases.map_control_to_5ws import ClassifyControlTo5Ws
 from mapper_api.application.ports.llm import LLMClient
+from mapper_api.application.services.metrics import (
+    EVALUATION_METRICS,
+    EVALUATION_RECORDS,
+    EVALUATION_RECORDS_PENDING,
+    EVALUATIONS_IN_PROGRESS,
+)
+from mapper_api.application.services.llm_usage import attribute_llm_usage, check_llm_budget, track_llm_usage
+from mapper_api.application.services.stage_timing import stage, track_stages
+from mapper_api.application.services.tracing import set_span_attributes, span, traced
+
+
+class _RecordProgress:
+    """Keeps the pending/evaluated record metrics of one metric evaluation current."""
+
+    def __init__(self, metric_type: MetricType, total: int) -> None:
+        self._pending = EVALUATION_RECORDS_PENDING.labels(metric_type.value)
+        self._done = EVALUATION_RECORDS.labels(metric_type.value)
+        self._remaining = total
+        self._lock = threading.Lock()  # throughput metrics advance from worker threads
+
+    def __enter__(self) -> "_RecordProgress":
+        self._pending.inc(self._remaining)
+        return self
+
+    def advance(self) -> None:
+        with self._lock:
+            self._remaining -= 1
+        self._pending.dec()
+        self._done.inc()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        # Records never reached (the metric failed) stop counting as pending
+        with self._lock:
+            remaining, self._remaining = self._remaining, 0
+        self._pending.dec(remaining)
+
+
+# Performance metrics per mapper; their records are capped by the request's n_records like latency
+RISK_THEME_PERFORMANCE_METRICS = (
+    MetricType.THROUGHPUT_RISK_THEME_MAPPER,
+    MetricType.TOKENS_PER_RECORD_RISK_THEME_MAPPER,
+    MetricType.COST_PER_1K_CONTROLS_RISK_THEME_MAPPER,
+)
+FIVEWS_PERFORMANCE_METRICS = (
+    MetricType.THROUGHPUT_5WS_MAPPER,
+    MetricType.TOKENS_PER_RECORD_5WS_MAPPER,
+    MetricType.COST_PER_1K_CONTROLS_5WS_MAPPER,
+)
+DEFAULT_THROUGHPUT_CONCURRENCY = 8
 
 
 @dataclass
@@ -28,46 +78,70 @@ class EvaluateMapper:
     fivews_classifier: ClassifyControlTo5Ws
     llm_client: LLMClient
 
+    @traced("EvaluateMapper.execute")
     def execute(self, request: EvaluationRequest) -> Dict[MetricType, EvaluationResult]:
         """Execute evaluation for the specified metric types."""
+        set_span_attributes(mapper__record_id=request.record_id)
+        with EVALUATIONS_IN_PROGRESS.labels().track_inprogress():
+            return self._execute(request)
+
+    def _execute(self, request: EvaluationRequest) -> Dict[MetricType, EvaluationResult]:
         results = {}
         
         # Pre-load ground truth data to avoid multiple loads
         risk_theme_gt = None
         fivews_gt = None
+        # Per-record usage of each mapper, shared by its tokens and cost metrics
+        usage_runs: Dict[bool, List[IndividualTokenUsage]] = {}
         
-        for metric_type in request.metric_types:
-            try:
-                # Load ground truth data only when needed
-                if metric_type in [
-                    MetricType.RECALL_K3_RISK_THEME,
-                    MetricType.TOP1_ACCURACY_RISK_THEME,
-                    MetricType.LLM_JUDGE_RISK_THEME_REASONING,
-                    MetricType.LLM_JUDGE_RISK_THEME_UNMATCHED,
-                    MetricType.LATENCY_RISK_THEME_MAPPER
-                ]:
-                    if risk_theme_gt is None:
-                        risk_theme_gt = self.ground_truth_repo.get_risk_themes_ground_truth()
-                        if not risk_theme_gt:
-                            raise DefinitionsUnavailableError("Risk theme ground truth data not loaded")
+        # Every metric is accounted separately; the run tracker carries the budget
+        with track_llm_usage(budget_tokens=request.token_budget):
+            for metric_type in request.metric_types:
+                with track_llm_usage() as metric_usage, attribute_llm_usage(metric_type=metric_type.value):
+                    try:
+                        # Load ground truth data only when needed
+                        if metric_type in [
+                            MetricType.RECALL_K3_RISK_THEME,
+                            MetricType.TOP1_ACCURACY_RISK_THEME,
+                            MetricType.LLM_JUDGE_RISK_THEME_REASONING,
+                            MetricType.LLM_JUDGE_RISK_THEME_UNMATCHED,
+                            MetricType.LATENCY_RISK_THEME_MAPPER,
+                            *RISK_THEME_PERFORMANCE_METRICS
+                        ]:
+                            if risk_theme_gt is None:
+                                with stage("ground_truth"):
+                                    risk_theme_gt = self.ground_truth_repo.get_risk_themes_ground_truth()
+                                if not risk_theme_gt:
+                                    raise DefinitionsUnavailableError("Risk theme ground truth data not loaded")
                 
-                elif metric_type in [
-                    MetricType.RECALL_K5_5WS,
-                    MetricType.LLM_JUDGE_5WS_REASONING,
-                    MetricType.LATENCY_5WS_MAPPER
-                ]:
-                    if fivews_gt is None:
-                        fivews_gt = self.ground_truth_repo.get_fivews_ground_truth()
-                        if not fivews_gt:
-                            raise DefinitionsUnavailableError("5Ws ground truth data not loaded")
+                        elif metric_type in [
+                            MetricType.RECALL_K5_5WS,
+                            MetricType.LLM_JUDGE_5WS_REASONING,
+                            MetricType.LATENCY_5WS_MAPPER,
+                            *FIVEWS_PERFORMANCE_METRICS
+                        ]:
+                            if fivews_gt is None:
+                                with stage("ground_truth"):
+                                    fivews_gt = self.ground_truth_repo.get_fivews_ground_truth()
+                                if not fivews_gt:
+                                    raise DefinitionsUnavailableError("5Ws ground truth data not loaded")
                 
-                # Execute the specific metric evaluation
-                result = self._execute_single_metric(metric_type, request, risk_theme_gt, fivews_gt)
-                results[metric_type] = result
+                        # Execute the specific metric evaluation
+                        with stage(f"metric.{metric_type.value}"), span(
+                            "EvaluateMapper.metric", mapper__metric_type=metric_type.value
+                        ):
+                            result = self._execute_single_metric(
+                                metric_type, request, risk_theme_gt, fivews_gt, usage_runs
+                            )
+                        results[metric_type] = result.model_copy(update={"llm_usage": metric_usage.to_dict()})
+                        EVALUATION_METRICS.labels(metric_type.value, "success").inc()
                 
-            except Exception as e:
-                # Create error result for failed metrics
-                results[metric_type] = self._create_error_result(metric_type, str(e))
+                    except Exception as e:
+                        # Create error result for failed metrics
+                        results[metric_type] = self._create_error_result(
+                            metric_type, str(e), metric_usage.to_dict()
+                        )
+                        EVALUATION_METRICS.labels(metric_type.value, "error").inc()
         
         return results
     
@@ -76,7 +150,8 @@ class EvaluateMapper:
         metric_type: MetricType, 
         request: EvaluationRequest,
         risk_theme_gt: List = None,
-        fivews_gt: List = None
+        fivews_gt: List = None,
+        usage_runs: Optional[Dict[bool, List[IndividualTokenUsage]]] = None
     ) -> EvaluationResult:
         """Execute evaluation for a single metric type."""
         if metric_type == MetricType.RECALL_K3_RISK_THEME:
@@ -89,29 +164,54 @@ class EvaluateMapper:
             return self._evaluate_llm_judge_risk_theme_reasoning(risk_theme_gt)
         elif metric_type == MetricType.LLM_JUDGE_RISK_THEME_UNMATCHED:
             return self._evaluate_llm_judge_risk_theme_unmatched(risk_theme_gt)
-        elif metric_type == MetricType.LATENCY_RISK_THEME_MAPPER:
-            return self._evaluate_latency_risk_theme_mapper(risk_theme_gt, request.n_records)
         elif metric_type == MetricType.LLM_JUDGE_5WS_REASONING:
             return self._evaluate_llm_judge_5ws_reasoning(fivews_gt)
-        elif metric_type == MetricType.LATENCY_5WS_MAPPER:
-            return self._evaluate_latency_5ws_mapper(fivews_gt, request.n_records)
+        elif metric_type in (MetricType.LATENCY_RISK_THEME_MAPPER, MetricType.LATENCY_5WS_MAPPER):
+            risk_theme = metric_type == MetricType.LATENCY_RISK_THEME_MAPPER
+            gt_records = risk_theme_gt if risk_theme else fivews_gt
+            records = gt_records[:request.n_records] if request.n_records else gt_records
+            return self._evaluate_latency(metric_type, risk_theme, records, request.concurrency_levels or [1])
+        elif metric_type in RISK_THEME_PERFORMANCE_METRICS or metric_type in FIVEWS_PERFORMANCE_METRICS:
+            risk_theme = metric_type in RISK_THEME_PERFORMANCE_METRICS
+            gt_records = risk_theme_gt if risk_theme else fivews_gt
+            records = gt_records[:request.n_records] if request.n_records else gt_records
+            if metric_type in (MetricType.THROUGHPUT_RISK_THEME_MAPPER, MetricType.THROUGHPUT_5WS_MAPPER):
+                return self._evaluate_throughput(
+                    metric_type, risk_theme, records, request.concurrency or DEFAULT_THROUGHPUT_CONCURRENCY
+                )
+            return self._evaluate_usage(metric_type, risk_theme, records, usage_runs if usage_runs is not None else {})
         else:
             raise ValueError(f"Unsupported metric type: {metric_type}")
     
-    def _create_error_result(self, metric_type: MetricType, error_message: str) -> EvaluationResult:
+    @staticmethod
+    def _tracked(metric_type: MetricType, gt_records: Sequence[Any]) -> Iterator[Any]:
+        """
+        Iterate ground truth records, reporting evaluation progress as each one
+        completes; stops with TokenBudgetExceededError once the run's budget is spent.
+        """
+        with _RecordProgress(metric_type, len(gt_records)) as progress:
+            for gt_record in gt_records:
+                check_llm_budget()
+                yield gt_record
+                progress.advance()
+
+    def _create_error_result(
+        self, metric_type: MetricType, error_message: str, llm_usage: Optional[Dict[str, Any]] = None
+    ) -> EvaluationResult:
         """Create an error result for a failed metric evaluation."""
         return EvaluationResult(
             metric_type=metric_type,
             individual_results=[],
             summary_result=None,
-            error_message=error_message
+            error_message=error_message,
+            llm_usage=llm_usage
         )
 
     def _evaluate_recall_k3_risk_theme(self, gt_records) -> EvaluationResult:
         """Evaluate recall K=3 for risk themes."""
         individual_recalls = []
         
-        for gt_record in gt_records:
+        for gt_record in self._tracked(MetricType.RECALL_K3_RISK_THEME, gt_records):
             taxonomy_request = TaxonomyMappingRequest(
                 record_id=gt_record.control_id,
                 control_description=gt_record.control_description
@@ -135,7 +235,7 @@ class EvaluateMapper:
         """Evaluate recall K=5 for 5Ws."""
         individual_recalls = []
         
-        for gt_record in gt_records:
+        for gt_record in self._tracked(MetricType.RECALL_K5_5WS, gt_records):
             fivews_request = FiveWsMappingRequest(
                 record_id=gt_record.control_id,
                 control_description=gt_record.control_description
@@ -159,7 +259,7 @@ class EvaluateMapper:
         """Evaluate Top-1 Accuracy for risk themes."""
         individual_accuracies = []
         
-        for gt_record in gt_records:
+        for gt_record in self._tracked(MetricType.TOP1_ACCURACY_RISK_THEME, gt_records):
             taxonomy_request = TaxonomyMappingRequest(
                 record_id=gt_record.control_id,
                 control_description=gt_record.control_description
@@ -183,7 +283,7 @@ class EvaluateMapper:
         """Evaluate LLM-as-a-Judge scores for risk theme reasoning."""
         individual_judges = []
         
-        for gt_record in gt_records:
+        for gt_record in self._tracked(MetricType.LLM_JUDGE_RISK_THEME_REASONING, gt_records):
             taxonomy_request = TaxonomyMappingRequest(
                 record_id=gt_record.control_id,
                 control_description=gt_record.control_description
@@ -207,7 +307,7 @@ class EvaluateMapper:
         """Evaluate LLM-as-a-Judge confidence for unmatched risk themes."""
         individual_analyses = []
         
-        for gt_record in gt_records:
+        for gt_record in self._tracked(MetricType.LLM_JUDGE_RISK_THEME_UNMATCHED, gt_records):
             taxonomy_request = TaxonomyMappingRequest(
                 record_id=gt_record.control_id,
                 control_description=gt_record.control_description
@@ -225,34 +325,11 @@ class EvaluateMapper:
             summary_result=None
         )
 
-    def _evaluate_latency_risk_theme_mapper(self, gt_records, n_records: int = None) -> EvaluationResult:
-        """Evaluate latency for risk theme mapper via direct calls."""
-        
-        def direct_mapper_function(record_id: str, control_description: str) -> List[Dict[str, Any]]:
-            """Direct call to taxonomy classifier."""
-            request = TaxonomyMappingRequest(
-                record_id=record_id,
-                control_description=control_description
-            )
-            return self.taxonomy_classifier.execute(request)
-
-        individual_latencies = self.evaluation_service.calculate_latency_risk_theme_mapper(
-            gt_records, direct_mapper_function, n_records
-        )
-
-        summary_latency = self.evaluation_service.calculate_summary_latency(individual_latencies)
-        
-        return EvaluationResult(
-            metric_type=MetricType.LATENCY_RISK_THEME_MAPPER,
-            individual_results=individual_latencies,
-            summary_result=summary_latency
-        )
-
     def _evaluate_llm_judge_5ws_reasoning(self, gt_records) -> EvaluationResult:
         """Evaluate LLM-as-a-Judge scores for 5Ws reasoning."""
         individual_judges = []
         
-        for gt_record in gt_records:
+        for gt_record in self._tracked(MetricType.LLM_JUDGE_5WS_REASONING, gt_records):
             fivews_request = FiveWsMappingRequest(
                 record_id=gt_record.control_id,
                 control_description=gt_record.control_description
@@ -272,25 +349,121 @@ class EvaluateMapper:
             summary_result=summary_judge
         )
 
-    def _evaluate_latency_5ws_mapper(self, gt_records, n_records: int = None) -> EvaluationResult:
-        """Evaluate latency for 5Ws mapper via direct calls."""
+    def _evaluate_latency(
+        self, metric_type: MetricType, risk_theme: bool, records: Sequence[Any], concurrency_levels: Sequence[int]
+    ) -> EvaluationResult:
+        """
+        Evaluate per-call latency of a mapper via direct calls, once per concurrency level.
         
-        def direct_mapper_function(record_id: str, control_description: str) -> List[Dict[str, Any]]:
-            """Direct call to 5Ws classifier."""
-            request = FiveWsMappingRequest(
-                record_id=record_id,
-                control_description=control_description
+        Only the first call of the sweep is flagged as the first call. Each call returns its
+        per-stage breakdown (LLM request, backoff, ...) from a stage tracker
+        of its own.
+        """
+        with _RecordProgress(metric_type, len(records) * len(concurrency_levels)) as progress:
+            mapper_function = self._direct_mapper_function(risk_theme, progress)
+            
+            def staged_mapper_function(record_id: str, control_description: str) -> Dict[str, float]:
+                with track_stages() as timings:
+                    mapper_function(record_id, control_description)
+                return timings.snapshot()
+            
+            calculate = (
+                self.evaluation_service.calculate_latency_risk_theme_mapper if risk_theme
+                else self.evaluation_service.calculate_latency_5ws_mapper
             )
-            return self.fivews_classifier.execute(request)
-
-        individual_latencies = self.evaluation_service.calculate_latency_5ws_mapper(
-            gt_records, direct_mapper_function, n_records
-        )
+            individual_latencies = []
+            for i, concurrency in enumerate(concurrency_levels):
+                individual_latencies.extend(calculate(
+                    records, staged_mapper_function, concurrency=concurrency, first_call=i == 0
+                ))
 
         summary_latency = self.evaluation_service.calculate_summary_latency(individual_latencies)
         
         return EvaluationResult(
-            metric_type=MetricType.LATENCY_5WS_MAPPER,
+            metric_type=metric_type,
             individual_results=individual_latencies,
             summary_result=summary_latency
         )
+
+    def _direct_mapper_function(self, risk_theme: bool, progress: _RecordProgress) -> Callable[[str, str], Any]:
+        """Direct call to the risk theme or 5Ws classifier, checking the run's token budget first."""
+        def direct_mapper_function(record_id: str, control_description: str) -> List[Dict[str, Any]]:
+            try:
+                check_llm_budget()
+                if risk_theme:
+                    return self.taxonomy_classifier.execute(TaxonomyMappingRequest(
+                        record_id=record_id,
+                        control_description=control_description
+                    ))
+                return self.fivews_classifier.execute(FiveWsMappingRequest(
+                    record_id=record_id,
+                    control_description=control_description
+                ))
+            finally:
+                progress.advance()
+        return direct_mapper_function
+
+    def _evaluate_throughput(
+        self, metric_type: MetricType, risk_theme: bool, records: Sequence[Any], concurrency: int
+    ) -> EvaluationResult:
+        """Evaluate sustained records per second of a mapper at a fixed concurrency."""
+        with _RecordProgress(metric_type, len(records)) as progress:
+            individual_latencies = self.evaluation_service.calculate_throughput(
+                records, self._direct_mapper_function(risk_theme, progress), concurrency
+            )
+
+        summary_throughput = self.evaluation_service.calculate_summary_throughput(individual_latencies, concurrency)
+
+        return EvaluationResult(
+            metric_type=metric_type,
+            individual_results=individual_latencies,
+            summary_result=summary_throughput
+        )
+
+    def _evaluate_usage(
+        self,
+        metric_type: MetricType,
+        risk_theme: bool,
+        records: Sequence[Any],
+        usage_runs: Dict[bool, List[IndividualTokenUsage]]
+    ) -> EvaluationResult:
+        """Evaluate tokens per record or cost per 1k controls (one mapping pass serves both)."""
+        individual_usages = usage_runs.get(risk_theme)
+        if individual_usages is None:
+            individual_usages = usage_runs[risk_theme] = self._measure_usage(metric_type, risk_theme, records)
+
+        if metric_type in (MetricType.TOKENS_PER_RECORD_RISK_THEME_MAPPER, MetricType.TOKENS_PER_RECORD_5WS_MAPPER):
+            summary = self.evaluation_service.calculate_summary_token_usage(individual_usages)
+        else:
+            summary = self.evaluation_service.calculate_summary_cost(individual_usages)
+
+        return EvaluationResult(
+            metric_type=metric_type,
+            individual_results=individual_usages,
+            summary_result=summary
+        )
+
+    def _measure_usage(
+        self, metric_type: MetricType, risk_theme: bool, records: Sequence[Any]
+    ) -> List[IndividualTokenUsage]:
+        with _RecordProgress(metric_type, len(records)) as progress:
+            mapper_function = self._direct_mapper_function(risk_theme, progress)
+
+            def usage_function(record_id: str, control_description: str) -> Mapping[str, Any]:
+                error = None
+                with track_llm_usage() as usage:
+                    try:
+                        mapper_function(record_id, control_description)
+                    except (TokenBudgetExceededError, DeadlineExceededError):
+                        raise
+                    except Exception as e:
+                        error = str(e)
+                return {
+                    "prompt_tokens": usage.prompt_tokens,
+                    "completion_tokens": usage.completion_tokens,
+                    "cached_tokens": usage.cached_tokens,
+                    "cost_usd": usage.cost_usd,
+                    "error": error,
+                }
+
+            return self.evaluation_service.calculate_token_usage(records, usage_function)
@@ -8,6 +8,8 @@ from mapper_api.domain.entities.control import Control
 from mapper_api.domain.repositories.definitions import DefinitionsRepository
 from mapper_api.domain.errors import ControlValidationError, DefinitionsUnavailableError
 from mapper_api.application.dto.domain_mapping import FiveWsMappingRequest
+from mapper_api.application.services.stage_timing import stage
+from mapper_api.application.services.tracing import set_span_attributes, traced
 
 _ORDER = ["who", "what", "when", "where", "why"]
 
@@ -28,6 +30,7 @@ class ClassifyControlTo5Ws:
         """Factory method to create use case instance."""
         return cls(repo=repo, llm=llm, deployment_name=deployment_name)
 
+    @traced("ClassifyControlTo5Ws.execute")
     def execute(self, request: FiveWsMappingRequest) -> list:
         """
         Execute the 5Ws extraction use case.
@@ -35,9 +38,12 @@ class ClassifyControlTo5Ws:
         Validates control text and extracts presence/absence of 5Ws elements
         with reasoning using LLM.
         """
+        set_span_attributes(mapper__record_id=request.record_id)
+
         # Validate control using domain entity
-        ctrl = Control(text=request.control_description)
-        ctrl.validate_all()
+        with stage("validate"):
+            ctrl = Control(text=request.control_description)
+            ctrl.validate_all()
 
         # Get 5Ws definitions
         defs = self.repo.get_fivews_rows()
@@ -45,25 +51,29 @@ class ClassifyControlTo5Ws:
             raise DefinitionsUnavailableError("5Ws definitions not loaded")
 
         # Build LLM request
-        schema = FiveWOut.model_json_schema()
-        system_prompt = fivews_prompts.SYSTEM
-        user_prompt = fivews_prompts.build_user_prompt(ctrl.text, defs)
+        with stage("schema"):
+            schema = FiveWOut.model_json_schema()
+        with stage("prompt"):
+            system_prompt = fivews_prompts.SYSTEM
+            user_prompt = fivews_prompts.build_user_prompt(ctrl.text, defs)
 
-        raw = self.llm.json_schema_chat(
-            system=system_prompt,
-            user=user_prompt,
-            schema_name="FiveWsResponse",
-            schema=schema,
-            max_tokens=400,
-            temperature=0.1,
-            context={"trace_id": request.record_id},
-            deployment=self.deployment_name,
-        )
+        with stage("llm"):
+            raw = self.llm.json_schema_chat(
+                system=system_prompt,
+                user=user_prompt,
+                schema_name="FiveWsResponse",
+                schema=schema,
+                max_tokens=400,
+                temperature=0.1,
+                context={"trace_id": request.record_id, "use_case": "fivews_mapping"},
+                deployment=self.deployment_name,
+            )
 
-        try:
-            data = FiveWOut.model_validate_json(raw)
-        except Exception as e:
-            raise ControlValidationError(f"LLM output validation failed: {e}")
+        with stage("parse"):
+            try:
+                data = FiveWOut.model_validate_json(raw)
+            except Exception as e:
+                raise ControlValidationError(f"LLM output validation failed: {e}")
 
         ordered = sorted(data.fivews, key=lambda x: _ORDER.index(x.name))
         return [
@@ -1,5 +1,6 @@
 """Use case: map control to Risk Themes"""
 from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
 
 from mapper_api.domain.entities.control import Control
 from mapper_api.domain.repositories.definitions import DefinitionsRepository
@@ -12,6 +13,9 @@ from mapper_api.application.ports.llm import LLMClient
 from mapper_api.application.dto.domain_mapping import TaxonomyMappingRequest
 from mapper_api.application.services.embedding_service import embed_text
 from mapper_api.application.services.mapping_threshold import compute_combined_score
+from mapper_api.application.services.json_stream import JsonArrayItemParser
+from mapper_api.application.services.stage_timing import stage
+from mapper_api.application.services.tracing import set_span_attributes, traced
 from mapper_api.config.scoring_config import ScoringConfig
 
 
@@ -25,6 +29,7 @@ class ClassifyControlToThemes:
     prompt: TaxonomyPrompt
     TaxonomyOut: type
     deployment_name: str
+    TaxonomyItem: Optional[type] = None
 
     @classmethod
     def from_defs(cls, repo: DefinitionsRepository, llm: LLMClient, deployment_name: str):
@@ -35,7 +40,7 @@ class ClassifyControlToThemes:
 
         # schema building
         allowed_names = [theme.name for theme in risk_themes]
-        _, TaxonomyOut = build_taxonomy_models(allowed_names)
+        TaxonomyItem, TaxonomyOut = build_taxonomy_models(allowed_names)
         prompt = TaxonomyPrompt(risk_themes)
 
         return cls(
@@ -43,43 +48,101 @@ class ClassifyControlToThemes:
             llm=llm,
             prompt=prompt,
             TaxonomyOut=TaxonomyOut,
-            deployment_name=deployment_name
+            deployment_name=deployment_name,
+            TaxonomyItem=TaxonomyItem
         )
 
+    @traced("ClassifyControlToThemes.execute")
     def execute(self, request: TaxonomyMappingRequest) -> list:
         """
         Execute taxonomy mapping use case
         """
+        set_span_attributes(mapper__record_id=request.record_id)
         # Validate control
-        ctrl = Control(text=request.control_description)
-        ctrl.validate_all()
-
-        # Get domain entities
-        risk_themes = self.repo.get_risk_themes()
+        ctrl = self._validated_control(request)
 
         # LLM call
-        system, user = self.prompt.build(
-            record_id=request.record_id, 
-            control_description=ctrl.text
-        )
-        schema = self.TaxonomyOut.model_json_schema()
+        llm_request = self._llm_request(request, ctrl)
+        with stage("llm"):
+            raw = self.llm.json_schema_chat(**llm_request)
+
+        with stage("parse"):
+            try:
+                data = self.TaxonomyOut.model_validate_json(raw)
+            except Exception as e:
+                raise ControlValidationError(f"LLM output validation failed: {e}")
+
+        return self._finalize(ctrl, data)
+
+    @traced("ClassifyControlToThemes.execute_stream")
+    def execute_stream(self, request: TaxonomyMappingRequest) -> Iterator[Tuple[str, Any]]:
+        """
+        Execute taxonomy mapping, yielding ("theme", item) events as each item of the
+        model output completes and a final ("result", classifications) event.
+
+        Validation runs eagerly so invalid controls fail before anything is streamed.
+        """
+        ctrl = self._validated_control(request)
+        llm_request = self._llm_request(request, ctrl)
+
+        stream = getattr(self.llm, "json_schema_chat_stream", None)
+        if stream is not None:
+            chunks: Iterable[str] = stream(**llm_request)
+        else:
+            # Non-streaming clients deliver the whole answer as a single chunk
+            chunks = iter([self.llm.json_schema_chat(**llm_request)])
+        return self._stream_events(ctrl, chunks)
+
+    def _stream_events(self, ctrl: Control, chunks: Iterable[str]) -> Iterator[Tuple[str, Any]]:
+        parser = JsonArrayItemParser("taxonomy")
+        for chunk in chunks:
+            for obj in parser.feed(chunk):
+                try:
+                    item = self.TaxonomyItem.model_validate(obj)
+                except Exception as e:
+                    raise ControlValidationError(f"LLM output validation failed: {e}")
+                yield "theme", item.model_dump()
+
+        with stage("parse"):
+            try:
+                data = self.TaxonomyOut.model_validate_json(parser.text)
+            except Exception as e:
+                raise ControlValidationError(f"LLM output validation failed: {e}")
+
+        yield "result", self._finalize(ctrl, data)
+
+    def _validated_control(self, request: TaxonomyMappingRequest) -> Control:
+        with stage("validate"):
+            ctrl = Control(text=request.control_description)
+            ctrl.validate_all()
+        return ctrl
+
+    def _llm_request(self, request: TaxonomyMappingRequest, ctrl: Control) -> Dict[str, Any]:
+        with stage("prompt"):
+            system, user = self.prompt.build(
+                record_id=request.record_id, 
+                control_description=ctrl.text
+            )
+        with stage("schema"):
+            schema = self.TaxonomyOut.model_json_schema()
 
-        raw = self.llm.json_schema_chat(
+        return dict(
             system=system,
             user=user,
             schema_name="TaxonomyMapperResponse",
             schema=schema,
             max_tokens=600,
             temperature=0.1,
-            context={"trace_id": request.record_id},
+            context={"trace_id": request.record_id, "use_case": "taxonomy_mapping"},
             deployment=self.deployment_name
         )
 
-        try:
-            data = self.TaxonomyOut.model_validate_json(raw)
-        except Exception as e:
-            raise ControlValidationError(f"LLM output validation failed: {e}")
+    def _finalize(self, ctrl: Control, data: Any) -> list:
+        """Apply composite scoring, ranking and the score threshold to validated output."""
+        with stage("scoring"):
+            return self._score(ctrl, data)
 
+    def _score(self, ctrl: Control, data: Any) -> list:
         config = ScoringConfig()
         if config.params["risk_theme_scoring"]["method"] == "composite":
             # Compute combine score
@@ -103,4 +166,4 @@ class ClassifyControlToThemes:
             for i in valid_items
         ]
 
-        return [classification.to_dict() for classification in classifications]
\ No newline at end of file
+        return [classification.to_dict() for classification in classifications]
@@ -21,4 +21,131 @@ class Settings(BaseSettings):
     AZURE_CLIENT_ID: str
     AZURE_CLIENT_SECRET: str
 
+    # AAD tokens: refresh this long before expiry; optional token cache file shared by workers ('' disables)
+    AAD_TOKEN_REFRESH_MARGIN_S: float = Field(default=300.0)
+    AAD_TOKEN_CACHE_PATH: str = Field(default='')
+
+    # Parallel chunk downloads/uploads per blob for the async blob adapters
+    BLOB_MAX_CONCURRENCY: int = Field(default=4)
+
+    # Blob storage backend: Azure, files under STORAGE_LOCAL_ROOT, or process memory.
+    # Local backends are seeded from STORAGE_SEED_DIR ('' = bundled sample data).
+    STORAGE_BACKEND: Literal['azure', 'local', 'memory'] = Field(default='azure')
+    STORAGE_LOCAL_ROOT: str = Field(default='.mapper_storage')
+    STORAGE_SEED_DIR: str = Field(default='')
+    # Injected cost per operation for the local backends: fixed latency plus size / throughput (0 = none)
+    STORAGE_LATENCY_MS: float = Field(default=0.0)
+    STORAGE_THROUGHPUT_MB_S: float = Field(default=0.0)
+
+    # Definitions hot reload: ETag poll interval in seconds (0 disables polling)
+    DEFINITIONS_REFRESH_INTERVAL_S: float = Field(default=60.0)
+    # Last good definitions on local disk for blob-independent startup ('' disables)
+    DEFINITIONS_SNAPSHOT_PATH: str = Field(default='.mapper_cache/definitions.snapshot.json.gz')
+
+    # Prime langdetect, schemas, definitions and Azure connections before serving
+    WARMUP_ENABLED: bool = Field(default=True)
+    # Failed required warm-up steps are retried in the background with exponential backoff up to this interval
+    WARMUP_RETRY_MAX_BACKOFF_S: float = Field(default=60.0)
+
+    # Per-stage request timing (logs + histograms at /health/timing); the header exposes it to clients
+    STAGE_TIMING_ENABLED: bool = Field(default=True)
+    SERVER_TIMING_HEADER: bool = Field(default=True)
+
+    # Admission control per worker: concurrency and queue per mapper route and for /evaluator, plus a pool shared
+    # by all work routes (sized for the LLM deployment); requests waiting longer than the timeout get 503
+    ADMISSION_ENABLED: bool = Field(default=True)
+    ADMISSION_MAPPER_CONCURRENCY: int = Field(default=32)
+    ADMISSION_MAPPER_QUEUE: int = Field(default=64)
+    ADMISSION_EVALUATOR_CONCURRENCY: int = Field(default=2)
+    ADMISSION_EVALUATOR_QUEUE: int = Field(default=4)
+    ADMISSION_SHARED_CONCURRENCY: int = Field(default=48)
+    ADMISSION_SHARED_QUEUE: int = Field(default=128)
+    ADMISSION_QUEUE_TIMEOUT_S: float = Field(default=10.0)
+    ADMISSION_RETRY_AFTER_S: float = Field(default=1.0)
+
+    # Threads running blocking request work, apart from the loop's default executor; 0 sizes the mapper pool to
+    # the larger of the shared admission limit and the LLM concurrency ceiling, and the evaluation pool to the
+    # evaluator admission limit, so those limits (not the threads) bound concurrency
+    MAPPER_WORKERS: int = Field(default=0)
+    EVALUATION_WORKERS: int = Field(default=0)
+
+    # Event-loop lag monitor (histogram in /metrics, stalls at /health/loop with the stack of the blocking code);
+    # LOOP_DEBUG also logs blocking calls made on the loop and runs asyncio in debug mode
+    LOOP_MONITOR_ENABLED: bool = Field(default=True)
+    LOOP_MONITOR_INTERVAL_S: float = Field(default=0.1)
+    LOOP_STALL_THRESHOLD_MS: float = Field(default=100.0)
+    LOOP_DEBUG: bool = Field(default=False)
+
+    # Prometheus /metrics; with several uvicorn workers set a directory shared by them (cleared on deploy)
+    METRICS_ENABLED: bool = Field(default=True)
+    METRICS_MULTIPROC_DIR: str = Field(default='')
+    METRICS_FLUSH_INTERVAL_S: float = Field(default=5.0)
+
+    # LLM usage accounting: per-request log line and rolling windows at /health/usage;
+    # estimated cost in USD per million tokens (cached prompt tokens are billed at the cached rate)
+    USAGE_ACCOUNTING_ENABLED: bool = Field(default=True)
+    LLM_PRICE_PROMPT_PER_1M: float = Field(default=2.50)
+    LLM_PRICE_COMPLETION_PER_1M: float = Field(default=10.00)
+    LLM_PRICE_CACHED_PER_1M: float = Field(default=1.25)
+    # Default token budget of an evaluation run (0 = unlimited; the request's maxTokens overrides it)
+    EVALUATION_TOKEN_BUDGET: int = Field(default=0)
+
+    # OpenTelemetry spans: memory (/health/traces), file (rotating gzip NDJSON), console or otlp (need the SDK)
+    TRACING_ENABLED: bool = Field(default=False)
+    TRACING_EXPORTER: str = Field(default='memory')
+    TRACING_SAMPLE_RATIO: float = Field(default=0.05)
+    TRACING_SERVICE_NAME: str = Field(default='mapper-api')
+    TRACING_OTLP_ENDPOINT: str = Field(default='')
+    TRACING_MEMORY_MAX_SPANS: int = Field(default=10000)
+    TRACING_FILE_DIR: str = Field(default='.mapper_traces')
+    TRACING_MAX_FILE_MB: float = Field(default=64.0)
+    TRACING_MAX_FILES: int = Field(default=20)
+
+    # Admin endpoints (on-demand stack and memory profiles); callers send X-Admin-Token ('' disables them)
+    ADMIN_TOKEN: str = Field(default='')
+    PROFILE_MAX_DURATION_S: float = Field(default=60.0)
+
+    # Sampled traffic capture to rotating gzip NDJSON for replay (control text is hashed unless included)
+    CAPTURE_ENABLED: bool = Field(default=False)
+    CAPTURE_SAMPLE_RATE: float = Field(default=0.01)
+    CAPTURE_INCLUDE_TEXT: bool = Field(default=False)
+    CAPTURE_DIR: str = Field(default='.mapper_capture')
+    CAPTURE_MAX_FILE_MB: float = Field(default=64.0)
+    CAPTURE_MAX_FILES: int = Field(default=20)
+
+    # Adaptive LLM concurrency (AIMD) shared by mapping and evaluation: grows while latency stays within
+    # TOLERANCE x baseline, cut by BACKOFF on 429s/timeouts; calls wait up to WAIT_S for a slot
+    LLM_ADAPTIVE_CONCURRENCY: bool = Field(default=True)
+    LLM_CONCURRENCY_INITIAL: int = Field(default=16)
+    LLM_CONCURRENCY_MIN: int = Field(default=2)
+    LLM_CONCURRENCY_MAX: int = Field(default=64)
+    LLM_CONCURRENCY_BACKOFF: float = Field(default=0.7)
+    LLM_LATENCY_TOLERANCE: float = Field(default=2.0)
+    LLM_CONCURRENCY_WAIT_S: float = Field(default=60.0)
+
+    # Cross-worker rate limit of LLM calls against each deployment's quota (0 = unlimited); the buckets
+    # hold BURST_S of quota. 'local' shares a flock'ed file by the workers of one host (STATE_PATH,
+    # '' = /dev/shm), 'redis' shares REDIS_URL across hosts. Calls wait up to MAX_WAIT_S for quota
+    LLM_RATE_LIMIT_RPM: int = Field(default=0)
+    LLM_RATE_LIMIT_TPM: int = Field(default=0)
+    LLM_RATE_LIMIT_BURST_S: float = Field(default=10.0)
+    LLM_RATE_LIMIT_MAX_WAIT_S: float = Field(default=30.0)
+    LLM_RATE_LIMIT_BACKEND: Literal['local', 'redis'] = Field(default='local')
+    LLM_RATE_LIMIT_STATE_PATH: str = Field(default='')
+    LLM_RATE_LIMIT_REDIS_URL: str = Field(default='')
+
+    # Request deadlines per work route (callers may shorten them with X-Request-Timeout, in seconds); each
+    # LLM attempt gets the time left, and work stops when the client disconnects
+    DEADLINE_ENABLED: bool = Field(default=True)
+    DEADLINE_MAPPER_S: float = Field(default=30.0)
+    DEADLINE_EVALUATOR_S: float = Field(default=900.0)
+
+    # Shared HTTP transport (pool limits, keep-alive, timeouts)
+    HTTP2_ENABLED: bool = Field(default=True)
+    HTTP_MAX_CONNECTIONS: int = Field(default=100)
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=20)
+    HTTP_KEEPALIVE_EXPIRY_S: float = Field(default=30.0)
+    HTTP_CONNECT_TIMEOUT_S: float = Field(default=5.0)
+    HTTP_READ_TIMEOUT_S: float = Field(default=60.0)
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
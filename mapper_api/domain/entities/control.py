@@ -3,9 +3,25 @@
 Implements: Control(text: str, id: Optional[str])
 """
 from __future__ import annotations
+import threading
 from dataclasses import dataclass
 from typing import Optional
 
+_language_profiles_lock = threading.Lock()
+_language_profiles_loaded = False
+
+
+def _load_language_profiles() -> None:
+    # langdetect publishes its detector factory before loading the profiles into
+    # it, so a concurrent first detect() can run against partial profiles
+    global _language_profiles_loaded
+    if _language_profiles_loaded:
+        return
+    from langdetect.detector_factory import init_factory
+    with _language_profiles_lock:
+        init_factory()
+        _language_profiles_loaded = True
+
 
 @dataclass(frozen=True, slots=True)
 class Control:
@@ -42,6 +58,7 @@ class Control:
         except ImportError:
             # Fallback if langdetect is not available
             raise ValueError("Language detection library not available")
+        _load_language_profiles()
 
         text = self.text.strip()
         if not text:
@@ -15,3 +15,15 @@ class DefinitionsUnavailableError(MapperDomainError):
 
 class LLMProcessingError(MapperDomainError):
     """Raised when LLM processing fails or returns invalid data."""
+
+
+class LLMCapacityError(LLMProcessingError):
+    """Raised when no LLM concurrency slot frees up in time (the deployment is saturated)."""
+
+
+class DeadlineExceededError(MapperDomainError):
+    """Raised when a request's deadline passed, or the request was cancelled, before its work finished."""
+
+
+class TokenBudgetExceededError(MapperDomainError):
+    """Raised when a unit of work (an evaluation run) has spent its LLM token budget."""
@@ -1,7 +1,7 @@
 """Repository protocol for loading taxonomy and 5Ws definitions."""
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Protocol, Sequence, Dict, Any, List
+from typing import Protocol, Sequence, Dict, Any, List, Tuple
 
 from mapper_api.domain.entities.cluster import Cluster
 from mapper_api.domain.entities.taxonomy import Taxonomy
@@ -22,6 +22,79 @@ class ThemeRow:
     mapping_considerations: str
 
 
+@dataclass(frozen=True, slots=True)
+class DefinitionsSnapshot:
+    """Immutable, versioned view of the definitions; satisfies DefinitionsRepository.
+
+    A snapshot never changes after creation, so anything built from it (prompts,
+    schemas, use cases) stays consistent for as long as it is referenced.
+    """
+    version: str
+    fivews: Tuple[Dict[str, Any], ...]
+    clusters: Tuple[Cluster, ...]
+    taxonomies: Tuple[Taxonomy, ...]
+    risk_themes: Tuple[RiskTheme, ...]
+
+    @classmethod
+    def from_rows(
+        cls,
+        version: str,
+        theme_rows: Sequence[ThemeRow],
+        fivews: Sequence[Dict[str, Any]],
+    ) -> "DefinitionsSnapshot":
+        """Convert flat ThemeRow data into proper domain entities."""
+        clusters: Dict[int, Cluster] = {}
+        taxonomies: Dict[int, Taxonomy] = {}
+        risk_themes: List[RiskTheme] = []
+
+        for row in theme_rows:
+            # Build cluster (deduplicated)
+            if row.cluster_id not in clusters:
+                clusters[row.cluster_id] = Cluster(id=row.cluster_id, name=row.cluster)
+
+            # Build taxonomy (deduplicated)
+            if row.taxonomy_id not in taxonomies:
+                taxonomies[row.taxonomy_id] = Taxonomy(
+                    id=row.taxonomy_id,
+                    name=row.taxonomy,
+                    description=row.taxonomy_description,
+                    cluster_id=row.cluster_id
+                )
+
+            # Build risk theme (each row = one theme) with all fields
+            risk_themes.append(RiskTheme(
+                id=row.risk_theme_id,
+                name=row.risk_theme,
+                description=row.risk_theme_description,
+                taxonomy_id=row.taxonomy_id,
+                taxonomy=row.taxonomy,
+                taxonomy_description=row.taxonomy_description,
+                cluster=row.cluster,
+                cluster_id=row.cluster_id,
+                mapping_considerations=row.mapping_considerations
+            ))
+
+        return cls(
+            version=version,
+            fivews=tuple(dict(row) for row in fivews),
+            clusters=tuple(clusters.values()),
+            taxonomies=tuple(taxonomies.values()),
+            risk_themes=tuple(risk_themes),
+        )
+
+    def get_fivews_rows(self) -> Sequence[Dict[str, Any]]:
+        return self.fivews
+
+    def get_clusters(self) -> List[Cluster]:
+        return list(self.clusters)
+
+    def get_taxonomies(self) -> List[Taxonomy]:
+        return list(self.taxonomies)
+
+    def get_risk_themes(self) -> List[RiskTheme]:
+        return list(self.risk_themes)
+
+
 class DefinitionsRepository(Protocol):
     """Repository for accessing taxonomy definitions and converting to domain entities."""
 
@@ -1,8 +1,11 @@
 """Domain service for evaluation metric calculations."""
 from __future__ import annotations
+import contextvars
+import math
 import time
 import statistics
-from typing import List, Set, Dict, Any, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Set, Dict, Any, Callable, Mapping, Sequence, Union
 from mapper_api.domain.value_objects.metric import (
     Score, 
     IndividualRecall, 
@@ -17,14 +20,55 @@ from mapper_api.domain.value_objects.metric import (
     UnmatchedTheme,
     IndividualUnmatchedAnalysis,
     LatencyScore,
+    LatencyInterval,
     IndividualLatency,
-    SummaryLatency
+    ConcurrencyLatency,
+    SummaryLatency,
+    IndividualTokenUsage,
+    SummaryThroughput,
+    SummaryTokenUsage,
+    SummaryCost
 )
 from mapper_api.domain.repositories.ground_truth import (
     FiveWGroundTruthRecord,
     RiskThemeGroundTruthRecord
 )
 from mapper_api.application.ports.llm import LLMClient
+from mapper_api.domain.errors import DeadlineExceededError, TokenBudgetExceededError
+
+
+def percentile(sorted_values: Sequence[float], p: float) -> float:
+    """
+    The ``p`` quantile (0..1) of ascending values, linearly interpolated
+    between the two nearest order statistics (numpy's default method).
+    """
+    if not sorted_values:
+        raise ValueError("Cannot take a percentile of no values")
+    rank = (len(sorted_values) - 1) * p
+    lower = math.floor(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+def percentile_interval(sorted_values: Sequence[float], p: float, z: float = 1.96) -> LatencyInterval:
+    """
+    Distribution-free confidence interval of the ``p`` quantile.
+    
+    The count of values below the true quantile is Binomial(n, p); the
+    bounds are the order statistics at ``n*p -/+ z*sqrt(n*p*(1-p))`` (normal
+    approximation, clipped to the sample), so small samples get honest,
+    wide intervals for the tail percentiles.
+    """
+    n = len(sorted_values)
+    if n == 0:
+        raise ValueError("Cannot take a percentile of no values")
+    spread = z * math.sqrt(n * p * (1 - p))
+    low_rank = min(max(math.floor(n * p - spread), 1), n)
+    high_rank = min(max(math.ceil(n * p + spread), 1), n)
+    confidence = round(math.erf(z / math.sqrt(2)), 4)
+    return LatencyInterval(
+        low_ms=sorted_values[low_rank - 1], high_ms=sorted_values[high_rank - 1], confidence=confidence
+    )
 
 
 class EvaluationService:
@@ -240,7 +284,7 @@ Evaluate the reasoning quality and return JSON in this exact format:
                 },
                 max_tokens=200,
                 temperature=0.1,
-                context={"trace_id": ground_truth_record.control_id},
+                context={"trace_id": ground_truth_record.control_id, "use_case": "evaluation_judge"},
                 deployment="gpt-4o"  # Use from settings in actual implementation
             )
             
@@ -321,7 +365,7 @@ Return ONLY a JSON object with the confidence score:
                     },
                     max_tokens=50,
                     temperature=0.1,
-                    context={"trace_id": ground_truth_record.control_id},
+                    context={"trace_id": ground_truth_record.control_id, "use_case": "evaluation_judge"},
                     deployment="gpt-4o"
                 )
                 
@@ -370,55 +414,24 @@ Return ONLY a JSON object with the confidence score:
     def calculate_latency_risk_theme_mapper(
         self,
         ground_truth_records: List[RiskThemeGroundTruthRecord],
-        mapper_function: Callable[[str, str], List[Dict[str, Any]]],
-        n_records: int = None
+        mapper_function: Callable[[str, str], Any],
+        n_records: int = None,
+        concurrency: int = 1,
+        first_call: bool = True
     ) -> List[IndividualLatency]:
         """
         Calculate latency metrics for risk theme mapper.
         
         Args:
             ground_truth_records: Ground truth data
-            mapper_function: Function that takes (record_id, control_description) and returns predictions
+            mapper_function: Function that takes (record_id, control_description); it may return
+                a per-stage breakdown (stage name -> ms), kept in the record's details
             n_records: Number of records to test (None for all)
+            concurrency: Calls in flight
+            first_call: Whether this run's first call is flagged as the sweep's first call
         """
         records_to_test = ground_truth_records[:n_records] if n_records else ground_truth_records
-        individual_latencies = []
-        
-        for record in records_to_test:
-            start_time = time.time()
-            
-            try:
-                # Call the mapper function
-                _ = mapper_function(record.control_id, record.control_description)
-                end_time = time.time()
-                latency_ms = (end_time - start_time) * 1000
-                
-                individual_latencies.append(IndividualLatency(
-                    control_id=record.control_id,
-                    latency=LatencyScore(value_ms=latency_ms),
-                    details={
-                        "start_time": start_time,
-                        "end_time": end_time,
-                        "success": True
-                    }
-                ))
-                
-            except Exception as e:
-                end_time = time.time()
-                latency_ms = (end_time - start_time) * 1000
-                
-                individual_latencies.append(IndividualLatency(
-                    control_id=record.control_id,
-                    latency=LatencyScore(value_ms=latency_ms),
-                    details={
-                        "start_time": start_time,
-                        "end_time": end_time,
-                        "success": False,
-                        "error": str(e)
-                    }
-                ))
-        
-        return individual_latencies
+        return self._timed_calls(records_to_test, mapper_function, concurrency, first_call)
     
     def calculate_llm_judge_5ws_reasoning(
         self,
@@ -496,7 +509,7 @@ Evaluate the reasoning quality and return JSON:
                     },
                     max_tokens=150,
                     temperature=0.1,
-                    context={"trace_id": ground_truth_record.control_id},
+                    context={"trace_id": ground_truth_record.control_id, "use_case": "evaluation_judge"},
                     deployment="gpt-4o"
                 )
                 
@@ -535,55 +548,137 @@ Evaluate the reasoning quality and return JSON:
     def calculate_latency_5ws_mapper(
         self,
         ground_truth_records: List[FiveWGroundTruthRecord],
-        mapper_function: Callable[[str, str], List[Dict[str, Any]]],
-        n_records: int = None
+        mapper_function: Callable[[str, str], Any],
+        n_records: int = None,
+        concurrency: int = 1,
+        first_call: bool = True
     ) -> List[IndividualLatency]:
         """
         Calculate latency metrics for 5Ws mapper.
         
         Args:
             ground_truth_records: Ground truth data
-            mapper_function: Function that takes (record_id, control_description) and returns predictions
+            mapper_function: Function that takes (record_id, control_description); it may return
+                a per-stage breakdown (stage name -> ms), kept in the record's details
             n_records: Number of records to test (None for all)
+            concurrency: Calls in flight
+            first_call: Whether this run's first call is flagged as the sweep's first call
         """
         records_to_test = ground_truth_records[:n_records] if n_records else ground_truth_records
-        individual_latencies = []
+        return self._timed_calls(records_to_test, mapper_function, concurrency, first_call)
+    
+    def calculate_throughput(
+        self,
+        ground_truth_records: Sequence[Union[RiskThemeGroundTruthRecord, FiveWGroundTruthRecord]],
+        mapper_function: Callable[[str, str], Any],
+        concurrency: int
+    ) -> List[IndividualLatency]:
+        """
+        Map all records with ``concurrency`` calls in flight and time each one.
         
-        for record in records_to_test:
-            start_time = time.time()
-            
+        Works for either mapper. Per-record start/end offsets (seconds from
+        the first start) let the summary compute the sustained rate.
+        """
+        return self._timed_calls(ground_truth_records, mapper_function, concurrency, first_call=False)
+    
+    def _timed_calls(
+        self,
+        records: Sequence[Union[RiskThemeGroundTruthRecord, FiveWGroundTruthRecord]],
+        mapper_function: Callable[[str, str], Any],
+        concurrency: int,
+        first_call: bool
+    ) -> List[IndividualLatency]:
+        """
+        Time one mapper call per record with ``concurrency`` calls in flight.
+        
+        Durations come from the monotonic nanosecond clock; wall-clock start
+        and end times are derived from one reading taken at the origin, so
+        they cannot go backwards. Each call runs in a copy of the caller's
+        context, so usage tracking and tracing follow it into the worker
+        threads. With ``first_call`` the first record is flagged so the
+        summary can report it apart. It is not a cold measurement: the app's
+        warm-up has already primed connections, schemas and language profiles.
+        A run that fails (token budget, deadline) cancels its queued calls.
+        """
+        origin_ns = time.perf_counter_ns()
+        origin_wall = time.time()
+        
+        def timed(index: int, record) -> IndividualLatency:
+            start_ns = time.perf_counter_ns()
+            error, stages = None, None
             try:
-                # Call the mapper function
-                _ = mapper_function(record.control_id, record.control_description)
-                end_time = time.time()
-                latency_ms = (end_time - start_time) * 1000
-                
-                individual_latencies.append(IndividualLatency(
-                    control_id=record.control_id,
-                    latency=LatencyScore(value_ms=latency_ms),
-                    details={
-                        "start_time": start_time,
-                        "end_time": end_time,
-                        "success": True
-                    }
-                ))
-                
+                result = mapper_function(record.control_id, record.control_description)
+                if isinstance(result, Mapping):
+                    stages = dict(result)
+            except (TokenBudgetExceededError, DeadlineExceededError):
+                # The run is over budget or out of time: stop instead of recording a failed call per record
+                raise
             except Exception as e:
-                end_time = time.time()
-                latency_ms = (end_time - start_time) * 1000
-                
-                individual_latencies.append(IndividualLatency(
-                    control_id=record.control_id,
-                    latency=LatencyScore(value_ms=latency_ms),
-                    details={
-                        "start_time": start_time,
-                        "end_time": end_time,
-                        "success": False,
-                        "error": str(e)
-                    }
-                ))
-        
-        return individual_latencies
+                error = str(e)
+            end_ns = time.perf_counter_ns()
+            start_s = (start_ns - origin_ns) / 1e9
+            end_s = (end_ns - origin_ns) / 1e9
+            details: Dict[str, Any] = {
+                "start_time": origin_wall + start_s,
+                "end_time": origin_wall + end_s,
+                "start_s": start_s,
+                "end_s": end_s,
+                "concurrency": concurrency,
+                "first_call": first_call and index == 0,
+                "success": error is None
+            }
+            if stages is not None:
+                details["stages_ms"] = stages
+            if error is not None:
+                details["error"] = error
+            return IndividualLatency(
+                control_id=record.control_id,
+                latency=LatencyScore(value_ms=(end_ns - start_ns) / 1e6),
+                details=details
+            )
+        
+        if concurrency <= 1:
+            return [timed(i, record) for i, record in enumerate(records)]
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [
+                pool.submit(contextvars.copy_context().run, timed, i, record)
+                for i, record in enumerate(records)
+            ]
+            try:
+                return [future.result() for future in futures]
+            except BaseException:
+                # Only wait for the calls already running, not the whole queue
+                pool.shutdown(cancel_futures=True)
+                raise
+    
+    def calculate_token_usage(
+        self,
+        ground_truth_records: Sequence[Union[RiskThemeGroundTruthRecord, FiveWGroundTruthRecord]],
+        usage_function: Callable[[str, str], Mapping[str, Any]]
+    ) -> List[IndividualTokenUsage]:
+        """
+        Map each record and report the LLM usage it cost.
+        
+        ``usage_function`` maps one control and returns its usage
+        (``prompt_tokens``, ``completion_tokens``, ``cached_tokens``,
+        ``cost_usd`` and ``error`` when mapping failed; a failed call still
+        spent tokens).
+        """
+        individual_usages = []
+        for record in ground_truth_records:
+            usage = usage_function(record.control_id, record.control_description)
+            details: Dict[str, Any] = {"success": usage.get("error") is None}
+            if usage.get("error") is not None:
+                details["error"] = usage["error"]
+            individual_usages.append(IndividualTokenUsage(
+                control_id=record.control_id,
+                prompt_tokens=usage.get("prompt_tokens", 0),
+                completion_tokens=usage.get("completion_tokens", 0),
+                cached_tokens=usage.get("cached_tokens", 0),
+                cost_usd=usage.get("cost_usd", 0.0),
+                details=details
+            ))
+        return individual_usages
     
     def calculate_summary_accuracy(
         self, 
@@ -623,21 +718,134 @@ Evaluate the reasoning quality and return JSON:
         self, 
         individual_latencies: List[IndividualLatency]
     ) -> SummaryLatency:
-        """Calculate summary statistics from individual latency measurements."""
+        """
+        Calculate summary statistics from individual latency measurements.
+        
+        Percentiles are linearly interpolated between order statistics, with
+        a distribution-free 95% confidence interval. The sweep's first call
+        is reported apart from the rest, and records measured at several
+        concurrency levels also get one latency/throughput row per level.
+        """
         if not individual_latencies:
             raise ValueError("Cannot calculate summary for empty individual latencies")
         
-        latency_values = [il.latency.value_ms for il in individual_latencies]
-        latency_values.sort()
-        
-        p95_index = int(0.95 * len(latency_values))
-        p99_index = int(0.99 * len(latency_values))
+        latency_values = sorted(il.latency.value_ms for il in individual_latencies)
+        first = [il for il in individual_latencies if il.details.get("first_call")]
+        warm_values = sorted(il.latency.value_ms for il in individual_latencies if not il.details.get("first_call"))
+        levels = sorted({il.details.get("concurrency", 1) for il in individual_latencies})
         
         return SummaryLatency(
             total_records=len(individual_latencies),
             average_latency=LatencyScore(value_ms=sum(latency_values) / len(latency_values)),
-            min_latency=LatencyScore(value_ms=min(latency_values)),
-            max_latency=LatencyScore(value_ms=max(latency_values)),
-            p95_latency=LatencyScore(value_ms=latency_values[p95_index]),
-            p99_latency=LatencyScore(value_ms=latency_values[p99_index])
+            min_latency=LatencyScore(value_ms=latency_values[0]),
+            max_latency=LatencyScore(value_ms=latency_values[-1]),
+            p95_latency=LatencyScore(value_ms=percentile(latency_values, 0.95)),
+            p99_latency=LatencyScore(value_ms=percentile(latency_values, 0.99)),
+            p50_latency=LatencyScore(value_ms=percentile(latency_values, 0.50)),
+            p95_interval=percentile_interval(latency_values, 0.95),
+            p99_interval=percentile_interval(latency_values, 0.99),
+            first_call_latency=LatencyScore(value_ms=first[0].latency.value_ms) if first else None,
+            warm_average_latency=(
+                LatencyScore(value_ms=sum(warm_values) / len(warm_values)) if first and warm_values else None
+            ),
+            warm_p95_latency=LatencyScore(value_ms=percentile(warm_values, 0.95)) if first and warm_values else None,
+            concurrency_sweep=[
+                self._concurrency_latency(
+                    level, [il for il in individual_latencies if il.details.get("concurrency", 1) == level]
+                )
+                for level in levels
+            ] if len(levels) > 1 else [],
+            average_stages_ms=self._average_stages(individual_latencies)
+        )
+    
+    def _concurrency_latency(self, concurrency: int, individual_latencies: List[IndividualLatency]) -> ConcurrencyLatency:
+        """One point of the latency versus throughput curve."""
+        latency_values = sorted(il.latency.value_ms for il in individual_latencies)
+        duration_s = (
+            max(il.details["end_s"] for il in individual_latencies)
+            - min(il.details["start_s"] for il in individual_latencies)
+        )
+        successful = sum(1 for il in individual_latencies if il.details.get("success"))
+        return ConcurrencyLatency(
+            concurrency=concurrency,
+            total_records=len(individual_latencies),
+            records_per_second=successful / duration_s if duration_s > 0 else 0.0,
+            average_latency=LatencyScore(value_ms=sum(latency_values) / len(latency_values)),
+            p50_latency=LatencyScore(value_ms=percentile(latency_values, 0.50)),
+            p95_latency=LatencyScore(value_ms=percentile(latency_values, 0.95)),
+            p99_latency=LatencyScore(value_ms=percentile(latency_values, 0.99))
+        )
+    
+    def _average_stages(self, individual_latencies: List[IndividualLatency]) -> Dict[str, float]:
+        """Mean milliseconds per stage over the records that reported a breakdown."""
+        staged = [il.details["stages_ms"] for il in individual_latencies if il.details.get("stages_ms") is not None]
+        totals: Dict[str, float] = {}
+        for stages in staged:
+            for name, ms in stages.items():
+                totals[name] = totals.get(name, 0.0) + ms
+        return {name: round(total / len(staged), 3) for name, total in totals.items()} if staged else {}
+    
+    def calculate_summary_throughput(
+        self,
+        individual_latencies: List[IndividualLatency],
+        concurrency: int
+    ) -> SummaryThroughput:
+        """Sustained rate: successful records over the wall time of the whole run."""
+        if not individual_latencies:
+            raise ValueError("Cannot calculate summary for empty individual latencies")
+        
+        starts = [il.details["start_s"] for il in individual_latencies]
+        ends = [il.details["end_s"] for il in individual_latencies]
+        duration_s = max(ends) - min(starts)
+        successful = sum(1 for il in individual_latencies if il.details.get("success"))
+        latency_values = [il.latency.value_ms for il in individual_latencies]
+        
+        return SummaryThroughput(
+            total_records=len(individual_latencies),
+            concurrency=concurrency,
+            successful_records=successful,
+            duration_s=duration_s,
+            records_per_second=successful / duration_s if duration_s > 0 else 0.0,
+            average_latency=LatencyScore(value_ms=sum(latency_values) / len(latency_values))
+        )
+    
+    def calculate_summary_token_usage(
+        self,
+        individual_usages: List[IndividualTokenUsage]
+    ) -> SummaryTokenUsage:
+        """Calculate average tokens per record from individual usages."""
+        if not individual_usages:
+            raise ValueError("Cannot calculate summary for empty individual token usages")
+        
+        n = len(individual_usages)
+        prompt = sum(iu.prompt_tokens for iu in individual_usages)
+        completion = sum(iu.completion_tokens for iu in individual_usages)
+        cached = sum(iu.cached_tokens for iu in individual_usages)
+        
+        return SummaryTokenUsage(
+            total_records=n,
+            average_prompt_tokens=prompt / n,
+            average_completion_tokens=completion / n,
+            average_cached_tokens=cached / n,
+            average_total_tokens=(prompt + completion) / n,
+            max_total_tokens=max(iu.prompt_tokens + iu.completion_tokens for iu in individual_usages),
+            cached_prompt_ratio=cached / prompt if prompt else 0.0
+        )
+    
+    def calculate_summary_cost(
+        self,
+        individual_usages: List[IndividualTokenUsage]
+    ) -> SummaryCost:
+        """Calculate total, per-record and per-1k-controls estimated cost."""
+        if not individual_usages:
+            raise ValueError("Cannot calculate summary for empty individual token usages")
+        
+        total_cost = sum(iu.cost_usd for iu in individual_usages)
+        average_cost = total_cost / len(individual_usages)
+        
+        return SummaryCost(
+            total_records=len(individual_usages),
+            total_cost_usd=total_cost,
+            average_cost_usd=average_cost,
+            cost_per_1k_controls_usd=average_cost * 1000
         )
@@ -12,7 +12,11 @@ from mapper_api.domain.value_objects.metric import (
     SummaryLLMJudge,
     IndividualUnmatchedAnalysis,
     IndividualLatency,
-    SummaryLatency
+    SummaryLatency,
+    IndividualTokenUsage,
+    SummaryThroughput,
+    SummaryTokenUsage,
+    SummaryCost
 )
 
 
@@ -26,15 +30,20 @@ class EvaluationResult(BaseModel):
         IndividualAccuracy, 
         IndividualLLMJudge, 
         IndividualUnmatchedAnalysis, 
-        IndividualLatency
+        IndividualLatency,
+        IndividualTokenUsage
     ]] = Field(default_factory=list, description="Individual evaluation results")
     summary_result: Optional[Union[
         SummaryRecall, 
         SummaryAccuracy, 
         SummaryLLMJudge, 
-        SummaryLatency
+        SummaryLatency,
+        SummaryThroughput,
+        SummaryTokenUsage,
+        SummaryCost
     ]] = Field(None, description="Summary result (None for unmatched analysis)")
     error_message: Optional[str] = Field(None, description="Error message if evaluation failed")
+    llm_usage: Optional[Dict[str, Any]] = Field(None, description="LLM calls, tokens and estimated cost spent on this metric")
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
@@ -45,4 +54,6 @@ class EvaluationResult(BaseModel):
         }
         if self.error_message:
             result["error_message"] = self.error_message
+        if self.llm_usage is not None:
+            result["llm_usage"] = self.llm_usage
         return result
@@ -1,7 +1,7 @@
 """Value objects for evaluation metrics using Pydantic V2."""
 from __future__ import annotations
 from enum import Enum
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
 from mapper_api.domain.value_objects.score import Score
 
@@ -16,6 +16,12 @@ class MetricType(Enum):
     LATENCY_RISK_THEME_MAPPER = "latency_risktheme_mapper"
     LLM_JUDGE_5WS_REASONING = "llm_judge_5ws_reasoning"
     LATENCY_5WS_MAPPER = "latency_5ws_mapper"
+    THROUGHPUT_RISK_THEME_MAPPER = "throughput_risktheme_mapper"
+    THROUGHPUT_5WS_MAPPER = "throughput_5ws_mapper"
+    TOKENS_PER_RECORD_RISK_THEME_MAPPER = "tokens_per_record_risktheme_mapper"
+    TOKENS_PER_RECORD_5WS_MAPPER = "tokens_per_record_5ws_mapper"
+    COST_PER_1K_CONTROLS_RISK_THEME_MAPPER = "cost_per_1k_controls_risktheme_mapper"
+    COST_PER_1K_CONTROLS_5WS_MAPPER = "cost_per_1k_controls_5ws_mapper"
 
 
 # Individual Metric Results
@@ -81,6 +87,44 @@ class LatencyScore(BaseModel):
         return {"value_ms": self.value_ms}
 
 
+class LatencyInterval(BaseModel):
+    """Confidence interval of a latency percentile."""
+    model_config = {"frozen": True}
+    
+    low_ms: float = Field(..., ge=0.0, description="Lower bound in milliseconds")
+    high_ms: float = Field(..., ge=0.0, description="Upper bound in milliseconds")
+    confidence: float = Field(0.95, gt=0.0, lt=1.0, description="Confidence level")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization."""
+        return {"low_ms": self.low_ms, "high_ms": self.high_ms, "confidence": self.confidence}
+
+
+class ConcurrencyLatency(BaseModel):
+    """Latency and throughput of a mapper at one concurrency level."""
+    model_config = {"frozen": True}
+    
+    concurrency: int = Field(..., ge=1, description="Calls in flight")
+    total_records: int = Field(..., ge=0, description="Records mapped at this level")
+    records_per_second: float = Field(..., ge=0.0, description="Successful records per second")
+    average_latency: LatencyScore = Field(..., description="Average latency")
+    p50_latency: LatencyScore = Field(..., description="Median latency")
+    p95_latency: LatencyScore = Field(..., description="95th percentile latency")
+    p99_latency: LatencyScore = Field(..., description="99th percentile latency")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization."""
+        return {
+            "concurrency": self.concurrency,
+            "total_records": self.total_records,
+            "records_per_second": self.records_per_second,
+            "average_latency_ms": self.average_latency.value_ms,
+            "p50_latency_ms": self.p50_latency.value_ms,
+            "p95_latency_ms": self.p95_latency.value_ms,
+            "p99_latency_ms": self.p99_latency.value_ms
+        }
+
+
 class IndividualLatency(BaseModel):
     """Latency measurement for a single control/record."""
     model_config = {"frozen": True}
@@ -98,6 +142,29 @@ class IndividualLatency(BaseModel):
         }
 
 
+class IndividualTokenUsage(BaseModel):
+    """LLM tokens and estimated cost spent mapping a single control/record."""
+    model_config = {"frozen": True}
+    
+    control_id: str = Field(..., description="Control ID")
+    prompt_tokens: int = Field(..., ge=0, description="Prompt tokens")
+    completion_tokens: int = Field(..., ge=0, description="Completion tokens")
+    cached_tokens: int = Field(0, ge=0, description="Prompt tokens served from the prompt cache")
+    cost_usd: float = Field(..., ge=0.0, description="Estimated cost in USD")
+    details: Dict[str, Any] = Field(default_factory=dict, description="Additional details")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization."""
+        return {
+            "control_id": self.control_id,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cost_usd": self.cost_usd,
+            "details": self.details
+        }
+
+
 # Unmatched Analysis (no score validation needed)
 class ConfidenceLevel:
     """Confidence level categorization."""
@@ -232,10 +299,18 @@ class SummaryLatency(BaseModel):
     max_latency: LatencyScore = Field(..., description="Maximum latency")
     p95_latency: LatencyScore = Field(..., description="95th percentile latency")
     p99_latency: LatencyScore = Field(..., description="99th percentile latency")
+    p50_latency: Optional[LatencyScore] = Field(None, description="Median latency")
+    p95_interval: Optional[LatencyInterval] = Field(None, description="Confidence interval of the 95th percentile")
+    p99_interval: Optional[LatencyInterval] = Field(None, description="Confidence interval of the 99th percentile")
+    first_call_latency: Optional[LatencyScore] = Field(None, description="Latency of the sweep's first call")
+    warm_average_latency: Optional[LatencyScore] = Field(None, description="Average latency of the calls after the first")
+    warm_p95_latency: Optional[LatencyScore] = Field(None, description="95th percentile latency of the calls after the first")
+    concurrency_sweep: List[ConcurrencyLatency] = Field(default_factory=list, description="Latency versus throughput per concurrency level")
+    average_stages_ms: Dict[str, float] = Field(default_factory=dict, description="Mean time per call spent in each stage")
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
-        return {
+        result = {
             "total_records": self.total_records,
             "average_latency_ms": self.average_latency.value_ms,
             "min_latency_ms": self.min_latency.value_ms,
@@ -243,4 +318,87 @@ class SummaryLatency(BaseModel):
             "p95_latency_ms": self.p95_latency.value_ms,
             "p99_latency_ms": self.p99_latency.value_ms
         }
+        if self.p50_latency is not None:
+            result["p50_latency_ms"] = self.p50_latency.value_ms
+        if self.p95_interval is not None:
+            result["p95_latency_ci"] = self.p95_interval.to_dict()
+        if self.p99_interval is not None:
+            result["p99_latency_ci"] = self.p99_interval.to_dict()
+        if self.first_call_latency is not None:
+            result["first_call_latency_ms"] = self.first_call_latency.value_ms
+        if self.warm_average_latency is not None:
+            result["warm_average_latency_ms"] = self.warm_average_latency.value_ms
+        if self.warm_p95_latency is not None:
+            result["warm_p95_latency_ms"] = self.warm_p95_latency.value_ms
+        if self.concurrency_sweep:
+            result["concurrency_sweep"] = [level.to_dict() for level in self.concurrency_sweep]
+        if self.average_stages_ms:
+            result["average_stages_ms"] = dict(self.average_stages_ms)
+        return result
+
+
+class SummaryThroughput(BaseModel):
+    """Sustained throughput of a mapper at a fixed concurrency."""
+    model_config = {"frozen": True}
+    
+    total_records: int = Field(..., ge=0, description="Total number of records")
+    concurrency: int = Field(..., ge=1, description="Records mapped concurrently")
+    successful_records: int = Field(..., ge=0, description="Records mapped without error")
+    duration_s: float = Field(..., ge=0.0, description="Wall time from the first request to the last response")
+    records_per_second: float = Field(..., ge=0.0, description="Successful records per second")
+    average_latency: LatencyScore = Field(..., description="Average latency under this concurrency")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization."""
+        return {
+            "total_records": self.total_records,
+            "concurrency": self.concurrency,
+            "successful_records": self.successful_records,
+            "duration_s": self.duration_s,
+            "records_per_second": self.records_per_second,
+            "average_latency_ms": self.average_latency.value_ms
+        }
+
+
+class SummaryTokenUsage(BaseModel):
+    """Average LLM tokens per record."""
+    model_config = {"frozen": True}
+    
+    total_records: int = Field(..., ge=0, description="Total number of records")
+    average_prompt_tokens: float = Field(..., ge=0.0, description="Average prompt tokens per record")
+    average_completion_tokens: float = Field(..., ge=0.0, description="Average completion tokens per record")
+    average_cached_tokens: float = Field(..., ge=0.0, description="Average cached prompt tokens per record")
+    average_total_tokens: float = Field(..., ge=0.0, description="Average prompt + completion tokens per record")
+    max_total_tokens: int = Field(..., ge=0, description="Largest prompt + completion tokens of a record")
+    cached_prompt_ratio: float = Field(..., ge=0.0, le=1.0, description="Share of prompt tokens served from cache")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization."""
+        return {
+            "total_records": self.total_records,
+            "average_prompt_tokens": self.average_prompt_tokens,
+            "average_completion_tokens": self.average_completion_tokens,
+            "average_cached_tokens": self.average_cached_tokens,
+            "average_total_tokens": self.average_total_tokens,
+            "max_total_tokens": self.max_total_tokens,
+            "cached_prompt_ratio": self.cached_prompt_ratio
+        }
 
+
+class SummaryCost(BaseModel):
+    """Estimated LLM cost of mapping controls."""
+    model_config = {"frozen": True}
+    
+    total_records: int = Field(..., ge=0, description="Total number of records")
+    total_cost_usd: float = Field(..., ge=0.0, description="Estimated cost of all records in USD")
+    average_cost_usd: float = Field(..., ge=0.0, description="Average estimated cost per record in USD")
+    cost_per_1k_controls_usd: float = Field(..., ge=0.0, description="Estimated cost of mapping 1,000 controls in USD")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization."""
+        return {
+            "total_records": self.total_records,
+            "total_cost_usd": self.total_cost_usd,
+            "average_cost_usd": self.average_cost_usd,
+            "cost_per_1k_controls_usd": self.cost_per_1k_controls_usd
+        }
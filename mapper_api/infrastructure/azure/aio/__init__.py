@@ -0,0 +1 @@
+"""Async (``azure.storage.blob.aio``) variants of the Azure Blob adapters."""
@@ -0,0 +1,142 @@
+"""Async Azure Blob adapter loading taxonomy.json and 5ws.json concurrently into versioned snapshots."""
+from __future__ import annotations
+import asyncio
+import logging
+from typing import Sequence, Dict, Any, Optional, List
+
+from azure.core.credentials_async import AsyncTokenCredential
+from azure.core.pipeline.transport import AsyncHttpTransport
+from mapper_api.application.ports.blob_store import AsyncBlobStore
+from mapper_api.infrastructure.azure.aio.blob_store import AsyncAzureBlobStore
+from mapper_api.domain.repositories.definitions import DefinitionsRepository, DefinitionsSnapshot
+from mapper_api.domain.entities.cluster import Cluster
+from mapper_api.domain.entities.taxonomy import Taxonomy
+from mapper_api.domain.entities.risk_theme import RiskTheme
+from mapper_api.infrastructure.azure.blob_definitions_repo import BlobDefinitionsRepository, TAXONOMY_BLOB, FIVEWS_BLOB
+from mapper_api.infrastructure.local.definitions_snapshot_file import DefinitionsSnapshotFile, StoredDefinitions
+
+
+class AsyncBlobDefinitionsRepository(DefinitionsRepository):
+    """
+    ``azure.storage.blob.aio`` counterpart of BlobDefinitionsRepository.
+
+    Both blobs are fetched concurrently with conditional GETs; parsing and the
+    content-derived version are shared with the sync adapter, so both produce
+    identical snapshots. Build with ``await AsyncBlobDefinitionsRepository.create(...)``.
+    """
+
+    def __init__(
+        self,
+        *,
+        account_name: str = "",
+        container_name: str = "",
+        credential: Optional[AsyncTokenCredential] = None,
+        transport: Optional[AsyncHttpTransport] = None,
+        max_concurrency: int = 4,
+        snapshot_file: Optional[DefinitionsSnapshotFile] = None,
+        store: Optional[AsyncBlobStore] = None,
+    ) -> None:
+        # An explicit store (local/in-memory backends) replaces the Azure container
+        self._store = store or AsyncAzureBlobStore.connect(
+            account_name=account_name,
+            container_name=container_name,
+            credential=credential,
+            transport=transport,
+            max_concurrency=max_concurrency,
+        )
+        self._refresh_lock = asyncio.Lock()
+        self._etags: Dict[str, str] = {}
+        self._raw: Dict[str, bytes] = {}
+        self._snapshot: Optional[DefinitionsSnapshot] = None
+        self._snapshot_file = snapshot_file
+        self._logger = logging.getLogger("mapper.definitions")
+        self.loaded_from_local_snapshot = False
+
+    @classmethod
+    async def create(cls, **kwargs: Any) -> "AsyncBlobDefinitionsRepository":
+        repo = cls(**kwargs)
+        await repo._load()
+        return repo
+
+    async def _load(self) -> None:
+        # Same stale-while-revalidate start as the sync adapter
+        if self._snapshot_file is not None:
+            stored = await asyncio.to_thread(self._snapshot_file.load)
+            if stored is not None and {TAXONOMY_BLOB, FIVEWS_BLOB} <= stored.blobs.keys():
+                self._raw = dict(stored.blobs)
+                self._etags = dict(stored.etags)
+                self._snapshot = BlobDefinitionsRepository._build_snapshot(
+                    self._raw[TAXONOMY_BLOB], self._raw[FIVEWS_BLOB]
+                )
+                self.loaded_from_local_snapshot = True
+                return
+        await self.refresh()
+
+    @property
+    def snapshot(self) -> Optional[DefinitionsSnapshot]:
+        """Current immutable definitions snapshot."""
+        return self._snapshot
+
+    async def refresh(self) -> bool:
+        """Conditionally re-read both blobs concurrently; True when a new snapshot was swapped in."""
+        async with self._refresh_lock:
+            names = (TAXONOMY_BLOB, FIVEWS_BLOB)
+            results = await asyncio.gather(*(
+                self._store.download(name, etag=self._etags.get(name)) for name in names
+            ))
+            changed = False
+            for name, downloaded in zip(names, results):
+                if downloaded is not None:
+                    self._raw[name], self._etags[name] = downloaded
+                    changed = True
+
+            if not changed and self._snapshot is not None:
+                return False
+
+            self._snapshot = BlobDefinitionsRepository._build_snapshot(
+                self._raw[TAXONOMY_BLOB], self._raw[FIVEWS_BLOB]
+            )
+            await self._persist()
+            return True
+
+    async def _persist(self) -> None:
+        if self._snapshot_file is None or self._snapshot is None:
+            return
+        stored = StoredDefinitions(version=self._snapshot.version, blobs=dict(self._raw), etags=dict(self._etags))
+        try:
+            await asyncio.to_thread(self._snapshot_file.save, stored)
+        except Exception as e:
+            self._logger.warning("definitions.snapshot_write_failed", extra={"error": f"{type(e).__name__}: {e}"})
+
+    async def close(self) -> None:
+        await self._store.close()
+
+    async def __aenter__(self) -> "AsyncBlobDefinitionsRepository":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    def get_fivews_rows(self) -> Sequence[Dict[str, Any]]:
+        if not self._snapshot:
+            return []
+        return self._snapshot.get_fivews_rows()
+
+    # Domain-oriented methods
+    def get_clusters(self) -> List[Cluster]:
+        """Return all clusters as domain entities."""
+        if not self._snapshot:
+            return []
+        return self._snapshot.get_clusters()
+
+    def get_taxonomies(self) -> List[Taxonomy]:
+        """Return all taxonomies as domain entities."""
+        if not self._snapshot:
+            return []
+        return self._snapshot.get_taxonomies()
+
+    def get_risk_themes(self) -> List[RiskTheme]:
+        """Return all risk themes as domain entities."""
+        if not self._snapshot:
+            return []
+        return self._snapshot.get_risk_themes()
@@ -0,0 +1,101 @@
+"""Async Azure Blob adapter writing evaluation results, uploading metrics concurrently."""
+from __future__ import annotations
+import asyncio
+import json
+from typing import Any, Dict, Mapping, Optional, Union
+
+from azure.core.credentials_async import AsyncTokenCredential
+from azure.core.pipeline.transport import AsyncHttpTransport
+from mapper_api.application.ports.blob_store import AsyncBlobStore
+from mapper_api.infrastructure.azure.aio.blob_store import AsyncAzureBlobStore
+from mapper_api.domain.value_objects.evaluation_result import EvaluationResult
+from mapper_api.infrastructure.azure import evaluation_results_layout as layout
+
+
+class AsyncBlobEvaluationResultsWriter:
+    """``azure.storage.blob.aio`` counterpart of BlobEvaluationResultsWriter."""
+
+    def __init__(
+        self,
+        *,
+        account_name: str = "",
+        container_name: str = "",
+        credential: Optional[AsyncTokenCredential] = None,
+        transport: Optional[AsyncHttpTransport] = None,
+        max_concurrency: int = 4,
+        store: Optional[AsyncBlobStore] = None,
+    ) -> None:
+        # An explicit store (local/in-memory backends) replaces the Azure container
+        self._store = store or AsyncAzureBlobStore.connect(
+            account_name=account_name,
+            container_name=container_name,
+            credential=credential,
+            transport=transport,
+            max_concurrency=max_concurrency,
+        )
+
+    async def write_evaluation_result(
+        self,
+        record_id: str,
+        timestamp: str,
+        metric_type: str,
+        evaluation_result: EvaluationResult
+    ) -> str:
+        """Upload records as chunked gzip NDJSON, then write the small summary; returns the summary path."""
+        directory = self.get_directory_path(record_id, timestamp)
+        records_blob = layout.records_path(directory, metric_type)
+        summary_blob = layout.summary_path(directory, metric_type)
+
+        await self._store.upload(
+            records_blob,
+            layout.gzip_ndjson_chunks(layout.result_records(evaluation_result)),
+            content_type="application/gzip",
+        )
+        await self._store.upload(
+            summary_blob,
+            layout.summary_document(evaluation_result, records_blob),
+            content_type="application/json",
+        )
+        return summary_blob
+
+    async def write_evaluation_results(
+        self,
+        record_id: str,
+        timestamp: str,
+        results: Mapping[str, EvaluationResult],
+    ) -> Dict[str, Union[str, BaseException]]:
+        """
+        Upload every metric's result concurrently.
+
+        Returns metric type -> summary path, or the exception for uploads that
+        failed, so one failed metric does not discard the others.
+        """
+        metric_types = list(results)
+        outcomes = await asyncio.gather(
+            *(self.write_evaluation_result(record_id, timestamp, m, results[m]) for m in metric_types),
+            return_exceptions=True,
+        )
+        return dict(zip(metric_types, outcomes))
+
+    async def read_summaries(self, directory: str) -> Dict[str, Dict[str, Any]]:
+        """Fetch every metric summary in a results directory concurrently, without any records."""
+        names = [
+            name for name in await self._store.list_names(f"{directory}/")
+            if name.endswith(layout.SUMMARY_SUFFIX)
+        ]
+        downloads = await asyncio.gather(*(self._store.download(name) for name in names))
+        documents = [json.loads(data) for data, _ in downloads]
+        return {document["metric_type"]: document for document in documents}
+
+    def get_directory_path(self, record_id: str, timestamp: str) -> str:
+        """Get the directory path for evaluation results."""
+        return layout.directory_path(record_id, timestamp)
+
+    async def close(self) -> None:
+        await self._store.close()
+
+    async def __aenter__(self) -> "AsyncBlobEvaluationResultsWriter":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
@@ -0,0 +1,81 @@
+"""Async Azure Blob adapter loading both ground truth files concurrently."""
+from __future__ import annotations
+import asyncio
+from typing import Any, Optional, Sequence
+
+from azure.core.credentials_async import AsyncTokenCredential
+from azure.core.pipeline.transport import AsyncHttpTransport
+from mapper_api.application.ports.blob_store import AsyncBlobStore
+from mapper_api.infrastructure.azure.aio.blob_store import AsyncAzureBlobStore
+from mapper_api.domain.repositories.ground_truth import (
+    GroundTruthRepository,
+    FiveWGroundTruthRecord,
+    RiskThemeGroundTruthRecord,
+)
+from mapper_api.infrastructure.azure.blob_ground_truth_repo import (
+    BlobGroundTruthRepository,
+    FIVEWS_GT_BLOB,
+    RISK_THEMES_GT_BLOB,
+)
+
+
+class AsyncBlobGroundTruthRepository(GroundTruthRepository):
+    """
+    ``azure.storage.blob.aio`` counterpart of BlobGroundTruthRepository.
+
+    gt_5ws.json and gt_risk_themes.json are downloaded concurrently, each with
+    chunked parallel download. Build with ``await AsyncBlobGroundTruthRepository.create(...)``.
+    """
+
+    def __init__(
+        self,
+        *,
+        account_name: str = "",
+        container_name: str = "",
+        credential: Optional[AsyncTokenCredential] = None,
+        transport: Optional[AsyncHttpTransport] = None,
+        max_concurrency: int = 4,
+        store: Optional[AsyncBlobStore] = None,
+    ) -> None:
+        # An explicit store (local/in-memory backends) replaces the Azure container
+        self._store = store or AsyncAzureBlobStore.connect(
+            account_name=account_name,
+            container_name=container_name,
+            credential=credential,
+            transport=transport,
+            max_concurrency=max_concurrency,
+        )
+        self._fivews_gt: Optional[Sequence[FiveWGroundTruthRecord]] = None
+        self._risk_themes_gt: Optional[Sequence[RiskThemeGroundTruthRecord]] = None
+
+    @classmethod
+    async def create(cls, **kwargs: Any) -> "AsyncBlobGroundTruthRepository":
+        repo = cls(**kwargs)
+        await repo._load()
+        return repo
+
+    async def _load(self) -> None:
+        """Load all ground truth data concurrently."""
+        (fivews_data, _), (risk_themes_data, _) = await asyncio.gather(
+            self._store.download(FIVEWS_GT_BLOB),
+            self._store.download(RISK_THEMES_GT_BLOB),
+        )
+        self._fivews_gt = BlobGroundTruthRepository._parse_fivews_ground_truth(fivews_data)
+        self._risk_themes_gt = BlobGroundTruthRepository._parse_risk_themes_ground_truth(risk_themes_data)
+
+    async def close(self) -> None:
+        await self._store.close()
+
+    async def __aenter__(self) -> "AsyncBlobGroundTruthRepository":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    def get_fivews_ground_truth(self) -> Sequence[FiveWGroundTruthRecord]:
+        """Return 5Ws ground truth records."""
+        return self._fivews_gt or []
+
+    def get_risk_themes_ground_truth(self) -> Sequence[RiskThemeGroundTruthRecord]:
+        """Return risk themes ground truth records."""
+        return self._risk_themes_gt or []
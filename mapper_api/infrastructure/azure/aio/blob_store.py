@@ -0,0 +1,78 @@
+"""Async (``azure.storage.blob.aio``) implementation of the AsyncBlobStore port."""
+from __future__ import annotations
+from typing import AsyncIterable, List, Optional, Tuple, Union
+
+from azure.core import MatchConditions
+from azure.core.credentials_async import AsyncTokenCredential
+from azure.core.exceptions import ResourceNotFoundError, ResourceNotModifiedError
+from azure.core.pipeline.transport import AsyncHttpTransport, AsyncioRequestsTransport
+from azure.storage.blob import ContentSettings
+from azure.storage.blob.aio import BlobServiceClient, ContainerClient
+from mapper_api.application.ports.blob_store import BlobData, BlobNotFoundError
+
+
+def _default_transport() -> Optional[AsyncHttpTransport]:
+    """SDK default (aiohttp) when installed, otherwise requests on the default executor."""
+    try:
+        import aiohttp  # noqa: F401
+    except ImportError:
+        return AsyncioRequestsTransport()
+    return None
+
+
+class AsyncAzureBlobStore:
+    """AsyncBlobStore over one container; transfers use ``max_concurrency`` chunked parallelism."""
+
+    def __init__(self, service: BlobServiceClient, container: ContainerClient, *, max_concurrency: int = 4) -> None:
+        self._service = service
+        self._container = container
+        self._max_concurrency = max_concurrency
+
+    @classmethod
+    def connect(
+        cls,
+        *,
+        account_name: str,
+        container_name: str,
+        credential: AsyncTokenCredential,
+        transport: Optional[AsyncHttpTransport] = None,
+        max_concurrency: int = 4,
+    ) -> "AsyncAzureBlobStore":
+        service = BlobServiceClient(
+            account_url=f"https://{account_name}.blob.core.windows.net",
+            credential=credential,
+            transport=transport or _default_transport(),
+        )
+        return cls(service, service.get_container_client(container_name), max_concurrency=max_concurrency)
+
+    async def download(self, name: str, *, etag: Optional[str] = None) -> Optional[Tuple[bytes, str]]:
+        blob = self._container.get_blob_client(name)
+        try:
+            if etag:
+                downloader = await blob.download_blob(
+                    etag=etag, match_condition=MatchConditions.IfModified, max_concurrency=self._max_concurrency
+                )
+            else:
+                downloader = await blob.download_blob(max_concurrency=self._max_concurrency)
+        except ResourceNotModifiedError:
+            return None
+        except ResourceNotFoundError as e:
+            raise BlobNotFoundError(name) from e
+        return await downloader.readall(), downloader.properties.etag
+
+    async def upload(self, name: str, data: Union[BlobData, AsyncIterable[bytes]], *, content_type: str) -> None:
+        await self._container.get_blob_client(name).upload_blob(
+            data,
+            overwrite=True,
+            content_settings=ContentSettings(content_type=content_type),
+            max_concurrency=self._max_concurrency,
+        )
+
+    async def list_names(self, prefix: str) -> List[str]:
+        return [blob.name async for blob in self._container.list_blobs(name_starts_with=prefix)]
+
+    async def ping(self) -> None:
+        await self._container.get_container_properties()
+
+    async def close(self) -> None:
+        await self._service.close()
@@ -1,48 +1,129 @@
-"""Azure Blob adapter to load taxonomy.json and 5ws.json once at startup."""
+"""Azure Blob adapter to load taxonomy.json and 5ws.json into versioned snapshots."""
 from __future__ import annotations
+import hashlib
 import json
+import logging
+import threading
 from typing import Sequence, Dict, Any, Optional, List
+from azure.core.credentials import TokenCredential
+from azure.core.pipeline.transport import HttpTransport
 from azure.identity import ClientSecretCredential
-from azure.storage.blob import BlobServiceClient
-from mapper_api.domain.repositories.definitions import DefinitionsRepository
+from mapper_api.application.ports.blob_store import BlobStore
+from mapper_api.domain.repositories.definitions import DefinitionsRepository, DefinitionsSnapshot, ThemeRow
 from mapper_api.domain.entities.cluster import Cluster
 from mapper_api.domain.entities.taxonomy import Taxonomy
 from mapper_api.domain.entities.risk_theme import RiskTheme
+from mapper_api.infrastructure.azure.blob_store import AzureBlobStore
+from mapper_api.infrastructure.local.definitions_snapshot_file import DefinitionsSnapshotFile, StoredDefinitions
+
+TAXONOMY_BLOB = "taxonomy.json"
+FIVEWS_BLOB = "5ws.json"
 
 
 class BlobDefinitionsRepository(DefinitionsRepository):
     def __init__(
         self,
         *,
-        account_name: str,
-        container_name: str,
-        tenant_id: str,
-        client_id: str,
-        client_secret: str,
+        account_name: str = "",
+        container_name: str = "",
+        tenant_id: str = "",
+        client_id: str = "",
+        client_secret: str = "",
+        transport: Optional[HttpTransport] = None,
+        credential: Optional[TokenCredential] = None,
+        snapshot_file: Optional[DefinitionsSnapshotFile] = None,
+        store: Optional[BlobStore] = None,
     ) -> None:
-        self._credential = ClientSecretCredential(tenant_id=tenant_id, client_id=client_id, client_secret=client_secret)
-        self._service = BlobServiceClient(
-            account_url=f"https://{account_name}.blob.core.windows.net",
-            credential=self._credential,
+        # An explicit store (local/in-memory backends) replaces the Azure container
+        self._store = store or AzureBlobStore.connect(
+            account_name=account_name,
+            container_name=container_name,
+            # Prefer the shared process-wide credential so tokens are fetched once, ahead of expiry
+            credential=credential or ClientSecretCredential(
+                tenant_id=tenant_id, client_id=client_id, client_secret=client_secret
+            ),
+            transport=transport,
         )
-        self._container = self._service.get_container_client(container_name)
-        self._fivews: Optional[Sequence[Dict[str, Any]]] = None
-        self._domain_hierarchy: Optional[Dict[str, List]] = None
+        self._refresh_lock = threading.Lock()
+        self._etags: Dict[str, str] = {}
+        self._raw: Dict[str, bytes] = {}
+        self._snapshot: Optional[DefinitionsSnapshot] = None
+        self._snapshot_file = snapshot_file
+        self._logger = logging.getLogger("mapper.definitions")
+        self.loaded_from_local_snapshot = False
         self._load()
 
     def _load(self) -> None:
-        self._fivews = self._load_fivews()
-        # Load raw theme data and convert to domain entities
-        raw_themes = self._load_raw_themes()
-        if raw_themes:
-            self._domain_hierarchy = self._build_domain_hierarchy(raw_themes)
-
-    def _load_raw_themes(self):
-        """Load raw theme data from blob storage."""
-        from mapper_api.domain.repositories.definitions import ThemeRow  # Import only for internal use
-        
-        blob = self._container.get_blob_client("taxonomy.json")
-        data = blob.download_blob().readall()
+        # Stale-while-revalidate: serve the last good local copy straight away and
+        # leave revalidation against blob to the background refresher
+        if self._snapshot_file is not None:
+            stored = self._snapshot_file.load()
+            if stored is not None and {TAXONOMY_BLOB, FIVEWS_BLOB} <= stored.blobs.keys():
+                self._raw = dict(stored.blobs)
+                self._etags = dict(stored.etags)
+                self._snapshot = self._build_snapshot(self._raw[TAXONOMY_BLOB], self._raw[FIVEWS_BLOB])
+                self.loaded_from_local_snapshot = True
+                return
+        self.refresh()
+
+    def warm_up(self) -> None:
+        """Fetch the AAD token and open a pooled TLS connection to the storage account."""
+        self._store.ping()
+
+    @property
+    def snapshot(self) -> Optional[DefinitionsSnapshot]:
+        """Current immutable definitions snapshot."""
+        return self._snapshot
+
+    def refresh(self) -> bool:
+        """
+        Re-read both blobs with conditional GETs (If-None-Match on the last ETag).
+
+        Returns True when a new snapshot was built and swapped in, False when
+        neither blob changed. Parsing happens before the swap, so readers never
+        observe a half-built snapshot.
+        """
+        with self._refresh_lock:
+            changed = False
+            for name in (TAXONOMY_BLOB, FIVEWS_BLOB):
+                downloaded = self._store.download(name, etag=self._etags.get(name))
+                if downloaded is not None:
+                    self._raw[name], self._etags[name] = downloaded
+                    changed = True
+
+            if not changed and self._snapshot is not None:
+                return False
+
+            self._snapshot = self._build_snapshot(self._raw[TAXONOMY_BLOB], self._raw[FIVEWS_BLOB])
+            self._persist()
+            return True
+
+    def _persist(self) -> None:
+        """Write the last good blobs to the local snapshot file (best effort)."""
+        if self._snapshot_file is None or self._snapshot is None:
+            return
+        try:
+            self._snapshot_file.save(StoredDefinitions(
+                version=self._snapshot.version,
+                blobs=dict(self._raw),
+                etags=dict(self._etags),
+            ))
+        except Exception as e:
+            self._logger.warning("definitions.snapshot_write_failed", extra={"error": f"{type(e).__name__}: {e}"})
+
+    @staticmethod
+    def _build_snapshot(taxonomy_data: bytes, fivews_data: bytes) -> DefinitionsSnapshot:
+        # Content-derived version: identical across workers that loaded the same blobs
+        digest = hashlib.sha256(taxonomy_data + b"\0" + fivews_data).hexdigest()[:12]
+        return DefinitionsSnapshot.from_rows(
+            version=digest,
+            theme_rows=BlobDefinitionsRepository._parse_theme_rows(taxonomy_data),
+            fivews=BlobDefinitionsRepository._parse_fivews(fivews_data),
+        )
+
+    @staticmethod
+    def _parse_theme_rows(data: bytes) -> List[ThemeRow]:
+        """Parse raw theme data from taxonomy.json."""
         rows = json.loads(data)
         result: list[ThemeRow] = []
         for r in rows:
@@ -61,74 +142,32 @@ class BlobDefinitionsRepository(DefinitionsRepository):
             )
         return result
 
-    def _build_domain_hierarchy(self, theme_rows) -> Dict[str, List]:
-        """Convert flat ThemeRow data into proper domain entities."""
-        clusters = {}
-        taxonomies = {}
-        risk_themes = []
-
-        for row in theme_rows:
-            # Build cluster (deduplicated)
-            if row.cluster_id not in clusters:
-                clusters[row.cluster_id] = Cluster(
-                    id=row.cluster_id,
-                    name=row.cluster
-                )
-
-            # Build taxonomy (deduplicated)
-            if row.taxonomy_id not in taxonomies:
-                taxonomies[row.taxonomy_id] = Taxonomy(
-                    id=row.taxonomy_id,
-                    name=row.taxonomy,
-                    description=row.taxonomy_description,
-                    cluster_id=row.cluster_id
-                )
-
-            # Build risk theme (each row = one theme) with all fields
-            risk_theme = RiskTheme(
-                id=row.risk_theme_id,
-                name=row.risk_theme,
-                description=row.risk_theme_description,
-                taxonomy_id=row.taxonomy_id,
-                taxonomy=row.taxonomy,
-                taxonomy_description=row.taxonomy_description,
-                cluster=row.cluster,
-                cluster_id=row.cluster_id,
-                mapping_considerations=row.mapping_considerations
-            )
-            risk_themes.append(risk_theme)
-
-        return {
-            "clusters": list(clusters.values()),
-            "taxonomies": list(taxonomies.values()),
-            "risk_themes": risk_themes
-        }
-
-    def _load_fivews(self) -> Sequence[Dict[str, Any]]:
-        blob = self._container.get_blob_client("5ws.json")
-        data = blob.download_blob().readall()
+    @staticmethod
+    def _parse_fivews(data: bytes) -> Sequence[Dict[str, Any]]:
         obj = json.loads(data)
         order = ["who", "what", "when", "where", "why"]
         return [{"name": k, "description": obj[k]} for k in order if k in obj]
 
     def get_fivews_rows(self) -> Sequence[Dict[str, Any]]:
-        return self._fivews or []
+        if not self._snapshot:
+            return []
+        return self._snapshot.get_fivews_rows()
 
     # Domain-oriented methods
     def get_clusters(self) -> List[Cluster]:
         """Return all clusters as domain entities."""
-        if not self._domain_hierarchy:
+        if not self._snapshot:
             return []
-        return self._domain_hierarchy["clusters"]
+        return self._snapshot.get_clusters()
 
     def get_taxonomies(self) -> List[Taxonomy]:
         """Return all taxonomies as domain entities."""
-        if not self._domain_hierarchy:
+        if not self._snapshot:
             return []
-        return self._domain_hierarchy["taxonomies"]
+        return self._snapshot.get_taxonomies()
 
     def get_risk_themes(self) -> List[RiskTheme]:
         """Return all risk themes as domain entities."""
-        if not self._domain_hierarchy:
+        if not self._snapshot:
             return []
-        return self._domain_hierarchy["risk_themes"]
+        return self._snapshot.get_risk_themes()
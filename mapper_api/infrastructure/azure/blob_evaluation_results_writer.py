@@ -1,11 +1,15 @@
 """Azure Blob adapter to write evaluation results to blob storage."""
 from __future__ import annotations
 import json
-from datetime import datetime
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Mapping, Optional, Union
+from azure.core.credentials import TokenCredential
+from azure.core.pipeline.transport import HttpTransport
 from azure.identity import ClientSecretCredential
-from azure.storage.blob import BlobServiceClient
+from mapper_api.application.ports.blob_store import BlobStore
 from mapper_api.domain.value_objects.evaluation_result import EvaluationResult
+from mapper_api.infrastructure.azure import evaluation_results_layout as layout
+from mapper_api.infrastructure.azure.blob_store import AzureBlobStore
 
 
 class BlobEvaluationResultsWriter:
@@ -14,22 +18,29 @@ class BlobEvaluationResultsWriter:
     def __init__(
         self,
         *,
-        account_name: str,
-        container_name: str,
-        tenant_id: str,
-        client_id: str,
-        client_secret: str,
+        account_name: str = "",
+        container_name: str = "",
+        tenant_id: str = "",
+        client_id: str = "",
+        client_secret: str = "",
+        transport: Optional[HttpTransport] = None,
+        credential: Optional[TokenCredential] = None,
+        max_concurrency: int = 4,
+        store: Optional[BlobStore] = None,
     ) -> None:
-        self._credential = ClientSecretCredential(
-            tenant_id=tenant_id, 
-            client_id=client_id, 
-            client_secret=client_secret
+        # An explicit store (local/in-memory backends) replaces the Azure container
+        self._store = store or AzureBlobStore.connect(
+            account_name=account_name,
+            container_name=container_name,
+            # Prefer the shared process-wide credential so tokens are fetched once, ahead of expiry
+            credential=credential or ClientSecretCredential(
+                tenant_id=tenant_id, 
+                client_id=client_id, 
+                client_secret=client_secret
+            ),
+            transport=transport,
+            max_concurrency=max_concurrency,
         )
-        self._service = BlobServiceClient(
-            account_url=f"https://{account_name}.blob.core.windows.net",
-            credential=self._credential,
-        )
-        self._container = self._service.get_container_client(container_name)
 
     def write_evaluation_result(
         self, 
@@ -41,6 +52,11 @@ class BlobEvaluationResultsWriter:
         """
         Write evaluation result to blob storage.
         
+        Individual results are encoded to gzip NDJSON chunk by chunk and
+        uploaded to ``{metric_type}.records.ndjson.gz`` (the result itself is
+        already in memory; the serialized document never is). The aggregate
+        goes to a small ``{metric_type}.summary.json`` written afterwards.
+        
         Args:
             record_id: The record ID from the evaluation request
             timestamp: Timestamp string for directory naming
@@ -48,29 +64,61 @@ class BlobEvaluationResultsWriter:
             evaluation_result: The evaluation result to write
             
         Returns:
-            str: The blob path where the result was written
+            str: The blob path of the summary file
         """
-        # Create blob path: evaluation/results/{record_id}_{timestamp}/{metric_type}.json
-        blob_path = f"evaluation/results/{record_id}_{timestamp}/{metric_type}.json"
+        directory = self.get_directory_path(record_id, timestamp)
+        records_blob = layout.records_path(directory, metric_type)
+        summary_blob = layout.summary_path(directory, metric_type)
         
-        # Convert evaluation result to JSON-serializable format
-        result_data = self._serialize_evaluation_result(evaluation_result)
-        
-        # Write to blob storage
-        blob_client = self._container.get_blob_client(blob_path)
-        blob_client.upload_blob(
-            json.dumps(result_data, indent=2),
-            overwrite=True,
-            content_type="application/json"
+        # Records first: a summary is only visible once its records are complete
+        self._store.upload(
+            records_blob,
+            layout.gzip_ndjson_chunks(layout.result_records(evaluation_result)),
+            content_type="application/gzip",
+        )
+        self._store.upload(
+            summary_blob,
+            layout.summary_document(evaluation_result, records_blob),
+            content_type="application/json",
         )
         
-        return blob_path
+        return summary_blob
+
+    def write_evaluation_results(
+        self,
+        record_id: str,
+        timestamp: str,
+        results: Mapping[str, EvaluationResult],
+    ) -> Dict[str, Union[str, BaseException]]:
+        """
+        Write every metric's result concurrently.
+        
+        Returns metric type -> summary path, or the exception for metrics whose
+        upload failed, so one failed metric does not discard the others.
+        """
+        if not results:
+            return {}
+        outcomes: Dict[str, Union[str, BaseException]] = {}
+        with ThreadPoolExecutor(max_workers=len(results), thread_name_prefix="results-upload") as pool:
+            futures = {
+                metric_type: pool.submit(self.write_evaluation_result, record_id, timestamp, metric_type, result)
+                for metric_type, result in results.items()
+            }
+            for metric_type, future in futures.items():
+                error = future.exception()
+                outcomes[metric_type] = error if error is not None else future.result()
+        return outcomes
+
+    def read_summaries(self, directory: str) -> Dict[str, Dict[str, Any]]:
+        """Fetch every metric summary in a results directory without downloading any records."""
+        summaries: Dict[str, Dict[str, Any]] = {}
+        for name in self._store.list_names(f"{directory}/"):
+            if name.endswith(layout.SUMMARY_SUFFIX):
+                data, _ = self._store.download(name)
+                document = json.loads(data)
+                summaries[document["metric_type"]] = document
+        return summaries
     
     def get_directory_path(self, record_id: str, timestamp: str) -> str:
         """Get the directory path for evaluation results."""
-        return f"evaluation/results/{record_id}_{timestamp}"
-
-    def _serialize_evaluation_result(self, result: EvaluationResult) -> Dict[str, Any]:
-        """Convert EvaluationResult to JSON-serializable dictionary."""
-        return result.to_dict()
-
+        return layout.directory_path(record_id, timestamp)
@@ -2,8 +2,10 @@
 from __future__ import annotations
 import json
 from typing import Sequence, Optional
+from azure.core.credentials import TokenCredential
+from azure.core.pipeline.transport import HttpTransport
 from azure.identity import ClientSecretCredential
-from azure.storage.blob import BlobServiceClient
+from mapper_api.application.ports.blob_store import BlobStore
 from mapper_api.domain.repositories.ground_truth import (
     GroundTruthRepository,
     FiveWGroundTruthRecord,
@@ -11,6 +13,10 @@ from mapper_api.domain.repositories.ground_truth import (
     RiskThemeGroundTruthRecord,
     RiskThemeGroundTruth,
 )
+from mapper_api.infrastructure.azure.blob_store import AzureBlobStore
+
+FIVEWS_GT_BLOB = "gt_5ws.json"
+RISK_THEMES_GT_BLOB = "gt_risk_themes.json"
 
 
 class BlobGroundTruthRepository(GroundTruthRepository):
@@ -19,22 +25,27 @@ class BlobGroundTruthRepository(GroundTruthRepository):
     def __init__(
         self,
         *,
-        account_name: str,
-        container_name: str,
-        tenant_id: str,
-        client_id: str,
-        client_secret: str,
+        account_name: str = "",
+        container_name: str = "",
+        tenant_id: str = "",
+        client_id: str = "",
+        client_secret: str = "",
+        transport: Optional[HttpTransport] = None,
+        credential: Optional[TokenCredential] = None,
+        store: Optional[BlobStore] = None,
     ) -> None:
-        self._credential = ClientSecretCredential(
-            tenant_id=tenant_id, 
-            client_id=client_id, 
-            client_secret=client_secret
-        )
-        self._service = BlobServiceClient(
-            account_url=f"https://{account_name}.blob.core.windows.net",
-            credential=self._credential,
+        # An explicit store (local/in-memory backends) replaces the Azure container
+        self._store = store or AzureBlobStore.connect(
+            account_name=account_name,
+            container_name=container_name,
+            # Prefer the shared process-wide credential so tokens are fetched once, ahead of expiry
+            credential=credential or ClientSecretCredential(
+                tenant_id=tenant_id, 
+                client_id=client_id, 
+                client_secret=client_secret
+            ),
+            transport=transport,
         )
-        self._container = self._service.get_container_client(container_name)
         self._fivews_gt: Optional[Sequence[FiveWGroundTruthRecord]] = None
         self._risk_themes_gt: Optional[Sequence[RiskThemeGroundTruthRecord]] = None
         self._load()
@@ -46,8 +57,11 @@ class BlobGroundTruthRepository(GroundTruthRepository):
 
     def _load_fivews_ground_truth(self) -> Sequence[FiveWGroundTruthRecord]:
         """Load 5Ws ground truth from gt_5ws.json."""
-        blob = self._container.get_blob_client("gt_5ws.json")
-        data = blob.download_blob().readall()
+        data, _ = self._store.download(FIVEWS_GT_BLOB)
+        return self._parse_fivews_ground_truth(data)
+
+    @staticmethod
+    def _parse_fivews_ground_truth(data: bytes) -> Sequence[FiveWGroundTruthRecord]:
         records = json.loads(data)
         
         result: list[FiveWGroundTruthRecord] = []
@@ -72,8 +86,11 @@ class BlobGroundTruthRepository(GroundTruthRepository):
 
     def _load_risk_themes_ground_truth(self) -> Sequence[RiskThemeGroundTruthRecord]:
         """Load risk themes ground truth from gt_risk_themes.json."""
-        blob = self._container.get_blob_client("gt_risk_themes.json")
-        data = blob.download_blob().readall()
+        data, _ = self._store.download(RISK_THEMES_GT_BLOB)
+        return self._parse_risk_themes_ground_truth(data)
+
+    @staticmethod
+    def _parse_risk_themes_ground_truth(data: bytes) -> Sequence[RiskThemeGroundTruthRecord]:
         records = json.loads(data)
         
         result: list[RiskThemeGroundTruthRecord] = []
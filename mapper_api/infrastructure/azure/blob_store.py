@@ -0,0 +1,69 @@
+"""Azure Blob Storage implementation of the BlobStore port."""
+from __future__ import annotations
+from typing import List, Optional, Tuple
+
+from azure.core import MatchConditions
+from azure.core.credentials import TokenCredential
+from azure.core.exceptions import ResourceNotFoundError, ResourceNotModifiedError
+from azure.core.pipeline.transport import HttpTransport
+from azure.storage.blob import BlobServiceClient, ContainerClient, ContentSettings
+from mapper_api.application.ports.blob_store import BlobData, BlobNotFoundError
+
+
+class AzureBlobStore:
+    """
+    BlobStore over one container of an Azure storage account.
+
+    Downloads and uploads pass ``max_concurrency`` so large blobs transfer in
+    parallel chunks; conditional downloads use If-None-Match on the ETag.
+    """
+
+    def __init__(self, container: ContainerClient, *, max_concurrency: int = 4) -> None:
+        self._container = container
+        self._max_concurrency = max_concurrency
+
+    @classmethod
+    def connect(
+        cls,
+        *,
+        account_name: str,
+        container_name: str,
+        credential: TokenCredential,
+        transport: Optional[HttpTransport] = None,
+        max_concurrency: int = 4,
+    ) -> "AzureBlobStore":
+        service = BlobServiceClient(
+            account_url=f"https://{account_name}.blob.core.windows.net",
+            credential=credential,
+            transport=transport,
+        )
+        return cls(service.get_container_client(container_name), max_concurrency=max_concurrency)
+
+    def download(self, name: str, *, etag: Optional[str] = None) -> Optional[Tuple[bytes, str]]:
+        blob = self._container.get_blob_client(name)
+        try:
+            if etag:
+                downloader = blob.download_blob(
+                    etag=etag, match_condition=MatchConditions.IfModified, max_concurrency=self._max_concurrency
+                )
+            else:
+                downloader = blob.download_blob(max_concurrency=self._max_concurrency)
+        except ResourceNotModifiedError:
+            return None
+        except ResourceNotFoundError as e:
+            raise BlobNotFoundError(name) from e
+        return downloader.readall(), downloader.properties.etag
+
+    def upload(self, name: str, data: BlobData, *, content_type: str) -> None:
+        self._container.get_blob_client(name).upload_blob(
+            data,
+            overwrite=True,
+            content_settings=ContentSettings(content_type=content_type),
+            max_concurrency=self._max_concurrency,
+        )
+
+    def list_names(self, prefix: str) -> List[str]:
+        return [blob.name for blob in self._container.list_blobs(name_starts_with=prefix)]
+
+    def ping(self) -> None:
+        self._container.get_container_properties()
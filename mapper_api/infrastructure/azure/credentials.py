@@ -0,0 +1,347 @@
+"""Process-wide AAD credential with proactive token refresh and an optional cross-worker cache.
+
+Wraps ``ClientSecretCredential`` so no request thread ever waits on
+login.microsoftonline.com: tokens are refreshed on a daemon thread ahead of
+expiry, and worker processes can share tokens through a locked local file.
+"""
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from azure.core.credentials import AccessToken, TokenCredential
+from azure.core.credentials_async import AsyncTokenCredential
+
+try:
+    import fcntl
+except ImportError:  # Windows: the file cache still works, without cross-process locking
+    fcntl = None  # type: ignore[assignment]
+
+STORAGE_SCOPE = "https://storage.azure.com/.default"
+
+
+class TokenCacheFile:
+    """
+    JSON file of access tokens keyed by scope, shared by worker processes.
+
+    Created with 0600 permissions. ``locked()`` holds an exclusive flock on a
+    sidecar lock file so only one worker goes to AAD when the token is stale.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+        self._lock_path = self._path.with_name(self._path.name + ".lock")
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self._lock_path, os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def read(self, key: str) -> Optional[AccessToken]:
+        try:
+            entry = json.loads(self._path.read_text(encoding="utf-8")).get(key)
+        except (FileNotFoundError, ValueError):
+            return None
+        if not entry:
+            return None
+        return AccessToken(entry["token"], int(entry["expires_on"]))
+
+    def write(self, key: str, token: AccessToken) -> None:
+        try:
+            entries = json.loads(self._path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            entries = {}
+        entries[key] = {"token": token.token, "expires_on": token.expires_on}
+
+        fd, tmp_path = tempfile.mkstemp(dir=self._path.parent, prefix=self._path.name, suffix=".tmp")
+        try:
+            os.chmod(tmp_path, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self._path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+
+class ProactiveTokenCredential(TokenCredential):
+    """
+    Caching ``TokenCredential`` that refreshes tokens before they expire.
+
+    ``get_token`` serves from memory while the token has more than
+    ``refresh_margin_s`` left. A background thread refreshes each cached
+    scope when it enters that margin, so callers only block on AAD for the
+    very first token of a scope (or if background refresh keeps failing
+    until the token actually expires).
+    """
+
+    def __init__(
+        self,
+        inner: TokenCredential,
+        *,
+        refresh_margin_s: float = 300.0,
+        retry_interval_s: float = 30.0,
+        cache_file: Optional[TokenCacheFile] = None,
+    ) -> None:
+        self._inner = inner
+        self._refresh_margin_s = refresh_margin_s
+        self._retry_interval_s = retry_interval_s
+        self._cache_file = cache_file
+        self._tokens: Dict[Tuple[str, ...], AccessToken] = {}
+        self._retry_at: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+        self._acquire_lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._logger = logging.getLogger("mapper.credentials")
+
+        self._acquisitions_total = 0
+        self._acquisition_failures_total = 0
+        self._acquisition_ms_total = 0.0
+        self._acquisition_ms_max = 0.0
+        self._acquisition_ms_last: Optional[float] = None
+        self._memory_hits_total = 0
+        self._file_hits_total = 0
+        self._background_refreshes_total = 0
+        self._stale_returns_total = 0
+
+    def _fresh(self, token: Optional[AccessToken]) -> bool:
+        return token is not None and token.expires_on - time.time() > self._refresh_margin_s
+
+    def get_token(self, *scopes: str, claims: Optional[str] = None, tenant_id: Optional[str] = None,
+                  **kwargs: Any) -> AccessToken:
+        if claims or tenant_id:
+            # Claims challenges / cross-tenant requests bypass the cache
+            return self._inner.get_token(*scopes, claims=claims, tenant_id=tenant_id, **kwargs)
+
+        token = self.cached_token(*scopes)
+        if token is not None:
+            return token
+        return self._acquire(tuple(sorted(scopes)), background=False)
+
+    def cached_token(self, *scopes: str) -> Optional[AccessToken]:
+        """Return the in-memory token for ``scopes`` if it is still valid, without blocking."""
+        with self._lock:
+            token = self._tokens.get(tuple(sorted(scopes)))
+            if token is not None and token.expires_on > time.time() + 1:
+                self._memory_hits_total += 1
+                return token
+        return None
+
+    def _acquire(self, key: Tuple[str, ...], *, background: bool) -> AccessToken:
+        # One acquisition at a time per process; other callers reuse its result
+        with self._acquire_lock:
+            with self._lock:
+                token = self._tokens.get(key)
+            if self._fresh(token):
+                return token  # type: ignore[return-value]
+
+            if self._cache_file is None:
+                token = self._fetch(key)
+            else:
+                cache_key = " ".join(key)
+                with self._cache_file.locked():
+                    token = self._cache_file.read(cache_key)
+                    if self._fresh(token):
+                        with self._lock:
+                            self._file_hits_total += 1
+                    else:
+                        token = self._fetch(key)
+                        self._cache_file.write(cache_key, token)
+
+            with self._lock:
+                self._tokens[key] = token
+                if self._fresh(token):
+                    self._retry_at.pop(key, None)
+                    if background:
+                        self._background_refreshes_total += 1
+                else:
+                    # The inner credential served a cached token already inside the margin (azure-identity
+                    # does for 30 s after a request, or when the margin exceeds its own): try again later
+                    # instead of spinning on a refresh that is due at once
+                    self._retry_at[key] = time.time() + self._retry_interval_s
+                self._ensure_refresher()
+                self._wake.notify()
+            return token
+
+    def _fetch(self, key: Tuple[str, ...]) -> AccessToken:
+        start = time.perf_counter()
+        try:
+            token = self._inner.get_token(*key)
+        except Exception:
+            with self._lock:
+                self._acquisition_failures_total += 1
+            raise
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if not self._fresh(token):
+            with self._lock:
+                self._stale_returns_total += 1
+            self._logger.debug("credentials.token_not_refreshed", extra={
+                "scopes": list(key), "expiresInS": int(token.expires_on - time.time()),
+            })
+            return token
+        with self._lock:
+            self._acquisitions_total += 1
+            self._acquisition_ms_total += elapsed_ms
+            self._acquisition_ms_max = max(self._acquisition_ms_max, elapsed_ms)
+            self._acquisition_ms_last = elapsed_ms
+        self._logger.info("credentials.token_acquired", extra={
+            "scopes": list(key),
+            "latencyMs": round(elapsed_ms, 1),
+            "expiresInS": int(token.expires_on - time.time()),
+        })
+        return token
+
+    # Background refresh
+    def _ensure_refresher(self) -> None:
+        # Called with self._lock held
+        if self._thread is None and not self._stopped:
+            self._thread = threading.Thread(target=self._run, name="aad-token-refresher", daemon=True)
+            self._thread.start()
+
+    def _next_due(self) -> Tuple[Optional[Tuple[str, ...]], float]:
+        # Called with self._lock held
+        due_key, due_at = None, float("inf")
+        for key, token in self._tokens.items():
+            at = max(token.expires_on - self._refresh_margin_s, self._retry_at.get(key, 0.0))
+            if at < due_at:
+                due_key, due_at = key, at
+        return due_key, due_at
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if self._stopped:
+                    return
+                key, due_at = self._next_due()
+                wait_s = due_at - time.time()
+                if key is None or wait_s > 0:
+                    self._wake.wait(timeout=None if key is None else wait_s)
+                    continue
+            try:
+                self._acquire(key, background=True)
+            except Exception as e:
+                # The current token is still usable; try again shortly
+                with self._lock:
+                    self._retry_at[key] = time.time() + self._retry_interval_s
+                self._logger.warning("credentials.refresh_failed", extra={
+                    "scopes": list(key), "error": f"{type(e).__name__}: {e}",
+                })
+
+    def stats(self) -> Dict[str, Any]:
+        """Token acquisition counters and latency (ms) for health/metrics endpoints."""
+        with self._lock:
+            now = time.time()
+            return {
+                "acquisitions_total": self._acquisitions_total,
+                "acquisition_failures_total": self._acquisition_failures_total,
+                "acquisition_ms_avg": (
+                    round(self._acquisition_ms_total / self._acquisitions_total, 1)
+                    if self._acquisitions_total else None
+                ),
+                "acquisition_ms_max": round(self._acquisition_ms_max, 1),
+                "acquisition_ms_last": (
+                    round(self._acquisition_ms_last, 1) if self._acquisition_ms_last is not None else None
+                ),
+                "memory_hits_total": self._memory_hits_total,
+                "file_cache_hits_total": self._file_hits_total,
+                "background_refreshes_total": self._background_refreshes_total,
+                "stale_returns_total": self._stale_returns_total,
+                "tokens": {
+                    " ".join(key): {"expires_in_s": int(token.expires_on - now)}
+                    for key, token in self._tokens.items()
+                },
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._stopped = True
+            self._wake.notify_all()
+        close = getattr(self._inner, "close", None)
+        if close is not None:
+            close()
+
+
+class AsyncTokenCredentialAdapter(AsyncTokenCredential):
+    """
+    Async view of a ProactiveTokenCredential for ``azure.storage.blob.aio`` clients.
+
+    Cached tokens are returned without leaving the event loop; the rare
+    blocking acquisition runs in a worker thread. Closing the adapter does not
+    close the shared credential it wraps.
+    """
+
+    def __init__(self, credential: ProactiveTokenCredential) -> None:
+        self._credential = credential
+
+    async def get_token(self, *scopes: str, claims: Optional[str] = None, tenant_id: Optional[str] = None,
+                        **kwargs: Any) -> AccessToken:
+        token = self._credential.cached_token(*scopes)
+        if token is not None and not claims and not tenant_id:
+            return token
+        return await asyncio.to_thread(
+            self._credential.get_token, *scopes, claims=claims, tenant_id=tenant_id, **kwargs
+        )
+
+    async def close(self) -> None:
+        pass
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+
+
+_shared: Optional[ProactiveTokenCredential] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_credential(settings: Any) -> ProactiveTokenCredential:
+    """Return the process-wide credential, creating it from settings on first use."""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                from azure.identity import ClientSecretCredential
+
+                _shared = ProactiveTokenCredential(
+                    ClientSecretCredential(
+                        tenant_id=settings.AZURE_TENANT_ID,
+                        client_id=settings.AZURE_CLIENT_ID,
+                        client_secret=settings.AZURE_CLIENT_SECRET,
+                    ),
+                    refresh_margin_s=settings.AAD_TOKEN_REFRESH_MARGIN_S,
+                    cache_file=(
+                        TokenCacheFile(settings.AAD_TOKEN_CACHE_PATH) if settings.AAD_TOKEN_CACHE_PATH else None
+                    ),
+                )
+    return _shared
+
+
+def peek_shared_credential() -> Optional[ProactiveTokenCredential]:
+    """Return the shared credential if it was created, without creating it."""
+    return _shared
+
+
+def close_shared_credential() -> None:
+    """Stop background refresh and drop the shared credential (used at app shutdown)."""
+    global _shared
+    with _shared_lock:
+        credential, _shared = _shared, None
+    if credential is not None:
+        credential.close()
@@ -0,0 +1,84 @@
+"""Background poller that republishes definitions when the blobs change."""
+from __future__ import annotations
+import logging
+import threading
+from typing import Callable, Optional, Protocol
+
+from mapper_api.domain.repositories.definitions import DefinitionsSnapshot
+
+
+class RefreshableDefinitions(Protocol):
+    @property
+    def snapshot(self) -> Optional[DefinitionsSnapshot]: ...
+
+    def refresh(self) -> bool: ...
+
+
+class DefinitionsRefresher:
+    """
+    Poll a refreshable definitions source on a daemon thread.
+
+    Each poll is a pair of conditional GETs; when a blob changed the new
+    snapshot is handed to ``on_snapshot`` (which compiles and swaps it) on
+    this thread, never on a request thread.
+    """
+
+    def __init__(
+        self,
+        *,
+        source: RefreshableDefinitions,
+        on_snapshot: Callable[[DefinitionsSnapshot], None],
+        interval_s: float,
+    ) -> None:
+        self._source = source
+        self._on_snapshot = on_snapshot
+        self._interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._logger = logging.getLogger("mapper.definitions")
+
+    def poll_once(self) -> bool:
+        """Run one conditional refresh; returns True when a new snapshot was published."""
+        if not self._source.refresh():
+            return False
+        snapshot = self._source.snapshot
+        if snapshot is None:
+            return False
+        self._on_snapshot(snapshot)
+        self._logger.info("definitions.reloaded", extra={"definitionsVersion": snapshot.version})
+        return True
+
+    def _poll_safely(self) -> None:
+        try:
+            self.poll_once()
+        except Exception as e:
+            # Keep serving the last good snapshot; try again next interval
+            self._logger.warning("definitions.refresh_failed", extra={"error": f"{type(e).__name__}: {e}"})
+
+    def _run(self, poll_immediately: bool) -> None:
+        if poll_immediately:
+            self._poll_safely()
+        if self._interval_s <= 0:
+            return
+        while not self._stop.wait(self._interval_s):
+            self._poll_safely()
+
+    def start(self, *, poll_immediately: bool = False) -> None:
+        """
+        Start polling. ``poll_immediately`` revalidates once right away (even when
+        periodic polling is disabled), used when serving a stale local snapshot.
+        """
+        if self._thread is not None:
+            return
+        if self._interval_s <= 0 and not poll_immediately:
+            return
+        self._thread = threading.Thread(
+            target=self._run, args=(poll_immediately,), name="definitions-refresher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
@@ -0,0 +1,77 @@
+"""Blob layout and encoding of evaluation results: a small summary JSON plus gzip NDJSON records.
+
+evaluation/results/{record_id}_{timestamp}/
+    {metric_type}.summary.json        metric, summary_result, record count, records path
+    {metric_type}.records.ndjson.gz   one individual result per line, gzip-compressed
+
+The records blob is written first, so a summary's presence means its records
+are complete. Readers list/download ``*.summary.json`` only to get scores.
+The API response's ``file_path`` is the summary; the records path is in it.
+"""
+from __future__ import annotations
+import json
+import zlib
+from typing import Any, Dict, Iterable, Iterator
+
+from mapper_api.domain.value_objects.evaluation_result import EvaluationResult
+
+RESULTS_ROOT = "evaluation/results"
+SUMMARY_SUFFIX = ".summary.json"
+RECORDS_SUFFIX = ".records.ndjson.gz"
+RECORDS_FORMAT = "ndjson+gzip"
+
+# Compressed bytes per yielded chunk (one staged block per chunk when uploading)
+_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def directory_path(record_id: str, timestamp: str) -> str:
+    return f"{RESULTS_ROOT}/{record_id}_{timestamp}"
+
+
+def summary_path(directory: str, metric_type: str) -> str:
+    return f"{directory}/{metric_type}{SUMMARY_SUFFIX}"
+
+
+def records_path(directory: str, metric_type: str) -> str:
+    return f"{directory}/{metric_type}{RECORDS_SUFFIX}"
+
+
+def summary_document(result: EvaluationResult, records_blob: str) -> bytes:
+    """Small JSON document with the aggregate result and a pointer to the records."""
+    document: Dict[str, Any] = {
+        "metric_type": result.metric_type.value,
+        "summary_result": result.summary_result.to_dict() if result.summary_result else None,
+        "record_count": len(result.individual_results),
+        "records_path": records_blob,
+        "records_format": RECORDS_FORMAT,
+    }
+    if result.error_message:
+        document["error_message"] = result.error_message
+    if result.llm_usage is not None:
+        document["llm_usage"] = result.llm_usage
+    return json.dumps(document, indent=2).encode("utf-8")
+
+
+def gzip_ndjson_chunks(records: Iterable[Dict[str, Any]], chunk_size: int = _CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Serialize and gzip records one line at a time.
+
+    The serialized document is never built whole: only the current
+    compressed chunk is held. The records themselves are already in memory
+    (``EvaluationResult`` is complete before it is written), so this bounds
+    the encoding overhead, not the evaluation's own footprint.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    pending = bytearray()
+    for record in records:
+        pending += compressor.compress(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n")
+        if len(pending) >= chunk_size:
+            yield bytes(pending)
+            pending.clear()
+    pending += compressor.flush()
+    yield bytes(pending)
+
+
+def result_records(result: EvaluationResult) -> Iterator[Dict[str, Any]]:
+    """Individual results serialized lazily, in evaluation order."""
+    return (individual.to_dict() for individual in result.individual_results)
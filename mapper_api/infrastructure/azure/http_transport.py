@@ -0,0 +1,307 @@
+"""Shared pooled HTTP transport for Azure OpenAI and Azure Blob SDK clients.
+
+One process-wide transport keeps TLS connections to ``*.openai.azure.com`` and
+``*.blob.core.windows.net`` alive across adapters instead of every adapter
+opening its own pool.
+"""
+from __future__ import annotations
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from azure.core.pipeline.transport import AsyncioRequestsTransport, RequestsTransport
+
+from mapper_api.application.services.adaptive_concurrency import note_throttled
+from mapper_api.application.services.metrics import LLM_RATE_LIMITED
+
+
+def _deployment(url: httpx.URL) -> str:
+    # /openai/deployments/<deployment>/chat/completions
+    parts = url.path.split("/")
+    return parts[parts.index("deployments") + 1] if "deployments" in parts[:-1] else ""
+
+
+def _http2_available() -> bool:
+    """HTTP/2 in httpx needs the optional ``h2`` package (``httpx[http2]``)."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _CountedStream(httpx.SyncByteStream):
+    """Response body that reports once when it is closed, read to the end or not."""
+
+    def __init__(self, stream: Any, done: Callable[[], None]) -> None:
+        self._stream = stream
+        self._done = done
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            done, self._done = self._done, None
+            if done is not None:
+                done()
+
+
+class _CountedAsyncStream(httpx.AsyncByteStream):
+    def __init__(self, stream: Any, done: Callable[[], None]) -> None:
+        self._stream = stream
+        self._done = done
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            done, self._done = self._done, None
+            if done is not None:
+                done()
+
+
+class _CountingTransport(httpx.BaseTransport):
+    """
+    Counts a request as in flight from send until its response body is closed.
+
+    Counting here rather than in event hooks means a request that raises
+    (connect error, timeout, cancelled stream) is still counted out.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, owner: "SharedHttpTransport", kind: str) -> None:
+        self._transport = transport
+        self._owner = owner
+        self._kind = kind
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        done = self._owner._started(self._kind)
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException:
+            done(error=True)
+            raise
+        return httpx.Response(
+            response.status_code, headers=response.headers, extensions=response.extensions,
+            stream=_CountedStream(response.stream, done),
+        )
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class _CountingAsyncTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport, owner: "SharedHttpTransport", kind: str) -> None:
+        self._transport = transport
+        self._owner = owner
+        self._kind = kind
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        done = self._owner._started(self._kind)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            done(error=True)
+            raise
+        return httpx.Response(
+            response.status_code, headers=response.headers, extensions=response.extensions,
+            stream=_CountedAsyncStream(response.stream, done),
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class SharedHttpTransport:
+    """
+    Process-wide pooled HTTP transport.
+
+    Holds a sync and an async ``httpx`` client (HTTP/2 when available) for the
+    OpenAI SDK and a pooled ``requests`` session for the Blob SDK, whose sync
+    pipeline is requests-based. All share the same limits and timeouts.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry_s: float = 30.0,
+        connect_timeout_s: float = 5.0,
+        read_timeout_s: float = 60.0,
+        http2: bool = True,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._in_flight = {"sync": 0, "async": 0}
+        self._requests_total = 0
+        self._errors_total = 0
+
+        self.http2 = http2 and _http2_available()
+        self.connect_timeout_s = connect_timeout_s
+        self.read_timeout_s = read_timeout_s
+        self.max_connections = max_connections
+
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry_s,
+        )
+        timeout = httpx.Timeout(
+            connect=connect_timeout_s,
+            read=read_timeout_s,
+            write=read_timeout_s,
+            pool=connect_timeout_s,
+        )
+
+        self.sync_client = httpx.Client(
+            transport=self.counting(httpx.HTTPTransport(http2=self.http2, limits=limits)),
+            timeout=timeout,
+            event_hooks={"response": [self._on_response]},
+        )
+        self.async_client = httpx.AsyncClient(
+            transport=self.counting_async(httpx.AsyncHTTPTransport(http2=self.http2, limits=limits)),
+            timeout=timeout,
+            event_hooks={"response": [self._on_response_async]},
+        )
+
+        # Blob SDK: one requests session with a sized urllib3 pool, shared by every blob adapter
+        self._blob_adapter = HTTPAdapter(
+            pool_connections=max_keepalive_connections,
+            pool_maxsize=max_connections,
+        )
+        self.blob_session = requests.Session()
+        self.blob_session.mount("https://", self._blob_adapter)
+        self.blob_session.mount("http://", self._blob_adapter)
+
+    def blob_transport(self) -> RequestsTransport:
+        """Return a Blob SDK transport bound to the shared session (session is not owned)."""
+        return RequestsTransport(
+            session=self.blob_session,
+            session_owner=False,
+            connection_timeout=self.connect_timeout_s,
+            read_timeout=self.read_timeout_s,
+        )
+
+    def async_blob_transport(self) -> AsyncioRequestsTransport:
+        """
+        Return an ``azure.storage.blob.aio`` transport bound to the shared session.
+
+        Requests run on the default executor, so async callers never block the
+        event loop and still reuse the pooled blob connections (no aiohttp needed).
+        """
+        return AsyncioRequestsTransport(
+            session=self.blob_session,
+            session_owner=False,
+            connection_timeout=self.connect_timeout_s,
+            read_timeout=self.read_timeout_s,
+        )
+
+    def counting(self, transport: httpx.BaseTransport) -> httpx.BaseTransport:
+        """Wrap a sync httpx transport so its requests are counted in ``pool_stats``."""
+        return _CountingTransport(transport, self, "sync")
+
+    def counting_async(self, transport: httpx.AsyncBaseTransport) -> httpx.AsyncBaseTransport:
+        return _CountingAsyncTransport(transport, self, "async")
+
+    # Request accounting
+    def _started(self, kind: str) -> Callable[..., None]:
+        with self._lock:
+            self._in_flight[kind] += 1
+            self._requests_total += 1
+
+        def done(error: bool = False) -> None:
+            with self._lock:
+                self._in_flight[kind] -= 1
+                if error:
+                    self._errors_total += 1
+
+        return done
+
+    def _on_response(self, response: httpx.Response) -> None:
+        if response.status_code >= 500 or response.status_code == 429:
+            with self._lock:
+                self._errors_total += 1
+        if response.status_code == 429:
+            LLM_RATE_LIMITED.labels(_deployment(response.request.url)).inc()
+            # Also the 429s the SDK retries by itself: they must slow the adaptive limiter down
+            note_throttled()
+
+    async def _on_response_async(self, response: httpx.Response) -> None:
+        self._on_response(response)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Return a point-in-time view of pool utilization for both SDK paths."""
+        with self._lock:
+            stats: Dict[str, Any] = {
+                "http2": self.http2,
+                "openai": {
+                    "in_flight": sum(self._in_flight.values()),
+                    "requests_total": self._requests_total,
+                    "errors_total": self._errors_total,
+                    "sync_pool": {"in_flight": self._in_flight["sync"], "max_connections": self.max_connections},
+                    "async_pool": {"in_flight": self._in_flight["async"], "max_connections": self.max_connections},
+                },
+            }
+        stats["blob"] = self._urllib3_pool_stats()
+        return stats
+
+    def _urllib3_pool_stats(self) -> Dict[str, int]:
+        manager = self._blob_adapter.poolmanager
+        pools = [manager.pools[key] for key in list(manager.pools.keys())]
+        return {
+            "hosts": len(pools),
+            "connections_opened": sum(p.num_connections for p in pools),
+            "requests_total": sum(p.num_requests for p in pools),
+            "idle": sum(p.pool.qsize() for p in pools if p.pool is not None),
+        }
+
+    def close(self) -> None:
+        self.sync_client.close()
+        self.blob_session.close()
+
+    async def aclose(self) -> None:
+        await self.async_client.aclose()
+        self.close()
+
+
+_shared: Optional[SharedHttpTransport] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_transport(settings: Any) -> SharedHttpTransport:
+    """Return the process-wide transport, creating it from settings on first use."""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = SharedHttpTransport(
+                    max_connections=settings.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry_s=settings.HTTP_KEEPALIVE_EXPIRY_S,
+                    connect_timeout_s=settings.HTTP_CONNECT_TIMEOUT_S,
+                    read_timeout_s=settings.HTTP_READ_TIMEOUT_S,
+                    http2=settings.HTTP2_ENABLED,
+                )
+    return _shared
+
+
+def peek_shared_transport() -> Optional[SharedHttpTransport]:
+    """Return the shared transport if it was created, without creating it."""
+    return _shared
+
+
+async def close_shared_transport() -> None:
+    """Close and drop the shared transport (used at app shutdown)."""
+    global _shared
+    with _shared_lock:
+        transport, _shared = _shared, None
+    if transport is not None:
+        await transport.aclose()
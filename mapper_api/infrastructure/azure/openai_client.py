@@ -1,18 +1,151 @@
 """Azure OpenAI client calling Chat Completions with response_format json_schema."""
 from __future__ import annotations
 import time
-from typing import Mapping, Any, Optional
-from openai import AzureOpenAI
-from tenacity import retry, stop_after_attempt, wait_exponential
+from contextlib import ExitStack, nullcontext
+from typing import ContextManager, Mapping, Any, Optional, Dict, Iterator, Tuple
+import httpx
+from openai import APITimeoutError, AzureOpenAI, RateLimitError
+from tenacity import RetryCallState, retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
 import logging
+from mapper_api.application.services.adaptive_concurrency import AdaptiveConcurrencyLimiter
+from mapper_api.application.services.deadline import current_deadline
+from mapper_api.application.services.llm_usage import UsageEvent, record_llm_usage
+from mapper_api.application.services.metrics import (
+    LLM_COST,
+    LLM_DEADLINE_EXCEEDED,
+    LLM_REQUEST_DURATION,
+    LLM_RETRIES,
+    LLM_TIMEOUTS,
+    LLM_TOKENS,
+)
+from mapper_api.application.services.rate_limiter import LLMRateLimiter, estimate_tokens
+from mapper_api.application.services.stage_timing import record_stage, stage
+from mapper_api.application.services.tracing import activate, current_span, mark_error, span, start_span
+from mapper_api.domain.errors import DeadlineExceededError, LLMCapacityError
+
+# Waiting for capacity or the deadline already spent the caller's patience: not retried
+_NOT_RETRIED = (LLMCapacityError, DeadlineExceededError)
+# Shortest time a retry is given to finish before the request deadline
+_MIN_ATTEMPT_S = 0.5
+
+
+def _retry_deployment(retry_state: RetryCallState) -> str:
+    kwargs = retry_state.kwargs
+    return kwargs.get("deployment") or kwargs.get("model") or ""
+
+
+def _deadline_stop(retry_state: RetryCallState) -> bool:
+    # Skip a retry that cannot finish before the request deadline: it would only burn quota
+    deadline = current_deadline()
+    if deadline is None:
+        return False
+    attempt_s = retry_state.seconds_since_start / retry_state.attempt_number
+    if deadline.cancelled or deadline.remaining() < retry_state.upcoming_sleep + max(attempt_s, _MIN_ATTEMPT_S):
+        LLM_DEADLINE_EXCEEDED.labels(_retry_deployment(retry_state), "retry_skipped").inc()
+        return True
+    return False
+
+
+def _count_retry(retry_state: RetryCallState) -> None:
+    # Called by tenacity before sleeping between attempts
+    kwargs = retry_state.kwargs
+    deployment = _retry_deployment(retry_state)
+    schema_name = kwargs.get("schema_name") or (
+        (kwargs.get("response_format") or {}).get("json_schema", {}).get("name", "")
+    )
+    LLM_RETRIES.labels(deployment, schema_name).inc()
+    if retry_state.next_action is not None:
+        record_stage("llm.backoff", retry_state.next_action.sleep * 1000)
+    current = current_span()
+    if current.is_recording():
+        error = retry_state.outcome.exception() if retry_state.outcome is not None else None
+        current.set_attribute("mapper.llm.retry_count", retry_state.attempt_number)
+        current.add_event("llm.retry", {
+            "mapper.llm.attempt": retry_state.attempt_number,
+            "mapper.llm.outcome": llm_outcome(error),
+        })
+
+
+def llm_outcome(error: Optional[BaseException]) -> str:
+    if error is None:
+        return "ok"
+    if isinstance(error, (APITimeoutError, httpx.TimeoutException)):
+        return "timeout"
+    if isinstance(error, RateLimitError):
+        return "rate_limited"
+    return "error"
+
+
+def _span_attributes(model_name: str, schema_name: str, max_tokens: int, context: Optional[dict]) -> Dict[str, Any]:
+    # OpenTelemetry GenAI semantic conventions, plus this service's own keys
+    return dict(
+        gen_ai__system="az.ai.openai",
+        gen_ai__operation__name="chat",
+        gen_ai__request__model=model_name,
+        gen_ai__request__max_tokens=max_tokens,
+        mapper__llm__schema_name=schema_name,
+        mapper__llm__retry_count=0,
+        mapper__trace_id=(context or {}).get("trace_id"),
+    )
 
 
 class AzureOpenAILLMClient:
-    def __init__(self, *, endpoint: str, api_key: str, api_version: str) -> None:
-        self._client = AzureOpenAI(azure_endpoint=endpoint, api_key=api_key, api_version=api_version)
+    def __init__(
+        self,
+        *,
+        endpoint: str,
+        api_key: str,
+        api_version: str,
+        http_client: Optional[httpx.Client] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        rate_limiter: Optional[LLMRateLimiter] = None,
+    ) -> None:
+        self._client = AzureOpenAI(
+            azure_endpoint=endpoint,
+            api_key=api_key,
+            api_version=api_version,
+            http_client=http_client,
+        )
+        self._limiter = concurrency_limiter
+        self._rate_limiter = rate_limiter
         self._logger = logging.getLogger("mapper.llm")
 
-    @retry(stop=stop_after_attempt(2), wait=wait_exponential(multiplier=0.3, min=0.3, max=2.0))
+    def _slot(self) -> ContextManager[None]:
+        # A concurrency slot per attempt, so back-off sleeps between retries hold none
+        return self._limiter.slot() if self._limiter is not None else nullcontext()
+
+    def _attempt_client(self, deployment: str) -> AzureOpenAI:
+        # Under a request deadline an attempt gets only the time left, and the SDK's own retries (blind
+        # to the deadline) give way to the deadline-aware retry of this client
+        deadline = current_deadline()
+        if deadline is None:
+            return self._client
+        try:
+            remaining = deadline.check()
+        except DeadlineExceededError:
+            LLM_DEADLINE_EXCEEDED.labels(deployment, "cancelled" if deadline.cancelled else "expired").inc()
+            raise
+        return self._client.with_options(timeout=remaining, max_retries=0)
+
+    @staticmethod
+    def _deadline_error(deployment: str, error: Exception) -> Optional[DeadlineExceededError]:
+        """The attempt timed out because the request deadline passed: report that, not the timeout."""
+        deadline = current_deadline()
+        if deadline is None or llm_outcome(error) != "timeout" or not (deadline.expired or deadline.cancelled):
+            return None
+        LLM_DEADLINE_EXCEEDED.labels(deployment, "expired").inc()
+        return DeadlineExceededError(f"Request deadline of {deadline.timeout_s:g}s exceeded waiting for the LLM")
+
+    def _reserve_quota(self, deployment: str, request: Mapping[str, Any]) -> None:
+        # Every attempt counts against the deployment's RPM/TPM quota, retries included
+        if self._rate_limiter is not None:
+            tokens = estimate_tokens(*(m["content"] for m in request["messages"]), max_tokens=request["max_tokens"])
+            self._rate_limiter.acquire(deployment, tokens)
+
+    def warm_up(self) -> None:
+        """Open a pooled TLS connection to the endpoint with a token-free call (models list)."""
+        self._client.models.list()
+
     def json_schema_chat(
         self,
         *,
@@ -25,14 +158,146 @@ class AzureOpenAILLMClient:
         context: Optional[dict] = None,
         deployment: Optional[str] = None,
     ) -> str:
+        model_name = deployment if deployment else ""
+        with span(f"chat {model_name}", kind="client",
+                  **_span_attributes(model_name, schema_name, max_tokens, context)):
+            return self._complete(
+                deployment=model_name,
+                schema_name=schema_name,
+                request=self._request_kwargs(system, user, schema_name, schema, max_tokens, temperature, model_name),
+                context=context,
+            )
+
+    @retry(stop=stop_after_attempt(2) | _deadline_stop, wait=wait_exponential(multiplier=0.3, min=0.3, max=2.0),
+           retry=retry_if_not_exception_type(_NOT_RETRIED), before_sleep=_count_retry)
+    def _complete(self, *, deployment: str, schema_name: str, request: Dict[str, Any],
+                  context: Optional[dict]) -> str:
+        # One attempt; retried inside the caller's span so every attempt is accounted to it
+        self._reserve_quota(deployment, request)
+        with self._slot():
+            client = self._attempt_client(deployment)
+            start = time.perf_counter()
+            try:
+                with stage("llm.request"):
+                    resp = client.chat.completions.create(**request)
+            except Exception as e:
+                self._observe(deployment, schema_name, start, None, context, e)
+                deadline_error = self._deadline_error(deployment, e)
+                if deadline_error is not None:
+                    raise deadline_error from e
+                raise
+        latency_ms = int((time.perf_counter() - start) * 1000)
+        event = self._observe(deployment, schema_name, start, getattr(resp, "usage", None), context)
+        self._log_call("llm.chat.json_schema", context, deployment, latency_ms, getattr(resp, "usage", None), event)
+        content = resp.choices[0].message.content  # type: ignore[attr-defined]
+        return content
+
+    @retry(stop=stop_after_attempt(2) | _deadline_stop, wait=wait_exponential(multiplier=0.3, min=0.3, max=2.0),
+           retry=retry_if_not_exception_type(_NOT_RETRIED), before_sleep=_count_retry)
+    def _open_stream(self, **kwargs: Any) -> Tuple[Any, ExitStack]:
+        # Only opening the stream is retried; a stream that fails midway is surfaced to the caller.
+        # As in _complete the slot is taken per attempt, after the quota wait; the one of the stream
+        # that opened is handed to the caller, which holds it until the stream is drained or closed
+        self._reserve_quota(kwargs["model"], kwargs)
+        held = ExitStack()
+        held.enter_context(self._slot())
+        try:
+            client = self._attempt_client(kwargs["model"])
+            with stage("llm.request"):
+                stream = client.chat.completions.create(
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **kwargs,
+                )
+        except BaseException as e:
+            held.__exit__(type(e), e, e.__traceback__)
+            raise
+        return stream, held
+
+    def json_schema_chat_stream(
+        self,
+        *,
+        system: str,
+        user: str,
+        schema_name: str,
+        schema: Mapping[str, Any],
+        max_tokens: int,
+        temperature: float = 0.1,
+        context: Optional[dict] = None,
+        deployment: Optional[str] = None,
+    ) -> Iterator[str]:
+        """Yield content deltas of the strict-JSON answer as they are generated."""
         start = time.perf_counter()
+        deadline = current_deadline()
         model_name = deployment if deployment else ""
-        
+        # Ended by hand: the generator's body may resume in another context
+        chat_span = start_span(f"chat {model_name}", kind="client",
+                               mapper__llm__stream=True, **_span_attributes(model_name, schema_name, max_tokens, context))
+        try:
+            with activate(chat_span):
+                stream, held = self._open_stream(
+                    **self._request_kwargs(system, user, schema_name, schema, max_tokens, temperature, model_name)
+                )
+        except Exception as e:
+            self._observe(model_name, schema_name, start, None, context, e, chat_span=chat_span)
+            mark_error(chat_span, e)
+            chat_span.end()
+            raise
+
+        usage = None
+        first_token_ms = None
+        error: Optional[BaseException] = None
+        try:
+            for chunk in stream:
+                if deadline is not None and (deadline.cancelled or deadline.expired):
+                    # Stop generating (and paying for) tokens nobody will read
+                    LLM_DEADLINE_EXCEEDED.labels(model_name, "cancelled" if deadline.cancelled else "expired").inc()
+                    deadline.check()
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if first_token_ms is None:
+                        first_token_ms = int((time.perf_counter() - start) * 1000)
+                    yield delta
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            stream.close()
+            if error is not None:
+                held.__exit__(type(error), error, error.__traceback__)
+            else:
+                held.close()
+            latency_ms = int((time.perf_counter() - start) * 1000)
+            event = self._observe(model_name, schema_name, start, usage, context, error, chat_span=chat_span)
+            if chat_span.is_recording():
+                chat_span.set_attribute("mapper.llm.first_token_ms", first_token_ms)
+                if error is not None:
+                    mark_error(chat_span, error)
+            chat_span.end()
+            self._log_call(
+                "llm.chat.json_schema.stream", context, model_name, latency_ms, usage, event,
+                firstTokenMs=first_token_ms,
+            )
+
+    @staticmethod
+    def _request_kwargs(
+        system: str,
+        user: str,
+        schema_name: str,
+        schema: Mapping[str, Any],
+        max_tokens: int,
+        temperature: float,
+        model_name: str,
+    ) -> Dict[str, Any]:
         # Azure requires additionalProperties=false at root level for strict mode
         schema = dict(schema)
         schema.setdefault("additionalProperties", False)
 
-        resp = self._client.chat.completions.create(
+        return dict(
             model=model_name,
             messages=[
                 {"role": "system", "content": system},
@@ -50,11 +315,64 @@ class AzureOpenAILLMClient:
             top_p=1.0,
             max_tokens=max_tokens,
         )
-        latency_ms = int((time.perf_counter() - start) * 1000)
-        usage = getattr(resp, "usage", None)
+
+    @staticmethod
+    def _observe(
+        model_name: str,
+        schema_name: str,
+        start: float,
+        usage: Any,
+        context: Optional[dict] = None,
+        error: Optional[BaseException] = None,
+        *,
+        chat_span: Any = None,
+    ) -> Optional[UsageEvent]:
+        """
+        Per-attempt latency, outcome, token and cost metrics, usage accounting
+        (trackers, rolling windows) and the call's span; returns the usage event.
+        """
+        outcome = llm_outcome(error)
+        LLM_REQUEST_DURATION.labels(model_name, schema_name, outcome).observe(time.perf_counter() - start)
+        if outcome == "timeout":
+            LLM_TIMEOUTS.labels(model_name, schema_name).inc()
+        event = record_llm_usage(usage, deployment=model_name, schema_name=schema_name, context=context)
+        if event is None:
+            return None
+        prompt_tokens, completion_tokens, cached_tokens = (
+            event.prompt_tokens, event.completion_tokens, event.cached_tokens
+        )
+        for kind, tokens in (
+            ("prompt", prompt_tokens),
+            ("completion", completion_tokens),
+            ("cached", cached_tokens),
+        ):
+            if tokens:
+                LLM_TOKENS.labels(model_name, schema_name, kind).inc(tokens)
+        LLM_COST.labels(event.route, event.use_case, schema_name).inc(event.cost_usd)
+        chat_span = chat_span if chat_span is not None else current_span()
+        if chat_span.is_recording():
+            chat_span.set_attributes({
+                "gen_ai.usage.input_tokens": prompt_tokens,
+                "gen_ai.usage.output_tokens": completion_tokens,
+                "mapper.llm.cached_tokens": cached_tokens,
+                "mapper.llm.prompt_cache_hit": cached_tokens > 0,
+                "mapper.llm.cost_usd": event.cost_usd,
+            })
+        return event
+
+    def _log_call(
+        self,
+        message: str,
+        context: Optional[dict],
+        model_name: str,
+        latency_ms: int,
+        usage: Any,
+        event: Optional[UsageEvent] = None,
+        **extra: Any,
+    ) -> None:
         try:
             self._logger.info(
-                "llm.chat.json_schema",
+                message,
                 extra={
                     "traceId": (context or {}).get("trace_id"),
                     "deployment": model_name,
@@ -62,9 +380,14 @@ class AzureOpenAILLMClient:
                     "promptTokens": getattr(usage, "prompt_tokens", None) if usage else None,
                     "completionTokens": getattr(usage, "completion_tokens", None) if usage else None,
                     "totalTokens": getattr(usage, "total_tokens", None) if usage else None,
+                    "cachedTokens": event.cached_tokens if event else None,
+                    "costUsd": round(event.cost_usd, 6) if event else None,
+                    "schemaName": event.schema_name if event else None,
+                    "route": event.route if event else None,
+                    "useCase": event.use_case if event else None,
+                    "metricType": event.metric_type if event else None,
+                    **extra,
                 },
             )
         except Exception:
             pass
-        content = resp.choices[0].message.content  # type: ignore[attr-defined]
-        return content
@@ -1 +1 @@
-"""Local file-based infrastructure for development and testing (LLM + repositories)."""
+"""Infrastructure without Azure: local LLM, repositories and blob stores, Redis, and backend-agnostic decorators."""
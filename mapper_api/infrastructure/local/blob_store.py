@@ -0,0 +1,283 @@
+"""In-memory and local-filesystem BlobStore backends with optional latency/throughput injection.
+
+Lets the whole service (definitions, ground truth, /evaluator results) run
+without Azure: ``STORAGE_BACKEND=memory`` or ``local`` seeds the store from the
+bundled data files, and ``STORAGE_LATENCY_MS`` / ``STORAGE_THROUGHPUT_MB_S``
+make each operation cost roughly what a round trip to blob storage would.
+"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+from mapper_api.application.ports.blob_store import BlobData, BlobNotFoundError, BlobStore
+
+DATA_DIR = Path(__file__).parent / "data"
+CHUNK_SIZE = 64 * 1024
+
+
+def _etag(data: bytes) -> str:
+    # Content-derived, so restarts and separate processes agree on it
+    return '"' + hashlib.sha256(data).hexdigest()[:16] + '"'
+
+
+def _chunks(data: BlobData) -> Iterator[bytes]:
+    """Chunks of a streamed upload; file objects are read ``CHUNK_SIZE`` at a time, not by line."""
+    read = getattr(data, "read", None)
+    if read is not None:
+        return iter(lambda: read(CHUNK_SIZE), b"")
+    return iter(data)
+
+
+def _as_bytes(data: BlobData) -> bytes:
+    return bytes(data) if isinstance(data, (bytes, bytearray)) else b"".join(_chunks(data))
+
+
+class InMemoryBlobStore:
+    """Thread-safe dict of blobs; contents live for the lifetime of the process."""
+
+    def __init__(self, blobs: Optional[Mapping[str, bytes]] = None) -> None:
+        self._lock = threading.Lock()
+        self._blobs: Dict[str, Tuple[bytes, str]] = {
+            name: (bytes(data), _etag(data)) for name, data in (blobs or {}).items()
+        }
+
+    @classmethod
+    def from_directory(cls, directory: Union[str, Path] = DATA_DIR) -> "InMemoryBlobStore":
+        """Seed with every file under ``directory``, named by its relative path."""
+        root = Path(directory)
+        return cls({
+            path.relative_to(root).as_posix(): path.read_bytes()
+            for path in sorted(root.rglob("*")) if path.is_file()
+        })
+
+    def download(self, name: str, *, etag: Optional[str] = None) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            entry = self._blobs.get(name)
+        if entry is None:
+            raise BlobNotFoundError(name)
+        if etag is not None and entry[1] == etag:
+            return None
+        return entry
+
+    def upload(self, name: str, data: BlobData, *, content_type: str) -> None:
+        content = _as_bytes(data)
+        with self._lock:
+            self._blobs[name] = (content, _etag(content))
+
+    def list_names(self, prefix: str) -> List[str]:
+        with self._lock:
+            return sorted(name for name in self._blobs if name.startswith(prefix))
+
+    def ping(self) -> None:
+        pass
+
+
+class LocalFileBlobStore:
+    """
+    Blobs as files under ``root`` (``a/b.json`` -> ``root/a/b.json``).
+
+    Files from ``seed_dir`` are copied in on first start without overwriting
+    anything already there, so evaluation results and edited definitions
+    survive restarts. Writes are atomic (temp file + rename).
+    """
+
+    def __init__(self, root: Union[str, Path], *, seed_dir: Optional[Union[str, Path]] = None) -> None:
+        self._root = Path(root).resolve()
+        self._root.mkdir(parents=True, exist_ok=True)
+        if seed_dir is not None:
+            self._seed(Path(seed_dir))
+
+    def _seed(self, seed_dir: Path) -> None:
+        for source in sorted(seed_dir.rglob("*")):
+            if source.is_file():
+                name = source.relative_to(seed_dir).as_posix()
+                if not self._path(name).exists():
+                    self.upload(name, source.read_bytes(), content_type="application/octet-stream")
+
+    def _path(self, name: str) -> Path:
+        path = (self._root / name).resolve()
+        if path == self._root or self._root not in path.parents:
+            raise ValueError(f"Blob name escapes the storage root: {name!r}")
+        return path
+
+    def download(self, name: str, *, etag: Optional[str] = None) -> Optional[Tuple[bytes, str]]:
+        try:
+            data = self._path(name).read_bytes()
+        except (FileNotFoundError, IsADirectoryError) as e:
+            raise BlobNotFoundError(name) from e
+        current = _etag(data)
+        if etag is not None and current == etag:
+            return None
+        return data, current
+
+    def upload(self, name: str, data: BlobData, *, content_type: str) -> None:
+        path = self._path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if isinstance(data, (bytes, bytearray)):
+                    f.write(data)
+                else:
+                    for chunk in _chunks(data):
+                        f.write(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def list_names(self, prefix: str) -> List[str]:
+        names = (
+            path.relative_to(self._root).as_posix()
+            for path in self._root.rglob("*")
+            if path.is_file() and not path.name.endswith(".tmp")
+        )
+        return sorted(name for name in names if name.startswith(prefix))
+
+    def ping(self) -> None:
+        if not self._root.is_dir():
+            raise FileNotFoundError(str(self._root))
+
+
+@dataclass(frozen=True)
+class TransferProfile:
+    """
+    Simulated cost of one storage operation: fixed latency plus size / throughput.
+
+    ``throughput_mb_s`` is in megabytes per second; 0 means unlimited.
+    """
+    latency_ms: float = 0.0
+    throughput_mb_s: float = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.latency_ms > 0 or self.throughput_mb_s > 0
+
+    def transfer_s(self, nbytes: int) -> float:
+        return nbytes / (self.throughput_mb_s * 1_000_000) if self.throughput_mb_s > 0 else 0.0
+
+    def delay_s(self, nbytes: int = 0) -> float:
+        return self.latency_ms / 1000 + self.transfer_s(nbytes)
+
+
+class SimulatedLatencyBlobStore:
+    """
+    BlobStore decorator that sleeps for ``profile.delay_s(size)`` on every operation.
+
+    Streamed uploads stay streamed: the latency is paid once up front and the
+    transfer time per chunk as the inner store consumes it.
+    """
+
+    def __init__(self, inner: BlobStore, profile: TransferProfile) -> None:
+        self._inner = inner
+        self._profile = profile
+
+    def download(self, name: str, *, etag: Optional[str] = None) -> Optional[Tuple[bytes, str]]:
+        result = self._inner.download(name, etag=etag)
+        time.sleep(self._profile.delay_s(len(result[0]) if result is not None else 0))
+        return result
+
+    def upload(self, name: str, data: BlobData, *, content_type: str) -> None:
+        if isinstance(data, (bytes, bytearray)):
+            time.sleep(self._profile.delay_s(len(data)))
+            self._inner.upload(name, data, content_type=content_type)
+            return
+        time.sleep(self._profile.delay_s())
+        self._inner.upload(name, self._paced(_chunks(data)), content_type=content_type)
+
+    def _paced(self, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        for chunk in chunks:
+            time.sleep(self._profile.transfer_s(len(chunk)))
+            yield chunk
+
+    def list_names(self, prefix: str) -> List[str]:
+        time.sleep(self._profile.delay_s())
+        return self._inner.list_names(prefix)
+
+    def ping(self) -> None:
+        time.sleep(self._profile.delay_s())
+        self._inner.ping()
+
+
+def _pull(chunks: AsyncIterator[bytes], loop: asyncio.AbstractEventLoop) -> Iterator[bytes]:
+    """Iterate an async chunk source from a worker thread, one loop round trip per chunk."""
+
+    async def step() -> Optional[bytes]:
+        try:
+            return await chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    while (chunk := asyncio.run_coroutine_threadsafe(step(), loop).result()) is not None:
+        yield chunk
+
+
+class AsyncBlobStoreAdapter:
+    """
+    AsyncBlobStore over a local BlobStore.
+
+    File I/O runs in a worker thread and the simulated delay is an
+    ``asyncio.sleep``, so injected latency never occupies a thread and many
+    concurrent operations overlap the way real network calls would. A
+    streamed upload holds its thread for the whole transfer, as a real one
+    would: the thread pulls each chunk from the loop, which pays the
+    chunk's transfer time before handing it over. Closing the adapter
+    leaves the wrapped store open.
+    """
+
+    def __init__(self, inner: BlobStore, profile: Optional[TransferProfile] = None) -> None:
+        self._inner = inner
+        self._profile = profile or TransferProfile()
+
+    async def _delay(self, nbytes: int = 0) -> None:
+        if self._profile.enabled:
+            await asyncio.sleep(self._profile.delay_s(nbytes))
+
+    async def download(self, name: str, *, etag: Optional[str] = None) -> Optional[Tuple[bytes, str]]:
+        result = await asyncio.to_thread(self._inner.download, name, etag=etag)
+        await self._delay(len(result[0]) if result is not None else 0)
+        return result
+
+    async def upload(self, name: str, data: Union[BlobData, AsyncIterable[bytes]], *, content_type: str) -> None:
+        if isinstance(data, (bytes, bytearray)):
+            await self._delay(len(data))
+            await asyncio.to_thread(self._inner.upload, name, data, content_type=content_type)
+            return
+        await self._delay()
+        chunks = _pull(self._paced(data), asyncio.get_running_loop())
+        await asyncio.to_thread(self._inner.upload, name, chunks, content_type=content_type)
+
+    async def _paced(self, data: Union[BlobData, AsyncIterable[bytes]]) -> AsyncIterator[bytes]:
+        if hasattr(data, "__aiter__"):
+            async for chunk in data:  # type: ignore[union-attr]
+                await self._transfer(chunk)
+                yield chunk
+            return
+        # A file object or generator may block on every read: pull it off the loop
+        source = _chunks(data)  # type: ignore[arg-type]
+        while (chunk := await asyncio.to_thread(next, source, None)) is not None:
+            await self._transfer(chunk)
+            yield chunk
+
+    async def _transfer(self, chunk: bytes) -> None:
+        if self._profile.throughput_mb_s > 0:
+            await asyncio.sleep(self._profile.transfer_s(len(chunk)))
+
+    async def list_names(self, prefix: str) -> List[str]:
+        await self._delay()
+        return await asyncio.to_thread(self._inner.list_names, prefix)
+
+    async def ping(self) -> None:
+        await self._delay()
+        await asyncio.to_thread(self._inner.ping)
+
+    async def close(self) -> None:
+        pass
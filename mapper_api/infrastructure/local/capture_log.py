@@ -0,0 +1,173 @@
+"""Rotating gzip NDJSON log of captured requests, written from a background thread.
+
+``submit`` only enqueues (never blocks, drops when the queue is full), so the
+request path pays for one ``put_nowait``. The writer thread serializes in
+batches and sync-flushes the gzip stream after each batch, so a file being
+written is readable up to its last batch. Files are named per process
+(``<prefix>-<utc time>-<pid>-<n>.ndjson.gz``, prefix ``capture`` by default) so
+uvicorn workers never share one.
+"""
+from __future__ import annotations
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Union
+
+CAPTURE_GLOB = "capture-*.ndjson.gz"
+
+_STOP = object()
+
+
+class CaptureLogWriter:
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        *,
+        max_file_bytes: int = 64 * 1024 * 1024,
+        max_files: int = 20,
+        queue_size: int = 10_000,
+        batch_size: int = 256,
+        prefix: str = "capture",
+    ) -> None:
+        self._directory = Path(directory)
+        self._prefix = prefix
+        self._max_file_bytes = max_file_bytes
+        self._max_files = max_files
+        self._batch_size = batch_size
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._file: Optional[IO[bytes]] = None
+        self._raw: Optional[IO[bytes]] = None
+        self._closed = False
+        self._logger = logging.getLogger("mapper.capture")
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+
+    def submit(self, record: Dict[str, Any]) -> bool:
+        """Queue a record for writing; False (and counted) when the queue is full or closed."""
+        if self._closed:
+            return False
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="capture-writer", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[Dict[str, Any]] = []
+            item = self._queue.get()
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self._batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    self._logger.warning("capture.write_failed", extra={"error": f"{type(e).__name__}: {e}"})
+        self._close_file()
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        if self._file is None or (self._raw is not None and self._raw.tell() >= self._max_file_bytes):
+            self._rotate()
+        assert self._file is not None
+        payload = b"".join(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n" for record in batch)
+        self._file.write(payload)
+        # Sync flush: everything written so far is decodable even while the file stays open
+        self._file.flush()  # type: ignore[call-arg]
+        with self._lock:
+            self.written += len(batch)
+
+    def _rotate(self) -> None:
+        self._close_file()
+        self._directory.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        path = self._directory / f"{self._prefix}-{stamp}-{os.getpid()}-{self.rotations:05d}.ndjson.gz"
+        self._raw = open(path, "wb")
+        self._file = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        self.rotations += 1
+        self._prune()
+
+    def _prune(self) -> None:
+        files = sorted(self._directory.glob(f"{self._prefix}-*.ndjson.gz"), key=lambda p: (p.stat().st_mtime, p.name))
+        for old in files[:-self._max_files] if self._max_files > 0 else []:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._raw is not None:
+            self._raw.close()
+            self._raw = None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "written": self.written,
+                "dropped": self.dropped,
+                "queued": self._queue.qsize(),
+                "files": self.rotations,
+            }
+
+    def close(self, timeout_s: float = 5.0) -> None:
+        """Write whatever is queued, then close the current file."""
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout=timeout_s)
+
+
+def _read_lines(path: Path) -> Iterator[bytes]:
+    # Tolerates the unterminated gzip stream of a file that is still being written
+    decompressor = zlib.decompressobj(wbits=31)
+    pending = b""
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            try:
+                pending += decompressor.decompress(chunk)
+            except zlib.error:
+                break
+            *lines, pending = pending.split(b"\n")
+            yield from lines
+
+
+def read_capture(paths: Iterable[Union[str, Path]], pattern: str = CAPTURE_GLOB) -> Iterator[Dict[str, Any]]:
+    """Records from capture files or directories of them (files matching ``pattern``), in file order."""
+    files: List[Path] = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.glob(pattern)) if path.is_dir() else [path])
+    for file in files:
+        for line in _read_lines(file):
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,90 @@
+"""Local on-disk copy of the last good definitions blobs for blob-independent startup."""
+from __future__ import annotations
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+_FORMAT = 1
+
+
+@dataclass(frozen=True)
+class StoredDefinitions:
+    """Raw blob contents and ETags as last downloaded, plus the snapshot version."""
+    version: str
+    blobs: Dict[str, bytes]
+    etags: Dict[str, str]
+
+
+class DefinitionsSnapshotFile:
+    """
+    Gzip-compressed JSON file holding the raw definitions blobs.
+
+    Raw bytes are kept (not the parsed entities) so the version hash stays
+    identical to a fresh blob load, and the stored ETags make the first
+    background revalidation a cheap 304. Writes are atomic (temp file +
+    rename) and reads verify a content hash, so a torn or edited file is
+    ignored rather than served.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+        self._logger = logging.getLogger("mapper.definitions")
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @staticmethod
+    def _content_hash(blobs: Dict[str, bytes]) -> str:
+        digest = hashlib.sha256()
+        for name in sorted(blobs):
+            digest.update(name.encode())
+            digest.update(b"\0")
+            digest.update(blobs[name])
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def save(self, stored: StoredDefinitions) -> None:
+        payload = {
+            "format": _FORMAT,
+            "version": stored.version,
+            "sha256": self._content_hash(stored.blobs),
+            "etags": stored.etags,
+            "blobs": {name: data.decode("utf-8") for name, data in stored.blobs.items()},
+        }
+        body = gzip.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"), compresslevel=6)
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self._path.parent, prefix=self._path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, self._path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def load(self) -> Optional[StoredDefinitions]:
+        """Return the stored definitions, or None if the file is missing or fails verification."""
+        try:
+            payload = json.loads(gzip.decompress(self._path.read_bytes()))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self._logger.warning("definitions.snapshot_unreadable", extra={"error": f"{type(e).__name__}: {e}"})
+            return None
+
+        if payload.get("format") != _FORMAT:
+            return None
+        blobs = {name: text.encode("utf-8") for name, text in payload["blobs"].items()}
+        if self._content_hash(blobs) != payload.get("sha256"):
+            self._logger.warning("definitions.snapshot_hash_mismatch", extra={"path": str(self._path)})
+            return None
+        return StoredDefinitions(version=payload["version"], blobs=blobs, etags=dict(payload["etags"]))
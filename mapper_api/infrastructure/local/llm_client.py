@@ -1,7 +1,7 @@
 """Static LLM client mock returning deterministic JSON matching provided schema."""
 from __future__ import annotations
 import json
-from typing import Mapping, Any, Optional
+from typing import Mapping, Any, Optional, Iterator
 
 
 class StaticLLMClient:
@@ -60,3 +60,30 @@ class StaticLLMClient:
             ]
         }
         return json.dumps(out)
+
+    def json_schema_chat_stream(
+        self,
+        *,
+        system: str,
+        user: str,
+        schema_name: str,
+        schema: Mapping[str, Any],
+        max_tokens: int,
+        temperature: float = 0.1,
+        context: Optional[dict] = None,
+        deployment: Optional[str] = None,
+        chunk_size: int = 16,
+    ) -> Iterator[str]:
+        """Yield the same deterministic JSON in small chunks, like a token stream."""
+        content = self.json_schema_chat(
+            system=system,
+            user=user,
+            schema_name=schema_name,
+            schema=schema,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            context=context,
+            deployment=deployment,
+        )
+        for i in range(0, len(content), chunk_size):
+            yield content[i:i + chunk_size]
@@ -0,0 +1,131 @@
+"""BlobStore decorators recording operation latency, outcome and a trace span for any backend."""
+from __future__ import annotations
+import time
+from typing import Any, AsyncIterable, List, Optional, Tuple, Union
+
+from mapper_api.application.ports.blob_store import AsyncBlobStore, BlobData, BlobNotFoundError, BlobStore
+from mapper_api.application.services.metrics import BLOB_OPERATION_DURATION
+from mapper_api.application.services.tracing import mark_error, start_span
+
+
+def _outcome(error: Optional[BaseException], result: Any = True) -> str:
+    if error is None:
+        return "not_modified" if result is None else "ok"
+    return "not_found" if isinstance(error, BlobNotFoundError) else "error"
+
+
+class _Timer:
+    def __init__(self, backend: str, operation: str, name: Optional[str] = None) -> None:
+        self._backend = backend
+        self._operation = operation
+        # Not made current: blob calls are leaves, and the async ones may hop tasks
+        self._span = start_span(
+            f"blob.{operation}", kind="client", mapper__blob__backend=backend, mapper__blob__name=name
+        )
+        self._start = time.perf_counter()
+
+    def done(self, error: Optional[BaseException] = None, result: Any = True) -> None:
+        outcome = _outcome(error, result)
+        BLOB_OPERATION_DURATION.labels(self._backend, self._operation, outcome).observe(
+            time.perf_counter() - self._start
+        )
+        if self._span.is_recording():
+            self._span.set_attribute("mapper.blob.outcome", outcome)
+            if self._operation == "download":
+                self._span.set_attribute("mapper.blob.cache_hit", outcome == "not_modified")
+                if isinstance(result, tuple):
+                    self._span.set_attribute("mapper.blob.size_bytes", len(result[0]))
+            if error is not None:
+                mark_error(self._span, error, status=outcome == "error")
+        self._span.end()
+
+
+class MeteredBlobStore:
+    def __init__(self, inner: BlobStore, *, backend: str) -> None:
+        self.inner = inner
+        self._backend = backend
+
+    def download(self, name: str, *, etag: Optional[str] = None) -> Optional[Tuple[bytes, str]]:
+        timer = _Timer(self._backend, "download", name)
+        try:
+            result = self.inner.download(name, etag=etag)
+        except Exception as e:
+            timer.done(e)
+            raise
+        timer.done(result=result)
+        return result
+
+    def upload(self, name: str, data: BlobData, *, content_type: str) -> None:
+        timer = _Timer(self._backend, "upload", name)
+        try:
+            self.inner.upload(name, data, content_type=content_type)
+        except Exception as e:
+            timer.done(e)
+            raise
+        timer.done()
+
+    def list_names(self, prefix: str) -> List[str]:
+        timer = _Timer(self._backend, "list", prefix)
+        try:
+            names = self.inner.list_names(prefix)
+        except Exception as e:
+            timer.done(e)
+            raise
+        timer.done()
+        return names
+
+    def ping(self) -> None:
+        timer = _Timer(self._backend, "ping")
+        try:
+            self.inner.ping()
+        except Exception as e:
+            timer.done(e)
+            raise
+        timer.done()
+
+
+class AsyncMeteredBlobStore:
+    def __init__(self, inner: AsyncBlobStore, *, backend: str) -> None:
+        self.inner = inner
+        self._backend = backend
+
+    async def download(self, name: str, *, etag: Optional[str] = None) -> Optional[Tuple[bytes, str]]:
+        timer = _Timer(self._backend, "download", name)
+        try:
+            result = await self.inner.download(name, etag=etag)
+        except Exception as e:
+            timer.done(e)
+            raise
+        timer.done(result=result)
+        return result
+
+    async def upload(self, name: str, data: Union[BlobData, AsyncIterable[bytes]], *, content_type: str) -> None:
+        timer = _Timer(self._backend, "upload", name)
+        try:
+            await self.inner.upload(name, data, content_type=content_type)
+        except Exception as e:
+            timer.done(e)
+            raise
+        timer.done()
+
+    async def list_names(self, prefix: str) -> List[str]:
+        timer = _Timer(self._backend, "list", prefix)
+        try:
+            names = await self.inner.list_names(prefix)
+        except Exception as e:
+            timer.done(e)
+            raise
+        timer.done()
+        return names
+
+    async def ping(self) -> None:
+        timer = _Timer(self._backend, "ping")
+        try:
+            await self.inner.ping()
+        except Exception as e:
+            timer.done(e)
+            raise
+        timer.done()
+
+    async def close(self) -> None:
+        await self.inner.close()
@@ -0,0 +1,100 @@
+"""Per-worker metric snapshots in a shared directory, for multi-worker ``/metrics``.
+
+Every uvicorn worker writes ``metrics-<pid>.json`` atomically every
+``interval_s`` from a daemon thread (and once more on shutdown, marked as
+finished). A scrape lands on one worker, which writes its own snapshot and
+merges it with every other worker's file: counters and histograms from all
+of them, gauges only from workers that are still live (not finished and
+flushed within three intervals).
+
+Clear the directory when the service is (re)deployed, as with any
+file-based multi-process metrics setup; files of workers that exited keep
+contributing their counters until then.
+"""
+from __future__ import annotations
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from mapper_api.application.services.metrics import MetricsRegistry, Snapshot, merge_snapshots
+
+_PREFIX = "metrics-"
+
+
+class MetricsSnapshotStore:
+    def __init__(self, directory: Union[str, Path], registry: MetricsRegistry, *, interval_s: float = 5.0) -> None:
+        self._directory = Path(directory)
+        self._registry = registry
+        self._interval_s = interval_s
+        self._pid = os.getpid()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._logger = logging.getLogger("mapper.metrics")
+
+    @property
+    def path(self) -> Path:
+        return self._directory / f"{_PREFIX}{self._pid}.json"
+
+    def start(self) -> None:
+        if self._thread is None and self._interval_s > 0:
+            self._thread = threading.Thread(target=self._run, name="metrics-flusher", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval_s):
+            try:
+                self.flush()
+            except Exception as e:
+                self._logger.warning("metrics.flush_failed", extra={"error": f"{type(e).__name__}: {e}"})
+
+    def flush(self, *, finished: bool = False) -> Snapshot:
+        """Write this worker's snapshot; returns it."""
+        snapshot = self._registry.snapshot()
+        self._directory.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps({"pid": self._pid, "finished": finished, "metrics": snapshot}, separators=(",", ":"))
+        fd, tmp = tempfile.mkstemp(dir=self._directory, prefix=".tmp-metrics-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return snapshot
+
+    def _others(self) -> Tuple[List[Snapshot], List[Snapshot]]:
+        live: List[Snapshot] = []
+        finished: List[Snapshot] = []
+        stale_after = time.time() - 3 * max(self._interval_s, 1.0)
+        for path in self._directory.glob(f"{_PREFIX}*.json"):
+            if path == self.path:
+                continue
+            try:
+                mtime = path.stat().st_mtime
+                data: Dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue  # the worker is replacing it right now; next scrape picks it up
+            is_live = not data.get("finished") and mtime >= stale_after
+            (live if is_live else finished).append(data["metrics"])
+        return live, finished
+
+    def collect(self) -> Snapshot:
+        """Merged view of every worker, with this worker's values current."""
+        own = self.flush()
+        live, finished = self._others()
+        return merge_snapshots([own, *live], finished)
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        try:
+            self.flush(finished=True)
+        except OSError:
+            pass
@@ -0,0 +1,162 @@
+"""On-demand, time-boxed profiling of the running worker (stdlib only).
+
+``sample_stacks`` polls every thread's Python stack with
+``sys._current_frames()`` for a fixed duration and returns collapsed stacks
+(``thread;module:func;... weight`` lines, the input format of flamegraph.pl,
+speedscope and inferno):
+
+- ``wall``: one sample per thread per tick, whatever the thread is doing, so
+  time spent waiting on the network or a lock shows up;
+- ``cpu``: each sample is weighted by the CPU time (microseconds) the thread
+  used since its previous sample, read from its per-thread CPU clock, so
+  blocked threads drop out.
+
+``allocation_diff`` traces allocations with ``tracemalloc`` for a fixed
+duration and returns the allocation sites that grew the most.
+
+Nothing runs between profiles: the sampler is the calling thread and
+tracemalloc is only started for the window (and left alone if something
+else already runs it). One profile runs at a time per process.
+"""
+from __future__ import annotations
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+MODES = ("wall", "cpu")
+
+_busy = threading.Lock()
+
+
+class ProfilerBusyError(RuntimeError):
+    """Another profile is already running in this process."""
+
+
+@dataclass
+class CollapsedProfile:
+    mode: str
+    duration_s: float
+    samples: int
+    stacks: Dict[str, int] = field(default_factory=dict)
+
+    def to_collapsed(self) -> str:
+        """One ``frame;frame;frame weight`` line per distinct stack, heaviest first."""
+        lines = sorted(self.stacks.items(), key=lambda item: (-item[1], item[0]))
+        return "".join(f"{stack} {weight}\n" for stack, weight in lines if weight > 0)
+
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__") or os.path.basename(code.co_filename)
+    # ';' separates frames and ' ' the weight in the collapsed format
+    return f"{module}:{code.co_qualname}".replace(";", ",").replace(" ", "_")
+
+
+def _stack(frame: Any) -> List[str]:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def _cpu_clock_ns(ident: int) -> Optional[int]:
+    try:
+        return time.clock_gettime_ns(time.pthread_getcpuclockid(ident))
+    except (OSError, ValueError):
+        return None  # the thread has exited
+
+
+def cpu_profiling_supported() -> bool:
+    return hasattr(time, "pthread_getcpuclockid")
+
+
+def sample_stacks(duration_s: float, *, mode: str = "wall", interval_s: float = 0.01) -> CollapsedProfile:
+    """Sample all threads but the caller for ``duration_s`` seconds (see module docstring)."""
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {', '.join(MODES)}")
+    if mode == "cpu" and not cpu_profiling_supported():
+        raise ValueError("CPU profiling needs per-thread CPU clocks, which this platform does not have")
+    if not _busy.acquire(blocking=False):
+        raise ProfilerBusyError("a profile is already running")
+    try:
+        own = threading.get_ident()
+        profile = CollapsedProfile(mode=mode, duration_s=duration_s, samples=0)
+        last_cpu_ns: Dict[int, int] = {}
+        start = time.perf_counter()
+        deadline = start + duration_s
+        while True:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                weight = 1
+                if mode == "cpu":
+                    now_ns = _cpu_clock_ns(ident)
+                    if now_ns is None:
+                        continue
+                    previous = last_cpu_ns.get(ident)
+                    last_cpu_ns[ident] = now_ns
+                    # The first sample of a thread only sets its baseline
+                    weight = 0 if previous is None else (now_ns - previous) // 1000
+                    if weight <= 0:
+                        continue
+                stack = ";".join([names.get(ident, f"thread-{ident}").replace(" ", "_"), *_stack(frame)])
+                profile.stacks[stack] = profile.stacks.get(stack, 0) + weight
+            profile.samples += 1
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            time.sleep(min(interval_s, remaining))
+        profile.duration_s = time.perf_counter() - start
+        return profile
+    finally:
+        _busy.release()
+
+
+def allocation_diff(duration_s: float, *, top: int = 50, frames: int = 1) -> Dict[str, Any]:
+    """
+    Allocation sites whose live memory grew the most over ``duration_s``
+    seconds (``frames`` > 1 groups by call stack instead of line).
+    """
+    if not _busy.acquire(blocking=False):
+        raise ProfilerBusyError("a profile is already running")
+    try:
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start(frames)
+        try:
+            before = tracemalloc.take_snapshot()
+            time.sleep(duration_s)
+            after = tracemalloc.take_snapshot()
+            traced_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            if started:
+                tracemalloc.stop()
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        stats = after.filter_traces(ignore).compare_to(
+            before.filter_traces(ignore), "traceback" if frames > 1 else "lineno"
+        )
+        return {
+            "durationS": duration_s,
+            "tracedBytes": traced_bytes,
+            "peakBytes": peak_bytes,
+            "sizeDiffBytes": sum(stat.size_diff for stat in stats),
+            "top": [
+                {
+                    "traceback": [f"{f.filename}:{f.lineno}" for f in stat.traceback],
+                    "sizeDiffBytes": stat.size_diff,
+                    "countDiff": stat.count_diff,
+                    "sizeBytes": stat.size,
+                    "count": stat.count,
+                }
+                for stat in stats[:top]
+            ],
+        }
+    finally:
+        _busy.release()
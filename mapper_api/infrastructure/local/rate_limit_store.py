@@ -0,0 +1,94 @@
+"""Token-bucket RateLimitStore backends for one process and for the workers of one host.
+
+``InMemoryRateLimitStore`` keeps the buckets in the process; it is also the
+stand-in for the Redis store in tests. ``FileRateLimitStore`` keeps them in
+one small JSON file that every worker reads and rewrites under an exclusive
+flock, by default in ``/dev/shm`` so the file never touches the disk.
+"""
+from __future__ import annotations
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple, Union
+
+from mapper_api.application.ports.rate_limit_store import BucketLimit
+from mapper_api.application.services.rate_limiter import take_from_buckets
+
+try:
+    import fcntl
+except ImportError:  # Windows: single worker only, the lock is a no-op
+    fcntl = None  # type: ignore[assignment]
+
+SHARED_MEMORY_DIR = Path("/dev/shm")
+
+
+def default_state_path() -> Path:
+    directory = SHARED_MEMORY_DIR if SHARED_MEMORY_DIR.is_dir() else Path(tempfile.gettempdir())
+    return directory / "mapper-llm-rate-limit.json"
+
+
+class InMemoryRateLimitStore:
+    def __init__(self, *, clock: Callable[[], float] = time.time) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, List[float]]] = {}
+
+    def take(self, key: str, costs: Sequence[float], limits: Sequence[BucketLimit],
+             max_wait_s: float) -> Tuple[bool, float]:
+        with self._lock:
+            now = self._clock()
+            updated_at, levels = self._buckets.get(key, (now, None))
+            granted, wait_s, levels = take_from_buckets(levels, updated_at, now, costs, limits, max_wait_s)
+            if granted:
+                self._buckets[key] = (now, levels)
+            return granted, wait_s
+
+
+class FileRateLimitStore:
+    """Buckets shared by the processes of one host through a flock'ed state file."""
+
+    def __init__(self, path: Union[str, Path, None] = None, *, clock: Callable[[], float] = time.time) -> None:
+        self._path = Path(path) if path else default_state_path()
+        self._clock = clock
+        # flock is per open file, not per thread: threads of one worker queue up here first
+        self._thread_lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @contextmanager
+    def _locked(self) -> Iterator[int]:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._thread_lock:
+            fd = os.open(self._path, os.O_CREAT | os.O_RDWR, 0o600)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                yield fd
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+    def take(self, key: str, costs: Sequence[float], limits: Sequence[BucketLimit],
+             max_wait_s: float) -> Tuple[bool, float]:
+        with self._locked() as fd:
+            size = os.fstat(fd).st_size
+            try:
+                state = json.loads(os.pread(fd, size, 0)) if size else {}
+            except ValueError:
+                state = {}  # torn write of a killed worker: start with full buckets
+            now = self._clock()
+            updated_at, levels = state.get(key, (now, None))
+            granted, wait_s, levels = take_from_buckets(levels, updated_at, now, costs, limits, max_wait_s)
+            if granted:
+                state[key] = (now, levels)
+                payload = json.dumps(state, separators=(",", ":")).encode()
+                os.pwrite(fd, payload, 0)
+                os.ftruncate(fd, len(payload))
+            return granted, wait_s
@@ -0,0 +1,69 @@
+"""RateLimitStore on Redis (or any server speaking its protocol and Lua), for workers on many hosts.
+
+The refill-and-reserve of ``take_from_buckets`` runs as one Lua script, so
+it is atomic on the server and timed by the server's clock. A key holds
+"updated_at,level1,level2,..." and expires once its buckets would be full
+again. ``redis`` is imported only by ``from_url``; the unit tests run the
+script's arithmetic against ``InMemoryRateLimitStore`` through a Redis double.
+"""
+from __future__ import annotations
+from typing import Any, Sequence, Tuple
+
+from mapper_api.application.ports.rate_limit_store import BucketLimit
+
+# KEYS[1] bucket key; ARGV: max_wait_s, ttl_s, then cost, capacity, rate_per_s per bucket
+_TAKE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local max_wait = tonumber(ARGV[1])
+local buckets = (#ARGV - 2) / 3
+local updated_at = now
+local levels = {}
+local raw = redis.call('GET', KEYS[1])
+if raw then
+  local i = 0
+  for value in string.gmatch(raw, '[^,]+') do
+    if i == 0 then updated_at = tonumber(value) else levels[i] = tonumber(value) end
+    i = i + 1
+  end
+end
+local elapsed = math.max(now - updated_at, 0)
+local wait = 0
+for b = 1, buckets do
+  local cost, capacity, rate = tonumber(ARGV[3 * b]), tonumber(ARGV[3 * b + 1]), tonumber(ARGV[3 * b + 2])
+  local level = capacity
+  if levels[b] then level = math.min(capacity, levels[b] + elapsed * rate) end
+  levels[b] = level
+  if cost > level then wait = math.max(wait, (cost - level) / rate) end
+end
+if wait > max_wait then
+  return {0, tostring(wait)}
+end
+for b = 1, buckets do
+  levels[b] = levels[b] - tonumber(ARGV[3 * b])
+end
+redis.call('SET', KEYS[1], string.format('%.6f', now) .. ',' .. table.concat(levels, ','), 'EX', ARGV[2])
+return {1, tostring(wait)}
+"""
+
+
+class RedisRateLimitStore:
+    def __init__(self, client: Any) -> None:
+        """``client``: a redis-py compatible client (``register_script``)."""
+        self._take = client.register_script(_TAKE_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisRateLimitStore":
+        import redis
+
+        return cls(redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0))
+
+    def take(self, key: str, costs: Sequence[float], limits: Sequence[BucketLimit],
+             max_wait_s: float) -> Tuple[bool, float]:
+        # Expire once every bucket has refilled: a missing key reads as full buckets
+        ttl_s = max(int(max(limit.capacity / limit.rate_per_s for limit in limits) + max_wait_s) + 1, 1)
+        args: list = [max_wait_s, ttl_s]
+        for cost, limit in zip(costs, limits):
+            args.extend((cost, limit.capacity, limit.rate_per_s))
+        granted, wait_s = self._take(keys=[key], args=args)
+        return bool(int(granted)), float(wait_s)
@@ -0,0 +1,220 @@
+"""Self-contained OpenTelemetry TracerProvider with in-memory and file span exporters.
+
+For running offline (and wherever the OpenTelemetry SDK is not installed):
+implements the ``opentelemetry-api`` interfaces with parent-based ratio
+sampling. Unsampled spans are the API's ``NonRecordingSpan`` (ids only, no
+attributes, no export), so the cost under load is one random draw per root
+span. Finished sampled spans become plain dicts:
+
+- ``InMemorySpanExporter`` keeps the last ``max_spans`` (``/health/traces``);
+- ``FileSpanExporter`` hands them to a background ``CaptureLogWriter``
+  (rotating gzip NDJSON), so the request path never writes to disk.
+"""
+from __future__ import annotations
+import random
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Mapping, Optional, Sequence, Union
+
+from opentelemetry import context as otel_context
+from opentelemetry import trace
+from opentelemetry.trace import (
+    NonRecordingSpan,
+    SpanContext,
+    SpanKind,
+    Status,
+    StatusCode,
+    TraceFlags,
+    use_span,
+)
+
+from mapper_api.infrastructure.local.capture_log import CaptureLogWriter
+
+SPANS_PREFIX = "spans"
+
+
+class InMemorySpanExporter:
+    def __init__(self, max_spans: int = 10_000) -> None:
+        self._spans: Deque[Dict[str, Any]] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, span: Dict[str, Any]) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self, trace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            spans = list(self._spans)
+        return [s for s in spans if trace_id is None or s["traceId"] == trace_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def shutdown(self) -> None:
+        pass
+
+
+class FileSpanExporter:
+    def __init__(self, directory: Union[str, Path], *, max_file_bytes: int = 64 * 1024 * 1024,
+                 max_files: int = 20) -> None:
+        self._writer = CaptureLogWriter(
+            directory, max_file_bytes=max_file_bytes, max_files=max_files, prefix=SPANS_PREFIX
+        )
+
+    def export(self, span: Dict[str, Any]) -> None:
+        self._writer.submit(span)
+
+    def stats(self) -> Dict[str, int]:
+        return self._writer.stats()
+
+    def shutdown(self) -> None:
+        self._writer.close()
+
+
+class _LocalSpan(trace.Span):
+    def __init__(self, name: str, context: SpanContext, parent: Optional[SpanContext], kind: SpanKind,
+                 attributes: Optional[Mapping[str, Any]], start_time: Optional[int],
+                 provider: "LocalTracerProvider") -> None:
+        self._name = name
+        self._context = context
+        self._parent = parent
+        self._kind = kind
+        self._attributes: Dict[str, Any] = dict(attributes or {})
+        self._events: List[Dict[str, Any]] = []
+        self._status = Status(StatusCode.UNSET)
+        self._start = start_time if start_time is not None else time.time_ns()
+        self._end: Optional[int] = None
+        self._provider = provider
+        self._lock = threading.Lock()
+
+    def get_span_context(self) -> SpanContext:
+        return self._context
+
+    def is_recording(self) -> bool:
+        return self._end is None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None and self._end is None:
+            with self._lock:
+                self._attributes[key] = value
+
+    def set_attributes(self, attributes: Mapping[str, Any]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def add_event(self, name: str, attributes: Optional[Mapping[str, Any]] = None,
+                  timestamp: Optional[int] = None) -> None:
+        with self._lock:
+            self._events.append({
+                "name": name,
+                "timeUnixNano": timestamp if timestamp is not None else time.time_ns(),
+                "attributes": dict(attributes or {}),
+            })
+
+    def update_name(self, name: str) -> None:
+        self._name = name
+
+    def set_status(self, status: Union[Status, StatusCode], description: Optional[str] = None) -> None:
+        self._status = status if isinstance(status, Status) else Status(status, description)
+
+    def record_exception(self, exception: BaseException, attributes: Optional[Mapping[str, Any]] = None,
+                         timestamp: Optional[int] = None, escaped: bool = False) -> None:
+        self.add_event("exception", {
+            "exception.type": type(exception).__name__,
+            "exception.message": str(exception),
+            **(attributes or {}),
+        }, timestamp)
+
+    def end(self, end_time: Optional[int] = None) -> None:
+        with self._lock:
+            if self._end is not None:
+                return
+            self._end = end_time if end_time is not None else time.time_ns()
+        self._provider._export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "traceId": format(self._context.trace_id, "032x"),
+            "spanId": format(self._context.span_id, "016x"),
+            "parentSpanId": format(self._parent.span_id, "016x") if self._parent is not None else None,
+            "name": self._name,
+            "kind": self._kind.name,
+            "startTimeUnixNano": self._start,
+            "endTimeUnixNano": self._end,
+            "durationMs": round(((self._end or self._start) - self._start) / 1e6, 3),
+            "status": self._status.status_code.name,
+            "statusDescription": self._status.description,
+            "attributes": self._attributes,
+            "events": self._events,
+            "resource": self._provider.resource,
+        }
+
+
+class _LocalTracer(trace.Tracer):
+    def __init__(self, provider: "LocalTracerProvider") -> None:
+        self._provider = provider
+
+    def start_span(self, name: str, context: Optional[otel_context.Context] = None,
+                   kind: SpanKind = SpanKind.INTERNAL, attributes: Optional[Mapping[str, Any]] = None,
+                   links: Optional[Sequence[Any]] = None, start_time: Optional[int] = None,
+                   record_exception: bool = True, set_status_on_exception: bool = True) -> trace.Span:
+        parent = trace.get_current_span(context).get_span_context()
+        rng = self._provider.rng
+        if parent.is_valid:
+            trace_id = parent.trace_id
+            sampled = parent.trace_flags.sampled
+        else:
+            trace_id = rng.getrandbits(128) or 1
+            parent = None
+            # Ratio sampling on the trace id, so every service sampling this trace agrees
+            sampled = (trace_id & 0xFFFFFFFFFFFFFFFF) < self._provider.sample_bound
+        span_context = SpanContext(
+            trace_id=trace_id,
+            span_id=rng.getrandbits(64) or 1,
+            is_remote=False,
+            trace_flags=TraceFlags(TraceFlags.SAMPLED if sampled else TraceFlags.DEFAULT),
+        )
+        if not sampled:
+            return NonRecordingSpan(span_context)
+        return _LocalSpan(name, span_context, parent, kind, attributes, start_time, self._provider)
+
+    def start_as_current_span(self, name: str, context: Optional[otel_context.Context] = None,
+                              kind: SpanKind = SpanKind.INTERNAL, attributes: Optional[Mapping[str, Any]] = None,
+                              links: Optional[Sequence[Any]] = None, start_time: Optional[int] = None,
+                              record_exception: bool = True, set_status_on_exception: bool = True,
+                              end_on_exit: bool = True) -> Iterator[trace.Span]:
+        span = self.start_span(name, context, kind, attributes, links, start_time)
+        return use_span(span, end_on_exit=end_on_exit, record_exception=record_exception,
+                        set_status_on_exception=set_status_on_exception)
+
+
+class LocalTracerProvider(trace.TracerProvider):
+    def __init__(self, exporter: Any, *, sample_ratio: float = 1.0,
+                 resource: Optional[Mapping[str, Any]] = None, seed: Optional[int] = None) -> None:
+        if not 0.0 <= sample_ratio <= 1.0:
+            raise ValueError("sample_ratio must be between 0 and 1")
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio
+        self.sample_bound = int(sample_ratio * (1 << 64))
+        self.resource = dict(resource or {})
+        self.rng = random.Random(seed)
+        self._tracer = _LocalTracer(self)
+        self.exported = 0
+        self.export_errors = 0
+
+    def get_tracer(self, instrumenting_module_name: str, *args: Any, **kwargs: Any) -> trace.Tracer:
+        return self._tracer
+
+    def _export(self, span: _LocalSpan) -> None:
+        try:
+            self.exporter.export(span.to_dict())
+            self.exported += 1
+        except Exception:
+            self.export_errors += 1
+
+    def shutdown(self) -> None:
+        self.exporter.shutdown()
+
@@ -1,17 +1,26 @@
 """Controller for evaluation operations - optimized for multiple metrics."""
 from __future__ import annotations
+import asyncio
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Union
+from typing import Dict, List, Optional, Tuple, Union, TYPE_CHECKING
 
 from mapper_api.application.dto.http_evaluation import EvaluationHttpRequest
 from mapper_api.application.dto.http_evaluation import EvaluationResponse, MetricResult
 from mapper_api.application.dto.http_common import ResponseHeader
 from mapper_api.application.dto.domain_evaluation import EvaluationRequest
 from mapper_api.application.use_cases.evaluate_mapper import EvaluateMapper
+from mapper_api.application.services.llm_usage import total_usage
+from mapper_api.application.services.stage_timing import stage
+from mapper_api.application.services.tracing import span
+from mapper_api.application.services.worker_pools import WorkerPool
 from mapper_api.domain.value_objects.metric import MetricType
+from mapper_api.domain.value_objects.evaluation_result import EvaluationResult
 from mapper_api.domain.errors import ControlValidationError
-from mapper_api.infrastructure.azure.blob_evaluation_results_writer import BlobEvaluationResultsWriter
+
+if TYPE_CHECKING:
+    from mapper_api.infrastructure.azure.blob_evaluation_results_writer import BlobEvaluationResultsWriter
+    from mapper_api.infrastructure.azure.aio.blob_evaluation_results_writer import AsyncBlobEvaluationResultsWriter
 
 
 @dataclass
@@ -22,7 +31,10 @@ class EvaluationController:
     Optimized for multiple metric evaluation.
     """
     evaluate_use_case: EvaluateMapper
-    results_writer: BlobEvaluationResultsWriter
+    results_writer: Union[BlobEvaluationResultsWriter, AsyncBlobEvaluationResultsWriter]
+    definitions_version: Optional[str] = None
+    default_token_budget: Optional[int] = None
+    worker_pool: Optional[WorkerPool] = None
 
     def handle_evaluation(self, request: EvaluationHttpRequest) -> EvaluationResponse:
         """
@@ -37,6 +49,44 @@ class EvaluationController:
         Raises:
             ControlValidationError: When validation fails
         """
+        use_case_request, timestamp = self._to_use_case_request(request)
+        results = self._execute(use_case_request)
+        
+        # Write all metric results to blob storage concurrently
+        with stage("write_results"):
+            outcomes = self.results_writer.write_evaluation_results(
+                use_case_request.record_id, timestamp, self._writable(results)
+            )
+        return self._build_response(use_case_request, timestamp, results, outcomes)
+
+    async def handle_evaluation_async(self, request: EvaluationHttpRequest) -> EvaluationResponse:
+        """
+        Async variant for async results writers (``write_evaluation_results``).
+        
+        The use case (sync LLM calls) runs on the evaluation worker pool (a
+        worker thread without one) and all metric uploads run concurrently,
+        so the event loop is never blocked.
+        """
+        with span("EvaluationController.handle_evaluation", mapper__record_id=request.header.recordId,
+                  mapper__definitions_version=self.definitions_version):
+            use_case_request, timestamp = self._to_use_case_request(request)
+            if self.worker_pool is not None:
+                results = await self.worker_pool.run(self._execute, use_case_request)
+            else:
+                results = await asyncio.to_thread(self._execute, use_case_request)
+            
+            with stage("write_results"):
+                outcomes = await self.results_writer.write_evaluation_results(
+                    use_case_request.record_id, timestamp, self._writable(results)
+                )
+            return self._build_response(use_case_request, timestamp, results, outcomes)
+
+    @staticmethod
+    def _writable(results: Dict[MetricType, EvaluationResult]) -> Dict[str, EvaluationResult]:
+        """Results to persist, keyed by metric value (failed evaluations are only reported)."""
+        return {m.value: r for m, r in results.items() if not r.error_message}
+
+    def _to_use_case_request(self, request: EvaluationHttpRequest) -> Tuple[EvaluationRequest, str]:
         # Parse and validate metric types
         metric_types = self._parse_metric_types(request.data.metricType)
         
@@ -47,20 +97,30 @@ class EvaluationController:
         use_case_request = EvaluationRequest(
             record_id=request.header.recordId,
             metric_types=metric_types,
-            n_records=request.data.nRecords
+            n_records=request.data.nRecords,
+            concurrency=request.data.concurrency,
+            concurrency_levels=request.data.concurrencyLevels,
+            token_budget=request.data.maxTokens or self.default_token_budget
         )
-        
-        # Execute use case
+        return use_case_request, timestamp
+
+    def _execute(self, use_case_request: EvaluationRequest) -> Dict[MetricType, EvaluationResult]:
         try:
-            results = self.evaluate_use_case.execute(use_case_request)
+            return self.evaluate_use_case.execute(use_case_request)
         except Exception as e:
             error_type = type(e).__name__
             error_msg = str(e)
             raise ControlValidationError(f"Failed to evaluate mapper: {error_type}: {error_msg}")
-        
-        # Write results to blob storage and prepare response
+
+    def _build_response(
+        self,
+        use_case_request: EvaluationRequest,
+        timestamp: str,
+        results: Dict[MetricType, EvaluationResult],
+        written: Dict[str, Union[str, BaseException]],
+    ) -> EvaluationResponse:
         directory_path = self.results_writer.get_directory_path(
-            request.header.recordId, 
+            use_case_request.record_id, 
             timestamp
         )
         
@@ -68,47 +128,44 @@ class EvaluationController:
         successful_metrics = 0
         
         for metric_type, evaluation_result in results.items():
+            total_records = len(evaluation_result.individual_results)
+            
             # Check if the evaluation itself failed
             if evaluation_result.error_message:
                 metric_results.append(MetricResult(
                     metric_type=metric_type.value,
                     file_path="",
-                    total_records=len(evaluation_result.individual_results),
+                    total_records=total_records,
                     status="error",
-                    error_message=evaluation_result.error_message
+                    error_message=evaluation_result.error_message,
+                    llm_usage=evaluation_result.llm_usage
                 ))
                 continue
             
-            try:
-                file_path = self.results_writer.write_evaluation_result(
-                    request.header.recordId,
-                    timestamp,
-                    metric_type.value,
-                    evaluation_result
-                )
-                
-                total_records = len(evaluation_result.individual_results)
-                
-                metric_results.append(MetricResult(
-                    metric_type=metric_type.value,
-                    file_path=file_path,
-                    total_records=total_records,
-                    status="success",
-                    error_message=None
-                ))
-                successful_metrics += 1
-                
-            except Exception as e:
+            outcome = written[metric_type.value]
+            if isinstance(outcome, BaseException):
                 metric_results.append(MetricResult(
                     metric_type=metric_type.value,
                     file_path="",
-                    total_records=len(evaluation_result.individual_results),
+                    total_records=total_records,
                     status="error",
-                    error_message=str(e)
+                    error_message=str(outcome),
+                    llm_usage=evaluation_result.llm_usage
                 ))
+                continue
+            
+            metric_results.append(MetricResult(
+                metric_type=metric_type.value,
+                file_path=outcome,
+                total_records=total_records,
+                status="success",
+                error_message=None,
+                llm_usage=evaluation_result.llm_usage
+            ))
+            successful_metrics += 1
         
         # Generate overall message
-        total_metrics = len(metric_types)
+        total_metrics = len(use_case_request.metric_types)
         if successful_metrics == total_metrics:
             message = f"All {total_metrics} metrics evaluated successfully. Results saved to {directory_path}"
         else:
@@ -116,10 +173,14 @@ class EvaluationController:
             message = f"{successful_metrics}/{total_metrics} metrics evaluated successfully. {failed_metrics} failed. Results saved to {directory_path}"
         
         return EvaluationResponse(
-            header=ResponseHeader(recordId=use_case_request.record_id),
+            header=ResponseHeader(
+                recordId=use_case_request.record_id,
+                definitionsVersion=self.definitions_version
+            ),
             results=metric_results,
             directory_path=directory_path,
-            message=message
+            message=message,
+            llm_usage=total_usage(r.llm_usage for r in results.values() if r.llm_usage is not None)
         )
     
     def _parse_metric_types(self, metric_input: Union[str, List[str]]) -> List[MetricType]:
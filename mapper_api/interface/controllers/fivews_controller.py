@@ -1,12 +1,15 @@
 """Controller for 5Ws mapping operations following EcomApp pattern."""
 from __future__ import annotations
 from dataclasses import dataclass
+from typing import Optional, Tuple
 
 from mapper_api.application.dto.http_common import CommonRequest
 from mapper_api.application.dto.http_common import FiveWResponse, ResponseHeader, FiveWData
 from mapper_api.application.dto.domain_mapping import FiveWsMappingRequest
 from mapper_api.application.use_cases.map_control_to_5ws import ClassifyControlTo5Ws
-from mapper_api.domain.errors import ControlValidationError
+from mapper_api.application.services.compiled_definitions import DefinitionsHolder
+from mapper_api.application.services.tracing import set_span_attributes, traced
+from mapper_api.domain.errors import ControlValidationError, DeadlineExceededError, LLMCapacityError
 
 
 @dataclass
@@ -18,8 +21,17 @@ class FiveWsController:
     The controller receives pre-configured use cases and focuses only on
     request/response transformation.
     """
-    classify_use_case: ClassifyControlTo5Ws
+    classify_use_case: Optional[ClassifyControlTo5Ws] = None
+    definitions: Optional[DefinitionsHolder] = None
 
+    def _resolve_use_case(self) -> Tuple[ClassifyControlTo5Ws, Optional[str]]:
+        """Pin the use case (and definitions version) for the duration of one request."""
+        if self.definitions is not None:
+            compiled = self.definitions.current()
+            return compiled.fivews_classifier, compiled.version
+        return self.classify_use_case, None
+
+    @traced("FiveWsController.handle_fivews_mapping")
     def handle_fivews_mapping(self, request: CommonRequest) -> FiveWResponse:
         """
         Handle 5Ws mapping request with clear separation of concerns.
@@ -39,9 +51,14 @@ class FiveWsController:
             control_description=request.data.controlDescription
         )
         
+        classify_use_case, definitions_version = self._resolve_use_case()
+        set_span_attributes(mapper__record_id=use_case_request.record_id, mapper__definitions_version=definitions_version)
+        
         # Execute use case (already configured with dependencies)
         try:
-            result = self.classify_use_case.execute(use_case_request)
+            result = classify_use_case.execute(use_case_request)
+        except (LLMCapacityError, DeadlineExceededError):
+            raise  # a saturated deployment (503) or a request out of time (504), not a bad request
         except Exception as e:
             # Provide more specific error information for debugging
             error_type = type(e).__name__
@@ -50,6 +67,9 @@ class FiveWsController:
         
         # Transform use case result to web response
         return FiveWResponse(
-            header=ResponseHeader(recordId=use_case_request.record_id),
+            header=ResponseHeader(
+                recordId=use_case_request.record_id,
+                definitionsVersion=definitions_version
+            ),
             data=FiveWData(fivews=result)
         )
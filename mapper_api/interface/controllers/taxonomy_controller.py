@@ -1,13 +1,15 @@
 """Controller for taxonomy mapping operations following EcomApp pattern."""
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional, Tuple
 
 from mapper_api.application.dto.http_common import CommonRequest
 from mapper_api.application.dto.http_common import TaxonomyResponse, ResponseHeader, TaxonomyData
 from mapper_api.application.dto.domain_mapping import TaxonomyMappingRequest
 from mapper_api.application.use_cases.map_control_to_themes import ClassifyControlToThemes
-from mapper_api.domain.errors import ControlValidationError
+from mapper_api.application.services.compiled_definitions import DefinitionsHolder
+from mapper_api.application.services.tracing import set_span_attributes, traced
+from mapper_api.domain.errors import ControlValidationError, DeadlineExceededError, LLMCapacityError
 
 
 @dataclass
@@ -19,8 +21,17 @@ class TaxonomyController:
     The controller receives pre-configured use cases and focuses only on
     request/response transformation.
     """
-    classify_use_case: ClassifyControlToThemes
+    classify_use_case: Optional[ClassifyControlToThemes] = None
+    definitions: Optional[DefinitionsHolder] = None
 
+    def _resolve_use_case(self) -> Tuple[ClassifyControlToThemes, Optional[str]]:
+        """Pin the use case (and definitions version) for the duration of one request."""
+        if self.definitions is not None:
+            compiled = self.definitions.current()
+            return compiled.taxonomy_classifier, compiled.version
+        return self.classify_use_case, None
+
+    @traced("TaxonomyController.handle_taxonomy_mapping")
     def handle_taxonomy_mapping(self, request: CommonRequest) -> TaxonomyResponse:
         """
         Handle taxonomy mapping request with clear separation of concerns.
@@ -40,9 +51,14 @@ class TaxonomyController:
             control_description=request.data.controlDescription
         )
         
+        classify_use_case, definitions_version = self._resolve_use_case()
+        set_span_attributes(mapper__record_id=use_case_request.record_id, mapper__definitions_version=definitions_version)
+        
         # Execute use case (already configured with dependencies)
         try:
-            result = self.classify_use_case.execute(use_case_request)
+            result = classify_use_case.execute(use_case_request)
+        except (LLMCapacityError, DeadlineExceededError):
+            raise  # a saturated deployment (503) or a request out of time (504), not a bad request
         except Exception as e:
             # Provide more specific error information for debugging
             error_type = type(e).__name__
@@ -51,6 +67,67 @@ class TaxonomyController:
         
         # Transform use case result to web response
         return TaxonomyResponse(
-            header=ResponseHeader(recordId=use_case_request.record_id),
+            header=ResponseHeader(
+                recordId=use_case_request.record_id,
+                definitionsVersion=definitions_version
+            ),
             data=TaxonomyData(taxonomy=result)
         )
+
+    @traced("TaxonomyController.stream_taxonomy_mapping")
+    def stream_taxonomy_mapping(self, request: CommonRequest) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Handle streaming taxonomy mapping request.
+        
+        Args:
+            request: Incoming HTTP request data
+            
+        Returns:
+            Iterator of (event, payload) pairs: one "theme" event per completed
+            taxonomy item, then a "result" event carrying the TaxonomyResponse
+            
+        Raises:
+            ControlValidationError: When control description validation fails
+        """
+        use_case_request = TaxonomyMappingRequest(
+            record_id=request.header.recordId,
+            control_description=request.data.controlDescription
+        )
+        
+        classify_use_case, definitions_version = self._resolve_use_case()
+        set_span_attributes(mapper__record_id=use_case_request.record_id, mapper__definitions_version=definitions_version)
+        
+        # Validation happens here, before the first event is sent
+        try:
+            events = classify_use_case.execute_stream(use_case_request)
+        except (LLMCapacityError, DeadlineExceededError):
+            raise  # a saturated deployment (503) or a request out of time (504), not a bad request
+        except Exception as e:
+            error_type = type(e).__name__
+            error_msg = str(e)
+            raise ControlValidationError(f"Failed to process control description: {error_type}: {error_msg}")
+        
+        return self._transform_events(use_case_request.record_id, definitions_version, events)
+
+    def _transform_events(
+        self,
+        record_id: str,
+        definitions_version: Optional[str],
+        events: Iterator[Tuple[str, Any]]
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        try:
+            for event, payload in events:
+                if event == "result":
+                    response = TaxonomyResponse(
+                        header=ResponseHeader(recordId=record_id, definitionsVersion=definitions_version),
+                        data=TaxonomyData(taxonomy=payload)
+                    )
+                    yield event, response.model_dump()
+                else:
+                    yield event, payload
+        except (LLMCapacityError, DeadlineExceededError):
+            raise  # reported to the client as an overload or timeout event, not a validation error
+        except Exception as e:
+            error_type = type(e).__name__
+            error_msg = str(e)
+            raise ControlValidationError(f"Failed to process control description: {error_type}: {error_msg}")
@@ -0,0 +1,93 @@
+"""Import-time regression benchmark for the API entrypoint.
+
+Usage examples:
+  - Check the default budget (exit code 1 when over budget):
+      python -m tests.benchmarks.bench_importtime
+
+  - Tighter budget, more runs, show the 15 slowest modules:
+      python -m tests.benchmarks.bench_importtime --budget-ms 600 --runs 7 --top 15
+
+Each run imports the module in a fresh interpreter with ``-X importtime`` and
+also fails if any heavy Azure/OpenAI SDK was imported eagerly.
+"""
+from __future__ import annotations
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+DEFAULT_MODULE = "mapper_api.api.api"
+DEFAULT_BUDGET_MS = 1500.0
+
+# Must only be imported when a client is first built, never by importing the app
+LAZY_MODULES = ("openai", "azure.identity", "azure.storage.blob", "azure.core", "tenacity", "httpx", "langdetect")
+
+# __import__ (not importlib.import_module) so -X importtime reports the module itself
+_PROBE = (
+    "import json, sys\n"
+    "__import__(sys.argv[1])\n"
+    "print(json.dumps([m for m in sys.argv[2:] if m in sys.modules]))\n"
+)
+
+
+def measure_import(module: str = DEFAULT_MODULE) -> Tuple[float, Dict[str, float], List[str]]:
+    """
+    Import ``module`` in a fresh interpreter.
+
+    Returns (total cumulative ms, self ms per imported module, eagerly imported lazy modules).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE, module, *LAZY_MODULES],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    self_us: Dict[str, float] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_part, cumulative_part, name = line[len("import time:"):].split("|", 2)
+        self_us[name.strip()] = int(self_part) / 1000
+        if name.strip() == module:
+            total_us = int(cumulative_part)
+    eager = json.loads(proc.stdout.strip().splitlines()[-1])
+    return total_us / 1000, self_us, eager
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fail when importing the API goes past the import-time budget")
+    parser.add_argument("--module", default=DEFAULT_MODULE)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest modules to report")
+    args = parser.parse_args()
+
+    totals: List[float] = []
+    self_ms: Dict[str, float] = {}
+    eager: List[str] = []
+    for _ in range(args.runs):
+        total, per_module, eager = measure_import(args.module)
+        totals.append(total)
+        self_ms = per_module
+
+    median_ms = statistics.median(totals)
+    slowest = sorted(self_ms.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    within_budget = median_ms <= args.budget_ms and not eager
+    print(json.dumps({
+        "module": args.module,
+        "runs": args.runs,
+        "median_ms": round(median_ms, 1),
+        "min_ms": round(min(totals), 1),
+        "budget_ms": args.budget_ms,
+        "eager_sdk_imports": eager,
+        "slowest_self_ms": {name: round(ms, 1) for name, ms in slowest},
+        "ok": within_budget,
+    }, indent=2))
+    return 0 if within_budget else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
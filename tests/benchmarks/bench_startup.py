@@ -0,0 +1,92 @@
+"""Startup benchmark: time-to-definitions with and without the local snapshot.
+
+Usage examples:
+  - Offline, simulated 150 ms blob round trips:
+      python -m tests.benchmarks.bench_startup --offline --blob-latency-ms 150 --runs 5
+
+  - Against the configured storage account (requires .env and Azure access):
+      python -m tests.benchmarks.bench_startup --runs 3
+
+Each run builds a fresh BlobDefinitionsRepository and compiles the use cases,
+once cold (no snapshot file) and once warm (snapshot file from the cold run).
+"""
+from __future__ import annotations
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from mapper_api.application.ports.blob_store import BlobStore
+from mapper_api.application.services.compiled_definitions import CompiledDefinitions
+from mapper_api.config.settings import Settings
+from mapper_api.infrastructure.azure.blob_definitions_repo import BlobDefinitionsRepository
+from mapper_api.infrastructure.local.blob_store import InMemoryBlobStore, SimulatedLatencyBlobStore, TransferProfile
+from mapper_api.infrastructure.local.definitions_snapshot_file import DefinitionsSnapshotFile
+from mapper_api.infrastructure.local.llm_client import StaticLLMClient
+
+
+
+def _time_startup(
+    settings: Settings, snapshot_file: DefinitionsSnapshotFile | None, store: Optional[BlobStore]
+) -> Dict[str, float]:
+    started = time.perf_counter()
+    repo = BlobDefinitionsRepository(
+        account_name=settings.STORAGE_ACCOUNT_NAME,
+        container_name=settings.STORAGE_CONTAINER_NAME,
+        tenant_id=settings.AZURE_TENANT_ID,
+        client_id=settings.AZURE_CLIENT_ID,
+        client_secret=settings.AZURE_CLIENT_SECRET,
+        snapshot_file=snapshot_file,
+        store=store,
+    )
+    loaded = time.perf_counter()
+    CompiledDefinitions.compile(repo.snapshot, StaticLLMClient(), settings.AZURE_OPENAI_DEPLOYMENT)
+    compiled = time.perf_counter()
+    return {
+        "load_ms": (loaded - started) * 1000,
+        "compile_ms": (compiled - loaded) * 1000,
+        "total_ms": (compiled - started) * 1000,
+    }
+
+
+def _summary(samples: List[Dict[str, float]]) -> Dict[str, float]:
+    return {key: round(statistics.median(s[key] for s in samples), 2) for key in samples[0]}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark definitions startup with and without the local snapshot")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--offline", action="store_true", help="Serve blobs from local data files")
+    parser.add_argument("--blob-latency-ms", type=float, default=150.0, help="Simulated latency per blob GET (offline)")
+    args = parser.parse_args()
+
+    settings = Settings()
+    cold: List[Dict[str, float]] = []
+    warm: List[Dict[str, float]] = []
+
+    store = None
+    if args.offline:
+        store = SimulatedLatencyBlobStore(
+            InMemoryBlobStore.from_directory(), TransferProfile(latency_ms=args.blob_latency_ms)
+        )
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            snapshot_file = DefinitionsSnapshotFile(Path(tmp) / "definitions.snapshot.json.gz")
+            cold.append(_time_startup(settings, snapshot_file, store))
+            warm.append(_time_startup(settings, snapshot_file, store))
+
+    print(json.dumps({
+        "runs": args.runs,
+        "offline": args.offline,
+        "without_snapshot": _summary(cold),
+        "with_snapshot": _summary(warm),
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,439 @@
+"""Local stand-in for Azure OpenAI Chat Completions, for benchmarking the real HTTP client path.
+
+Usage examples:
+  - Serve on :8081 with ~400 ms median latency and 2% throttling:
+      python -m tests.benchmarks.fake_openai_server --port 8081 --error-429-rate 0.02
+
+    then run the API against it (any api key is accepted):
+      AZURE_OPENAI_ENDPOINT=http://127.0.0.1:8081 uvicorn main:app
+
+  - Change failure injection on a running server:
+      curl -X POST localhost:8081/_fake/config -d '{"error_500_rate": 0.1}'
+
+  - Usage accounting per deployment (reset with POST /_fake/reset):
+      curl localhost:8081/_fake/stats
+
+Responses honour ``response_format`` json_schema: content is generated from
+the schema (``$ref``/``$defs``, enums, array bounds, numeric ranges) and is
+valid against it. Latency is lognormal, plus per-token costs for the prompt
+and the completion; streamed responses pay the completion cost per chunk.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import contextlib
+import dataclasses
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterator, List, Mapping, Optional, Set, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+_WORDS = (
+    "control access review owner quarterly system data privileged production database approval "
+    "evidence policy process monitoring exception risk management periodic user account log"
+).split()
+
+# Azure only reports cached prompt tokens for prompts of at least 1024 tokens, in 128-token steps
+_CACHE_MIN_TOKENS = 1024
+_CACHE_INCREMENT = 128
+
+
+@dataclass
+class FakeOpenAIConfig:
+    """
+    Behaviour of the fake server; every field can be changed at runtime via ``POST /_fake/config``.
+
+    Latency per request = lognormal(median=latency_median_ms, sigma=latency_sigma)
+    + prompt_tokens * prompt_token_ms + completion_tokens * completion_token_ms.
+    """
+    model: str = "gpt-4o-2024-08-06"
+    latency_median_ms: float = 400.0
+    latency_sigma: float = 0.35
+    prompt_token_ms: float = 0.05
+    completion_token_ms: float = 8.0
+    error_429_rate: float = 0.0
+    error_500_rate: float = 0.0
+    retry_after_s: float = 1.0
+    # Sliding one-minute request quota per deployment; 429 beyond it (0 = unlimited)
+    requests_per_minute: int = 0
+    stream_chunk_tokens: int = 4
+    seed: Optional[int] = None
+
+    def update(self, changes: Mapping[str, Any]) -> None:
+        names = {f.name for f in dataclasses.fields(self)}
+        unknown = set(changes) - names
+        if unknown:
+            raise ValueError(f"Unknown config fields: {sorted(unknown)}")
+        for name, value in changes.items():
+            setattr(self, name, value)
+
+
+@dataclass
+class DeploymentUsage:
+    requests: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    errors: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "total_tokens": self.prompt_tokens + self.completion_tokens,
+            "errors": dict(self.errors),
+        }
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough tiktoken-free estimate (~4 characters per token for English)."""
+    return max(1, math.ceil(len(text) / 4))
+
+
+def _resolve(node: Mapping[str, Any], root: Mapping[str, Any]) -> Mapping[str, Any]:
+    while "$ref" in node:
+        ref = node["$ref"]
+        if not ref.startswith("#/"):
+            raise ValueError(f"Only local $ref is supported: {ref}")
+        target: Any = root
+        for part in ref[2:].split("/"):
+            target = target[part]
+        node = target
+    return node
+
+
+def schema_instance(schema: Mapping[str, Any], rng: random.Random) -> Any:
+    """
+    Generate a value that validates against a (strict-mode) JSON schema.
+
+    Items of an array take distinct enum values per property while any are
+    left, so e.g. five 5Ws items name who/what/when/where/why once each.
+    """
+    return _instance(schema, schema, rng, used=None)
+
+
+def _instance(node: Mapping[str, Any], root: Mapping[str, Any], rng: random.Random,
+              used: Optional[Dict[str, Set[Any]]], key: str = "") -> Any:
+    node = _resolve(node, root)
+    if "const" in node:
+        return node["const"]
+    if "enum" in node:
+        options = list(node["enum"])
+        if used is not None:
+            fresh = [o for o in options if o not in used.setdefault(key, set())]
+            options = fresh or options
+        value = rng.choice(options)
+        if used is not None:
+            used[key].add(value)
+        return value
+    for combinator in ("anyOf", "oneOf"):
+        if combinator in node:
+            return _instance(rng.choice(node[combinator]), root, rng, used, key)
+    if "allOf" in node:
+        merged: Dict[str, Any] = {}
+        for part in node["allOf"]:
+            merged.update(_resolve(part, root))
+        return _instance(merged, root, rng, used, key)
+
+    kind = node.get("type", "object" if "properties" in node else "string")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        return {
+            name: _instance(prop, root, rng, used, f"{key}.{name}")
+            for name, prop in node.get("properties", {}).items()
+        }
+    if kind == "array":
+        low = node.get("minItems", 1)
+        high = node.get("maxItems", max(low, 3))
+        item_used: Dict[str, Set[Any]] = {}
+        return [_instance(node.get("items", {}), root, rng, item_used) for _ in range(rng.randint(low, high))]
+    if kind == "integer":
+        return rng.randint(int(node.get("minimum", 1)), int(node.get("maximum", 100)))
+    if kind == "number":
+        return round(rng.uniform(node.get("minimum", 0.0), node.get("maximum", 1.0)), 2)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if kind == "null":
+        return None
+    words = rng.randint(max(1, node.get("minLength", 0) // 6), 12)
+    text = " ".join(rng.choice(_WORDS) for _ in range(words))
+    return text[:node["maxLength"]] if "maxLength" in node else text
+
+
+class FakeAzureOpenAI:
+    """Request handling, latency model, failure injection and usage ledger behind the HTTP app."""
+
+    def __init__(self, config: Optional[FakeOpenAIConfig] = None) -> None:
+        self.config = config or FakeOpenAIConfig()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._usage: Dict[str, DeploymentUsage] = {}
+        self._recent: Dict[str, List[float]] = {}
+        self._seen_prefixes: Set[str] = set()
+
+    # Accounting
+    def _ledger(self, deployment: str) -> DeploymentUsage:
+        return self._usage.setdefault(deployment, DeploymentUsage())
+
+    def _record_error(self, deployment: str, status: int) -> None:
+        with self._lock:
+            errors = self._ledger(deployment).errors
+            errors[str(status)] = errors.get(str(status), 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {name: usage.to_dict() for name, usage in self._usage.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._usage.clear()
+            self._recent.clear()
+            self._seen_prefixes.clear()
+
+    # Failure injection
+    def injected_failure(self, deployment: str) -> Optional[JSONResponse]:
+        config = self.config
+        with self._lock:
+            roll = self._rng.random()
+            over_quota = False
+            if config.requests_per_minute > 0:
+                now = time.monotonic()
+                recent = [t for t in self._recent.get(deployment, []) if now - t < 60.0]
+                over_quota = len(recent) >= config.requests_per_minute
+                if not over_quota:
+                    recent.append(now)
+                self._recent[deployment] = recent
+
+        if over_quota or roll < config.error_429_rate:
+            self._record_error(deployment, 429)
+            retry_after = config.retry_after_s
+            return JSONResponse(
+                status_code=429,
+                headers={"Retry-After": str(math.ceil(retry_after)), "retry-after-ms": str(int(retry_after * 1000))},
+                content={"error": {
+                    "code": "429",
+                    "message": (
+                        "Requests to the ChatCompletions_Create Operation under Azure OpenAI API have "
+                        f"exceeded call rate limit. Please retry after {math.ceil(retry_after)} seconds."
+                    ),
+                }},
+            )
+        if roll < config.error_429_rate + config.error_500_rate:
+            self._record_error(deployment, 500)
+            return JSONResponse(
+                status_code=500,
+                headers={"Retry-After": str(math.ceil(config.retry_after_s))},
+                content={"error": {"code": "InternalServerError", "message": "The server had an error."}},
+            )
+        return None
+
+    # Completion
+    def complete(self, deployment: str, body: Mapping[str, Any]) -> Tuple[str, str, Dict[str, Any], float, float]:
+        """Return (content, finish_reason, usage, time-to-first-token s, per-completion-token s)."""
+        messages = body.get("messages", [])
+        prompt_text = "\n".join(str(m.get("content") or "") for m in messages)
+        response_format = body.get("response_format") or {}
+        prompt_tokens = estimate_tokens(prompt_text)
+        if response_format.get("type") == "json_schema":
+            prompt_tokens += estimate_tokens(json.dumps(response_format["json_schema"].get("schema", {})))
+
+        with self._lock:
+            rng = random.Random(self._rng.random())
+            base_s = self.config.latency_median_ms / 1000 * math.exp(self._rng.gauss(0.0, self.config.latency_sigma))
+            cached_tokens = self._cached_tokens(messages, prompt_tokens)
+
+        if response_format.get("type") == "json_schema":
+            content = json.dumps(schema_instance(response_format["json_schema"].get("schema", {}), rng))
+        elif response_format.get("type") == "json_object":
+            content = "{}"
+        else:
+            content = " ".join(rng.choice(_WORDS) for _ in range(12))
+
+        finish_reason = "stop"
+        completion_tokens = estimate_tokens(content)
+        max_tokens = body.get("max_tokens") or body.get("max_completion_tokens")
+        if max_tokens and completion_tokens > max_tokens:
+            content, completion_tokens, finish_reason = content[:max_tokens * 4], max_tokens, "length"
+
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        }
+        with self._lock:
+            ledger = self._ledger(deployment)
+            ledger.requests += 1
+            ledger.prompt_tokens += prompt_tokens
+            ledger.completion_tokens += completion_tokens
+            ledger.cached_tokens += cached_tokens
+
+        ttft_s = base_s + prompt_tokens * self.config.prompt_token_ms / 1000
+        return content, finish_reason, usage, ttft_s, self.config.completion_token_ms / 1000
+
+    def _cached_tokens(self, messages: List[Mapping[str, Any]], prompt_tokens: int) -> int:
+        # Called with self._lock held. The system prompt stands in for the cacheable prefix.
+        if prompt_tokens < _CACHE_MIN_TOKENS or not messages:
+            return 0
+        prefix = str(messages[0].get("content") or "")
+        digest = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        if digest not in self._seen_prefixes:
+            self._seen_prefixes.add(digest)
+            return 0
+        cacheable = min(estimate_tokens(prefix), prompt_tokens)
+        return cacheable // _CACHE_INCREMENT * _CACHE_INCREMENT if cacheable >= _CACHE_MIN_TOKENS else 0
+
+
+def _completion_body(completion_id: str, model: str, content: str, finish_reason: str,
+                      usage: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "system_fingerprint": "fp_fake",
+        "choices": [{
+            "index": 0,
+            "finish_reason": finish_reason,
+            "message": {"role": "assistant", "content": content, "refusal": None},
+        }],
+        "usage": usage,
+    }
+
+
+def _split_tokens(content: str, chunk_tokens: int) -> Iterator[str]:
+    size = max(1, chunk_tokens) * 4
+    for start in range(0, len(content), size):
+        yield content[start:start + size]
+
+
+def create_app(fake: Optional[FakeAzureOpenAI] = None) -> FastAPI:
+    fake = fake or FakeAzureOpenAI()
+    app = FastAPI(title="Fake Azure OpenAI")
+    app.state.fake = fake
+
+    @app.get("/openai/models")
+    async def list_models() -> Dict[str, Any]:
+        return {"object": "list", "data": [{"id": fake.config.model, "object": "model"}]}
+
+    @app.post("/openai/deployments/{deployment}/chat/completions")
+    async def chat_completions(deployment: str, request: Request):
+        if not (request.headers.get("api-key") or request.headers.get("authorization")):
+            return JSONResponse(status_code=401, content={"error": {"code": "401", "message": "Access denied."}})
+        failure = fake.injected_failure(deployment)
+        if failure is not None:
+            return failure
+
+        body = await request.json()
+        content, finish_reason, usage, ttft_s, token_s = fake.complete(deployment, body)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        model = fake.config.model
+
+        if not body.get("stream"):
+            await asyncio.sleep(ttft_s + usage["completion_tokens"] * token_s)
+            return _completion_body(completion_id, model, content, finish_reason, usage)
+
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        async def events() -> AsyncIterator[bytes]:
+            def chunk(delta: Dict[str, Any], finish: Optional[str] = None, **extra: Any) -> bytes:
+                payload = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                    "model": model, "system_fingerprint": "fp_fake",
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish}] if delta is not None else [],
+                    **extra,
+                }
+                return f"data: {json.dumps(payload)}\n\n".encode("utf-8")
+
+            await asyncio.sleep(ttft_s)
+            yield chunk({"role": "assistant", "content": ""})
+            for piece in _split_tokens(content, fake.config.stream_chunk_tokens):
+                await asyncio.sleep(estimate_tokens(piece) * token_s)
+                yield chunk({"content": piece})
+            yield chunk({}, finish_reason)
+            if include_usage:
+                yield chunk(None, usage=usage)
+            yield b"data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/_fake/stats")
+    async def stats() -> Dict[str, Any]:
+        return {"config": dataclasses.asdict(fake.config), "deployments": fake.stats()}
+
+    @app.post("/_fake/reset")
+    async def reset() -> Dict[str, Any]:
+        fake.reset()
+        return {"ok": True}
+
+    @app.post("/_fake/config")
+    async def update_config(request: Request):
+        try:
+            fake.config.update(await request.json())
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"error": str(e)})
+        return dataclasses.asdict(fake.config)
+
+    return app
+
+
+@contextlib.contextmanager
+def serve(config: Optional[FakeOpenAIConfig] = None, *, host: str = "127.0.0.1",
+          port: int = 0) -> Iterator[Tuple[str, FakeAzureOpenAI]]:
+    """Run the fake server on a background thread; yields (endpoint URL, FakeAzureOpenAI)."""
+    fake = FakeAzureOpenAI(config)
+    server = uvicorn.Server(uvicorn.Config(create_app(fake), host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="fake-openai", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("Fake OpenAI server failed to start")
+        time.sleep(0.01)
+    bound_port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://{host}:{bound_port}", fake
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+def main() -> int:
+    defaults = FakeOpenAIConfig()
+    parser = argparse.ArgumentParser(description="Fake Azure OpenAI Chat Completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--model", default=defaults.model)
+    parser.add_argument("--latency-median-ms", type=float, default=defaults.latency_median_ms)
+    parser.add_argument("--latency-sigma", type=float, default=defaults.latency_sigma)
+    parser.add_argument("--prompt-token-ms", type=float, default=defaults.prompt_token_ms)
+    parser.add_argument("--completion-token-ms", type=float, default=defaults.completion_token_ms)
+    parser.add_argument("--error-429-rate", type=float, default=defaults.error_429_rate)
+    parser.add_argument("--error-500-rate", type=float, default=defaults.error_500_rate)
+    parser.add_argument("--retry-after-s", type=float, default=defaults.retry_after_s)
+    parser.add_argument("--requests-per-minute", type=int, default=defaults.requests_per_minute)
+    parser.add_argument("--stream-chunk-tokens", type=int, default=defaults.stream_chunk_tokens)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = FakeOpenAIConfig(**{
+        f.name: getattr(args, f.name) for f in dataclasses.fields(FakeOpenAIConfig)
+    })
+    uvicorn.run(create_app(FakeAzureOpenAI(config)), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,100 @@
+"""Minimal HDR (high dynamic range) histogram for latency recording.
+
+Values are bucketed log-linearly: exact below ``2**sub_bucket_bits`` and
+then with a constant relative error (~0.05% for the default 3 significant
+digits), so p99.9 of a million samples costs a few thousand counters rather
+than a sorted list. Counts serialize to a dict so runs can be merged and
+compared offline.
+"""
+from __future__ import annotations
+import math
+from typing import Dict, Iterable, Iterator, Mapping, Optional, Tuple
+
+
+class HdrHistogram:
+    def __init__(self, significant_figures: int = 3) -> None:
+        if not 1 <= significant_figures <= 5:
+            raise ValueError("significant_figures must be between 1 and 5")
+        self.significant_figures = significant_figures
+        # Sub-buckets per power of two, enough to resolve 10**significant_figures distinct values
+        self._bits = math.ceil(math.log2(2 * 10 ** significant_figures))
+        self._counts: Dict[int, int] = {}
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+        self._sum = 0
+
+    def _bucket(self, value: int) -> Tuple[int, int]:
+        """(lowest equivalent value, bucket width) of the bucket holding ``value``."""
+        shift = max(0, value.bit_length() - self._bits)
+        return (value >> shift) << shift, 1 << shift
+
+    def record(self, value: int, count: int = 1) -> None:
+        if value < 0:
+            raise ValueError("HdrHistogram only records non-negative values")
+        value = int(value)
+        low, _ = self._bucket(value)
+        self._counts[low] = self._counts.get(low, 0) + count
+        self.total += count
+        self._sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "HdrHistogram") -> None:
+        for low, count in other._counts.items():
+            self._counts[low] = self._counts.get(low, 0) + count
+        self.total += other.total
+        self._sum += other._sum
+        for bound in (other.min, other.max):
+            if bound is not None:
+                self.min = bound if self.min is None else min(self.min, bound)
+                self.max = bound if self.max is None else max(self.max, bound)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self._sum / self.total if self.total else None
+
+    def percentile(self, p: float) -> Optional[int]:
+        """Value at or below which ``p`` percent of recordings fall (bucket midpoint, clamped to min/max)."""
+        if not self.total:
+            return None
+        # The epsilon keeps e.g. 99.9% of 20000 at rank 19980 despite float rounding
+        rank = max(1, math.ceil(p / 100 * self.total - 1e-9))
+        seen = 0
+        for low, count in sorted(self._counts.items()):
+            seen += count
+            if seen >= rank:
+                _, width = self._bucket(low)
+                return min(max(low + width // 2, self.min), self.max)  # type: ignore[type-var]
+        return self.max
+
+    def buckets(self) -> Iterator[Tuple[int, int]]:
+        """(lowest equivalent value, count) in ascending order."""
+        return iter(sorted(self._counts.items()))
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "significant_figures": self.significant_figures,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "sum": self._sum,
+            "counts": {str(low): count for low, count in sorted(self._counts.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, object]) -> "HdrHistogram":
+        hist = cls(int(data["significant_figures"]))  # type: ignore[arg-type]
+        hist._counts = {int(low): int(count) for low, count in data["counts"].items()}  # type: ignore[union-attr]
+        hist.total = int(data["total"])  # type: ignore[arg-type]
+        hist.min = data["min"]  # type: ignore[assignment]
+        hist.max = data["max"]  # type: ignore[assignment]
+        hist._sum = int(data["sum"])  # type: ignore[arg-type]
+        return hist
+
+    @classmethod
+    def of(cls, values: Iterable[int], significant_figures: int = 3) -> "HdrHistogram":
+        hist = cls(significant_figures)
+        for value in values:
+            hist.record(value)
+        return hist
@@ -0,0 +1,363 @@
+"""Load generator for the mapper endpoints: open-loop (arrival rate) or closed-loop (concurrency).
+
+Usage examples:
+  - Closed loop, 16 concurrent clients for 60 s against both mappers:
+      python -m tests.benchmarks.loadgen --base http://127.0.0.1:8000/v2024-12 \
+        --route taxonomy_mapper --route 5ws_mapper --mode closed --concurrency 16 --duration 60
+
+  - Open loop, Poisson arrivals at 20 req/s, 3:1 taxonomy/5Ws mix, saved for later comparison:
+      python -m tests.benchmarks.loadgen --base http://127.0.0.1:8000/v2024-12 \
+        --route taxonomy_mapper:3 --route 5ws_mapper:1 --mode open --rate 20 --duration 120 \
+        --output runs/baseline.json
+
+  - Same run, failing (exit 1) when p50..p999 or throughput regress more than 10% vs the baseline:
+      python -m tests.benchmarks.loadgen ... --baseline runs/baseline.json --max-regression-pct 10
+
+Corpora (``--corpus``, repeatable) are either JSONL files of request bodies
+(``{"route": "/5ws_mapper", "body": {...}}`` or ``{"controlDescription": "..."}``
+per line) or ground-truth JSON files (``gt_5ws.json``, ``gt_risk_themes.json``);
+the bundled ground-truth controls are used by default.
+
+Open-loop latency is measured from each request's *scheduled* send time, so
+a saturated server cannot hide its queueing (no coordinated omission);
+``service_time_ms`` is measured from the actual send.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import httpx
+
+from tests.benchmarks.hdr_histogram import HdrHistogram
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "mapper_api" / "infrastructure" / "local" / "data"
+DEFAULT_CORPORA = (DATA_DIR / "gt_5ws.json", DATA_DIR / "gt_risk_themes.json")
+PERCENTILES = {"p50": 50.0, "p95": 95.0, "p99": 99.0, "p999": 99.9}
+
+
+@dataclass(frozen=True)
+class CorpusEntry:
+    """One request body; ``route`` pins it to an endpoint, otherwise it follows the route mix."""
+    body: Dict[str, Any]
+    route: Optional[str] = None
+
+
+@dataclass
+class LoadConfig:
+    routes: Dict[str, float] = field(default_factory=lambda: {"taxonomy_mapper": 1.0})
+    mode: str = "closed"
+    concurrency: int = 8
+    rate: float = 10.0
+    arrival: str = "poisson"
+    duration_s: float = 30.0
+    max_requests: Optional[int] = None
+    warmup_s: float = 0.0
+    max_in_flight: int = 1000
+    timeout_s: float = 120.0
+    metric_type: Any = "all"
+    seed: Optional[int] = None
+
+
+def _control_body(text: str, record_id: Optional[str] = None) -> Dict[str, Any]:
+    return {"header": {"recordId": record_id or "load"}, "data": {"controlDescription": text}}
+
+
+def load_corpus(path: str | Path) -> List[CorpusEntry]:
+    """Read request bodies from a JSONL corpus or a ground-truth JSON file."""
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".jsonl":
+        entries = []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if "body" in item:
+                route = item.get("route")
+                entries.append(CorpusEntry(body=item["body"], route=route.strip("/") if route else None))
+            else:
+                control = item.get("controlDescription") or item.get("control_description") or item["text"]
+                entries.append(CorpusEntry(body=_control_body(control, item.get("recordId"))))
+        return entries
+    # Ground truth: [{"control_id": ..., "control_description": ...}, ...]
+    return [
+        CorpusEntry(body=_control_body(record["control_description"], str(record.get("control_id", "load"))))
+        for record in json.loads(text)
+    ]
+
+
+class RouteStats:
+    def __init__(self) -> None:
+        self.latency_us = HdrHistogram()
+        self.service_us = HdrHistogram()
+        self.ok = 0
+        self.errors: Dict[str, int] = {}
+
+    def record(self, latency_s: float, service_s: float, error: Optional[str]) -> None:
+        self.latency_us.record(int(latency_s * 1_000_000))
+        self.service_us.record(int(service_s * 1_000_000))
+        if error is None:
+            self.ok += 1
+        else:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def merge(self, other: "RouteStats") -> None:
+        self.latency_us.merge(other.latency_us)
+        self.service_us.merge(other.service_us)
+        self.ok += other.ok
+        for key, count in other.errors.items():
+            self.errors[key] = self.errors.get(key, 0) + count
+
+    @staticmethod
+    def _ms(hist: HdrHistogram) -> Dict[str, Optional[float]]:
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(value / 1000, 2) if value is not None else None
+        return {
+            **{name: ms(hist.percentile(p)) for name, p in PERCENTILES.items()},
+            "min": ms(hist.min),
+            "max": ms(hist.max),
+            "mean": ms(hist.mean),
+        }
+
+    def summary(self, elapsed_s: float) -> Dict[str, Any]:
+        requests = self.latency_us.total
+        return {
+            "requests": requests,
+            "ok": self.ok,
+            "error_rate": round(1 - self.ok / requests, 4) if requests else 0.0,
+            "errors": dict(sorted(self.errors.items())),
+            "throughput_rps": round(self.ok / elapsed_s, 3) if elapsed_s > 0 else 0.0,
+            "latency_ms": self._ms(self.latency_us),
+            "service_time_ms": self._ms(self.service_us),
+            "histogram_us": self.latency_us.to_dict(),
+        }
+
+
+class _Run:
+    def __init__(self, config: LoadConfig, corpus: Sequence[CorpusEntry], client: httpx.AsyncClient) -> None:
+        if not corpus:
+            raise ValueError("Corpus is empty")
+        self.config = config
+        self.client = client
+        self.rng = random.Random(config.seed)
+        self.run_id = uuid.uuid4().hex[:8]
+        self.stats: Dict[str, RouteStats] = {route: RouteStats() for route in config.routes}
+        self.issued = 0
+        self.dropped = 0
+        self._route_names = list(config.routes)
+        self._route_weights = [config.routes[r] for r in self._route_names]
+        self._corpus = list(corpus)
+        self._measure_from = 0.0
+
+    def _next_request(self) -> Tuple[str, Dict[str, Any]]:
+        entry = self.rng.choice(self._corpus)
+        route = entry.route or self.rng.choices(self._route_names, self._route_weights)[0]
+        self.issued += 1
+        record_id = f"load-{self.run_id}-{self.issued}"
+        if route == "evaluator" and entry.route is None:
+            body: Dict[str, Any] = {"header": {"recordId": record_id}, "data": {"metricType": self.config.metric_type}}
+        else:
+            body = {**entry.body, "header": {**entry.body.get("header", {}), "recordId": record_id}}
+        return route, body
+
+    async def _send(self, route: str, body: Dict[str, Any], scheduled: float) -> None:
+        sent = time.perf_counter()
+        error = None
+        try:
+            response = await self.client.post(f"/{route}", json=body)
+            await response.aread()
+            if response.status_code >= 400:
+                error = f"http_{response.status_code}"
+        except Exception as e:
+            error = type(e).__name__
+        done = time.perf_counter()
+        if scheduled >= self._measure_from:
+            self.stats.setdefault(route, RouteStats()).record(done - scheduled, done - sent, error)
+
+    def _more(self, started: float, now: float) -> bool:
+        if self.config.max_requests is not None:
+            return self.issued < self.config.max_requests
+        return now - started < self.config.duration_s
+
+    async def closed_loop(self, started: float) -> None:
+        async def worker() -> None:
+            while self._more(started, time.perf_counter()):
+                route, body = self._next_request()
+                now = time.perf_counter()
+                await self._send(route, body, now)
+
+        await asyncio.gather(*(worker() for _ in range(self.config.concurrency)))
+
+    async def open_loop(self, started: float) -> None:
+        in_flight: set[asyncio.Task] = set()
+        scheduled = started
+        while self._more(started, scheduled):
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= self.config.max_in_flight:
+                # The generator itself is saturated; count it rather than silently slowing arrivals
+                self.dropped += 1
+            else:
+                route, body = self._next_request()
+                task = asyncio.create_task(self._send(route, body, scheduled))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            if self.config.arrival == "poisson":
+                scheduled += self.rng.expovariate(self.config.rate)
+            else:
+                scheduled += 1 / self.config.rate
+        if in_flight:
+            await asyncio.gather(*in_flight)
+
+    async def run(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        self._measure_from = started + self.config.warmup_s
+        if self.config.mode == "open":
+            await self.open_loop(started)
+        elif self.config.mode == "closed":
+            await self.closed_loop(started)
+        else:
+            raise ValueError(f"Unknown mode: {self.config.mode}")
+        elapsed = time.perf_counter() - self._measure_from
+
+        overall = RouteStats()
+        for stats in self.stats.values():
+            overall.merge(stats)
+        return {
+            "run_id": self.run_id,
+            "config": asdict(self.config),
+            "elapsed_s": round(elapsed, 3),
+            "issued": self.issued,
+            "dropped": self.dropped,
+            "routes": {route: stats.summary(elapsed) for route, stats in self.stats.items()},
+            "overall": overall.summary(elapsed),
+        }
+
+
+async def run_load(
+    config: LoadConfig,
+    corpus: Sequence[CorpusEntry],
+    *,
+    base_url: str = "",
+    client: Optional[httpx.AsyncClient] = None,
+) -> Dict[str, Any]:
+    """Run one load test and return the machine-readable report."""
+    if client is not None:
+        return await _Run(config, corpus, client).run()
+    connections = config.concurrency if config.mode == "closed" else config.max_in_flight
+    async with httpx.AsyncClient(
+        base_url=base_url.rstrip("/"),
+        timeout=config.timeout_s,
+        limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+    ) as owned:
+        return await _Run(config, corpus, owned).run()
+
+
+def compare(report: Mapping[str, Any], baseline: Mapping[str, Any], max_regression_pct: float) -> List[Dict[str, Any]]:
+    """
+    Per-route deltas of latency percentiles and throughput against a baseline report.
+
+    Each row has ``regressed`` set when latency grew, or throughput fell, by
+    more than ``max_regression_pct`` percent.
+    """
+    rows = []
+    for route, current in report["routes"].items():
+        previous = baseline.get("routes", {}).get(route)
+        if previous is None:
+            continue
+        metrics = [(f"latency_ms.{name}", current["latency_ms"][name], previous["latency_ms"][name], False)
+                   for name in PERCENTILES]
+        metrics.append(("throughput_rps", current["throughput_rps"], previous["throughput_rps"], True))
+        for metric, now, before, higher_is_better in metrics:
+            if now is None or not before:
+                continue
+            change_pct = (now - before) / before * 100
+            worse = -change_pct if higher_is_better else change_pct
+            rows.append({
+                "route": route,
+                "metric": metric,
+                "baseline": before,
+                "current": now,
+                "change_pct": round(change_pct, 2),
+                "regressed": worse > max_regression_pct,
+            })
+    return rows
+
+
+def _parse_routes(values: Sequence[str]) -> Dict[str, float]:
+    routes: Dict[str, float] = {}
+    for value in values:
+        name, _, weight = value.partition(":")
+        routes[name.strip("/")] = float(weight) if weight else 1.0
+    return routes
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Open/closed-loop load generator for the mapper API")
+    parser.add_argument("--base", required=True, help="Base URL including the version prefix")
+    parser.add_argument("--route", action="append", default=[],
+                        help="Endpoint to load, optionally weighted: taxonomy_mapper:3 (repeatable)")
+    parser.add_argument("--mode", choices=["open", "closed"], default="closed")
+    parser.add_argument("--concurrency", type=int, default=8, help="Closed loop: concurrent clients")
+    parser.add_argument("--rate", type=float, default=10.0, help="Open loop: arrivals per second")
+    parser.add_argument("--arrival", choices=["poisson", "uniform"], default="poisson")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to generate load")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests instead")
+    parser.add_argument("--warmup", type=float, default=0.0, help="Seconds at the start excluded from results")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--corpus", action="append", default=[], help="JSONL or ground-truth JSON (repeatable)")
+    parser.add_argument("--metric-type", default="all", help="metricType sent to /evaluator")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="Write the full report (with histograms) to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a previous --output report")
+    parser.add_argument("--max-regression-pct", type=float, default=10.0)
+    args = parser.parse_args()
+
+    config = LoadConfig(
+        routes=_parse_routes(args.route or ["taxonomy_mapper"]),
+        mode=args.mode,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        arrival=args.arrival,
+        duration_s=args.duration,
+        max_requests=args.requests,
+        warmup_s=args.warmup,
+        max_in_flight=args.max_in_flight,
+        timeout_s=args.timeout,
+        metric_type=args.metric_type,
+        seed=args.seed,
+    )
+    corpus = [entry for path in (args.corpus or DEFAULT_CORPORA) for entry in load_corpus(path)]
+    report = asyncio.run(run_load(config, corpus, base_url=args.base))
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    summary = {
+        key: value for key, value in report.items() if key not in ("routes", "overall")
+    }
+    summary["routes"] = {
+        route: {k: v for k, v in stats.items() if k != "histogram_us"} for route, stats in report["routes"].items()
+    }
+    exit_code = 0
+    if args.baseline:
+        rows = compare(report, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.max_regression_pct)
+        summary["comparison"] = rows
+        exit_code = 1 if any(row["regressed"] for row in rows) else 0
+    print(json.dumps(summary, indent=2))
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""Replay captured traffic against any deployment and compare latencies with the original.
+
+Usage examples:
+  - Replay a capture directory at the original inter-arrival times:
+      python -m tests.benchmarks.replay --base http://127.0.0.1:8000/mapper-api --capture .mapper_capture
+
+  - 4x faster, restoring hashed control texts from the ground-truth corpus, report saved:
+      python -m tests.benchmarks.replay --base http://127.0.0.1:8000/mapper-api --capture .mapper_capture \
+        --speed 4 --corpus mapper_api/infrastructure/local/data/gt_5ws.json --output runs/replay.json
+
+Captures written with CAPTURE_INCLUDE_TEXT=false only hold a SHA-256 of each
+control description; those requests are replayed when a ``--corpus`` file
+contains the same text and skipped (and counted) otherwise. Latency is
+measured from each request's scheduled send time, as in the load generator.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import hashlib
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import httpx
+
+from mapper_api.infrastructure.local.capture_log import read_capture
+from tests.benchmarks.hdr_histogram import HdrHistogram
+from tests.benchmarks.loadgen import PERCENTILES, load_corpus
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def resolve_bodies(records: Iterable[Mapping[str, Any]], texts: Mapping[str, str]) -> List[Dict[str, Any]]:
+    """
+    Records ready to send, with hashed control texts restored from ``texts`` (sha256 -> text).
+
+    Records whose text cannot be restored get ``"body": None``.
+    """
+    resolved = []
+    for record in records:
+        record = dict(record)
+        body = record.get("body")
+        if body is not None:
+            data = body.get("data") or {}
+            if "controlSha256" in record and "controlDescription" not in data:
+                text = texts.get(record["controlSha256"])
+                body = {**body, "data": {**data, "controlDescription": text}} if text is not None else None
+        record["body"] = body
+        resolved.append(record)
+    return resolved
+
+
+class _RouteComparison:
+    def __init__(self) -> None:
+        self.original_us = HdrHistogram()
+        self.replay_us = HdrHistogram()
+        self.deltas_ms: List[float] = []
+        self.errors: Dict[str, int] = {}
+        self.status_mismatches = 0
+
+    def record(self, original_ms: float, replay_ms: float, original_status: int, status: Optional[int],
+               error: Optional[str]) -> None:
+        self.original_us.record(int(original_ms * 1000))
+        self.replay_us.record(int(replay_ms * 1000))
+        self.deltas_ms.append(replay_ms - original_ms)
+        if error is not None:
+            self.errors[error] = self.errors.get(error, 0) + 1
+        if status != original_status:
+            self.status_mismatches += 1
+
+    def summary(self) -> Dict[str, Any]:
+        def percentiles(hist: HdrHistogram) -> Dict[str, Optional[float]]:
+            return {name: (round(v / 1000, 2) if (v := hist.percentile(p)) is not None else None)
+                    for name, p in PERCENTILES.items()}
+
+        original, replay = percentiles(self.original_us), percentiles(self.replay_us)
+        deltas = sorted(self.deltas_ms)
+        return {
+            "requests": self.replay_us.total,
+            "errors": dict(sorted(self.errors.items())),
+            "status_mismatches": self.status_mismatches,
+            "original_ms": original,
+            "replay_ms": replay,
+            "change_pct": {
+                name: round((replay[name] - original[name]) / original[name] * 100, 2)
+                for name in PERCENTILES if original[name] and replay[name] is not None
+            },
+            "per_request_delta_ms": {
+                "median": round(statistics.median(deltas), 2) if deltas else None,
+                "p95": round(deltas[min(len(deltas) - 1, int(0.95 * len(deltas)))], 2) if deltas else None,
+                "min": round(deltas[0], 2) if deltas else None,
+                "max": round(deltas[-1], 2) if deltas else None,
+            },
+        }
+
+
+async def replay_capture(
+    records: Sequence[Mapping[str, Any]],
+    *,
+    client: httpx.AsyncClient,
+    speed: float = 1.0,
+    max_in_flight: int = 1000,
+) -> Dict[str, Any]:
+    """Re-send ``records`` (sorted by capture time) at ``speed`` x the original pace."""
+    if speed <= 0:
+        raise ValueError("speed must be positive")
+    sendable = sorted((r for r in records if r.get("body") is not None), key=lambda r: r["ts"])
+    skipped = len(records) - len(sendable)
+    comparisons: Dict[str, _RouteComparison] = {}
+    semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def send(record: Mapping[str, Any], scheduled: float) -> None:
+        status: Optional[int] = None
+        error: Optional[str] = None
+        async with semaphore:
+            try:
+                response = await client.post(record["route"], json=record["body"])
+                await response.aread()
+                status = response.status_code
+                if status >= 400:
+                    error = f"http_{status}"
+            except Exception as e:
+                error = type(e).__name__
+        replay_ms = (time.perf_counter() - scheduled) * 1000
+        comparisons.setdefault(record["route"], _RouteComparison()).record(
+            record["durationMs"], replay_ms, record.get("status", 200), status, error
+        )
+
+    started = time.perf_counter()
+    tasks = []
+    if sendable:
+        first_ts = sendable[0]["ts"]
+        for record in sendable:
+            scheduled = started + (record["ts"] - first_ts) / speed
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(record, scheduled)))
+        await asyncio.gather(*tasks)
+
+    return {
+        "speed": speed,
+        "replayed": len(sendable),
+        "skipped_unresolved": skipped,
+        "original_span_s": round(sendable[-1]["ts"] - sendable[0]["ts"], 3) if sendable else 0.0,
+        "elapsed_s": round(time.perf_counter() - started, 3),
+        "routes": {route: comparison.summary() for route, comparison in sorted(comparisons.items())},
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay captured mapper traffic and compare latencies")
+    parser.add_argument("--base", required=True, help="Base URL; captured routes are appended (e.g. /v2024-12/...)")
+    parser.add_argument("--capture", action="append", required=True, help="Capture file or directory (repeatable)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier (2 = twice as fast)")
+    parser.add_argument("--corpus", action="append", default=[], help="Corpus to restore hashed control texts")
+    parser.add_argument("--route", action="append", default=[], help="Only replay routes ending with this")
+    parser.add_argument("--limit", type=int, default=None, help="Replay only the first N captured requests")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    texts = {
+        _sha256(entry.body["data"]["controlDescription"]): entry.body["data"]["controlDescription"]
+        for path in args.corpus for entry in load_corpus(path)
+        if "controlDescription" in entry.body.get("data", {})
+    }
+    records = [r for r in read_capture(args.capture) if not args.route or r["route"].endswith(tuple(args.route))]
+    records = sorted(records, key=lambda r: r["ts"])[:args.limit]
+
+    async def run() -> Dict[str, Any]:
+        async with httpx.AsyncClient(base_url=args.base.rstrip("/"), timeout=args.timeout) as client:
+            return await replay_capture(
+                resolve_bodies(records, texts), client=client, speed=args.speed, max_in_flight=args.max_in_flight
+            )
+
+    report = asyncio.run(run())
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
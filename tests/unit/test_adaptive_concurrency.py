@@ -0,0 +1,169 @@
+"""Tests for the adaptive (AIMD) limit on concurrent LLM calls."""
+import threading
+import time
+from contextlib import ExitStack
+
+import pytest
+from tenacity import RetryError
+
+from mapper_api.application.dto.llm_schemas import FiveWOut
+from mapper_api.application.services.adaptive_concurrency import AdaptiveConcurrencyLimiter, note_throttled
+from mapper_api.application.services.metrics import LLM_CONCURRENCY_LIMIT, LLM_IN_FLIGHT
+from mapper_api.application.services.rate_limiter import LLMRateLimiter
+from mapper_api.domain.errors import LLMCapacityError
+from mapper_api.infrastructure.azure.http_transport import SharedHttpTransport
+from mapper_api.infrastructure.azure.openai_client import AzureOpenAILLMClient, llm_outcome
+from mapper_api.infrastructure.local.rate_limit_store import InMemoryRateLimitStore
+from tests.benchmarks.fake_openai_server import FakeOpenAIConfig, serve
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _run_batch(limiter, clock, latency_s, size=None):
+    """Run ``size`` (default: the limit) concurrent calls that all take ``latency_s``."""
+    with ExitStack() as held:
+        for _ in range(size or limiter.limit):
+            held.enter_context(limiter.slot())
+        clock.now += latency_s
+
+
+def test_limit_grows_while_latency_is_flat():
+    clock = FakeClock()
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=8, clock=clock)
+    for _ in range(10):
+        _run_batch(limiter, clock, 0.1)
+    assert limiter.limit == 8
+    assert LLM_CONCURRENCY_LIMIT.labels()._state() == 8
+    # An idle limiter (under half used) does not grow
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=8, clock=clock)
+    for _ in range(10):
+        _run_batch(limiter, clock, 0.1, size=1)
+    assert limiter.limit == 4
+
+
+def test_burst_of_429s_cuts_the_limit_once():
+    clock = FakeClock()
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, backoff_ratio=0.5, clock=clock)
+    with ExitStack() as held:
+        for _ in range(5):
+            held.enter_context(limiter.slot())
+            note_throttled()  # as the transport does on each 429, also SDK-internal retries
+        clock.now += 0.1
+    assert limiter.limit == 5
+    # An attempt started after the cut that is throttled again opens a new episode
+    clock.now += 0.1
+    with limiter.slot():
+        note_throttled()
+    assert limiter.limit == 2
+    # Timeouts count as throttling too
+    limiter = AdaptiveConcurrencyLimiter(
+        initial_limit=10, backoff_ratio=0.5, clock=clock,
+        classify=lambda e: "timeout" if isinstance(e, TimeoutError) else "error",
+    )
+    with pytest.raises(TimeoutError):
+        with limiter.slot():
+            raise TimeoutError
+    assert limiter.limit == 5
+
+
+def test_latency_inflation_cuts_the_limit():
+    clock = FakeClock()
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=16, latency_tolerance=2.0, clock=clock)
+    for _ in range(5):
+        _run_batch(limiter, clock, 0.1)
+    grown = limiter.limit
+    # Ten times slower: one cut per batch, as each batch starts after the previous cut
+    for _ in range(3):
+        _run_batch(limiter, clock, 1.0)
+    assert limiter.limit < grown / 2
+    stats = limiter.stats()
+    assert stats["inFlight"] == 0 and stats["latencyMs"] > 2 * stats["baselineMs"]
+
+
+def test_callers_over_the_limit_wait_then_time_out():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, min_limit=1, max_limit=1, wait_timeout_s=0.05)
+    released = []
+
+    def hold():
+        with limiter.slot():
+            time.sleep(0.02)
+        released.append(True)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    time.sleep(0.005)
+    with limiter.slot():  # waits for the holder's slot
+        assert released == [True]
+    holder.join()
+
+    with limiter.slot():
+        assert LLM_IN_FLIGHT.labels()._state() == 1
+        with pytest.raises(LLMCapacityError, match="limit 1"):
+            with limiter.slot():
+                pass
+    assert limiter.in_flight == 0 and LLM_IN_FLIGHT.labels()._state() == 0
+
+
+def test_llm_client_backs_off_on_429s():
+    fast = dict(latency_median_ms=5.0, latency_sigma=0.0, prompt_token_ms=0.0, completion_token_ms=0.0, seed=3)
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=16, classify=llm_outcome)
+    transport = SharedHttpTransport(http2=False)
+    with serve(FakeOpenAIConfig(**fast)) as (url, fake):
+        client = AzureOpenAILLMClient(
+            endpoint=url, api_key="fake-key", api_version="2024-12-01-preview",
+            http_client=transport.sync_client, concurrency_limiter=limiter,
+        )
+        call = dict(system="Classify.", user="Control text", schema_name="FiveWsResponse",
+                    schema=FiveWOut.model_json_schema(), max_tokens=400, deployment="gpt-4o")
+        client.json_schema_chat(**call)
+        assert limiter.limit == 16
+        fake.config.update({"error_429_rate": 1.0, "retry_after_s": 0.01})
+        with pytest.raises(RetryError):
+            client.json_schema_chat(**call)
+    transport.close()
+    # One cut per attempt (each attempt starts after the previous cut)
+    assert limiter.limit == int(16 * 0.7 * 0.7)
+    assert LLM_CONCURRENCY_LIMIT.labels()._state() == limiter.limit and limiter.in_flight == 0
+
+
+def test_no_capacity_is_not_retried():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, min_limit=1, max_limit=1, wait_timeout_s=0.01)
+    client = AzureOpenAILLMClient(
+        endpoint="http://127.0.0.1:9", api_key="fake-key", api_version="2024-12-01-preview",
+        concurrency_limiter=limiter,
+    )
+    with limiter.slot():
+        with pytest.raises(LLMCapacityError):
+            client.json_schema_chat(system="s", user="u", schema_name="FiveWsResponse",
+                                    schema=FiveWOut.model_json_schema(), max_tokens=10, deployment="gpt-4o")
+
+
+def test_stream_holds_a_slot_only_once_open():
+    fast = dict(latency_median_ms=5.0, latency_sigma=0.0, prompt_token_ms=0.0, completion_token_ms=0.0, seed=3)
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, classify=llm_outcome)
+    in_flight_while_waiting = []
+    # One request per second: the second stream waits for quota (the sleep stubbed to record the slots held)
+    quota = LLMRateLimiter(InMemoryRateLimitStore(), requests_per_minute=60, burst_s=1.0,
+                           sleep=lambda s: in_flight_while_waiting.append(limiter.in_flight))
+    transport = SharedHttpTransport(http2=False)
+    with serve(FakeOpenAIConfig(**fast)) as (url, fake):
+        client = AzureOpenAILLMClient(
+            endpoint=url, api_key="fake-key", api_version="2024-12-01-preview",
+            http_client=transport.sync_client, concurrency_limiter=limiter, rate_limiter=quota,
+        )
+        call = dict(system="Classify.", user="Control text", schema_name="FiveWsResponse",
+                    schema=FiveWOut.model_json_schema(), max_tokens=400, deployment="gpt-4o")
+        first = client.json_schema_chat_stream(**call)
+        next(first)
+        assert limiter.in_flight == 1  # held while the stream is read
+        "".join(first)
+        assert limiter.in_flight == 0
+        "".join(client.json_schema_chat_stream(**call))
+    transport.close()
+    assert in_flight_while_waiting == [0]
@@ -0,0 +1,105 @@
+"""Tests for admission control: priority queueing, eviction, timeouts and fast 503s."""
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from mapper_api.api.admission import (
+    AdmissionControlMiddleware,
+    AdmissionController,
+    AdmissionRejected,
+    PriorityLimiter,
+)
+from mapper_api.application.services.metrics import ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTED
+
+INTERACTIVE, BATCH, EVALUATION = 0, 1, 2
+
+
+def test_waiters_are_served_by_priority_and_low_priority_is_evicted():
+    async def main():
+        limiter = PriorityLimiter("test-priority", limit=1, max_queue=2)
+        await limiter.acquire(INTERACTIVE, 1.0)
+        order = []
+
+        async def wait(name, rank):
+            try:
+                await limiter.acquire(rank, 1.0)
+            except AdmissionRejected as e:
+                order.append(f"{name}:{e.reason}")
+                return
+            order.append(name)
+            limiter.release()
+
+        tasks = [asyncio.create_task(wait("eval-1", EVALUATION)), asyncio.create_task(wait("eval-2", EVALUATION))]
+        await asyncio.sleep(0)
+        assert ADMISSION_QUEUE_DEPTH.labels("test-priority", "evaluation")._state() == 2
+        # Queue full: the interactive request takes the place of the latest evaluation waiter
+        tasks.append(asyncio.create_task(wait("interactive", INTERACTIVE)))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected, match="queue_full"):
+            await limiter.acquire(EVALUATION, 1.0)
+        limiter.release()
+        await asyncio.gather(*tasks)
+        assert (limiter.in_flight, limiter.queued) == (0, 0)
+        return order
+
+    assert asyncio.run(main()) == ["eval-2:evicted", "interactive", "eval-1"]
+    assert ADMISSION_QUEUE_DEPTH.labels("test-priority", "evaluation")._state() == 0
+
+
+def test_queue_timeout_and_priority_floor():
+    async def main():
+        limiter = PriorityLimiter("test-timeout", limit=1, max_queue=4)
+        await limiter.acquire(BATCH, 1.0)
+        with pytest.raises(AdmissionRejected, match="queue_timeout"):
+            await limiter.acquire(BATCH, 0.01)
+        assert limiter.queued == 0
+        limiter.release()
+        assert limiter.in_flight == 0
+
+    asyncio.run(main())
+    # The header can lower a route's priority, never raise it
+    assert AdmissionController.rank("/evaluator", "interactive") == EVALUATION
+    assert AdmissionController.rank("/taxonomy_mapper", "batch") == BATCH
+    assert AdmissionController.rank("/taxonomy_mapper", "bogus") == INTERACTIVE
+
+
+def test_middleware_sheds_overflow_with_retry_after():
+    app = FastAPI()
+    release = asyncio.Event()
+
+    @app.post("/v1/taxonomy_mapper")
+    async def taxonomy():
+        await release.wait()
+        return {"ok": True}
+
+    @app.get("/v1/health")
+    async def health():
+        return {"ok": True}
+
+    controller = AdmissionController(
+        route_limits={"/taxonomy_mapper": (1, 1)}, shared_limit=8, shared_queue=8, retry_after_s=2.0
+    )
+    app.add_middleware(AdmissionControlMiddleware, controller=controller)
+    shed_before = ADMISSION_REJECTED.labels("/taxonomy_mapper", "interactive", "queue_full")._state()
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.post("/v1/taxonomy_mapper"))
+            queued = asyncio.create_task(client.post("/v1/taxonomy_mapper"))
+            await asyncio.sleep(0.05)
+            shed = await client.post("/v1/taxonomy_mapper", headers={"x-trace-id": "t-1"})
+            health = await client.get("/v1/health")
+            assert controller.stats()["routes"]["/taxonomy_mapper"]["queued"]["interactive"] == 1
+            release.set()
+            return shed, health, await first, await queued
+
+    shed, health, first, queued = asyncio.run(main())
+    assert shed.status_code == 503 and shed.json() == {"error": "Server overloaded, retry later", "traceId": "t-1"}
+    # One request queued behind a limit of one: twice the base back-off
+    assert shed.headers["retry-after"] == "4"
+    assert health.status_code == 200 and first.status_code == 200 and queued.status_code == 200
+    assert ADMISSION_REJECTED.labels("/taxonomy_mapper", "interactive", "queue_full")._state() == shed_before + 1
+    assert controller.stats()["shared"]["inFlight"] == 0
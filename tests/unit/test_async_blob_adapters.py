@@ -0,0 +1,106 @@
+"""Tests for the azure.storage.blob.aio adapters (concurrency, conditional GET, partial failures)."""
+import asyncio
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from azure.core.exceptions import ResourceNotModifiedError
+from mapper_api.domain.value_objects.evaluation_result import EvaluationResult
+from mapper_api.domain.value_objects.metric import MetricType
+from mapper_api.infrastructure.azure.aio.blob_definitions_repo import AsyncBlobDefinitionsRepository
+from mapper_api.infrastructure.azure.aio.blob_ground_truth_repo import AsyncBlobGroundTruthRepository
+from mapper_api.infrastructure.azure.aio.blob_evaluation_results_writer import AsyncBlobEvaluationResultsWriter
+from mapper_api.infrastructure.azure.aio.blob_store import AsyncAzureBlobStore
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "mapper_api" / "infrastructure" / "local" / "data"
+
+
+class FakeContainer:
+    """Async container stand-in serving the bundled data files with a fixed latency."""
+
+    def __init__(self, latency_s=0.1, fail_uploads=()):
+        self.latency_s = latency_s
+        self.fail_uploads = set(fail_uploads)
+        self.uploaded = {}
+        self.download_kwargs = []
+
+    def get_blob_client(self, name):
+        container = self
+
+        class Blob:
+            async def download_blob(self, etag=None, match_condition=None, max_concurrency=1):
+                container.download_kwargs.append((name, etag, max_concurrency))
+                await asyncio.sleep(container.latency_s)
+                data = container.uploaded.get(name) or (DATA_DIR / name).read_bytes()
+                if etag == f"etag-{name}":
+                    raise ResourceNotModifiedError("not modified")
+
+                async def readall():
+                    return data
+                return SimpleNamespace(readall=readall, properties=SimpleNamespace(etag=f"etag-{name}"))
+
+            async def upload_blob(self, data, overwrite, content_settings, max_concurrency=1):
+                await asyncio.sleep(container.latency_s)
+                if any(marker in name for marker in container.fail_uploads):
+                    raise IOError("upload failed")
+                container.uploaded[name] = data if isinstance(data, bytes) else b"".join(data)
+
+        return Blob()
+
+    async def list_blobs(self, name_starts_with):
+        for name in list(self.uploaded):
+            if name.startswith(name_starts_with):
+                yield SimpleNamespace(name=name)
+
+
+def _store(container, max_concurrency=4):
+    return AsyncAzureBlobStore(None, container, max_concurrency=max_concurrency)
+
+
+def test_ground_truth_files_download_concurrently():
+    async def run():
+        container = FakeContainer(latency_s=0.2)
+        repo = AsyncBlobGroundTruthRepository(store=_store(container, max_concurrency=8))
+        started = time.perf_counter()
+        await repo._load()
+        return repo, container, time.perf_counter() - started
+
+    repo, container, elapsed = asyncio.run(run())
+    assert elapsed < 0.35  # two 0.2 s downloads overlapped
+    assert len(repo.get_fivews_ground_truth()) > 0
+    assert len(repo.get_risk_themes_ground_truth()) > 0
+    assert {kwargs[2] for kwargs in container.download_kwargs} == {8}
+
+
+def test_definitions_refresh_is_conditional():
+    async def run():
+        container = FakeContainer(latency_s=0.0)
+        repo = AsyncBlobDefinitionsRepository(store=_store(container))
+        first = await repo.refresh()
+        second = await repo.refresh()
+        return repo, first, second
+
+    repo, first, second = asyncio.run(run())
+    assert first is True and second is False
+    assert len(repo.get_risk_themes()) > 0
+    assert len(repo.snapshot.version) == 12
+
+
+def test_results_upload_concurrently_and_report_failures():
+    results = {
+        m.value: EvaluationResult(metric_type=m)
+        for m in (MetricType.RECALL_K3_RISK_THEME, MetricType.RECALL_K5_5WS)
+    }
+
+    async def run():
+        container = FakeContainer(latency_s=0.2, fail_uploads=["5ws"])
+        writer = AsyncBlobEvaluationResultsWriter(store=_store(container))
+        started = time.perf_counter()
+        outcome = await writer.write_evaluation_results("rec", "ts", results)
+        elapsed = time.perf_counter() - started
+        return outcome, elapsed, await writer.read_summaries("evaluation/results/rec_ts")
+
+    outcome, elapsed, summaries = asyncio.run(run())
+    assert elapsed < 0.6  # records then summary per metric, metrics overlapped
+    assert outcome["recall_k3_risktheme"] == "evaluation/results/rec_ts/recall_k3_risktheme.summary.json"
+    assert isinstance(outcome["recall_k5_5ws"], IOError)
+    assert list(summaries) == ["recall_k3_risktheme"]
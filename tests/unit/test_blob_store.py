@@ -0,0 +1,172 @@
+"""Tests for the local/in-memory BlobStore backends, latency injection and backend selection."""
+import asyncio
+import time
+
+import pytest
+
+from mapper_api.api import dependencies
+from mapper_api.application.ports.blob_store import BlobNotFoundError
+from mapper_api.config.settings import Settings
+from mapper_api.domain.value_objects.evaluation_result import EvaluationResult
+from mapper_api.domain.value_objects.metric import MetricType
+from mapper_api.infrastructure.azure.aio.blob_evaluation_results_writer import AsyncBlobEvaluationResultsWriter
+from mapper_api.infrastructure.azure.aio.blob_ground_truth_repo import AsyncBlobGroundTruthRepository
+from mapper_api.infrastructure.azure.blob_definitions_repo import BlobDefinitionsRepository
+from mapper_api.infrastructure.local.blob_store import (
+    DATA_DIR,
+    AsyncBlobStoreAdapter,
+    InMemoryBlobStore,
+    LocalFileBlobStore,
+    SimulatedLatencyBlobStore,
+    TransferProfile,
+)
+from mapper_api.infrastructure.local.metered_blob_store import AsyncMeteredBlobStore, MeteredBlobStore
+
+
+def test_in_memory_store_conditional_download_and_listing():
+    store = InMemoryBlobStore.from_directory()
+    data, etag = store.download("taxonomy.json")
+    assert data == (DATA_DIR / "taxonomy.json").read_bytes()
+    assert store.download("taxonomy.json", etag=etag) is None
+
+    store.upload("results/a.json", iter([b"{", b"}"]), content_type="application/json")
+    assert store.download("results/a.json")[0] == b"{}"
+    assert store.list_names("results/") == ["results/a.json"]
+    with pytest.raises(BlobNotFoundError):
+        store.download("missing.json")
+
+
+def test_local_file_store_seeds_without_overwriting(tmp_path):
+    root = tmp_path / "storage"
+    store = LocalFileBlobStore(root, seed_dir=DATA_DIR)
+    _, etag = store.download("5ws.json")
+
+    store.upload("5ws.json", b'{"who": "edited"}', content_type="application/json")
+    store.upload("evaluation/results/r_ts/x.summary.json", b"{}", content_type="application/json")
+
+    reopened = LocalFileBlobStore(root, seed_dir=DATA_DIR)
+    data, new_etag = reopened.download("5ws.json", etag=etag)
+    assert data == b'{"who": "edited"}' and new_etag != etag
+    assert reopened.list_names("evaluation/") == ["evaluation/results/r_ts/x.summary.json"]
+    assert not list(root.rglob("*.tmp"))
+
+
+def test_local_file_store_rejects_names_outside_root(tmp_path):
+    store = LocalFileBlobStore(tmp_path / "storage")
+    with pytest.raises(ValueError):
+        store.upload("../escape.json", b"{}", content_type="application/json")
+
+
+def test_transfer_profile_adds_latency_and_size_cost():
+    profile = TransferProfile(latency_ms=20, throughput_mb_s=1)
+    assert profile.delay_s(500_000) == pytest.approx(0.52)
+    assert not TransferProfile().enabled
+
+    store = SimulatedLatencyBlobStore(InMemoryBlobStore.from_directory(), TransferProfile(latency_ms=50))
+    started = time.perf_counter()
+    store.download("5ws.json")
+    assert time.perf_counter() - started >= 0.05
+
+
+class RecordingStore(InMemoryBlobStore):
+    def __init__(self):
+        super().__init__()
+        self.received = []
+
+    def upload(self, name, data, *, content_type):
+        self.received.append(data)
+        super().upload(name, data, content_type=content_type)
+
+
+def test_streamed_uploads_reach_the_inner_store_as_chunks(tmp_path):
+    # 1 MB/s: each 20 kB chunk costs 20 ms of transfer on top of the 10 ms latency
+    profile = TransferProfile(latency_ms=10, throughput_mb_s=1)
+    source = tmp_path / "payload.bin"
+    source.write_bytes(b"x" * 60_000)
+
+    inner = RecordingStore()
+    store = SimulatedLatencyBlobStore(inner, profile)
+    started = time.perf_counter()
+    store.upload("a.bin", iter([b"a" * 20_000] * 3), content_type="application/octet-stream")
+    assert time.perf_counter() - started >= 0.07
+    with source.open("rb") as f:
+        store.upload("b.bin", f, content_type="application/octet-stream")
+    assert not any(isinstance(data, bytes) for data in inner.received)
+    assert inner.download("a.bin")[0] == b"a" * 60_000
+    assert inner.download("b.bin")[0] == source.read_bytes()
+
+    async def chunks():
+        for _ in range(3):
+            yield b"c" * 20_000
+
+    async_inner = RecordingStore()
+    adapter = AsyncBlobStoreAdapter(async_inner, profile)
+
+    async def run():
+        started = time.perf_counter()
+        await adapter.upload("c.bin", chunks(), content_type="application/octet-stream")
+        elapsed = time.perf_counter() - started
+        with source.open("rb") as f:
+            await adapter.upload("d.bin", f, content_type="application/octet-stream")
+        return elapsed
+
+    assert asyncio.run(run()) >= 0.07
+    assert not any(isinstance(data, bytes) for data in async_inner.received)
+    assert async_inner.download("c.bin")[0] == b"c" * 60_000
+    assert async_inner.download("d.bin")[0] == source.read_bytes()
+
+
+def test_async_adapter_overlaps_injected_latency():
+    store = AsyncBlobStoreAdapter(InMemoryBlobStore.from_directory(), TransferProfile(latency_ms=200))
+
+    async def run():
+        started = time.perf_counter()
+        repo = await AsyncBlobGroundTruthRepository.create(store=store)
+        return repo, time.perf_counter() - started
+
+    repo, elapsed = asyncio.run(run())
+    assert elapsed < 0.35  # two 0.2 s downloads overlapped
+    assert len(repo.get_fivews_ground_truth()) > 0
+
+
+def test_repositories_share_one_local_store():
+    base = InMemoryBlobStore.from_directory()
+    repo = BlobDefinitionsRepository(store=base)
+    assert len(repo.get_risk_themes()) > 0
+    assert repo.refresh() is False
+
+    async def write():
+        writer = AsyncBlobEvaluationResultsWriter(store=AsyncBlobStoreAdapter(base))
+        async with writer:
+            await writer.write_evaluation_results(
+                "rec", "ts", {"recall_k5_5ws": EvaluationResult(metric_type=MetricType.RECALL_K5_5WS)}
+            )
+
+    asyncio.run(write())
+    assert base.list_names("evaluation/results/rec_ts/") == [
+        "evaluation/results/rec_ts/recall_k5_5ws.records.ndjson.gz",
+        "evaluation/results/rec_ts/recall_k5_5ws.summary.json",
+    ]
+
+
+def test_settings_select_local_backend(tmp_path, monkeypatch):
+    settings = Settings.model_construct(
+        STORAGE_BACKEND="local",
+        STORAGE_LOCAL_ROOT=str(tmp_path / "storage"),
+        STORAGE_SEED_DIR="",
+        STORAGE_LATENCY_MS=5.0,
+        STORAGE_THROUGHPUT_MB_S=0.0,
+    )
+    monkeypatch.setattr(dependencies, "get_settings", lambda: settings)
+    dependencies._local_blob_store.cache_clear()
+    dependencies.get_blob_store.cache_clear()
+    try:
+        store = dependencies.get_blob_store()
+        assert isinstance(store, MeteredBlobStore) and isinstance(store.inner, SimulatedLatencyBlobStore)
+        assert "taxonomy.json" in store.list_names("")
+        async_store = dependencies.get_async_blob_store()
+        assert isinstance(async_store, AsyncMeteredBlobStore) and isinstance(async_store.inner, AsyncBlobStoreAdapter)
+        assert (tmp_path / "storage" / "gt_5ws.json").exists()
+    finally:
+        dependencies._local_blob_store.cache_clear()
+        dependencies.get_blob_store.cache_clear()
@@ -0,0 +1,91 @@
+"""Tests for the proactive-refresh AAD credential and its shared file cache."""
+import os
+import time
+from azure.core.credentials import AccessToken
+from mapper_api.infrastructure.azure.credentials import ProactiveTokenCredential, TokenCacheFile
+
+SCOPE = "https://storage.azure.com/.default"
+
+
+class CountingCredential:
+    def __init__(self, lifetime_s: float = 3600):
+        self.lifetime_s = lifetime_s
+        self.calls = 0
+
+    def get_token(self, *scopes, **kwargs):
+        self.calls += 1
+        return AccessToken(f"token-{self.calls}", int(time.time() + self.lifetime_s))
+
+
+def test_tokens_are_cached_per_scope():
+    inner = CountingCredential()
+    credential = ProactiveTokenCredential(inner)
+    try:
+        assert credential.get_token(SCOPE).token == "token-1"
+        assert credential.get_token(SCOPE).token == "token-1"
+        assert inner.calls == 1
+        stats = credential.stats()
+        assert stats["acquisitions_total"] == 1
+        assert stats["memory_hits_total"] == 1
+        assert stats["acquisition_ms_last"] is not None
+    finally:
+        credential.close()
+
+
+def test_token_is_refreshed_in_background_before_expiry():
+    # Fresh when issued (whole-second expiry), due for refresh within a second
+    inner = CountingCredential(lifetime_s=5)
+    credential = ProactiveTokenCredential(inner, refresh_margin_s=4)
+    try:
+        credential.get_token(SCOPE)
+        deadline = time.time() + 5
+        while inner.calls < 2 and time.time() < deadline:
+            time.sleep(0.05)
+        assert inner.calls >= 2
+        assert credential.stats()["background_refreshes_total"] >= 1
+        assert credential.get_token(SCOPE).token != "token-1"
+    finally:
+        credential.close()
+
+
+class CachedCredential:
+    """Returns the same near-expiry token every time, as azure-identity does from its own cache."""
+
+    def __init__(self, expires_in_s: float):
+        self.token = AccessToken("cached", int(time.time() + expires_in_s))
+        self.calls = 0
+
+    def get_token(self, *scopes, **kwargs):
+        self.calls += 1
+        return self.token
+
+
+def test_token_inside_the_margin_is_retried_later_not_in_a_loop():
+    inner = CachedCredential(expires_in_s=120)
+    credential = ProactiveTokenCredential(inner, refresh_margin_s=300, retry_interval_s=0.1)
+    try:
+        assert credential.get_token(SCOPE).token == "cached"
+        time.sleep(0.35)
+        # The first call plus one background attempt per retry interval, not thousands
+        assert 2 <= inner.calls <= 6
+        stats = credential.stats()
+        assert stats["acquisitions_total"] == 0 and stats["background_refreshes_total"] == 0
+        assert stats["stale_returns_total"] == inner.calls
+    finally:
+        credential.close()
+
+
+def test_file_cache_is_shared_between_processes(tmp_path):
+    cache_path = tmp_path / "aad" / "tokens.json"
+    first_inner, second_inner = CountingCredential(), CountingCredential()
+    first = ProactiveTokenCredential(first_inner, cache_file=TokenCacheFile(cache_path))
+    second = ProactiveTokenCredential(second_inner, cache_file=TokenCacheFile(cache_path))
+    try:
+        token = first.get_token(SCOPE)
+        assert second.get_token(SCOPE) == token
+        assert second_inner.calls == 0
+        assert second.stats()["file_cache_hits_total"] == 1
+        assert os.stat(cache_path).st_mode & 0o777 == 0o600
+    finally:
+        first.close()
+        second.close()
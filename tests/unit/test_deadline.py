@@ -0,0 +1,182 @@
+"""Tests for request deadlines in the LLM client and cancellation on client disconnect."""
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from tenacity import RetryError
+
+from mapper_api.api.admission import AdmissionControlMiddleware, AdmissionController
+from mapper_api.api.deadline import DeadlineMiddleware
+from mapper_api.application.dto.llm_schemas import FiveWOut
+from mapper_api.application.services.deadline import current_deadline, deadline_scope
+from mapper_api.application.services.metrics import HTTP_REQUESTS_CANCELLED, LLM_DEADLINE_EXCEEDED
+from mapper_api.application.services.worker_pools import WorkerPool
+from mapper_api.domain.errors import DeadlineExceededError
+from mapper_api.infrastructure.azure.http_transport import SharedHttpTransport
+from mapper_api.infrastructure.azure.openai_client import AzureOpenAILLMClient
+from tests.benchmarks.fake_openai_server import FakeOpenAIConfig, serve
+
+CALL = dict(system="Classify.", user="Control text", schema_name="FiveWsResponse",
+            schema=FiveWOut.model_json_schema(), max_tokens=400, deployment="gpt-4o")
+FAST = dict(latency_median_ms=5.0, latency_sigma=0.0, prompt_token_ms=0.0, completion_token_ms=0.0, seed=3)
+
+
+def test_deadline_scope_nests_to_the_earlier_deadline():
+    assert current_deadline() is None
+    with deadline_scope(10) as outer:
+        with deadline_scope(60) as inner:
+            assert inner is outer
+        with deadline_scope(1) as inner:
+            assert current_deadline() is inner and 0 < inner.check() <= 1
+            inner.cancel("client disconnected")
+            with pytest.raises(DeadlineExceededError, match="client disconnected"):
+                inner.check()
+        assert current_deadline() is outer
+    assert current_deadline() is None
+
+
+def test_llm_attempts_are_bounded_by_the_deadline():
+    transport = SharedHttpTransport(http2=False)
+    with serve(FakeOpenAIConfig(**{**FAST, "latency_median_ms": 2000.0})) as (url, fake):
+        client = AzureOpenAILLMClient(endpoint=url, api_key="fake-key", api_version="2024-12-01-preview",
+                                      http_client=transport.sync_client)
+        expired_before = LLM_DEADLINE_EXCEEDED.labels("gpt-4o", "expired")._state()
+        start = time.perf_counter()
+        with deadline_scope(0.3):
+            with pytest.raises(DeadlineExceededError, match="0.3s"):
+                client.json_schema_chat(**CALL)
+        # No wait for the slow answer, no SDK retry and no client retry
+        assert time.perf_counter() - start < 1.0
+        assert fake.stats()["gpt-4o"]["requests"] == 1
+        assert LLM_DEADLINE_EXCEEDED.labels("gpt-4o", "expired")._state() == expired_before + 1
+    transport.close()
+
+
+def test_retry_that_cannot_finish_in_time_is_skipped():
+    transport = SharedHttpTransport(http2=False)
+    with serve(FakeOpenAIConfig(**{**FAST, "error_500_rate": 1.0, "retry_after_s": 0.01})) as (url, fake):
+        client = AzureOpenAILLMClient(endpoint=url, api_key="fake-key", api_version="2024-12-01-preview",
+                                      http_client=transport.sync_client)
+        skipped_before = LLM_DEADLINE_EXCEEDED.labels("gpt-4o", "retry_skipped")._state()
+        with deadline_scope(0.6), pytest.raises(RetryError):
+            client.json_schema_chat(**CALL)
+        assert fake.stats()["gpt-4o"]["errors"]["500"] == 1
+        assert LLM_DEADLINE_EXCEEDED.labels("gpt-4o", "retry_skipped")._state() == skipped_before + 1
+        # With time to spare the retry is made
+        with deadline_scope(5), pytest.raises(RetryError):
+            client.json_schema_chat(**CALL)
+        assert fake.stats()["gpt-4o"]["errors"]["500"] == 3
+    transport.close()
+
+
+def _app(seen, pool=None, admission=None):
+    app = FastAPI()
+
+    @app.post("/v1/taxonomy_mapper")
+    async def taxonomy():
+        deadline = current_deadline()
+        seen["timeout"] = deadline.timeout_s
+
+        def work():
+            if "release" in seen:
+                seen["release"].wait(5)  # ignores the cancelled deadline, as a blocking HTTP read in flight does
+            # Stands in for a use case whose LLM client checks the deadline between attempts
+            while not deadline.cancelled and seen.get("block"):
+                time.sleep(0.005)
+            seen["cancelled"] = deadline.cancelled
+
+        await (pool.run(work) if pool is not None else asyncio.to_thread(work))
+        return {"ok": True}
+
+    if admission is not None:
+        app.add_middleware(AdmissionControlMiddleware, controller=admission)
+    app.add_middleware(DeadlineMiddleware, route_timeouts={"/taxonomy_mapper": 30.0})
+    return app
+
+
+def _disconnecting_request(app, sent):
+    """Start a request on ``app``; returns its task and the event that disconnects the client."""
+    disconnect = asyncio.Event()
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+             "scheme": "http", "path": "/v1/taxonomy_mapper", "raw_path": b"/v1/taxonomy_mapper",
+             "root_path": "", "query_string": b"", "headers": [], "client": ("test", 1), "server": ("test", 80)}
+    return asyncio.create_task(app(scope, receive, send)), disconnect
+
+
+def test_timeout_header_can_only_shorten_the_route_default():
+    seen = {}
+    app = _app(seen)
+
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            timeouts = []
+            for header in ({"x-request-timeout": "5"}, {"x-request-timeout": "120"}, {"x-request-timeout": "soon"}):
+                response = await client.post("/v1/taxonomy_mapper", headers=header)
+                assert response.status_code == 200
+                timeouts.append(seen["timeout"])
+            return timeouts
+
+    assert asyncio.run(main()) == [5.0, 30.0, 30.0]
+
+
+def test_disconnect_cancels_the_request_and_its_work():
+    seen = {"block": True}
+    app = _app(seen)
+    sent = []
+    cancelled_before = HTTP_REQUESTS_CANCELLED.labels("/taxonomy_mapper")._state()
+
+    async def main():
+        request, disconnect = _disconnecting_request(app, sent)
+        await asyncio.sleep(0.05)
+        assert not request.done()
+        disconnect.set()
+        await asyncio.wait_for(request, 2.0)
+
+    asyncio.run(main())
+    deadline_wait = time.perf_counter() + 2.0
+    while "cancelled" not in seen and time.perf_counter() < deadline_wait:
+        time.sleep(0.005)
+    assert seen["cancelled"] is True
+    assert sent == []  # nobody to answer
+    assert HTTP_REQUESTS_CANCELLED.labels("/taxonomy_mapper")._state() == cancelled_before + 1
+
+
+def test_disconnected_request_keeps_its_admission_slot_until_its_thread_returns():
+    release = threading.Event()
+    seen = {"release": release}
+    pool = WorkerPool("deadline-test", max_workers=2)
+    admission = AdmissionController(route_limits={"/taxonomy_mapper": (4, 4)}, shared_limit=4, shared_queue=4)
+    app = _app(seen, pool, admission)
+    sent = []
+
+    async def main():
+        request, disconnect = _disconnecting_request(app, sent)
+        await asyncio.sleep(0.05)
+        disconnect.set()
+        await asyncio.sleep(0.05)
+        # Cancelled, but its thread still runs: the slot is not handed to new work
+        held = (request.done(), admission.shared.in_flight, pool.stats()["orphaned"])
+        release.set()
+        await asyncio.wait_for(request, 2.0)
+        return held
+
+    try:
+        assert asyncio.run(main()) == (False, 1, 1)
+    finally:
+        pool.shutdown()
+    assert admission.shared.in_flight == 0 and pool.stats() == {"maxWorkers": 2, "busy": 0, "queued": 0, "orphaned": 0}
+    assert sent == []
@@ -0,0 +1,86 @@
+"""Tests for versioned definitions snapshots, hot swap and the refresher."""
+import pytest
+from mapper_api.domain.repositories.definitions import DefinitionsSnapshot, ThemeRow
+from mapper_api.domain.errors import DefinitionsUnavailableError
+from mapper_api.application.services.compiled_definitions import CompiledDefinitions, DefinitionsHolder
+from mapper_api.infrastructure.azure.definitions_refresher import DefinitionsRefresher
+from mapper_api.infrastructure.local.llm_client import StaticLLMClient
+
+FIVEWS = [{"name": n, "description": f"{n} desc"} for n in ["who", "what", "when", "where", "why"]]
+
+
+def make_snapshot(version: str, theme_names):
+    rows = [
+        ThemeRow(cluster_id=1, cluster='A', taxonomy_id=1, taxonomy='NFR1', taxonomy_description='d',
+                 risk_theme_id=i + 1, risk_theme=name, risk_theme_description='d', mapping_considerations='m')
+        for i, name in enumerate(theme_names)
+    ]
+    return DefinitionsSnapshot.from_rows(version, rows, FIVEWS)
+
+
+def test_snapshot_builds_deduplicated_hierarchy():
+    snapshot = make_snapshot("v1", ["Theme A", "Theme B", "Theme C"])
+    assert snapshot.version == "v1"
+    assert len(snapshot.get_clusters()) == 1
+    assert len(snapshot.get_taxonomies()) == 1
+    assert [t.name for t in snapshot.get_risk_themes()] == ["Theme A", "Theme B", "Theme C"]
+    assert [row["name"] for row in snapshot.get_fivews_rows()] == ["who", "what", "when", "where", "why"]
+
+
+def test_holder_keeps_old_version_for_in_flight_readers():
+    llm = StaticLLMClient()
+    holder = DefinitionsHolder(CompiledDefinitions.compile(make_snapshot("v1", ["A1", "B1", "C1"]), llm, "d"))
+
+    pinned = holder.current()
+    assert holder.swap(CompiledDefinitions.compile(make_snapshot("v2", ["A2", "B2", "C2"]), llm, "d"))
+
+    assert pinned.version == "v1"
+    assert [t.name for t in pinned.taxonomy_classifier.repo.get_risk_themes()] == ["A1", "B1", "C1"]
+    assert holder.current().version == "v2"
+
+
+def test_holder_ignores_same_version_and_requires_definitions():
+    llm = StaticLLMClient()
+    holder = DefinitionsHolder()
+    with pytest.raises(DefinitionsUnavailableError):
+        holder.current()
+    compiled = CompiledDefinitions.compile(make_snapshot("v1", ["A", "B", "C"]), llm, "d")
+    assert holder.swap(compiled)
+    assert not holder.swap(CompiledDefinitions.compile(make_snapshot("v1", ["A", "B", "C"]), llm, "d"))
+    assert holder.current() is compiled
+
+
+def test_refresher_publishes_only_changed_snapshots():
+    class Source:
+        def __init__(self):
+            self.snapshot = make_snapshot("v1", ["A", "B", "C"])
+            self.changed = False
+
+        def refresh(self):
+            return self.changed
+
+    source = Source()
+    published = []
+    refresher = DefinitionsRefresher(source=source, on_snapshot=published.append, interval_s=0)
+
+    assert refresher.poll_once() is False
+    source.changed = True
+    assert refresher.poll_once() is True
+    assert [s.version for s in published] == ["v1"]
+
+
+def test_refresher_polls_immediately_when_serving_stale_snapshot():
+    class Source:
+        def __init__(self):
+            self.snapshot = make_snapshot("v1", ["A", "B", "C"])
+            self.calls = 0
+
+        def refresh(self):
+            self.calls += 1
+            return False
+
+    source = Source()
+    refresher = DefinitionsRefresher(source=source, on_snapshot=lambda s: None, interval_s=0)
+    refresher.start(poll_immediately=True)
+    refresher._thread.join(timeout=5)
+    assert source.calls == 1
@@ -0,0 +1,36 @@
+"""Tests for the local on-disk definitions snapshot."""
+import gzip
+import json
+from mapper_api.infrastructure.local.definitions_snapshot_file import DefinitionsSnapshotFile, StoredDefinitions
+
+
+def make_stored():
+    return StoredDefinitions(
+        version="abc123",
+        blobs={"taxonomy.json": b'[{"x": 1}]', "5ws.json": b'{"who": "w"}'},
+        etags={"taxonomy.json": '"0x1"', "5ws.json": '"0x2"'},
+    )
+
+
+def test_round_trip(tmp_path):
+    snapshot_file = DefinitionsSnapshotFile(tmp_path / "cache" / "defs.json.gz")
+    snapshot_file.save(make_stored())
+    assert snapshot_file.load() == make_stored()
+
+
+def test_missing_file_returns_none(tmp_path):
+    assert DefinitionsSnapshotFile(tmp_path / "missing.json.gz").load() is None
+
+
+def test_tampered_file_is_ignored(tmp_path):
+    path = tmp_path / "defs.json.gz"
+    snapshot_file = DefinitionsSnapshotFile(path)
+    snapshot_file.save(make_stored())
+
+    payload = json.loads(gzip.decompress(path.read_bytes()))
+    payload["blobs"]["5ws.json"] = '{"who": "edited"}'
+    path.write_bytes(gzip.compress(json.dumps(payload).encode()))
+    assert snapshot_file.load() is None
+
+    path.write_bytes(b"not gzip")
+    assert snapshot_file.load() is None
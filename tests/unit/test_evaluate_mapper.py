@@ -0,0 +1,105 @@
+"""Tests for the latency sweep, throughput, tokens-per-record and cost-per-1k-controls evaluation metrics."""
+import threading
+import time
+
+import pytest
+
+from mapper_api.application.dto.domain_evaluation import EvaluationRequest
+from mapper_api.domain.entities.control import Control
+from mapper_api.domain.errors import TokenBudgetExceededError
+from mapper_api.domain.repositories.ground_truth import RiskThemeGroundTruthRecord
+from mapper_api.domain.services.evaluation_service import EvaluationService, percentile, percentile_interval
+from mapper_api.domain.value_objects.metric import MetricType
+from tests.unit.test_llm_usage import CONTROL, MeteredLLM, _evaluator
+
+
+class SlowLLM(MeteredLLM):
+    def __init__(self):
+        self.in_flight = self.peak = 0
+        self._lock = threading.Lock()
+
+    def json_schema_chat(self, **kwargs):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.02)
+        with self._lock:
+            self.in_flight -= 1
+        return super().json_schema_chat(**kwargs)
+
+
+def test_throughput_runs_records_concurrently():
+    Control(text=CONTROL).ensure_is_english()  # load language profiles outside the timed run
+    llm = SlowLLM()
+    results = _evaluator(llm).execute(EvaluationRequest(
+        record_id="run", metric_types=[MetricType.THROUGHPUT_RISK_THEME_MAPPER], concurrency=5
+    ))
+    result = results[MetricType.THROUGHPUT_RISK_THEME_MAPPER]
+    assert result.error_message is None
+    summary = result.summary_result.to_dict()
+    assert summary["concurrency"] == 5 and summary["successful_records"] == 5
+    assert llm.peak == 5
+    # Five 20 ms calls in parallel: well above the 50 records/s of a serial run
+    assert summary["records_per_second"] > 100
+    assert result.llm_usage["calls"] == 5
+
+
+def test_tokens_and_cost_share_one_mapping_pass():
+    metrics = [MetricType.TOKENS_PER_RECORD_RISK_THEME_MAPPER, MetricType.COST_PER_1K_CONTROLS_RISK_THEME_MAPPER]
+    results = _evaluator(MeteredLLM()).execute(EvaluationRequest(record_id="run", metric_types=metrics, n_records=4))
+    tokens, cost = results.values()
+    assert tokens.summary_result.to_dict() == {
+        "total_records": 4, "average_prompt_tokens": 100.0, "average_completion_tokens": 20.0,
+        "average_cached_tokens": 0.0, "average_total_tokens": 120.0, "max_total_tokens": 120,
+        "cached_prompt_ratio": 0.0,
+    }
+    # 100 prompt + 20 completion tokens at the default prices: $0.00045 per control
+    assert round(cost.summary_result.cost_per_1k_controls_usd, 6) == 0.45
+    assert tokens.individual_results[0].to_dict()["prompt_tokens"] == 100
+    assert tokens.llm_usage["calls"] == 4 and cost.llm_usage["calls"] == 0
+
+
+def test_interpolated_percentiles_and_intervals():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 0.95) == 95.05
+    assert percentile(values, 0.5) == 50.5
+    assert percentile([7.0], 0.99) == 7.0
+    interval = percentile_interval(values, 0.95)
+    assert (interval.low_ms, interval.high_ms, interval.confidence) == (90.0, 100.0, 0.95)
+    # Too few samples to bound the tail: the upper bound is the sample maximum
+    small = percentile_interval([1.0, 2.0, 3.0], 0.99)
+    assert (small.low_ms, small.high_ms) == (2.0, 3.0)
+
+
+def test_latency_sweeps_concurrency_levels_and_separates_first_call():
+    Control(text=CONTROL).ensure_is_english()
+    llm = SlowLLM()
+    results = _evaluator(llm).execute(EvaluationRequest(
+        record_id="run", metric_types=[MetricType.LATENCY_RISK_THEME_MAPPER], concurrency_levels=[1, 5]
+    ))
+    result = results[MetricType.LATENCY_RISK_THEME_MAPPER]
+    assert result.error_message is None
+    assert len(result.individual_results) == 10 and llm.peak == 5
+    assert [r.details["first_call"] for r in result.individual_results] == [True] + [False] * 9
+    summary = result.summary_result.to_dict()
+    serial, parallel = summary["concurrency_sweep"]
+    assert (serial["concurrency"], parallel["concurrency"]) == (1, 5)
+    assert parallel["records_per_second"] > 2 * serial["records_per_second"]
+    assert summary["first_call_latency_ms"] == result.individual_results[0].latency.value_ms
+    assert summary["p95_latency_ci"]["low_ms"] <= summary["p95_latency_ms"] <= summary["p95_latency_ci"]["high_ms"]
+    assert summary["average_stages_ms"]["llm"] >= 20
+
+
+def test_failed_concurrent_run_cancels_queued_calls():
+    records = [RiskThemeGroundTruthRecord(f"C{i}", CONTROL, []) for i in range(50)]
+    calls = []
+
+    def mapper(record_id, control_description):
+        calls.append(record_id)
+        time.sleep(0.01)
+        raise TokenBudgetExceededError("token budget exceeded")
+
+    with pytest.raises(TokenBudgetExceededError):
+        EvaluationService().calculate_throughput(records, mapper, concurrency=4)
+    # The calls already running finish; the rest of the queue never starts
+    assert len(calls) <= 8
@@ -0,0 +1,50 @@
+"""Tests for the summary + gzip NDJSON evaluation results layout and the sync writer."""
+import gzip
+import hashlib
+import json
+from mapper_api.domain.value_objects.evaluation_result import EvaluationResult
+from mapper_api.domain.value_objects.metric import MetricType, IndividualLatency, LatencyScore, SummaryLatency
+from mapper_api.infrastructure.azure import evaluation_results_layout as layout
+from mapper_api.infrastructure.azure.blob_evaluation_results_writer import BlobEvaluationResultsWriter
+from mapper_api.infrastructure.local.blob_store import InMemoryBlobStore
+
+
+def make_result(n):
+    return EvaluationResult(
+        metric_type=MetricType.LATENCY_5WS_MAPPER,
+        individual_results=[
+            IndividualLatency(control_id=f"c{i}", latency=LatencyScore(value_ms=float(i))) for i in range(n)
+        ],
+        summary_result=SummaryLatency(
+            total_records=n,
+            **{f: LatencyScore(value_ms=1.0) for f in
+               ["average_latency", "min_latency", "max_latency", "p95_latency", "p99_latency"]},
+        ),
+    )
+
+
+def test_gzip_ndjson_round_trip_in_bounded_chunks():
+    records = [{"i": i, "details": hashlib.sha256(str(i).encode()).hexdigest()} for i in range(2000)]
+    chunks = list(layout.gzip_ndjson_chunks(iter(records), chunk_size=1024))
+    assert len(chunks) > 1
+    lines = gzip.decompress(b"".join(chunks)).decode().splitlines()
+    assert [json.loads(line) for line in lines] == records
+
+
+def test_writer_splits_summary_and_records():
+    store = InMemoryBlobStore()
+    writer = BlobEvaluationResultsWriter(store=store)
+
+    outcomes = writer.write_evaluation_results("rec", "ts", {"latency_5ws_mapper": make_result(500)})
+    summary_blob = outcomes["latency_5ws_mapper"]
+    assert summary_blob == "evaluation/results/rec_ts/latency_5ws_mapper.summary.json"
+
+    summaries = writer.read_summaries("evaluation/results/rec_ts")
+    summary = summaries["latency_5ws_mapper"]
+    assert summary["record_count"] == 500
+    assert summary["summary_result"]["total_records"] == 500
+    assert len(store.download(summary_blob)[0]) < 1024
+
+    records = gzip.decompress(store.download(summary["records_path"])[0]).decode().splitlines()
+    assert len(records) == 500
+    assert json.loads(records[0])["control_id"] == "c0"
@@ -0,0 +1,92 @@
+"""Tests for the fake Azure OpenAI server, driven through the real AzureOpenAILLMClient."""
+import json
+import random
+
+import httpx
+import pytest
+
+from mapper_api.application.dto.llm_schemas import FiveWOut, build_taxonomy_models
+from mapper_api.infrastructure.azure.openai_client import AzureOpenAILLMClient
+from tests.benchmarks.fake_openai_server import FakeOpenAIConfig, schema_instance, serve
+
+_FAST = dict(latency_median_ms=5.0, latency_sigma=0.0, prompt_token_ms=0.0, completion_token_ms=0.0, seed=7)
+
+
+@pytest.fixture(scope="module")
+def fake_endpoint():
+    with serve(FakeOpenAIConfig(**_FAST)) as (url, fake):
+        yield url, fake
+
+
+def _client(url):
+    return AzureOpenAILLMClient(endpoint=url, api_key="fake-key", api_version="2024-12-01-preview")
+
+
+def test_schema_instances_validate_and_spread_enum_values():
+    _, taxonomy_out = build_taxonomy_models(["Access", "Change", "Backup", "Logging"])
+    for seed in range(20):
+        rng = random.Random(seed)
+        fivews = FiveWOut.model_validate(schema_instance(FiveWOut.model_json_schema(), rng))
+        assert sorted(item.name for item in fivews.fivews) == sorted(["who", "what", "when", "where", "why"])
+        taxonomy = taxonomy_out.model_validate(schema_instance(taxonomy_out.model_json_schema(), rng))
+        assert len({item.name for item in taxonomy.taxonomy}) == 3
+
+
+def test_json_schema_chat_round_trip_with_usage(fake_endpoint):
+    url, fake = fake_endpoint
+    fake.reset()
+    raw = _client(url).json_schema_chat(
+        system="Classify.", user="Control text", schema_name="FiveWsResponse",
+        schema=FiveWOut.model_json_schema(), max_tokens=400, deployment="gpt-4o",
+    )
+    FiveWOut.model_validate_json(raw)
+    usage = fake.stats()["gpt-4o"]
+    assert usage["requests"] == 1
+    assert usage["completion_tokens"] > 0 and usage["prompt_tokens"] > 0
+
+
+def test_streaming_reassembles_to_valid_json(fake_endpoint):
+    url, _ = fake_endpoint
+    deltas = list(_client(url).json_schema_chat_stream(
+        system="Classify.", user="Control text", schema_name="FiveWsResponse",
+        schema=FiveWOut.model_json_schema(), max_tokens=400, deployment="gpt-4o",
+    ))
+    assert len(deltas) > 1
+    FiveWOut.model_validate_json("".join(deltas))
+
+
+def test_injected_throttling_carries_retry_after(fake_endpoint):
+    url, fake = fake_endpoint
+    fake.config.update({"error_429_rate": 1.0, "retry_after_s": 2.5})
+    try:
+        response = httpx.post(
+            f"{url}/openai/deployments/gpt-4o/chat/completions",
+            params={"api-version": "2024-12-01-preview"},
+            headers={"api-key": "fake-key"},
+            json={"messages": [{"role": "user", "content": "hi"}]},
+        )
+    finally:
+        fake.config.update({"error_429_rate": 0.0})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
+    assert response.headers["retry-after-ms"] == "2500"
+    assert fake.stats()["gpt-4o"]["errors"]["429"] >= 1
+
+
+def test_max_tokens_truncates_with_length_finish(fake_endpoint):
+    url, _ = fake_endpoint
+    response = httpx.post(
+        f"{url}/openai/deployments/gpt-4o/chat/completions",
+        headers={"api-key": "fake-key"},
+        json={
+            "messages": [{"role": "user", "content": "hi"}],
+            "max_tokens": 5,
+            "response_format": {"type": "json_schema", "json_schema": {
+                "name": "FiveWsResponse", "schema": FiveWOut.model_json_schema(), "strict": True,
+            }},
+        },
+    ).json()
+    assert response["choices"][0]["finish_reason"] == "length"
+    assert response["usage"]["completion_tokens"] == 5
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(response["choices"][0]["message"]["content"])
@@ -0,0 +1,66 @@
+"""Tests for the shared pooled HTTP transport."""
+import httpx
+import pytest
+
+from mapper_api.infrastructure.azure.http_transport import SharedHttpTransport
+
+
+def test_transport_applies_timeouts_and_limits():
+    transport = SharedHttpTransport(connect_timeout_s=2.0, read_timeout_s=9.0, max_connections=7)
+    try:
+        assert transport.sync_client.timeout.connect == 2.0
+        assert transport.sync_client.timeout.read == 9.0
+        assert transport.async_client.timeout.read == 9.0
+    finally:
+        transport.close()
+
+
+def test_blob_transports_share_one_session():
+    transport = SharedHttpTransport()
+    try:
+        first = transport.blob_transport()
+        second = transport.blob_transport()
+        assert first.session is transport.blob_session
+        assert second.session is transport.blob_session
+    finally:
+        transport.close()
+
+
+def test_pool_stats_counts_requests():
+    transport = SharedHttpTransport()
+    # Route the shared client through a mock transport while keeping its accounting
+    transport.sync_client = httpx.Client(
+        transport=transport.counting(httpx.MockTransport(lambda request: httpx.Response(429))),
+        event_hooks=transport.sync_client.event_hooks,
+    )
+    try:
+        transport.sync_client.get("https://example.openai.azure.com/")
+        stats = transport.pool_stats()
+        assert stats["openai"]["requests_total"] == 1
+        assert stats["openai"]["errors_total"] == 1
+        assert stats["openai"]["in_flight"] == 0
+        assert stats["blob"]["hosts"] == 0
+    finally:
+        transport.close()
+
+
+def test_failed_and_abandoned_requests_leave_no_in_flight():
+    transport = SharedHttpTransport()
+
+    def handler(request):
+        if request.url.path == "/down":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, content=b"x" * 10_000)
+
+    transport.sync_client = httpx.Client(transport=transport.counting(httpx.MockTransport(handler)))
+    try:
+        with pytest.raises(httpx.ConnectError):
+            transport.sync_client.get("https://example.openai.azure.com/down")
+        with transport.sync_client.stream("GET", "https://example.openai.azure.com/stream") as response:
+            assert transport.pool_stats()["openai"]["in_flight"] == 1
+            next(response.iter_bytes(16))  # left unread, as a cancelled stream is
+        stats = transport.pool_stats()
+        assert stats["openai"]["in_flight"] == 0
+        assert stats["openai"]["requests_total"] == 2 and stats["openai"]["errors_total"] == 1
+    finally:
+        transport.close()
@@ -0,0 +1,8 @@
+"""Importing the API must not pull in Azure/OpenAI SDKs or touch the network."""
+from tests.benchmarks.bench_importtime import measure_import
+
+
+def test_app_import_is_sdk_free():
+    total_ms, _, eager = measure_import("mapper_api.api.api")
+    assert eager == []
+    assert total_ms > 0
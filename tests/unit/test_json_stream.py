@@ -0,0 +1,28 @@
+"""Tests for the incremental JSON array item parser."""
+import json
+from mapper_api.application.services.json_stream import JsonArrayItemParser
+
+
+def test_items_are_emitted_as_soon_as_they_complete():
+    doc = json.dumps({"taxonomy": [
+        {"name": "Theme A", "id": 1, "score": 0.9, "reasoning": "braces } and \"quotes\" in text"},
+        {"name": "Theme B", "id": 2, "score": 0.5, "reasoning": "nested [1, {\"x\": 2}]"},
+    ]})
+    parser = JsonArrayItemParser("taxonomy")
+
+    first_end = doc.index("},") + 1
+    assert parser.feed(doc[:first_end - 1]) == []
+    first = parser.feed(doc[first_end - 1:first_end])
+    assert [item["name"] for item in first] == ["Theme A"]
+
+    rest = []
+    for i in range(first_end, len(doc), 5):
+        rest.extend(parser.feed(doc[i:i + 5]))
+    assert [item["name"] for item in rest] == ["Theme B"]
+    assert parser.text == doc
+
+
+def test_other_arrays_are_ignored():
+    doc = json.dumps({"other": [{"a": 1}], "taxonomy": [{"b": 2}]})
+    parser = JsonArrayItemParser("taxonomy")
+    assert parser.feed(doc) == [{"b": 2}]
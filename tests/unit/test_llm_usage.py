@@ -0,0 +1,126 @@
+"""Tests for LLM usage accounting: attribution, cost, rolling windows and evaluation budgets."""
+import logging
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from mapper_api.api.usage import LLMUsageMiddleware
+from mapper_api.application.dto.domain_evaluation import EvaluationRequest
+from mapper_api.application.services.llm_usage import (
+    LLMPricing,
+    UsageEvent,
+    UsageWindows,
+    attribute_llm_usage,
+    record_llm_usage,
+    total_usage,
+    track_llm_usage,
+)
+from mapper_api.application.use_cases.evaluate_mapper import EvaluateMapper
+from mapper_api.application.use_cases.map_control_to_5ws import ClassifyControlTo5Ws
+from mapper_api.application.use_cases.map_control_to_themes import ClassifyControlToThemes
+from mapper_api.domain.repositories.ground_truth import RiskThemeGroundTruth, RiskThemeGroundTruthRecord
+from mapper_api.domain.services.evaluation_service import EvaluationService
+from mapper_api.domain.value_objects.metric import MetricType
+from tests.unit.test_use_cases import Fake5WsLLM, FakeLLM, FakeRepo
+
+CONTROL = "This is a test control description that is long enough to pass validation and is written in English."
+
+
+def _usage(prompt=100, completion=20, cached=0):
+    return SimpleNamespace(prompt_tokens=prompt, completion_tokens=completion,
+                           prompt_tokens_details=SimpleNamespace(cached_tokens=cached))
+
+
+class MeteredLLM(FakeLLM):
+    """FakeLLM reporting 100 prompt + 20 completion tokens per call, like the Azure adapter."""
+
+    def json_schema_chat(self, **kwargs):
+        record_llm_usage(_usage(), deployment=kwargs.get("deployment", ""),
+                         schema_name=kwargs["schema_name"], context=kwargs.get("context"))
+        return super().json_schema_chat(**kwargs)
+
+
+class GroundTruth:
+    def get_risk_themes_ground_truth(self):
+        return [
+            RiskThemeGroundTruthRecord(f"c-{i}", CONTROL, [RiskThemeGroundTruth("Theme A", 10, "r")])
+            for i in range(5)
+        ]
+
+    def get_fivews_ground_truth(self):
+        return []
+
+
+def test_nested_trackers_attribution_and_cost():
+    with track_llm_usage() as outer, attribute_llm_usage(route="/evaluator", metric_type="m"):
+        with track_llm_usage() as inner:
+            event = record_llm_usage(_usage(cached=64), deployment="gpt-4o", schema_name="S",
+                                     context={"trace_id": "r-1", "use_case": "taxonomy_mapping"})
+    assert outer.to_dict() == inner.to_dict() == {
+        "calls": 1, "promptTokens": 100, "completionTokens": 20, "cachedTokens": 64,
+        "totalTokens": 120, "costUsd": 0.00037,
+    }
+    assert (event.route, event.use_case, event.record_id, event.metric_type) == (
+        "/evaluator", "taxonomy_mapping", "r-1", "m"
+    )
+    assert LLMPricing(prompt=1, completion=2, cached=0.5).cost(1_000_000, 0, 0) == 1
+    assert total_usage([outer.to_dict(), inner.to_dict()])["totalTokens"] == 240
+
+
+def test_windows_roll_slots_out():
+    windows = UsageWindows(windows_s=(60, 300), slot_s=10)
+
+    def event(ts, prompt):
+        return UsageEvent(ts, "gpt-4o", "S", "/5ws_mapper", "fivews_mapping", None, None, prompt, 10, 0, 0.001)
+
+    windows.add(event(1000.0, 100))
+    windows.add(event(1200.0, 300))
+    snapshot = windows.snapshot(now=1205.0)
+    (last_minute,), (last_5m,) = snapshot["60s"], snapshot["300s"]
+    assert last_minute["calls"] == 1 and last_minute["promptTokensPerCall"] == 300
+    assert last_5m["calls"] == 2 and last_5m["costUsd"] == 0.002
+    windows.add(event(1400.0, 100))  # the slot from t=1000 falls out of the horizon
+    assert windows.snapshot(now=1400.0)["300s"][0]["calls"] == 2
+
+
+def _evaluator(llm):
+    return EvaluateMapper(
+        ground_truth_repo=GroundTruth(),
+        evaluation_service=EvaluationService(),
+        taxonomy_classifier=ClassifyControlToThemes.from_defs(FakeRepo(), llm, deployment_name="gpt-4o"),
+        fivews_classifier=ClassifyControlTo5Ws.from_defs(FakeRepo(), Fake5WsLLM(), deployment_name="gpt-4o"),
+        llm_client=llm,
+    )
+
+
+def test_evaluation_results_carry_usage_and_budget_stops_the_run():
+    metrics = [MetricType.RECALL_K3_RISK_THEME, MetricType.LATENCY_RISK_THEME_MAPPER]
+    results = _evaluator(MeteredLLM()).execute(EvaluationRequest(record_id="run", metric_types=metrics))
+    assert [r.llm_usage["calls"] for r in results.values()] == [5, 5]
+    assert results[MetricType.RECALL_K3_RISK_THEME].to_dict()["llm_usage"]["totalTokens"] == 600
+
+    budgeted = _evaluator(MeteredLLM()).execute(
+        EvaluationRequest(record_id="run", metric_types=metrics, token_budget=300)
+    )
+    recall, latency = budgeted.values()
+    assert recall.llm_usage["calls"] == 3 and "token budget exceeded" in recall.error_message
+    assert latency.llm_usage["calls"] == 0 and latency.error_message
+
+
+def test_middleware_attributes_route_and_logs_request_usage(caplog):
+    app = FastAPI()
+    events = []
+
+    @app.post("/v1/5ws_mapper")
+    def fivews(body: dict):
+        events.append(record_llm_usage(_usage(), schema_name="FiveWsResponse"))
+        return {"ok": True}
+
+    app.add_middleware(LLMUsageMiddleware)
+    with caplog.at_level(logging.INFO, logger="mapper.usage"), TestClient(app) as client:
+        client.post("/v1/5ws_mapper", json={}, headers={"x-trace-id": "t-1"})
+
+    assert events[0].route == "/v1/5ws_mapper"
+    (record,) = [r for r in caplog.records if r.getMessage() == "http.request.llm_usage"]
+    assert record.traceId == "t-1" and record.totalTokens == 120 and record.costUsd == 0.00045
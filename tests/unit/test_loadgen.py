@@ -0,0 +1,103 @@
+"""Tests for the HDR histogram and the open/closed-loop load generator."""
+import asyncio
+import json
+import random
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from tests.benchmarks.hdr_histogram import HdrHistogram
+from tests.benchmarks.loadgen import DEFAULT_CORPORA, CorpusEntry, LoadConfig, compare, load_corpus, run_load
+
+
+def test_hdr_percentiles_within_three_significant_digits():
+    rng = random.Random(1)
+    values = sorted(int(rng.lognormvariate(12, 0.8)) for _ in range(20000))
+    hist = HdrHistogram.of(values)
+    for p in (50, 95, 99, 99.9):
+        exact = values[max(0, int(p / 100 * len(values) + 0.5) - 1)]
+        assert hist.percentile(p) == pytest.approx(exact, rel=2e-3)
+    assert hist.max == values[-1] and hist.min == values[0]
+    assert len(list(hist.buckets())) < len(set(values))
+
+    restored = HdrHistogram.from_dict(json.loads(json.dumps(hist.to_dict())))
+    restored.merge(hist)
+    assert restored.total == 40000
+    assert restored.percentile(99) == hist.percentile(99)
+
+
+def test_corpus_loading_from_ground_truth_and_jsonl(tmp_path):
+    entries = load_corpus(DEFAULT_CORPORA[0])
+    assert entries and entries[0].route is None
+    assert entries[0].body["data"]["controlDescription"]
+
+    corpus = tmp_path / "corpus.jsonl"
+    corpus.write_text(
+        json.dumps({"controlDescription": "Backups are tested monthly."}) + "\n\n"
+        + json.dumps({"route": "/evaluator", "body": {"header": {}, "data": {"metricType": "all"}}}) + "\n"
+    )
+    first, second = load_corpus(corpus)
+    assert first.body["data"]["controlDescription"] == "Backups are tested monthly."
+    assert second.route == "evaluator"
+
+
+def _app():
+    app = FastAPI()
+    calls = {"n": 0}
+
+    @app.post("/taxonomy_mapper")
+    async def taxonomy(body: dict):
+        calls["n"] += 1
+        fail = calls["n"] % 5 == 0
+        await asyncio.sleep(0.02)
+        if fail:
+            return JSONResponse(status_code=503, content={"detail": "busy"})
+        return {"header": body["header"]}
+
+    @app.post("/5ws_mapper")
+    async def fivews(body: dict):
+        await asyncio.sleep(0.01)
+        return {"header": body["header"]}
+
+    return app
+
+
+def _run(config):
+    corpus = [CorpusEntry(body={"header": {}, "data": {"controlDescription": "x"}})]
+
+    async def go():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://test") as client:
+            return await run_load(config, corpus, client=client)
+
+    return asyncio.run(go())
+
+
+def test_closed_loop_reports_percentiles_and_error_breakdown():
+    report = _run(LoadConfig(routes={"taxonomy_mapper": 1.0}, mode="closed", concurrency=5, max_requests=50))
+    stats = report["routes"]["taxonomy_mapper"]
+    assert stats["requests"] == 50
+    assert stats["errors"] == {"http_503": 10}
+    assert stats["latency_ms"]["p50"] >= 20
+    assert set(stats["latency_ms"]) >= {"p50", "p95", "p99", "p999"}
+    assert stats["throughput_rps"] > 0
+
+
+def test_open_loop_follows_arrival_rate_and_route_mix():
+    report = _run(LoadConfig(routes={"taxonomy_mapper": 1.0, "5ws_mapper": 1.0}, mode="open", rate=200,
+                             arrival="uniform", duration_s=0.5, seed=3))
+    assert 90 <= report["issued"] <= 110
+    assert report["routes"]["5ws_mapper"]["requests"] > 20
+    assert report["overall"]["requests"] == report["issued"]
+
+
+def test_compare_flags_regressions_against_baseline():
+    report = _run(LoadConfig(routes={"5ws_mapper": 1.0}, concurrency=2, max_requests=20))
+    baseline = json.loads(json.dumps(report))
+    assert not any(row["regressed"] for row in compare(report, baseline, 10))
+
+    for name in baseline["routes"]["5ws_mapper"]["latency_ms"]:
+        baseline["routes"]["5ws_mapper"]["latency_ms"][name] /= 2
+    rows = compare(report, baseline, 10)
+    assert {row["metric"] for row in rows if row["regressed"]} >= {"latency_ms.p50", "latency_ms.p99"}
@@ -0,0 +1,80 @@
+"""Tests for the event-loop lag monitor and the blocking-call debug mode."""
+import asyncio
+import socket
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from mapper_api.api.loop_monitor import BlockingCallError, LoopLagMonitor, forbid_blocking_calls
+from mapper_api.api.routers.taxonomy_mapper import get_taxonomy_controller, router as taxonomy_router
+from mapper_api.application.dto.http_common import ResponseHeader, TaxonomyData, TaxonomyItem, TaxonomyResponse
+from mapper_api.application.services.metrics import EVENT_LOOP_LAG, EVENT_LOOP_STALLS
+
+REQUEST = {"header": {"recordId": "r-1"}, "data": {"controlDescription": "text"}}
+
+
+class SleepyController:
+    def handle_taxonomy_mapping(self, request):
+        time.sleep(0.01)  # stands in for the blocking LLM call
+        items = [TaxonomyItem(name=f"theme {i}", id=i, score=0.5, reasoning="r") for i in range(3)]
+        return TaxonomyResponse(header=ResponseHeader(recordId=request.header.recordId), data=TaxonomyData(taxonomy=items))
+
+    def stream_taxonomy_mapping(self, request):
+        time.sleep(0.01)  # stands in for validation and language detection, which run before the first event
+        return iter([("result", {"recordId": request.header.recordId})])
+
+
+def test_monitor_logs_stack_of_blocking_task(caplog):
+    async def blocking_handler():
+        time.sleep(0.25)
+
+    async def main():
+        monitor = LoopLagMonitor(interval_s=0.02, stall_threshold_s=0.05)
+        await monitor.start()
+        await asyncio.sleep(0.1)
+        await asyncio.create_task(blocking_handler(), name="request-1")
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor
+
+    lag_before = sum(EVENT_LOOP_LAG.labels()._state()["counts"])
+    stalls_before = EVENT_LOOP_STALLS.labels()._state()
+    monitor = asyncio.run(main())
+
+    assert EVENT_LOOP_STALLS.labels()._state() == stalls_before + monitor.stall_count
+    (stall,) = [s for s in monitor.stalls if s.task and s.task.startswith("request-1")]
+    assert "blocking_handler" in stall.task and stall.overdue_ms > 50
+    assert "time.sleep(0.25)" in "\n".join(stall.stack)
+    assert sum(EVENT_LOOP_LAG.labels()._state()["counts"]) > lag_before
+    assert {r.getMessage() for r in caplog.records if r.name == "mapper.loop"} == {"event_loop.stall"}
+
+
+def test_debug_mode_fails_on_blocking_call_from_the_loop():
+    async def blocks():
+        time.sleep(0.001)
+
+    async def offloads():
+        await asyncio.to_thread(time.sleep, 0.001)
+        await asyncio.sleep(0.001)
+
+    with forbid_blocking_calls() as calls:
+        asyncio.run(offloads())
+    assert calls == []
+    with pytest.raises(BlockingCallError, match="time.sleep"):
+        with forbid_blocking_calls():
+            asyncio.run(blocks())
+    # Patches are removed on exit
+    assert "recv" not in vars(socket.socket) and time.sleep.__module__ == "time"
+
+
+def test_mapper_route_does_not_block_the_loop():
+    app = FastAPI()
+    app.include_router(taxonomy_router)
+    app.dependency_overrides[get_taxonomy_controller] = SleepyController
+    with forbid_blocking_calls(), TestClient(app) as client:
+        response = client.post("/taxonomy_mapper", json=REQUEST)
+        stream = client.post("/taxonomy_mapper/stream", json=REQUEST)
+    assert response.status_code == 200
+    assert stream.status_code == 200 and stream.text.startswith("event: result")
@@ -0,0 +1,146 @@
+"""Tests for the metric registry, Prometheus rendering, multi-worker merge and instrumentation."""
+import json
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from tenacity import RetryError
+
+from mapper_api.api.metrics import RequestMetricsMiddleware
+from mapper_api.api.routers.metrics import router as metrics_router
+from mapper_api.application.dto.llm_schemas import FiveWOut
+from mapper_api.application.ports.blob_store import BlobNotFoundError
+from mapper_api.application.services.metrics import REGISTRY, MetricsRegistry, merge_snapshots, render
+from mapper_api.infrastructure.azure.http_transport import SharedHttpTransport
+from mapper_api.infrastructure.azure.openai_client import AzureOpenAILLMClient
+from mapper_api.infrastructure.local.blob_store import InMemoryBlobStore
+from mapper_api.infrastructure.local.metrics_store import MetricsSnapshotStore
+from mapper_api.infrastructure.local.metered_blob_store import MeteredBlobStore
+from tests.benchmarks.fake_openai_server import FakeOpenAIConfig, serve
+
+
+@pytest.fixture(autouse=True)
+def _clean_registry():
+    REGISTRY.reset()
+    yield
+    REGISTRY.reset()
+
+
+def _sample(text, line_prefix):
+    (value,) = [line.rsplit(" ", 1)[1] for line in text.splitlines() if line.startswith(line_prefix + " ")]
+    return float(value)
+
+
+def test_render_counters_gauges_and_histograms():
+    registry = MetricsRegistry()
+    registry.counter("c_total", "A counter.", ("kind",)).labels('a"b').inc(2)
+    registry.gauge("g", "A gauge.").set(3)
+    hist = registry.histogram("h_seconds", "A histogram.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        hist.labels("/r").observe(value)
+
+    text = render(registry.snapshot())
+    assert "# TYPE c_total counter" in text
+    assert _sample(text, 'c_total{kind="a\\"b"}') == 2
+    assert _sample(text, "g") == 3
+    assert _sample(text, 'h_seconds_bucket{route="/r",le="0.1"}') == 1
+    assert _sample(text, 'h_seconds_bucket{route="/r",le="1"}') == 2
+    assert _sample(text, 'h_seconds_bucket{route="/r",le="+Inf"}') == 3
+    assert _sample(text, 'h_seconds_count{route="/r"}') == 3
+    with pytest.raises(ValueError):
+        registry.counter("c_total", "A counter.").inc(-1)
+
+
+def test_merge_sums_counters_and_only_live_gauges():
+    def worker(requests, in_flight):
+        registry = MetricsRegistry()
+        registry.counter("req_total", "Requests.").inc(requests)
+        registry.gauge("in_flight", "In flight.").set(in_flight)
+        return registry.snapshot()
+
+    merged = merge_snapshots([worker(3, 2), worker(4, 1)], finished=[worker(10, 7)])
+    text = render(merged)
+    assert _sample(text, "req_total") == 17
+    assert _sample(text, "in_flight") == 3
+
+
+def test_snapshot_store_merges_other_workers(tmp_path):
+    registry = MetricsRegistry()
+    counter = registry.counter("req_total", "Requests.")
+    counter.inc(5)
+    store = MetricsSnapshotStore(tmp_path, registry, interval_s=60)
+    # Another worker's flushed file, and a finished one
+    other = MetricsRegistry()
+    other.counter("req_total", "Requests.").inc(2)
+    other.gauge("in_flight", "In flight.").set(4)
+    for pid, finished in ((os.getpid() + 1, False), (os.getpid() + 2, True)):
+        (tmp_path / f"metrics-{pid}.json").write_text(
+            json.dumps({"pid": pid, "finished": finished, "metrics": other.snapshot()})
+        )
+
+    text = render(store.collect())
+    assert _sample(text, "req_total") == 9
+    assert _sample(text, "in_flight") == 4
+    store.close()
+    assert json.loads(store.path.read_text())["finished"] is True
+
+
+def test_request_middleware_and_metrics_endpoint():
+    app = FastAPI()
+
+    @app.post("/v1/5ws_mapper")
+    async def fivews():
+        return {"ok": True}
+
+    app.include_router(metrics_router)
+    app.add_middleware(RequestMetricsMiddleware)
+    with TestClient(app) as client:
+        for _ in range(3):
+            client.post("/v1/5ws_mapper")
+        client.get("/nope")
+        response = client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert _sample(text, 'mapper_http_request_duration_seconds_count{route="/v1/5ws_mapper",method="POST",status="200"}') == 3
+    assert _sample(text, 'mapper_http_request_duration_seconds_count{route="unmatched",method="GET",status="404"}') == 1
+    assert _sample(text, 'mapper_http_requests_in_flight{route="/v1/5ws_mapper"}') == 0
+    assert _sample(text, 'mapper_http_requests_in_flight{route="other"}') == 1  # the scrape itself
+
+
+def test_metered_blob_store_outcomes():
+    store = MeteredBlobStore(InMemoryBlobStore({"a.json": b"{}"}), backend="memory")
+    _, etag = store.download("a.json")
+    assert store.download("a.json", etag=etag) is None
+    with pytest.raises(BlobNotFoundError):
+        store.download("missing.json")
+    text = render(REGISTRY.snapshot())
+    for outcome in ("ok", "not_modified", "not_found"):
+        labels = f'backend="memory",operation="download",outcome="{outcome}"'
+        assert _sample(text, f"mapper_blob_operation_duration_seconds_count{{{labels}}}") == 1
+
+
+def test_llm_client_counts_tokens_retries_and_429s():
+    fast = dict(latency_median_ms=5.0, latency_sigma=0.0, prompt_token_ms=0.0, completion_token_ms=0.0, seed=3)
+    transport = SharedHttpTransport(http2=False)
+    with serve(FakeOpenAIConfig(**fast)) as (url, fake):
+        client = AzureOpenAILLMClient(
+            endpoint=url, api_key="fake-key", api_version="2024-12-01-preview", http_client=transport.sync_client
+        )
+        call = dict(system="Classify.", user="Control text", schema_name="FiveWsResponse",
+                    schema=FiveWOut.model_json_schema(), max_tokens=400, deployment="gpt-4o")
+        client.json_schema_chat(**call)
+        fake.config.update({"error_429_rate": 1.0, "retry_after_s": 0.01})
+        with pytest.raises(RetryError):  # both attempts throttled
+            client.json_schema_chat(**call)
+    transport.close()
+
+    text = render(REGISTRY.snapshot())
+    labels = 'deployment="gpt-4o",schema_name="FiveWsResponse"'
+    assert _sample(text, f'mapper_llm_request_duration_seconds_count{{{labels},outcome="ok"}}') == 1
+    assert _sample(text, f'mapper_llm_request_duration_seconds_count{{{labels},outcome="rate_limited"}}') == 2
+    assert _sample(text, f'mapper_llm_retries_total{{{labels}}}') == 1
+    assert _sample(text, f'mapper_llm_tokens_total{{{labels},kind="completion"}}') > 0
+    # Every 429, including the OpenAI SDK's own retries, is seen by the transport
+    assert _sample(text, 'mapper_llm_rate_limited_total{deployment="gpt-4o"}') == fake.stats()["gpt-4o"]["errors"]["429"]
@@ -0,0 +1,101 @@
+"""Tests for the admin profiling endpoints: token guard, wall/CPU stack samples, allocation diffs."""
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from mapper_api.api.dependencies import get_settings
+from mapper_api.api.routers.admin import router
+from mapper_api.infrastructure.local import profiler
+
+
+class _Settings:
+    ADMIN_TOKEN = "s3cret"
+    PROFILE_MAX_DURATION_S = 5.0
+
+
+def _spin(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def _idle(stop):
+    stop.wait()
+
+
+@pytest.fixture
+def workers():
+    stop = threading.Event()
+    threads = [threading.Thread(target=_spin, args=(stop,), name="spinner"),
+               threading.Thread(target=_idle, args=(stop,), name="idler")]
+    for t in threads:
+        t.start()
+    yield
+    stop.set()
+    for t in threads:
+        t.join()
+
+
+def _client(token):
+    app = FastAPI()
+    app.include_router(router)
+    settings = _Settings()
+    settings.ADMIN_TOKEN = token
+    app.dependency_overrides[get_settings] = lambda: settings
+    return TestClient(app)
+
+
+def test_endpoints_need_configured_admin_token():
+    assert _client("").get("/admin/profile/stacks", headers={"X-Admin-Token": ""}).status_code == 404
+    client = _client("s3cret")
+    assert client.get("/admin/profile/stacks").status_code == 403
+    assert client.get("/admin/profile/memory", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    response = client.get("/admin/profile/stacks", params={"duration_s": 60}, headers={"X-Admin-Token": "s3cret"})
+    assert response.status_code == 422
+
+
+def test_wall_profile_sees_waiting_threads_cpu_profile_does_not(workers):
+    client = _client("s3cret")
+    wall = client.get("/admin/profile/stacks", params={"duration_s": 0.2},
+                      headers={"X-Admin-Token": "s3cret"})
+    assert wall.status_code == 200 and int(wall.headers["X-Profile-Samples"]) > 5
+    lines = wall.text.splitlines()
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any(line.startswith("spinner;") and "test_profiling:_spin" in line for line in lines)
+    assert any(line.startswith("idler;") and "test_profiling:_idle" in line for line in lines)
+
+    cpu = profiler.sample_stacks(0.2, mode="cpu", interval_s=0.01)
+    stacks = cpu.to_collapsed()
+    assert "test_profiling:_spin" in stacks and "test_profiling:_idle" not in stacks
+    # Weighted by CPU microseconds: the spinner used a good share of the window
+    assert sum(w for s, w in cpu.stacks.items() if s.startswith("spinner;")) > 20_000
+
+
+def test_memory_diff_reports_growing_allocation_site():
+    retained = []
+
+    def grow():
+        for _ in range(50):
+            retained.append(bytearray(10_000))
+            time.sleep(0.002)
+
+    thread = threading.Thread(target=grow)
+    timer = threading.Timer(0.05, thread.start)
+    timer.start()
+    diff = _client("s3cret").get("/admin/profile/memory", params={"duration_s": 0.4, "top": 5},
+                                 headers={"X-Admin-Token": "s3cret"}).json()
+    thread.join()
+    assert diff["sizeDiffBytes"] >= 400_000
+    assert "test_profiling.py" in diff["top"][0]["traceback"][0]
+    assert diff["top"][0]["countDiff"] >= 40
+
+
+def test_one_profile_at_a_time():
+    runner = threading.Thread(target=profiler.sample_stacks, args=(0.3,))
+    runner.start()
+    time.sleep(0.05)
+    with pytest.raises(profiler.ProfilerBusyError):
+        profiler.allocation_diff(0.01)
+    runner.join()
@@ -0,0 +1,182 @@
+"""Tests for the cross-worker RPM/TPM token-bucket rate limiter and its stores."""
+import multiprocessing
+
+import pytest
+
+from mapper_api.application.dto.llm_schemas import FiveWOut
+from mapper_api.application.ports.rate_limit_store import BucketLimit
+from mapper_api.application.services.metrics import LLM_QUOTA_REJECTED
+from mapper_api.application.services.rate_limiter import LLMRateLimiter, estimate_tokens
+from mapper_api.domain.errors import LLMCapacityError
+from mapper_api.infrastructure.azure.http_transport import SharedHttpTransport
+from mapper_api.infrastructure.azure.openai_client import AzureOpenAILLMClient
+from mapper_api.infrastructure.local.rate_limit_store import FileRateLimitStore, InMemoryRateLimitStore
+from mapper_api.infrastructure.local.redis_rate_limit_store import _TAKE_SCRIPT, RedisRateLimitStore
+from tests.benchmarks.fake_openai_server import FakeOpenAIConfig, serve
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_requests_and_tokens_both_limit():
+    clock = FakeClock()
+    # 2-request burst refilling 1/s; 200-token burst refilling 100/s
+    limiter = LLMRateLimiter(InMemoryRateLimitStore(clock=clock), requests_per_minute=60, tokens_per_minute=6000,
+                             burst_s=2.0, sleep=clock.sleep)
+    assert limiter.acquire("gpt-4o", 100) == 0.0
+    assert limiter.acquire("gpt-4o", 100) == 0.0
+    assert limiter.acquire("gpt-4o", 100) == pytest.approx(1.0)  # out of requests
+    assert limiter.acquire("gpt-4o", 150) == pytest.approx(1.5)  # out of tokens
+    # A call above the burst is charged the whole burst rather than never passing
+    clock.now += 10
+    assert limiter.acquire("gpt-4o", 5000) == 0.0
+    assert limiter.acquire("gpt-4o", 100) == pytest.approx(1.0)
+    # Deployments have separate buckets
+    assert limiter.acquire("gpt-4o-mini", 100) == 0.0
+    assert estimate_tokens("a" * 10, "b" * 6, max_tokens=50) == 54
+
+
+def test_too_long_a_wait_is_refused_without_taking_quota():
+    clock = FakeClock()
+    limiter = LLMRateLimiter(InMemoryRateLimitStore(clock=clock), requests_per_minute=60, burst_s=1.0,
+                             max_wait_s=0.5, sleep=clock.sleep)
+    rejected_before = LLM_QUOTA_REJECTED.labels("gpt-4o")._state()
+    limiter.acquire("gpt-4o", 10)
+    with pytest.raises(LLMCapacityError, match="quota"):
+        limiter.acquire("gpt-4o", 10)
+    assert LLM_QUOTA_REJECTED.labels("gpt-4o")._state() == rejected_before + 1
+    clock.now += 1.0
+    assert limiter.acquire("gpt-4o", 10) == 0.0
+    # Unlimited when no quota is configured
+    assert LLMRateLimiter(InMemoryRateLimitStore()).acquire("gpt-4o", 10**9) == 0.0
+
+
+def _take_all(path, results):
+    store = FileRateLimitStore(path)
+    limits = [BucketLimit(capacity=12, rate_per_s=1e-6)]
+    results.put(sum(store.take("deployment", [1.0], limits, 0.0)[0] for _ in range(10)))
+
+
+def test_file_store_shares_buckets_between_processes(tmp_path):
+    path = tmp_path / "rate-limit.json"
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    workers = [context.Process(target=_take_all, args=(path, results)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    granted = sum(results.get(timeout=30) for _ in workers)
+    for worker in workers:
+        worker.join(timeout=30)
+    assert granted == 12
+    # A torn state file reads as full buckets
+    path.write_text("{trunc")
+    assert FileRateLimitStore(path).take("deployment", [1.0], [BucketLimit(1, 1)], 0.0) == (True, 0.0)
+
+
+def test_llm_client_reserves_quota_before_sending():
+    fast = dict(latency_median_ms=5.0, latency_sigma=0.0, prompt_token_ms=0.0, completion_token_ms=0.0, seed=3)
+    waits = []
+    limiter = LLMRateLimiter(InMemoryRateLimitStore(), requests_per_minute=60, burst_s=1.0, sleep=waits.append)
+    transport = SharedHttpTransport(http2=False)
+    with serve(FakeOpenAIConfig(**fast)) as (url, fake):
+        client = AzureOpenAILLMClient(
+            endpoint=url, api_key="fake-key", api_version="2024-12-01-preview",
+            http_client=transport.sync_client, rate_limiter=limiter,
+        )
+        call = dict(system="Classify.", user="Control text", schema_name="FiveWsResponse",
+                    schema=FiveWOut.model_json_schema(), max_tokens=400, deployment="gpt-4o")
+        client.json_schema_chat(**call)
+        client.json_schema_chat(**call)
+    transport.close()
+    # One request per second: the second call waited (with the sleep stubbed) for most of a second
+    assert waits and 0.5 < waits[0] <= 1.0
+
+
+def _lua_number(value):
+    # Lua's tostring / table.concat format numbers with %.14g
+    return format(value, ".14g")
+
+
+class ScriptedRedis:
+    """
+    Redis double for ``RedisRateLimitStore``: GET/SET/EX/TIME on a fake clock,
+    and ``_TAKE_SCRIPT`` evaluated statement by statement in Python, through
+    the same string encoding of the key.
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.values = {}
+
+    def register_script(self, script):
+        assert script == _TAKE_SCRIPT
+        return self._take
+
+    def _get(self, key):
+        value, expires_at = self.values.get(key, (None, 0.0))
+        return value if self.clock() < expires_at else None
+
+    def _take(self, keys, args):
+        args = [str(arg) for arg in args]  # redis-py sends every argument as a string
+        now = round(self.clock(), 6)  # TIME: seconds and microseconds
+        max_wait = float(args[0])
+        buckets = (len(args) - 2) // 3
+        updated_at, levels = now, {}
+        raw = self._get(keys[0])
+        if raw:
+            for i, value in enumerate(v for v in raw.split(",") if v):
+                if i == 0:
+                    updated_at = float(value)
+                else:
+                    levels[i] = float(value)
+        elapsed = max(now - updated_at, 0)
+        wait = 0
+        for b in range(1, buckets + 1):
+            cost, capacity, rate = (float(args[3 * b - 1 + j]) for j in range(3))
+            level = capacity
+            if b in levels:
+                level = min(capacity, levels[b] + elapsed * rate)
+            levels[b] = level
+            if cost > level:
+                wait = max(wait, (cost - level) / rate)
+        if wait > max_wait:
+            return [0, _lua_number(wait)]
+        for b in range(1, buckets + 1):
+            levels[b] = levels[b] - float(args[3 * b - 1])
+        encoded = "%.6f" % now + "," + ",".join(_lua_number(levels[b]) for b in range(1, buckets + 1))
+        self.values[keys[0]] = (encoded, self.clock() + int(args[1]))
+        return [1, _lua_number(wait)]
+
+
+def test_redis_script_matches_the_in_process_buckets():
+    clock = FakeClock()
+    redis_store = RedisRateLimitStore(ScriptedRedis(clock))
+    reference = InMemoryRateLimitStore(clock=clock)
+    # 2-request burst refilling 1/s; 200-token burst refilling 100/s
+    limits = [BucketLimit(2, 1.0), BucketLimit(200, 100.0)]
+    steps = [(0.0, 150), (0.0, 100), (0.3, 10), (0.7, 10), (0.0, 10), (0.25, 500), (5.0, 10), (60.0, 10)]
+    for advance, tokens in steps:
+        clock.now += advance
+        expected = reference.take("gpt-4o", [1, tokens], limits, max_wait_s=2.0)
+        granted, wait_s = redis_store.take("gpt-4o", [1, tokens], limits, max_wait_s=2.0)
+        assert granted == expected[0]
+        assert wait_s == pytest.approx(expected[1], abs=1e-5)
+
+
+def test_redis_script_on_fakeredis():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # fakeredis evaluates Lua through lupa
+    store = RedisRateLimitStore(fakeredis.FakeRedis())
+    limits = [BucketLimit(2, 0.001)]
+    assert store.take("k", [1], limits, max_wait_s=0.0) == (True, 0.0)
+    assert store.take("k", [1], limits, max_wait_s=0.0) == (True, 0.0)
+    granted, wait_s = store.take("k", [1], limits, max_wait_s=0.0)
+    assert not granted and wait_s == pytest.approx(1000, rel=0.01)
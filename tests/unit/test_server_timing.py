@@ -0,0 +1,66 @@
+"""Tests for per-stage timing: use case stages, Server-Timing header, logs and histograms."""
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from mapper_api.api.server_timing import ServerTimingMiddleware
+from mapper_api.application.dto.domain_mapping import TaxonomyMappingRequest
+from mapper_api.application.services.stage_timing import StageHistograms, stage, track_stages
+from mapper_api.application.use_cases.map_control_to_themes import ClassifyControlToThemes
+from tests.unit.test_use_cases import FakeLLM, FakeRepo
+
+CONTROL = "This is a test control description that is long enough to pass validation and is written in English."
+
+
+def test_use_case_reports_each_stage():
+    use_case = ClassifyControlToThemes.from_defs(FakeRepo(), FakeLLM(), deployment_name="test-deployment")
+    with track_stages() as timings:
+        use_case.execute(TaxonomyMappingRequest(record_id="r-1", control_description=CONTROL))
+    assert list(timings.snapshot()) == ["validate", "prompt", "schema", "llm", "parse", "scoring"]
+    # Outside a tracked context stages are no-ops
+    use_case.execute(TaxonomyMappingRequest(record_id="r-1", control_description=CONTROL))
+
+
+def test_repeated_stages_accumulate():
+    with track_stages() as timings:
+        for _ in range(3):
+            with stage("llm"):
+                pass
+    assert timings.counts == {"llm": 3}
+    assert timings.server_timing({"total": 1.25}).endswith("total;dur=1.2")
+
+
+def test_histogram_percentiles_and_buckets():
+    histograms = StageHistograms(buckets_ms=(10, 100, 1000))
+    for ms in [5] * 50 + [50] * 45 + [500] * 5:
+        histograms.observe("/r", {"llm": ms})
+    series = histograms.snapshot()["/r"]["llm"]
+    assert series["count"] == 100
+    assert series["buckets"] == {"10": 50, "100": 95, "1000": 100, "+Inf": 100}
+    assert series["p50Ms"] == 10.0 and 10 < series["p95Ms"] <= 100 < series["p99Ms"] <= 1000
+
+
+def test_middleware_sets_header_logs_and_observes(caplog):
+    app = FastAPI()
+    use_case = ClassifyControlToThemes.from_defs(FakeRepo(), FakeLLM(), deployment_name="test-deployment")
+
+    @app.post("/v1/taxonomy_mapper")
+    async def taxonomy(body: dict):
+        return {"taxonomy": use_case.execute(TaxonomyMappingRequest(record_id="r-1", control_description=CONTROL))}
+
+    @app.get("/v1/health")
+    async def health():
+        return {"ok": True}
+
+    histograms = StageHistograms()
+    app.add_middleware(ServerTimingMiddleware, histograms=histograms)
+    with caplog.at_level(logging.INFO, logger="mapper.timing"), TestClient(app) as client:
+        response = client.post("/v1/taxonomy_mapper", json={}, headers={"x-trace-id": "t-1"})
+        assert client.get("/v1/health").headers["server-timing"].startswith("total;dur=")
+
+    entries = [entry.split(";dur=")[0] for entry in response.headers["server-timing"].split(", ")]
+    assert entries == ["validate", "prompt", "schema", "llm", "parse", "scoring", "serialize", "total"]
+    (record,) = [r for r in caplog.records if r.getMessage() == "http.request.timing"]
+    assert record.route == "/v1/taxonomy_mapper" and record.status == 200 and record.traceId == "t-1"
+    assert set(histograms.snapshot()["/v1/taxonomy_mapper"]) == set(entries)
@@ -0,0 +1,25 @@
+"""Tests for in-band SSE error events of the streaming mapper route."""
+from mapper_api.api.sse import sse_stream
+from mapper_api.domain.errors import DeadlineExceededError, LLMCapacityError
+from mapper_api.interface.controllers.taxonomy_controller import TaxonomyController
+
+
+def _failing(error):
+    yield "theme", {"id": 1}
+    raise error
+
+
+def _stream(error):
+    events = TaxonomyController(definitions=None)._transform_events("r-1", None, _failing(error))
+    return list(sse_stream(events, "t-1"))
+
+
+def test_overload_and_timeout_are_not_reported_as_validation_errors():
+    overloaded = _stream(LLMCapacityError("No LLM capacity"))
+    assert overloaded[0].startswith("event: theme")
+    assert overloaded[1] == (
+        'event: overloaded\ndata: {"error":"No LLM capacity","traceId":"t-1","retryAfterS":1}\n\n'
+    )
+    assert _stream(DeadlineExceededError("Request cancelled: client disconnected"))[1].startswith("event: timeout\n")
+    failed = _stream(RuntimeError("bad json"))[1]
+    assert failed.startswith("event: error\n") and "Failed to process control description" in failed
@@ -0,0 +1,163 @@
+"""Tests for OpenTelemetry spans: local provider, sampling, exporters, HTTP/use case/LLM/blob layers."""
+import importlib
+import sys
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from mapper_api.api.tracing import TracingMiddleware, configure_tracing
+from mapper_api.application.dto.domain_mapping import TaxonomyMappingRequest
+from mapper_api.application.dto.llm_schemas import FiveWOut
+from mapper_api.application.ports.blob_store import BlobNotFoundError
+from mapper_api.application.services import tracing
+from mapper_api.application.use_cases.map_control_to_themes import ClassifyControlToThemes
+from mapper_api.config.settings import Settings
+from mapper_api.infrastructure.azure.http_transport import SharedHttpTransport
+from mapper_api.infrastructure.azure.openai_client import AzureOpenAILLMClient
+from mapper_api.infrastructure.local.blob_store import InMemoryBlobStore
+from mapper_api.infrastructure.local.capture_log import read_capture
+from mapper_api.infrastructure.local.tracing import FileSpanExporter, InMemorySpanExporter, LocalTracerProvider
+from mapper_api.infrastructure.local.metered_blob_store import MeteredBlobStore
+from tests.benchmarks.fake_openai_server import FakeOpenAIConfig, serve
+from tests.unit.test_use_cases import FakeLLM, FakeRepo
+
+CONTROL = "This is a test control description that is long enough to pass validation and is written in English."
+TRACEPARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemorySpanExporter()
+    tracing.set_tracer_provider(LocalTracerProvider(exporter, seed=1))
+    yield exporter
+    tracing.set_tracer_provider(None)
+
+
+def _by_name(spans):
+    return {s["name"]: s for s in spans}
+
+
+def test_request_span_tree_continues_traceparent(exporter):
+    app = FastAPI()
+    use_case = ClassifyControlToThemes.from_defs(FakeRepo(), FakeLLM(), deployment_name="test-deployment")
+
+    @app.post("/v1/taxonomy_mapper")
+    def taxonomy(body: dict):
+        return {"taxonomy": use_case.execute(TaxonomyMappingRequest(record_id="r-1", control_description=CONTROL))}
+
+    app.add_middleware(TracingMiddleware)
+    with TestClient(app) as client:
+        response = client.post("/v1/taxonomy_mapper", json={}, headers={"traceparent": TRACEPARENT, "x-trace-id": "t-1"})
+
+    spans = _by_name(exporter.spans("0af7651916cd43dd8448eb211c80319c"))
+    server, execute = spans["POST /v1/taxonomy_mapper"], spans["ClassifyControlToThemes.execute"]
+    assert server["kind"] == "SERVER" and server["parentSpanId"] == "b7ad6b7169203331"
+    assert server["attributes"]["http.response.status_code"] == 200
+    assert server["attributes"]["mapper.trace_id"] == "t-1"
+    assert execute["parentSpanId"] == server["spanId"]
+    assert execute["attributes"]["mapper.record_id"] == "r-1"
+    assert response.headers["traceresponse"].startswith("00-0af7651916cd43dd8448eb211c80319c-")
+
+
+def test_unsampled_traces_record_nothing():
+    exporter = InMemorySpanExporter()
+    tracing.set_tracer_provider(LocalTracerProvider(exporter, sample_ratio=0.0))
+    try:
+        with tracing.span("outer") as outer:
+            assert not outer.is_recording()
+            assert tracing.current_trace_id() is not None
+            with tracing.span("inner") as inner:
+                assert not inner.is_recording()
+                tracing.set_span_attributes(mapper__record_id="r-1")
+    finally:
+        tracing.set_tracer_provider(None)
+    assert exporter.spans() == []
+    with pytest.raises(ValueError):
+        LocalTracerProvider(exporter, sample_ratio=1.5)
+
+
+def test_file_exporter_writes_spans(tmp_path):
+    provider = LocalTracerProvider(FileSpanExporter(tmp_path), resource={"service.name": "mapper-api"})
+    tracing.set_tracer_provider(provider)
+    try:
+        with pytest.raises(RuntimeError), tracing.span("failing", mapper__record_id="r-1"):
+            raise RuntimeError("boom")
+    finally:
+        tracing.set_tracer_provider(None)
+        provider.shutdown()
+    (record,) = list(read_capture(sorted(tmp_path.glob("spans-*.ndjson.gz"))))
+    assert record["name"] == "failing" and record["status"] == "ERROR"
+    assert record["resource"] == {"service.name": "mapper-api"}
+    assert record["events"][0]["attributes"]["exception.type"] == "RuntimeError"
+
+
+def test_blob_spans_carry_name_and_cache_outcome(exporter):
+    store = MeteredBlobStore(InMemoryBlobStore({"a.json": b"{}"}), backend="memory")
+    with tracing.span("parent"):
+        _, etag = store.download("a.json")
+        store.download("a.json", etag=etag)
+        with pytest.raises(BlobNotFoundError):
+            store.download("missing.json")
+    downloads = [s for s in exporter.spans() if s["name"] == "blob.download"]
+    assert [s["attributes"]["mapper.blob.name"] for s in downloads] == ["a.json", "a.json", "missing.json"]
+    assert [s["attributes"]["mapper.blob.cache_hit"] for s in downloads] == [False, True, False]
+    assert downloads[0]["attributes"]["mapper.blob.size_bytes"] == 2
+    assert downloads[2]["status"] == "UNSET" and downloads[2]["events"][0]["name"] == "exception"
+
+
+def test_llm_span_has_tokens_and_retries(exporter):
+    fast = dict(latency_median_ms=5.0, latency_sigma=0.0, prompt_token_ms=0.0, completion_token_ms=0.0, seed=3)
+    transport = SharedHttpTransport(http2=False)
+    with serve(FakeOpenAIConfig(**fast)) as (url, fake):
+        client = AzureOpenAILLMClient(
+            endpoint=url, api_key="fake-key", api_version="2024-12-01-preview", http_client=transport.sync_client
+        )
+        call = dict(system="Classify.", user="Control text", schema_name="FiveWsResponse",
+                    schema=FiveWOut.model_json_schema(), max_tokens=400, deployment="gpt-4o",
+                    context={"trace_id": "r-9"})
+        client.json_schema_chat(**call)
+        "".join(client.json_schema_chat_stream(**call))
+        fake.config.update({"error_429_rate": 1.0, "retry_after_s": 0.01})
+        with pytest.raises(Exception):
+            client.json_schema_chat(**call)
+    transport.close()
+
+    ok, streamed, throttled = [s for s in exporter.spans() if s["name"] == "chat gpt-4o"]
+    assert ok["kind"] == "CLIENT" and ok["attributes"]["mapper.trace_id"] == "r-9"
+    assert ok["attributes"]["gen_ai.usage.output_tokens"] > 0
+    assert ok["attributes"]["mapper.llm.retry_count"] == 0
+    assert streamed["attributes"]["mapper.llm.stream"] is True
+    assert streamed["attributes"]["gen_ai.usage.input_tokens"] > 0
+    assert throttled["status"] == "ERROR" and throttled["attributes"]["mapper.llm.retry_count"] == 1
+    assert [e["name"] for e in throttled["events"]][0] == "llm.retry"
+
+
+@pytest.fixture
+def without_opentelemetry(monkeypatch):
+    # Re-import the module as if opentelemetry-api (the ``tracing`` extra) were not installed
+    monkeypatch.setitem(sys.modules, "opentelemetry", None)
+    importlib.reload(tracing)
+    yield
+    monkeypatch.undo()
+    importlib.reload(tracing)
+
+
+def test_spans_are_no_ops_without_opentelemetry(without_opentelemetry):
+    assert not tracing.tracing_available()
+    with tracing.span("noop", mapper__record_id="r1") as current:
+        assert not current.is_recording()
+        tracing.set_span_attributes(mapper__record_id="r1")
+    started = tracing.start_span("noop.manual")
+    with tracing.activate(started):
+        tracing.mark_error(started, ValueError("boom"))
+    started.end()
+    assert tracing.traced("noop.decorated")(lambda x: x + 1)(1) == 2
+    assert tracing.current_trace_id() is None
+
+    store = MeteredBlobStore(InMemoryBlobStore({"a.json": b"{}"}), backend="memory")
+    assert store.download("a.json")[0] == b"{}"
+    with pytest.raises(BlobNotFoundError):
+        store.download("missing.json")
+    with pytest.raises(RuntimeError, match="opentelemetry-api"):
+        configure_tracing(Settings.model_construct(TRACING_ENABLED=True))
@@ -0,0 +1,113 @@
+"""Tests for sampled traffic capture (middleware + rotating writer) and time-faithful replay."""
+import asyncio
+import gzip
+import time
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from mapper_api.api.capture import TrafficCaptureMiddleware, text_sha256
+from mapper_api.application.services.llm_usage import record_llm_usage
+from mapper_api.infrastructure.local.capture_log import CaptureLogWriter, read_capture
+from tests.benchmarks.replay import replay_capture, resolve_bodies
+
+CONTROL = "Backups are restored and tested every month by the infrastructure team."
+
+
+def test_writer_rotates_and_partial_files_stay_readable(tmp_path):
+    writer = CaptureLogWriter(tmp_path, max_file_bytes=2048, max_files=3, batch_size=10)
+    for i in range(600):
+        writer.submit({"i": i, "pad": text_sha256(str(i))})
+        if i % 50 == 0:
+            time.sleep(0.01)  # let the writer rotate between batches
+
+    deadline = time.monotonic() + 5
+    while writer.stats()["written"] < 600 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # Still open: the current file has no gzip trailer yet but is readable up to the last batch
+    open_records = list(read_capture([tmp_path]))
+    writer.close()
+
+    files = sorted(tmp_path.glob("capture-*.ndjson.gz"))
+    assert len(files) == 3 and writer.stats()["files"] > 3
+    closed_records = list(read_capture([tmp_path]))
+    assert [r["i"] for r in closed_records] == list(range(closed_records[0]["i"], 600))
+    assert len(open_records) == len(closed_records)
+    gzip.decompress(files[-1].read_bytes())  # closed files are complete gzip streams
+
+
+def test_writer_drops_instead_of_blocking_when_full(tmp_path):
+    writer = CaptureLogWriter(tmp_path, queue_size=1)
+    writer._ensure_thread = lambda: None  # no consumer
+    assert writer.submit({"a": 1}) is True
+    assert writer.submit({"a": 2}) is False
+    assert writer.stats()["dropped"] == 1
+
+
+def _captured_app(tmp_path, include_text):
+    app = FastAPI()
+
+    @app.post("/v1/taxonomy_mapper")
+    def taxonomy(body: dict):
+        record_llm_usage(SimpleNamespace(prompt_tokens=100, completion_tokens=20,
+                                         prompt_tokens_details=SimpleNamespace(cached_tokens=64)))
+        return {"ok": True}
+
+    @app.post("/v1/other")
+    def other(body: dict):
+        return {"ok": True}
+
+    writer = CaptureLogWriter(tmp_path)
+    app.add_middleware(TrafficCaptureMiddleware, writer=writer, sample_rate=1.0, include_text=include_text)
+    return app, writer
+
+
+def test_middleware_captures_sampled_routes_with_llm_usage(tmp_path):
+    app, writer = _captured_app(tmp_path, include_text=False)
+    body = {"header": {"recordId": "r-1"}, "data": {"controlDescription": CONTROL}}
+    with TestClient(app) as client:
+        assert client.post("/v1/taxonomy_mapper", json=body).status_code == 200
+        client.post("/v1/other", json=body)
+    writer.close()
+
+    (record,) = list(read_capture([tmp_path]))
+    assert record["route"] == "/v1/taxonomy_mapper"
+    assert record["recordId"] == "r-1" and record["status"] == 200
+    assert record["controlSha256"] == text_sha256(CONTROL)
+    assert "controlDescription" not in record["body"]["data"]
+    assert record["llm"] == {"calls": 1, "promptTokens": 100, "completionTokens": 20, "cachedTokens": 64,
+                             "totalTokens": 120, "costUsd": 0.00037}
+    assert record["durationMs"] >= 0
+
+
+def test_replay_scales_inter_arrival_times_and_restores_hashed_text(tmp_path):
+    app = FastAPI()
+    seen = []
+
+    @app.post("/v1/5ws_mapper")
+    async def fivews(body: dict):
+        seen.append((time.perf_counter(), body["data"]["controlDescription"]))
+        return {"ok": True}
+
+    records = [
+        {"ts": 1000.0 + 0.4 * i, "route": "/v1/5ws_mapper", "status": 200, "durationMs": 50.0,
+         "controlSha256": text_sha256(CONTROL), "body": {"header": {"recordId": f"r{i}"}, "data": {}}}
+        for i in range(3)
+    ]
+    records.append({**records[0], "controlSha256": "unknown"})
+    resolved = resolve_bodies(records, {text_sha256(CONTROL): CONTROL})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await replay_capture(resolved, client=client, speed=4.0)
+
+    report = asyncio.run(run())
+    assert report["replayed"] == 3 and report["skipped_unresolved"] == 1
+    assert [text for _, text in seen] == [CONTROL] * 3
+    gap = seen[-1][0] - seen[0][0]
+    assert 0.15 <= gap < 0.35  # 0.8 s of original traffic at 4x
+    route = report["routes"]["/v1/5ws_mapper"]
+    assert route["requests"] == 3 and route["status_mismatches"] == 0
+    assert route["change_pct"]["p50"] < 0  # in-process replay beats the captured 50 ms
@@ -221,3 +221,34 @@ def test_score_thresholding():
     assert len(result) == 1
     assert result[0]["name"] == "Theme A"
     assert result[0]["score"] == 0.9
+
+
+def test_classify_control_to_themes_stream():
+    class StreamingLLM(FakeLLM):
+        def json_schema_chat_stream(self, **kwargs):
+            content = self.json_schema_chat(**kwargs)
+            for i in range(0, len(content), 7):
+                yield content[i:i + 7]
+
+    repo = FakeRepo()
+    use_case = ClassifyControlToThemes.from_defs(repo, StreamingLLM(), deployment_name="test-deployment")
+
+    request = TaxonomyMappingRequest(
+        record_id="test-123",
+        control_description="This is a test control description that is long enough to pass validation and is written in English."
+    )
+
+    events = list(use_case.execute_stream(request))
+
+    assert [event for event, _ in events] == ["theme", "theme", "theme", "result"]
+    assert events[0][1]["name"] == "Theme A"
+    assert events[-1][1] == use_case.execute(request)
+
+
+def test_classify_control_to_themes_stream_validates_eagerly():
+    use_case = ClassifyControlToThemes.from_defs(FakeRepo(), FakeLLM(), deployment_name="test-deployment")
+
+    request = TaxonomyMappingRequest(record_id="test-123", control_description="Short")
+
+    with pytest.raises(ValueError, match="at least 50 characters"):
+        use_case.execute_stream(request)
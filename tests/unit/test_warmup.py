@@ -0,0 +1,81 @@
+"""Tests for the readiness warm-up report and /health gating."""
+import asyncio
+from pathlib import Path
+from fastapi import FastAPI
+from mapper_api.api import warmup
+from mapper_api.api.routers.health import health_check
+from mapper_api.application.services.compiled_definitions import CompiledDefinitions, DefinitionsHolder
+from mapper_api.infrastructure.azure.blob_definitions_repo import BlobDefinitionsRepository
+from mapper_api.infrastructure.local.llm_client import StaticLLMClient
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "mapper_api" / "infrastructure" / "local" / "data"
+
+
+def _local_snapshot():
+    return BlobDefinitionsRepository._build_snapshot(
+        (DATA_DIR / "taxonomy.json").read_bytes(), (DATA_DIR / "5ws.json").read_bytes()
+    )
+
+
+def _offline(monkeypatch, holder):
+    def unavailable():
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(warmup, "start_definitions_refresher", lambda: None)
+    monkeypatch.setattr(warmup, "get_definitions_holder", lambda: holder)
+    monkeypatch.setattr(warmup, "get_definitions_repo", unavailable)
+    monkeypatch.setattr(warmup, "get_llm_client", unavailable)
+    monkeypatch.setattr(warmup, "_acquire_storage_token", unavailable)
+    monkeypatch.setattr(warmup, "_report", None)
+
+
+def test_warmup_times_every_step_and_gates_on_required(monkeypatch):
+    holder = DefinitionsHolder(CompiledDefinitions.compile(_local_snapshot(), StaticLLMClient(), "d"))
+    _offline(monkeypatch, holder)
+
+    report = warmup.run_warmup(FastAPI())
+
+    steps = {step.name: step for step in report.steps}
+    assert list(steps)[:6] == ["aad_token", "definitions", "language_detection", "request_schemas",
+                               "taxonomy_dry_run", "fivews_dry_run"]
+    assert all(steps[name].ok for name in ["taxonomy_dry_run", "fivews_dry_run", "language_detection"])
+    # Network pre-connects failing does not block readiness
+    assert not steps["azure_openai_connection"].ok and not steps["azure_openai_connection"].required
+    assert report.ready
+    assert report.to_dict()["steps"][0]["durationMs"] >= 0
+    assert asyncio.run(health_check()).status == "healthy"
+
+
+def test_health_not_ready_without_definitions(monkeypatch):
+    _offline(monkeypatch, DefinitionsHolder())
+    assert asyncio.run(health_check()).status_code == 503
+
+    report = warmup.run_warmup(FastAPI())
+    assert not report.ready
+    assert asyncio.run(health_check()).status_code == 503
+
+
+def test_failed_definitions_load_is_retried_until_ready(monkeypatch):
+    holder = DefinitionsHolder()
+    _offline(monkeypatch, holder)
+    attempts = []
+
+    def load_definitions():
+        attempts.append(True)
+        if len(attempts) < 3:
+            raise ConnectionError("storage unreachable")
+        holder.swap(CompiledDefinitions.compile(_local_snapshot(), StaticLLMClient(), "d"))
+
+    monkeypatch.setattr(warmup, "start_definitions_refresher", load_definitions)
+    app = FastAPI()
+    assert not warmup.run_warmup(app).ready
+    assert asyncio.run(health_check()).status_code == 503
+
+    asyncio.run(warmup.retry_warmup(app, initial_backoff_s=0.01))
+
+    assert len(attempts) == 3
+    steps = {step.name: step for step in warmup.get_warmup_report().steps}
+    assert steps["definitions"].ok and steps["taxonomy_dry_run"].ok
+    # Optional steps are not retried
+    assert not steps["azure_openai_connection"].ok
+    assert asyncio.run(health_check()).status == "healthy"
@@ -0,0 +1,65 @@
+"""Tests for the dedicated worker pools running blocking request work."""
+import asyncio
+import threading
+from contextvars import ContextVar
+
+from mapper_api.application.services.metrics import WORKER_POOL_QUEUED
+from mapper_api.application.services.worker_pools import WorkerPool
+
+REQUEST_ID: ContextVar[str] = ContextVar("request_id", default="")
+
+
+def test_pool_runs_in_the_callers_context_and_reports_its_queue():
+    pool = WorkerPool("test", max_workers=2)
+    release = threading.Event()
+    seen = []
+
+    def work():
+        release.wait(5)
+        seen.append((REQUEST_ID.get(), threading.current_thread().name))
+
+    async def main():
+        REQUEST_ID.set("r-1")
+        calls = [asyncio.ensure_future(pool.run(work)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        stats = pool.stats()
+        release.set()
+        await asyncio.gather(*calls)
+        return stats
+
+    try:
+        assert asyncio.run(main()) == {"maxWorkers": 2, "busy": 2, "queued": 1, "orphaned": 0}
+    finally:
+        pool.shutdown()
+    assert {request_id for request_id, _ in seen} == {"r-1"}
+    assert all(name.startswith("test-worker") for _, name in seen)
+    assert pool.stats()["busy"] == 0 and WORKER_POOL_QUEUED.labels("test")._state() == 0
+
+
+def test_iterate_steps_a_generator_on_the_pool_and_closes_it_early():
+    pool = WorkerPool("test-iterate", max_workers=1)
+    threads = []
+    closed = threading.Event()
+
+    def chunks():
+        try:
+            for i in range(10):
+                threads.append(threading.current_thread().name)
+                yield i
+        finally:
+            closed.set()
+
+    async def main():
+        received = []
+        async for item in pool.iterate(chunks()):
+            received.append(item)
+            if len(received) == 3:
+                break
+        return received
+
+    try:
+        assert asyncio.run(main()) == [0, 1, 2]
+        assert closed.wait(1)
+    finally:
+        pool.shutdown()
+    assert threads and all(name.startswith("test-iterate-worker") for name in threads)